@@ -1,4 +1,17 @@
-from raiden.utils.typing import List, TokenAddress
+from dataclasses import dataclass
+from enum import Enum
+
+from raiden.utils.typing import (
+    BlockTimeout,
+    List,
+    Optional,
+    PaymentAmount,
+    PaymentID,
+    Secret,
+    SecretHash,
+    TargetAddress,
+    TokenAddress,
+)
 
 
 class FlatList(list):
@@ -33,3 +46,22 @@ class PartnersPerToken:
     def __init__(self, partner_address: Address, channel: str) -> None:
         self.partner_address = partner_address
         self.channel = channel
+
+
+class BatchedPaymentStatus(Enum):
+    PENDING = "pending"
+    SUCCESS = "success"
+    FAILED = "failed"
+
+
+@dataclass
+class BatchedPayment:
+    token_address: TokenAddress
+    target_address: TargetAddress
+    amount: PaymentAmount
+    identifier: Optional[PaymentID] = None
+    secret: Optional[Secret] = None
+    secret_hash: Optional[SecretHash] = None
+    lock_timeout: Optional[BlockTimeout] = None
+    status: BatchedPaymentStatus = BatchedPaymentStatus.PENDING
+    errors: Optional[str] = None
@@ -0,0 +1,156 @@
+""" Executes the payments of a batch started through the API.
+
+The payments are started concurrently, at most `max_concurrency` of them are
+in flight at the same time. The routes found for a payment are shared with the
+payments of the batch which have the same token network, target and amount.
+"""
+import gevent
+import structlog
+from gevent import Greenlet
+from gevent.event import Event
+from gevent.pool import Pool
+
+from raiden.api.objects import BatchedPayment, BatchedPaymentStatus
+from raiden.exceptions import (
+    InsufficientFunds,
+    InvalidAmount,
+    InvalidBinaryAddress,
+    InvalidPaymentIdentifier,
+    InvalidSecret,
+    InvalidSecretHash,
+    PaymentConflict,
+    SamePeerAddress,
+    UnknownTokenAddress,
+)
+from raiden.routing import RouteCache
+from raiden.transfer.events import EventPaymentSentFailed, EventPaymentSentSuccess
+from raiden.utils import metrics
+from raiden.utils.gevent import spawn_named
+from raiden.utils.secrethash import sha256_secrethash
+from raiden.utils.transfers import create_default_identifier
+from raiden.utils.typing import (
+    MYPY_ANNOTATION,
+    TYPE_CHECKING,
+    Dict,
+    List,
+    Optional,
+    TokenNetworkRegistryAddress,
+)
+
+if TYPE_CHECKING:
+    from raiden.api.python import RaidenAPI
+
+log = structlog.get_logger(__name__)
+
+# Errors of a single payment, these don't stop the batch
+PAYMENT_ERRORS = (
+    InsufficientFunds,
+    InvalidAmount,
+    InvalidBinaryAddress,
+    InvalidPaymentIdentifier,
+    InvalidSecret,
+    InvalidSecretHash,
+    PaymentConflict,
+    SamePeerAddress,
+    UnknownTokenAddress,
+)
+
+# Finished batches which are kept for the clients to poll their results
+MAX_FINISHED_PAYMENT_BATCHES = 100
+
+BATCH_PAYMENTS = metrics.Counter(
+    "raiden_api_batch_payments_total",
+    "Payments of the batches started through the API which finished, by result",
+    labelnames=("result",),
+)
+BATCH_PAYMENTS_IN_FLIGHT = metrics.Gauge(
+    "raiden_api_batch_payments_in_flight", "Payments of the batches which are in flight"
+)
+
+
+class PaymentBatch:
+    def __init__(
+        self,
+        identifier: int,
+        raiden_api: "RaidenAPI",
+        registry_address: TokenNetworkRegistryAddress,
+        payments: List[BatchedPayment],
+        max_concurrency: int,
+    ) -> None:
+        self.identifier = identifier
+        self.raiden_api = raiden_api
+        self.registry_address = registry_address
+        self.payments = payments
+        self.max_concurrency = max_concurrency
+
+        for payment in payments:
+            if payment.identifier is None:
+                payment.identifier = create_default_identifier()
+
+        self.route_cache = RouteCache()
+        self.finished = Event()
+        self.greenlet: Optional[Greenlet] = None
+
+    def start(self) -> None:
+        log.debug(
+            "Starting payment batch",
+            batch_identifier=self.identifier,
+            payments=len(self.payments),
+            max_concurrency=self.max_concurrency,
+        )
+        # The expected errors of a payment are recorded in its result, any
+        # other error is a bug and stops the node
+        self.greenlet = spawn_named(f"PaymentBatch:{self.identifier}", self._run)
+        self.greenlet.link_exception(self.raiden_api.raiden.on_error)
+
+    def summary(self) -> Dict[str, int]:
+        summary = {status.value: 0 for status in BatchedPaymentStatus}
+        for payment in self.payments:
+            summary[payment.status.value] += 1
+        return summary
+
+    def _run(self) -> None:
+        pool = Pool(self.max_concurrency)
+        # The pool forgets the payments which finished, the errors of these
+        # are raised from their greenlets
+        greenlets = [
+            # Blocks while `max_concurrency` payments are in flight
+            pool.spawn(self._pay, payment)
+            for payment in self.payments
+        ]
+        gevent.joinall(set(greenlets), raise_error=True)
+
+        self.finished.set()
+        log.debug("Payment batch finished", batch_identifier=self.identifier, **self.summary())
+
+    def _pay(self, payment: BatchedPayment) -> None:
+        BATCH_PAYMENTS_IN_FLIGHT.inc()
+        try:
+            payment_status = self.raiden_api.transfer_async(
+                registry_address=self.registry_address,
+                token_address=payment.token_address,
+                amount=payment.amount,
+                target=payment.target_address,
+                identifier=payment.identifier,
+                secret=payment.secret,
+                secrethash=payment.secret_hash,
+                lock_timeout=payment.lock_timeout,
+                batch_route_cache=self.route_cache,
+            )
+            result = payment_status.payment_done.get()
+        except PAYMENT_ERRORS as e:
+            payment.status = BatchedPaymentStatus.FAILED
+            payment.errors = str(e)
+        else:
+            if isinstance(result, EventPaymentSentFailed):
+                payment.status = BatchedPaymentStatus.FAILED
+                payment.errors = f"Payment couldn't be completed because: {result.reason}"
+            else:
+                assert isinstance(result, EventPaymentSentSuccess), MYPY_ANNOTATION
+                payment.status = BatchedPaymentStatus.SUCCESS
+                payment.secret = result.secret
+                payment.secret_hash = sha256_secrethash(result.secret)
+        finally:
+            BATCH_PAYMENTS_IN_FLIGHT.dec()
+
+        BATCH_PAYMENTS.labels(payment.status.value).inc()
@@ -36,6 +36,8 @@
     WithdrawMismatch,
 )
 from raiden.messages.monitoring_service import RequestMonitoring
+from raiden.network.proxies.token_network import NewChannelResult, TokenNetwork
+from raiden.routing import RouteCache
 from raiden.settings import DEFAULT_RETRY_TIMEOUT
 from raiden.storage.utils import TimestampedEvent
 from raiden.transfer import channel, views
@@ -45,6 +47,7 @@
     EventPaymentSentFailed,
     EventPaymentSentSuccess,
 )
+from raiden.transfer.identifiers import CanonicalIdentifier
 from raiden.transfer.mediated_transfer.tasks import InitiatorTask, MediatorTask, TargetTask
 from raiden.transfer.state import (
     BalanceProofSignedState,
@@ -62,6 +65,7 @@
     TYPE_CHECKING,
     Address,
     Any,
+    BlockHash,
     BlockIdentifier,
     BlockTimeout,
     ChannelID,
@@ -391,24 +395,18 @@ def is_already_existing_channel(
 
         return channel_identifier is not None
 
-    def channel_open(
+    def _token_network_for_channel_open(
         self,
         registry_address: TokenNetworkRegistryAddress,
         token_address: TokenAddress,
-        partner_address: Address,
-        settle_timeout: BlockTimeout = None,
-        reveal_timeout: BlockTimeout = None,
-        retry_timeout: NetworkTimeout = DEFAULT_RETRY_TIMEOUT,
-    ) -> ChannelID:
-        """ Open a channel with the peer at `partner_address`
-        with the given `token_address`.
+        partner_addresses: List[Address],
+        settle_timeout: BlockTimeout,
+        reveal_timeout: BlockTimeout,
+        confirmed_block_identifier: BlockHash,
+    ) -> TokenNetwork:
+        """ Validate the arguments to open channels, returns the proxy of the
+        token network the channels are opened in.
         """
-        if settle_timeout is None:
-            settle_timeout = self.raiden.config.settle_timeout
-
-        if reveal_timeout is None:
-            reveal_timeout = self.raiden.config.reveal_timeout
-
         if reveal_timeout <= 0:
             raise InvalidRevealTimeout("reveal_timeout should be larger than zero")
 
@@ -436,12 +434,11 @@ def channel_open(
         if not is_binary_address(token_address):
             raise InvalidBinaryAddress("Expected binary address format for token in channel open")
 
-        if not is_binary_address(partner_address):
+        if not all(map(is_binary_address, partner_addresses)):
             raise InvalidBinaryAddress(
                 "Expected binary address format for partner in channel open"
             )
 
-        confirmed_block_identifier = views.get_confirmed_blockhash(self.raiden)
         registry = self.raiden.proxy_manager.token_network_registry(
             registry_address, block_identifier=confirmed_block_identifier
         )
@@ -487,6 +484,37 @@ def channel_open(
             )
             raise TokenNetworkDeprecated(msg)
 
+        return token_network
+
+    def channel_open(
+        self,
+        registry_address: TokenNetworkRegistryAddress,
+        token_address: TokenAddress,
+        partner_address: Address,
+        settle_timeout: BlockTimeout = None,
+        reveal_timeout: BlockTimeout = None,
+        retry_timeout: NetworkTimeout = DEFAULT_RETRY_TIMEOUT,
+    ) -> ChannelID:
+        """ Open a channel with the peer at `partner_address`
+        with the given `token_address`.
+        """
+        if settle_timeout is None:
+            settle_timeout = self.raiden.config.settle_timeout
+
+        if reveal_timeout is None:
+            reveal_timeout = self.raiden.config.reveal_timeout
+
+        confirmed_block_identifier = views.get_confirmed_blockhash(self.raiden)
+        token_network = self._token_network_for_channel_open(
+            registry_address=registry_address,
+            token_address=token_address,
+            partner_addresses=[partner_address],
+            settle_timeout=settle_timeout,
+            reveal_timeout=reveal_timeout,
+            confirmed_block_identifier=confirmed_block_identifier,
+        )
+        token_network_address = token_network.address
+
         duplicated_channel = self.is_already_existing_channel(
             token_network_address=token_network_address,
             partner_address=partner_address,
@@ -552,6 +580,148 @@ def channel_open(
 
         return channel_state.identifier
 
+    def channel_batch_open(
+        self,
+        registry_address: TokenNetworkRegistryAddress,
+        token_address: TokenAddress,
+        partners_total_deposits: Dict[Address, TokenAmount],
+        settle_timeout: BlockTimeout = None,
+        reveal_timeout: BlockTimeout = None,
+        retry_timeout: NetworkTimeout = DEFAULT_RETRY_TIMEOUT,
+    ) -> Dict[Address, NewChannelResult]:
+        """ Open channels with many partners of the given `token_address` at
+        once and make the initial deposits.
+
+        The transactions of all channels are sent without waiting for each
+        other to be mined, see `TokenNetwork.new_netting_channels`. A channel
+        which can not be opened or funded does not stop the others, its
+        error is reported in the result for the partner. Channels which
+        already exist are neither opened nor funded.
+        """
+        if settle_timeout is None:
+            settle_timeout = self.raiden.config.settle_timeout
+
+        if reveal_timeout is None:
+            reveal_timeout = self.raiden.config.reveal_timeout
+
+        partner_addresses = list(partners_total_deposits)
+        confirmed_block_identifier = views.get_confirmed_blockhash(self.raiden)
+        token_network = self._token_network_for_channel_open(
+            registry_address=registry_address,
+            token_address=token_address,
+            partner_addresses=partner_addresses,
+            settle_timeout=settle_timeout,
+            reveal_timeout=reveal_timeout,
+            confirmed_block_identifier=confirmed_block_identifier,
+        )
+
+        results: Dict[Address, NewChannelResult] = dict()
+        new_partners_total_deposits: Dict[Address, TokenAmount] = dict()
+        for partner_address, total_deposit in partners_total_deposits.items():
+            duplicated_channel = self.is_already_existing_channel(
+                token_network_address=token_network.address,
+                partner_address=partner_address,
+                block_identifier=confirmed_block_identifier,
+            )
+            if duplicated_channel:
+                results[partner_address] = NewChannelResult(
+                    total_deposit=total_deposit,
+                    error=DuplicatedChannelError(
+                        f"A channel with {to_checksum_address(partner_address)} for token "
+                        f"{to_checksum_address(token_address)} already exists."
+                    ),
+                )
+            else:
+                new_partners_total_deposits[partner_address] = total_deposit
+
+        has_enough_reserve, estimated_required_reserve = has_enough_gas_reserve(
+            self.raiden, channels_to_open=len(new_partners_total_deposits)
+        )
+        if not has_enough_reserve:
+            raise InsufficientGasReserve(
+                "The account balance is below the estimated amount necessary to "
+                "finish the lifecycles of all active channels. A balance of at "
+                f"least {estimated_required_reserve} wei is required."
+            )
+
+        total_deposits = sum(new_partners_total_deposits.values())
+        balance = token_network.token.balance_of(
+            self.raiden.address, block_identifier=confirmed_block_identifier
+        )
+        if balance < total_deposits:
+            msg = "Not enough balance to deposit. {} Available={} Needed={}".format(
+                to_checksum_address(token_address), balance, total_deposits
+            )
+            raise InsufficientFunds(msg)
+
+        network_balance = token_network.token.balance_of(
+            address=Address(token_network.address), block_identifier=confirmed_block_identifier
+        )
+        token_network_deposit_limit = token_network.token_network_deposit_limit(
+            block_identifier=confirmed_block_identifier
+        )
+        if network_balance + total_deposits > token_network_deposit_limit:
+            msg = (
+                f"Deposits of {total_deposits} would have exceeded the token network "
+                f"deposit limit."
+            )
+            raise DepositOverLimit(msg)
+
+        channel_participant_deposit_limit = token_network.channel_participant_deposit_limit(
+            block_identifier=confirmed_block_identifier
+        )
+        if any(
+            total_deposit > channel_participant_deposit_limit
+            for total_deposit in new_partners_total_deposits.values()
+        ):
+            msg = (
+                f"A deposit is larger than the channel participant deposit limit "
+                f"of {channel_participant_deposit_limit}"
+            )
+            raise DepositOverLimit(msg)
+
+        if new_partners_total_deposits:
+            results.update(
+                token_network.new_netting_channels(
+                    partners_total_deposits=new_partners_total_deposits,
+                    settle_timeout=settle_timeout,
+                    given_block_identifier=confirmed_block_identifier,
+                )
+            )
+
+        for partner_address, result in results.items():
+            if result.channel_identifier is None:
+                continue
+
+            waiting.wait_for_newchannel(
+                raiden=self.raiden,
+                token_network_registry_address=registry_address,
+                token_address=token_address,
+                partner_address=partner_address,
+                retry_timeout=retry_timeout,
+            )
+            self.raiden.set_channel_reveal_timeout(
+                canonical_identifier=CanonicalIdentifier(
+                    chain_identifier=token_network.chain_id(),
+                    token_network_address=token_network.address,
+                    channel_identifier=result.channel_identifier,
+                ),
+                reveal_timeout=reveal_timeout,
+            )
+
+            if result.deposited:
+                waiting.wait_for_participant_deposit(
+                    raiden=self.raiden,
+                    token_network_registry_address=registry_address,
+                    token_address=token_address,
+                    partner_address=partner_address,
+                    target_address=self.raiden.address,
+                    target_balance=result.total_deposit,
+                    retry_timeout=retry_timeout,
+                )
+
+        return results
+
     def mint_token_for(self, token_address: TokenAddress, to: Address, value: TokenAmount) -> None:
         """ Try to mint `value` units of the token at `token_address` and
         assign them to `to`, using `mintFor`.
@@ -1048,6 +1218,7 @@ def transfer_async(
         secret: Secret = None,
         secrethash: SecretHash = None,
         lock_timeout: BlockTimeout = None,
+        batch_route_cache: RouteCache = None,
     ) -> "PaymentStatus":
         current_state = views.state_from_raiden(self.raiden)
         token_network_registry_address = self.raiden.default_registry.address
@@ -1123,6 +1294,7 @@ def transfer_async(
             secret=secret,
             secrethash=secrethash,
             lock_timeout=lock_timeout,
+            batch_route_cache=batch_route_cache,
         )
         return payment_status
 
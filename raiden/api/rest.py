@@ -1,4 +1,5 @@
 import errno
+import itertools
 import logging
 import socket
 from hashlib import sha256
@@ -7,7 +8,7 @@
 import gevent
 import gevent.pool
 import structlog
-from eth_utils import encode_hex
+from eth_utils import decode_hex, encode_hex
 from flask import Flask, Response, request, send_from_directory, url_for
 from flask.json import jsonify
 from flask_cors import CORS
@@ -20,11 +21,15 @@
 from werkzeug.routing import BaseConverter
 
 from raiden.api.exceptions import ChannelNotFound, NonexistingChannel
-from raiden.api.objects import AddressList, PartnersPerTokenList
+from raiden.api.objects import AddressList, BatchedPayment, PartnersPerTokenList
+from raiden.api.payment_batch import MAX_FINISHED_PAYMENT_BATCHES, PaymentBatch
 from raiden.api.python import RaidenAPI
-from raiden.api.rest_utils import api_error, api_response
+from raiden.api.rest_utils import ResponseCache, api_error, api_response, cached_by_state_change
+from raiden.api.stream import EventStream
 from raiden.api.v1.encoding import (
     AddressListSchema,
+    BatchedChannelSchema,
+    BatchedPaymentSchema,
     ChannelStateSchema,
     EventPaymentReceivedSuccessSchema,
     EventPaymentSentFailedSchema,
@@ -38,22 +43,30 @@
     AddressResource,
     BlockchainEventsNetworkResource,
     BlockchainEventsTokenResource,
+    ChannelBatchResource,
     ChannelBlockchainEventsResource,
     ChannelsResource,
     ChannelsResourceByTokenAddress,
     ChannelsResourceByTokenAndPartnerAddress,
     ConnectionsInfoResource,
     ConnectionsResource,
+    HubBlockingResource,
+    MetricsResource,
     MintTokenResource,
     PartnersResourceByTokenAddress,
+    PaymentBatchesResource,
+    PaymentBatchResource,
     PaymentResource,
+    PaymentTasksResource,
     PendingTransfersResource,
     PendingTransfersResourceByTokenAddress,
     PendingTransfersResourceByTokenAndPartnerAddress,
+    ProfilerResource,
     RaidenInternalEventsResource,
     RegisterTokenResource,
     ShutdownResource,
     StatusResource,
+    StreamResource,
     TokensResource,
     VersionResource,
     create_blueprint,
@@ -94,17 +107,24 @@
 )
 from raiden.network.rpc.client import JSONRPCClient
 from raiden.settings import RestApiConfig
+from raiden.storage.serialization import DictSerializer
+from raiden.storage.sqlite import EventID
+from raiden.storage.ulid import ULID
+from raiden.storage.utils import TimestampedEvent
 from raiden.transfer import channel, views
 from raiden.transfer.events import (
     EventPaymentReceivedSuccess,
     EventPaymentSentFailed,
     EventPaymentSentSuccess,
 )
-from raiden.transfer.state import ChannelState, NettingChannelState
+from raiden.transfer.state import ChainState, ChannelState, NettingChannelState
 from raiden.ui.sync import blocks_to_sync
+from raiden.utils import metrics
 from raiden.utils.formatting import optional_address_to_string, to_checksum_address
 from raiden.utils.gevent import spawn_named
 from raiden.utils.http import split_endpoint
+from raiden.utils.profiling.greenlets import HUB_BLOCKING_MONITOR
+from raiden.utils.profiling.sampler import SamplingProfiler
 from raiden.utils.runnable import Runnable
 from raiden.utils.system import get_system_spec
 from raiden.utils.transfers import create_default_identifier
@@ -137,6 +157,7 @@
     ("/address", AddressResource),
     ("/version", VersionResource),
     ("/channels", ChannelsResource),
+    ("/channels/batch", ChannelBatchResource),
     ("/channels/<hexaddress:token_address>", ChannelsResourceByTokenAddress),
     (
         "/channels/<hexaddress:token_address>/<hexaddress:partner_address>",
@@ -145,6 +166,8 @@
     ("/connections/<hexaddress:token_address>", ConnectionsResource),
     ("/connections", ConnectionsInfoResource),
     ("/payments", PaymentResource),
+    ("/payments/batches", PaymentBatchesResource),
+    ("/payments/batches/<int:batch_identifier>", PaymentBatchResource),
     ("/payments/<hexaddress:token_address>", PaymentResource, "token_paymentresource"),
     (
         "/payments/<hexaddress:token_address>/<hexaddress:target_address>",
@@ -166,6 +189,8 @@
         "pending_transfers_resource_by_token_and_partner",
     ),
     ("/status", StatusResource),
+    ("/metrics", MetricsResource),
+    ("/stream", StreamResource),
     ("/shutdown", ShutdownResource),
     ("/_debug/blockchain_events/network", BlockchainEventsNetworkResource),
     ("/_debug/blockchain_events/tokens/<hexaddress:token_address>", BlockchainEventsTokenResource),
@@ -182,6 +207,9 @@
         ChannelBlockchainEventsResource,
     ),
     ("/_debug/raiden_events", RaidenInternalEventsResource),
+    ("/_debug/payment_tasks", PaymentTasksResource),
+    ("/_debug/profiler", ProfilerResource),
+    ("/_debug/hub_blocking", HubBlockingResource),
     ("/_testing/tokens/<hexaddress:token_address>/mint", MintTokenResource, "tokensmintresource"),
 ]
 
@@ -491,9 +519,16 @@ def __init__(self, raiden_api: RaidenAPI = None, rpc_client: JSONRPCClient = Non
         self.address_list_schema = AddressListSchema()
         self.partner_per_token_list_schema = PartnersPerTokenListSchema()
         self.payment_schema = PaymentSchema()
+        self.batched_payment_schema = BatchedPaymentSchema()
+        self.batched_channel_schema = BatchedChannelSchema()
         self.sent_success_payment_schema = EventPaymentSentSuccessSchema()
         self.received_success_payment_schema = EventPaymentReceivedSuccessSchema()
         self.failed_payment_schema = EventPaymentSentFailedSchema()
+        self.profiler = SamplingProfiler()
+        self.response_cache = ResponseCache()
+        self.event_stream = EventStream(serialize_payment=self.serialize_payment_event)
+        self.payment_batches: Dict[int, PaymentBatch] = dict()
+        self._payment_batch_identifiers = itertools.count(1)
 
     @property
     def rpc_client(self) -> JSONRPCClient:
@@ -700,6 +735,71 @@ def open(
 
         return api_response(result=result, status_code=status_code)
 
+    def open_batch(
+        self,
+        registry_address: TokenNetworkRegistryAddress,
+        token_address: TokenAddress,
+        channels: List[Dict[str, Any]],
+        settle_timeout: BlockTimeout = None,
+        reveal_timeout: BlockTimeout = None,
+    ) -> Response:
+        log.debug(
+            "Opening channels",
+            node=self.checksum_address,
+            registry_address=to_checksum_address(registry_address),
+            token_address=to_checksum_address(token_address),
+            channels=len(channels),
+            settle_timeout=settle_timeout,
+            reveal_timeout=reveal_timeout,
+        )
+
+        partners_total_deposits = {
+            channel_request["partner_address"]: channel_request["total_deposit"]
+            for channel_request in channels
+        }
+        if len(partners_total_deposits) != len(channels):
+            return api_error(
+                errors="The partners of the channels must be unique",
+                status_code=HTTPStatus.BAD_REQUEST,
+            )
+
+        try:
+            results = self.raiden_api.channel_batch_open(
+                registry_address=registry_address,
+                token_address=token_address,
+                partners_total_deposits=partners_total_deposits,
+                settle_timeout=settle_timeout,
+                reveal_timeout=reveal_timeout,
+            )
+        except (
+            InvalidRevealTimeout,
+            InvalidSettleTimeout,
+            TokenNetworkDeprecated,
+            InvalidBinaryAddress,
+            SamePeerAddress,
+            AddressWithoutCode,
+            TokenNotRegistered,
+            DepositOverLimit,
+        ) as e:
+            return api_error(errors=str(e), status_code=HTTPStatus.CONFLICT)
+        except (InsufficientEth, InsufficientFunds, InsufficientGasReserve) as e:
+            return api_error(errors=str(e), status_code=HTTPStatus.PAYMENT_REQUIRED)
+
+        result = [
+            {
+                "partner_address": partner_address,
+                "total_deposit": channel_result.total_deposit,
+                "channel_identifier": channel_result.channel_identifier,
+                "deposited": channel_result.deposited,
+                "errors": str(channel_result.error) if channel_result.error else None,
+            }
+            for partner_address, channel_result in results.items()
+        ]
+        return api_response(
+            result={"channels": self.batched_channel_schema.dump(result, many=True)},
+            status_code=HTTPStatus.CREATED,
+        )
+
     def connect(
         self,
         registry_address: TokenNetworkRegistryAddress,
@@ -729,6 +829,9 @@ def connect(
             return api_error(errors=str(e), status_code=HTTPStatus.PAYMENT_REQUIRED)
         except (InvalidAmount, InvalidBinaryAddress) as e:
             return api_error(errors=str(e), status_code=HTTPStatus.CONFLICT)
+        finally:
+            # The funds of the connection manager are not part of the state
+            self.response_cache.invalidate()
 
         return api_response(result=dict(), status_code=HTTPStatus.NO_CONTENT)
 
@@ -747,6 +850,7 @@ def leave(
         ]
         return api_response(result=closed_channels)
 
+    @cached_by_state_change
     def get_connection_managers_info(
         self, registry_address: TokenNetworkRegistryAddress
     ) -> Response:
@@ -796,6 +900,7 @@ def get_connection_managers_info(
 
         return api_response(result=connection_managers)
 
+    @cached_by_state_change
     def get_channel_list(
         self,
         registry_address: TokenNetworkRegistryAddress,
@@ -819,6 +924,7 @@ def get_channel_list(
         ]
         return api_response(result=result)
 
+    @cached_by_state_change
     def get_tokens_list(self, registry_address: TokenNetworkRegistryAddress) -> Response:
         log.debug(
             "Getting token list",
@@ -921,31 +1027,45 @@ def get_raiden_events_payment_history_with_timestamps(
         except (InvalidNumberInput, InvalidBinaryAddress) as e:
             return api_error(str(e), status_code=HTTPStatus.CONFLICT)
 
-        result = []
         chain_state = views.state_from_raiden(self.raiden_api.raiden)
-        for event in service_result:
-            if isinstance(event.wrapped_event, EventPaymentSentSuccess):
-                serialized_event = self.sent_success_payment_schema.serialize(
-                    chain_state=chain_state, event=event
-                )
-            elif isinstance(event.wrapped_event, EventPaymentSentFailed):
-                serialized_event = self.failed_payment_schema.serialize(
-                    chain_state=chain_state, event=event
-                )
-            elif isinstance(event.wrapped_event, EventPaymentReceivedSuccess):
-                serialized_event = self.received_success_payment_schema.serialize(
-                    chain_state=chain_state, event=event
-                )
-            else:
-                log.warning(
-                    "Unexpected event",
-                    node=self.checksum_address,
-                    unexpected_event=event.wrapped_event,
-                )
-
-            result.append(serialized_event)
+        result = [self.serialize_payment_event(chain_state, event) for event in service_result]
         return api_response(result=result)
 
+    def serialize_payment_event(
+        self, chain_state: ChainState, event: TimestampedEvent
+    ) -> Dict[str, Any]:
+        if isinstance(event.wrapped_event, EventPaymentSentSuccess):
+            return self.sent_success_payment_schema.serialize(chain_state=chain_state, event=event)
+        if isinstance(event.wrapped_event, EventPaymentSentFailed):
+            return self.failed_payment_schema.serialize(chain_state=chain_state, event=event)
+        if isinstance(event.wrapped_event, EventPaymentReceivedSuccess):
+            return self.received_success_payment_schema.serialize(
+                chain_state=chain_state, event=event
+            )
+
+        raise TypeError(f"Unexpected payment event {event.wrapped_event}")
+
+    def get_stream(self, last_event_id: Optional[str]) -> Response:
+        """ Stream the payment events and the channel updates as server-sent events.
+
+        The payments saved after `last_event_id` are replayed first.
+        """
+        cursor: Optional[EventID] = None
+        if last_event_id is not None:
+            try:
+                identifier = decode_hex(last_event_id)
+            except ValueError:
+                identifier = b""
+            if len(identifier) != 16:
+                return api_error("Invalid last event id", status_code=HTTPStatus.BAD_REQUEST)
+            cursor = EventID(ULID(identifier))
+
+        return Response(
+            self.event_stream.stream(self.raiden_api.raiden, cursor),
+            content_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     def get_raiden_internal_events_with_timestamps(
         self, limit: Optional[int], offset: Optional[int]
     ) -> Response:
@@ -958,6 +1078,30 @@ def get_raiden_internal_events_with_timestamps(
         ]
         return api_response(result=events)
 
+    def get_payment_tasks(self, secret_hash: SecretHash) -> Response:
+        """ Return the payment task for `secret_hash` which is in flight, and the
+        archived tasks of the finished payments.
+        """
+        raiden = self.raiden_api.raiden
+        assert raiden.wal, "Raiden Service has to be initialized"
+
+        chain_state = views.state_from_raiden(raiden)
+        live_task = chain_state.payment_mapping.secrethashes_to_task.get(secret_hash)
+        archived_tasks = [
+            dict(
+                state_change_identifier=encode_hex(record.state_change_identifier.identifier),
+                log_time=record.log_time.isoformat(),
+                task=DictSerializer.serialize(record.data),
+            )
+            for record in raiden.wal.storage.get_payment_tasks(secret_hash)
+        ]
+        return api_response(
+            result=dict(
+                live=DictSerializer.serialize(live_task) if live_task is not None else None,
+                archived=archived_tasks,
+            )
+        )
+
     def get_blockchain_events_channel(
         self,
         token_address: TokenAddress,
@@ -1010,6 +1154,7 @@ def get_channel(
         except ChannelNotFound as e:
             return api_error(errors=str(e), status_code=HTTPStatus.NOT_FOUND)
 
+    @cached_by_state_change
     def get_partners_by_token(
         self, registry_address: TokenNetworkRegistryAddress, token_address: TokenAddress
     ) -> Response:
@@ -1118,6 +1263,62 @@ def initiate_payment(
         result = self.payment_schema.dump(payment)
         return api_response(result=result)
 
+    def initiate_payment_batch(
+        self,
+        registry_address: TokenNetworkRegistryAddress,
+        payments: List[BatchedPayment],
+        max_concurrency: int,
+    ) -> Response:
+        log.debug(
+            "Initiating payment batch",
+            node=self.checksum_address,
+            registry_address=to_checksum_address(registry_address),
+            payments=len(payments),
+            max_concurrency=max_concurrency,
+        )
+
+        # Keep the results of the latest batches available for the clients
+        finished = [
+            identifier
+            for identifier, batch in self.payment_batches.items()
+            if batch.finished.is_set()
+        ]
+        number_to_forget = max(0, len(finished) + 1 - MAX_FINISHED_PAYMENT_BATCHES)
+        for identifier in finished[:number_to_forget]:
+            del self.payment_batches[identifier]
+
+        batch = PaymentBatch(
+            identifier=next(self._payment_batch_identifiers),
+            raiden_api=self.raiden_api,
+            registry_address=registry_address,
+            payments=payments,
+            max_concurrency=max_concurrency,
+        )
+        self.payment_batches[batch.identifier] = batch
+        batch.start()
+
+        return api_response(
+            result=self._payment_batch_result(batch), status_code=HTTPStatus.ACCEPTED
+        )
+
+    def get_payment_batch(self, batch_identifier: int) -> Response:
+        batch = self.payment_batches.get(batch_identifier)
+        if batch is None:
+            return api_error(
+                errors=f"Payment batch {batch_identifier} not found",
+                status_code=HTTPStatus.NOT_FOUND,
+            )
+
+        return api_response(result=self._payment_batch_result(batch))
+
+    def _payment_batch_result(self, batch: PaymentBatch) -> Dict[str, Any]:
+        return {
+            "batch_identifier": batch.identifier,
+            "finished": batch.finished.is_set(),
+            "summary": batch.summary(),
+            "payments": self.batched_payment_schema.dump(batch.payments, many=True),
+        }
+
     def _deposit(
         self,
         registry_address: TokenNetworkRegistryAddress,
@@ -1402,6 +1603,7 @@ def patch_channel(
             )
         return result
 
+    @cached_by_state_change
     def get_pending_transfers(
         self, token_address: TokenAddress = None, partner_address: Address = None
     ) -> Response:
@@ -1424,6 +1626,41 @@ def get_status(self) -> Response:
             else:
                 return api_response(result=dict(status="unavailable"))
 
+    @staticmethod
+    def get_metrics() -> Response:
+        return Response(metrics.REGISTRY.expose(), content_type=metrics.CONTENT_TYPE)
+
+    def get_profile(self) -> Response:
+        return Response(self.profiler.flamegraph(), content_type="text/plain; charset=utf-8")
+
+    def start_profiler(self, interval: float, duration: float) -> Response:
+        if self.profiler.is_running:
+            return api_error("The profiler is already running", HTTPStatus.CONFLICT)
+
+        log.info("Starting the sampling profiler", interval=interval, duration=duration)
+        self.profiler.start(interval=interval, duration=duration)
+        return api_response(
+            result=dict(interval=interval, duration=duration), status_code=HTTPStatus.CREATED
+        )
+
+    def stop_profiler(self) -> Response:
+        if not self.profiler.is_running:
+            return api_error("The profiler is not running", HTTPStatus.CONFLICT)
+
+        log.info("Stopping the sampling profiler")
+        self.profiler.stop()
+        return self.get_profile()
+
+    @staticmethod
+    def get_hub_blocking_reports() -> Response:
+        return api_response(
+            result=dict(
+                enabled=HUB_BLOCKING_MONITOR.is_running,
+                threshold=HUB_BLOCKING_MONITOR.threshold,
+                offenders=HUB_BLOCKING_MONITOR.report(),
+            )
+        )
+
     def shutdown(self) -> Response:
         shutdown_greenlet = spawn_named("trigger shutdown", self.raiden_api.shutdown)
         shutdown_greenlet.link_exception(self.raiden_api.raiden.on_error)
@@ -1,10 +1,13 @@
 import json
+from functools import wraps
 from http import HTTPStatus
 
 import structlog
-from flask import Response, make_response
+from cachetools import LRUCache
+from flask import Response, make_response, request
 
-from raiden.utils.typing import Any, Callable
+from raiden.utils import metrics
+from raiden.utils.typing import Any, Callable, Hashable, Optional
 
 log = structlog.get_logger(__name__)
 
@@ -20,6 +23,12 @@
     HTTPStatus.SERVICE_UNAVAILABLE,
 ]
 
+RESPONSE_CACHE = metrics.Counter(
+    "raiden_api_response_cache_total",
+    "Requests to the endpoints cached until the next state change",
+    labelnames=("result",),
+)
+
 
 def api_response(result: Any, status_code: HTTPStatus = HTTPStatus.OK) -> Response:
     if status_code == HTTPStatus.NO_CONTENT:
@@ -59,3 +68,80 @@ def decorated(self, *args, **kwargs):  # type: ignore
         return method(self, *args, **kwargs)
 
     return decorated
+
+
+class ResponseCache:
+    """ Response bodies of the endpoints which only depend on the chain state.
+
+    The bodies are only valid for the ETag they were computed with, which is
+    derived from the id of the last state change. `invalidate` changes the
+    ETags for the data which is not part of the state, e.g. the funds of the
+    connection managers.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self._generation = 0
+        self._etag: Optional[str] = None
+        self._bodies: LRUCache = LRUCache(maxsize)
+
+    def etag(self, state_change_id: Any) -> str:
+        return f"{state_change_id}-{self._generation}"
+
+    def get(self, etag: str, key: Hashable) -> Optional[bytes]:
+        if etag != self._etag:
+            self._etag = etag
+            self._bodies.clear()
+        return self._bodies.get(key)
+
+    def set(self, etag: str, key: Hashable, body: bytes) -> None:
+        if etag == self._etag:
+            self._bodies[key] = body
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._etag = None
+        self._bodies.clear()
+
+
+def cached_by_state_change(method: Callable) -> Callable:
+    """ Decorator for `RestAPI` methods whose response only depends on the chain state.
+
+    The ETag of the response is derived from the id of the last state change,
+    a request with a matching `If-None-Match` header gets a 304 Not Modified.
+    Otherwise the body of a successful response is served from the
+    `response_cache` until the next state change.
+    """
+
+    @wraps(method)
+    def decorated(self, *args, **kwargs):  # type: ignore
+        state_change_id = self.raiden_api.raiden.wal.saved_state.state_change_id
+        etag = self.response_cache.etag(state_change_id)
+
+        if request.if_none_match.contains(etag):
+            RESPONSE_CACHE.labels("not_modified").inc()
+            response = Response(status=HTTPStatus.NOT_MODIFIED)
+            response.set_etag(etag)
+            return response
+
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        body = self.response_cache.get(etag, key)
+        if body is not None:
+            RESPONSE_CACHE.labels("hit").inc()
+            response = make_response(
+                (
+                    body,
+                    HTTPStatus.OK,
+                    {"mimetype": "application/json", "Content-Type": "application/json"},
+                )
+            )
+        else:
+            RESPONSE_CACHE.labels("miss").inc()
+            response = method(self, *args, **kwargs)
+            if response.status_code != HTTPStatus.OK:
+                return response
+            self.response_cache.set(etag, key, response.get_data())
+
+        response.set_etag(etag)
+        return response
+
+    return decorated
@@ -0,0 +1,288 @@
+""" Pushes the payment events and the channel updates to the API clients.
+
+The messages are sent as server-sent events [1], which are plain HTTP
+responses streamed by the existing WSGI server. The payment events carry the
+id of the event in the database, a client which reconnects with the
+`Last-Event-ID` of the last message it received gets the payments it missed
+replayed from the database. The current state of every channel is sent when
+the stream is opened, followed by the channels which changed.
+
+[1] https://html.spec.whatwg.org/multipage/server-sent-events.html
+"""
+import json
+from datetime import datetime
+from itertools import chain
+
+import structlog
+from eth_utils import encode_hex
+from gevent.queue import Empty, Full, Queue
+
+from raiden.api.v1.encoding import ChannelStateSchema
+from raiden.storage.sqlite import EventID
+from raiden.storage.utils import TimestampedEvent
+from raiden.storage.wal import WriteAheadLog
+from raiden.transfer import channel, views
+from raiden.transfer.architecture import Event, StateChange
+from raiden.transfer.events import (
+    EventPaymentReceivedSuccess,
+    EventPaymentSentFailed,
+    EventPaymentSentSuccess,
+)
+from raiden.transfer.identifiers import CanonicalIdentifier
+from raiden.transfer.state import ChainState, ChannelState, NettingChannelState
+from raiden.utils import metrics
+from raiden.utils.formatting import to_checksum_address
+from raiden.utils.typing import (
+    TYPE_CHECKING,
+    Any,
+    Balance,
+    BlockTimeout,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    WithdrawAmount,
+)
+
+if TYPE_CHECKING:
+    from raiden.raiden_service import RaidenService
+
+log = structlog.get_logger(__name__)
+
+PAYMENT_EVENTS = (EventPaymentSentSuccess, EventPaymentSentFailed, EventPaymentReceivedSuccess)
+PAYMENT_EVENT_FILTERS = [
+    ("_type", f"{event_type.__module__}.{event_type.__name__}") for event_type in PAYMENT_EVENTS
+]
+
+# Number of messages buffered for a client before its stream is closed
+SUBSCRIPTION_QUEUE_SIZE = 1_000
+REPLAY_BATCH_SIZE = 100
+# A comment is sent after this many seconds without a message, which also
+# detects the clients which went away
+KEEPALIVE_INTERVAL = 15
+
+STREAM_SUBSCRIPTIONS = metrics.Gauge(
+    "raiden_api_stream_subscriptions", "Number of clients connected to the event stream"
+)
+
+ChannelSummary = Tuple[ChannelState, Balance, Balance, WithdrawAmount, BlockTimeout]
+PaymentSerializer = Callable[[ChainState, TimestampedEvent], Dict[str, Any]]
+
+
+class StreamMessage(NamedTuple):
+    event: str
+    data: Dict[str, Any]
+    identifier: Optional[EventID] = None
+
+    def encode(self) -> str:
+        lines = list()
+        if self.identifier is not None:
+            lines.append(f"id: {encode_hex(self.identifier.identifier)}")
+        lines.append(f"event: {self.event}")
+        lines.append(f"data: {json.dumps(self.data)}")
+        return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    def __init__(self) -> None:
+        self.queue: Queue = Queue(SUBSCRIPTION_QUEUE_SIZE)
+        # Set when the client could not keep up, the stream must be closed
+        # since messages were lost.
+        self.overflowed = False
+
+
+def referenced_channels(item: Any) -> Iterator[CanonicalIdentifier]:
+    """ The channels of a state change or an event.
+
+    A channel is referenced directly, or by a balance proof, a transfer or a
+    new channel state. Every change of a channel summary is done by a state
+    change which references the channel, or produces an event which does,
+    e.g. a `Block` expiring a lock sends a balance proof of the channel.
+    """
+    canonical_identifier = getattr(item, "canonical_identifier", None)
+    if isinstance(canonical_identifier, CanonicalIdentifier):
+        yield canonical_identifier
+
+    for attribute in ("balance_proof", "transfer", "from_transfer", "channel_state"):
+        value = getattr(item, attribute, None)
+        if value is not None:
+            yield from referenced_channels(value)
+
+
+def channel_summary(channel_state: NettingChannelState) -> ChannelSummary:
+    """ The values of the channel which are exposed by the API and change. """
+    return (
+        channel.get_status(channel_state),
+        channel.get_balance(channel_state.our_state, channel_state.partner_state),
+        channel_state.our_total_deposit,
+        channel_state.our_total_withdraw,
+        channel_state.reveal_timeout,
+    )
+
+
+class EventStream:
+    """ Fans the payment events and the channel updates out to the subscriptions.
+
+    `on_dispatch` is registered as a listener of the WAL, it returns right
+    away while there is no subscription.
+    """
+
+    def __init__(self, serialize_payment: PaymentSerializer) -> None:
+        self.serialize_payment = serialize_payment
+        self.channel_schema = ChannelStateSchema()
+
+        self._listening_to: Optional[WriteAheadLog] = None
+        self._subscriptions: Set[Subscription] = set()
+        self._channels: Dict[CanonicalIdentifier, ChannelSummary] = dict()
+
+    def subscribe(self, raiden: "RaidenService") -> Tuple[Subscription, List[StreamMessage]]:
+        """ Return a new subscription together with the current channels. """
+        assert raiden.wal, "Raiden service has to be started for the API to be usable."
+
+        if self._listening_to is not raiden.wal:
+            raiden.wal.dispatch_listeners.append(self.on_dispatch)
+            self._listening_to = raiden.wal
+
+        chain_state = raiden.wal.saved_state.state
+        channel_states = views.list_all_channelstate(chain_state)
+        if not self._subscriptions:
+            # The summaries are only maintained while there are subscriptions
+            self._channels = {
+                channel_state.canonical_identifier: channel_summary(channel_state)
+                for channel_state in channel_states
+            }
+
+        subscription = Subscription()
+        self._subscriptions.add(subscription)
+        STREAM_SUBSCRIPTIONS.set(len(self._subscriptions))
+
+        return (
+            subscription,
+            [
+                StreamMessage("channel", self.channel_schema.dump(channel_state))
+                for channel_state in channel_states
+            ],
+        )
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+        STREAM_SUBSCRIPTIONS.set(len(self._subscriptions))
+
+    def stream(
+        self, raiden: "RaidenService", last_event_id: Optional[EventID]
+    ) -> Generator[str, None, None]:
+        """ Generate the encoded messages of a new subscription.
+
+        The current channels come first, followed by the payments saved after
+        `last_event_id` and then the live messages.
+        """
+        subscription, channel_messages = self.subscribe(raiden)
+        try:
+            for message in channel_messages:
+                yield message.encode()
+
+            replayed_until = last_event_id
+            if last_event_id is not None:
+                for message in self.replay(raiden, last_event_id):
+                    yield message.encode()
+                    replayed_until = message.identifier
+
+            while not subscription.overflowed:
+                try:
+                    message = subscription.queue.get(timeout=KEEPALIVE_INTERVAL)
+                except Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                # The payments saved during the replay are also published
+                already_sent = (
+                    message.identifier is not None
+                    and replayed_until is not None
+                    and message.identifier <= replayed_until
+                )
+                if not already_sent:
+                    yield message.encode()
+        finally:
+            self.unsubscribe(subscription)
+
+    def replay(self, raiden: "RaidenService", last_event_id: EventID) -> Iterator[StreamMessage]:
+        """ Return the payment events which were saved after `last_event_id`. """
+        assert raiden.wal, "Raiden service has to be started for the API to be usable."
+
+        while True:
+            records = raiden.wal.storage.get_events_with_timestamps_after(
+                event_identifier=last_event_id,
+                limit=REPLAY_BATCH_SIZE,
+                filters=PAYMENT_EVENT_FILTERS,
+            )
+            if not records:
+                return
+
+            chain_state = raiden.wal.saved_state.state
+            for event_id, event in records:
+                yield StreamMessage(
+                    "payment", self.serialize_payment(chain_state, event), event_id
+                )
+            last_event_id = records[-1][0]
+
+    def on_dispatch(
+        self,
+        chain_state: ChainState,
+        state_changes: List[StateChange],
+        events: List[Tuple[EventID, Event]],
+    ) -> None:
+        if not self._subscriptions:
+            return
+
+        messages = list()
+
+        log_time = datetime.utcnow()
+        for event_id, event in events:
+            if isinstance(event, PAYMENT_EVENTS):
+                data = self.serialize_payment(chain_state, TimestampedEvent(event, log_time))
+                messages.append(StreamMessage("payment", data, event_id))
+
+        # Only the channels which the state changes or the events refer to
+        # can have changed. A dict keeps the order of the first reference, so
+        # the updates are sent in a deterministic order.
+        touched: Dict[CanonicalIdentifier, None] = dict()
+        for item in chain(state_changes, (event for _, event in events)):
+            touched.update(dict.fromkeys(referenced_channels(item)))
+
+        for canonical_identifier in touched:
+            channel_state = views.get_channelstate_by_canonical_identifier(
+                chain_state, canonical_identifier
+            )
+            if channel_state is not None:
+                summary = channel_summary(channel_state)
+                if self._channels.get(canonical_identifier) != summary:
+                    self._channels[canonical_identifier] = summary
+                    messages.append(
+                        StreamMessage("channel", self.channel_schema.dump(channel_state))
+                    )
+            elif self._channels.pop(canonical_identifier, None) is not None:
+                data = {
+                    "token_network_address": to_checksum_address(
+                        canonical_identifier.token_network_address
+                    ),
+                    "channel_identifier": str(canonical_identifier.channel_identifier),
+                }
+                messages.append(StreamMessage("channel_removed", data))
+
+        if messages:
+            self.publish(messages)
+
+    def publish(self, messages: List[StreamMessage]) -> None:
+        for subscription in list(self._subscriptions):
+            try:
+                for message in messages:
+                    subscription.queue.put_nowait(message)
+            except Full:
+                log.warning("Closing the event stream of a slow client")
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
@@ -14,7 +14,13 @@
 from werkzeug.exceptions import NotFound
 from werkzeug.routing import BaseConverter
 
-from raiden.api.objects import Address, AddressList, PartnersPerToken, PartnersPerTokenList
+from raiden.api.objects import (
+    Address,
+    AddressList,
+    BatchedPayment,
+    PartnersPerToken,
+    PartnersPerTokenList,
+)
 from raiden.constants import (
     NULL_ADDRESS_BYTES,
     NULL_ADDRESS_HEX,
@@ -22,12 +28,24 @@
     SECRETHASH_LENGTH,
     UINT256_MAX,
 )
-from raiden.settings import DEFAULT_INITIAL_CHANNEL_TARGET, DEFAULT_JOINABLE_FUNDS_TARGET
+from raiden.settings import (
+    DEFAULT_INITIAL_CHANNEL_TARGET,
+    DEFAULT_JOINABLE_FUNDS_TARGET,
+    DEFAULT_PAYMENT_BATCH_CONCURRENCY,
+    MAX_CHANNEL_BATCH_SIZE,
+    MAX_PAYMENT_BATCH_CONCURRENCY,
+    MAX_PAYMENT_BATCH_SIZE,
+)
 from raiden.storage.serialization.fields import IntegerToStringField
 from raiden.storage.utils import TimestampedEvent
 from raiden.transfer import channel
 from raiden.transfer.state import ChainState, ChannelState, NettingChannelState
 from raiden.transfer.views import get_token_network_by_address
+from raiden.utils.profiling.constants import (
+    PROFILER_DURATION_SECONDS,
+    PROFILER_INTERVAL_SECONDS,
+    PROFILER_MAX_DURATION_SECONDS,
+)
 from raiden.utils.typing import Address as AddressBytes, AddressHex
 
 
@@ -118,6 +136,8 @@ class SecretField(fields.Field):
 
     @staticmethod
     def _serialize(value, attr, obj, **kwargs):  # pylint: disable=unused-argument
+        if value is None:
+            return None
         return to_hex(value)
 
     def _deserialize(self, value, attr, data, **kwargs):  # pylint: disable=unused-argument
@@ -146,6 +166,8 @@ class SecretHashField(fields.Field):
 
     @staticmethod
     def _serialize(value, attr, obj, **kwargs):  # pylint: disable=unused-argument
+        if value is None:
+            return None
         return to_hex(value)
 
     def _deserialize(self, value, attr, data, **kwargs):  # pylint: disable=unused-argument
@@ -295,6 +317,25 @@ class ChannelPutSchema(BaseSchema):
     total_deposit = IntegerToStringField(default=None, missing=None)
 
 
+class BatchedChannelSchema(BaseSchema):
+    partner_address = AddressField(required=True)
+    total_deposit = IntegerToStringField(missing=0)
+    channel_identifier = IntegerToStringField(dump_only=True)
+    deposited = fields.Boolean(dump_only=True)
+    errors = fields.String(dump_only=True)
+
+
+class ChannelBatchPutSchema(BaseSchema):
+    token_address = AddressField(required=True)
+    channels = fields.List(
+        fields.Nested(BatchedChannelSchema),
+        required=True,
+        validate=validate.Length(min=1, max=MAX_CHANNEL_BATCH_SIZE),
+    )
+    reveal_timeout = IntegerToStringField(missing=None)
+    settle_timeout = IntegerToStringField(missing=None)
+
+
 class ChannelPatchSchema(BaseSchema):
     total_deposit = IntegerToStringField(default=None, missing=None)
     total_withdraw = IntegerToStringField(default=None, missing=None)
@@ -323,12 +364,61 @@ class PaymentSchema(BaseSchema):
     lock_timeout = IntegerToStringField(missing=None)
 
 
+class BatchedPaymentSchema(BaseSchema):
+    token_address = AddressField(required=True)
+    target_address = AddressField(required=True)
+    amount = IntegerToStringField(required=True)
+    identifier = IntegerToStringField(missing=None)
+    secret = SecretField(missing=None)
+    secret_hash = SecretHashField(missing=None)
+    lock_timeout = IntegerToStringField(missing=None)
+    status = fields.Method("get_status", dump_only=True)
+    errors = fields.String(dump_only=True)
+
+    class Meta:
+        decoding_class = BatchedPayment
+
+    @staticmethod
+    def get_status(payment: BatchedPayment) -> str:
+        return payment.status.value
+
+
+class PaymentBatchSchema(BaseSchema):
+    payments = fields.List(
+        fields.Nested(BatchedPaymentSchema),
+        required=True,
+        validate=validate.Length(min=1, max=MAX_PAYMENT_BATCH_SIZE),
+    )
+    max_concurrency = fields.Integer(
+        missing=DEFAULT_PAYMENT_BATCH_CONCURRENCY,
+        validate=validate.Range(min=1, max=MAX_PAYMENT_BATCH_CONCURRENCY),
+    )
+
+
 class ConnectionsConnectSchema(BaseSchema):
     funds = IntegerToStringField(required=True)
     initial_channel_target = IntegerToStringField(missing=DEFAULT_INITIAL_CHANNEL_TARGET)
     joinable_funds_target = fields.Decimal(missing=DEFAULT_JOINABLE_FUNDS_TARGET)
 
 
+class PaymentTasksRequestSchema(BaseSchema):
+    secret_hash = SecretHashField(required=True)
+
+
+class StreamRequestSchema(BaseSchema):
+    last_event_id = fields.String(missing=None)
+
+
+class ProfilerSchema(BaseSchema):
+    interval = fields.Float(
+        missing=PROFILER_INTERVAL_SECONDS, validate=validate.Range(min=0.001, max=1.0)
+    )
+    duration = fields.Float(
+        missing=PROFILER_DURATION_SECONDS,
+        validate=validate.Range(min=0, max=PROFILER_MAX_DURATION_SECONDS, min_inclusive=False),
+    )
+
+
 class EventPaymentSchema(BaseSchema):
     block_number = IntegerToStringField()
     identifier = IntegerToStringField()
@@ -7,12 +7,17 @@
 from raiden.api.rest_utils import if_api_available
 from raiden.api.v1.encoding import (
     BlockchainEventsRequestSchema,
+    ChannelBatchPutSchema,
     ChannelPatchSchema,
     ChannelPutSchema,
     ConnectionsConnectSchema,
     MintTokenSchema,
+    PaymentBatchSchema,
     PaymentSchema,
+    PaymentTasksRequestSchema,
+    ProfilerSchema,
     RaidenEventsRequestSchema,
+    StreamRequestSchema,
 )
 from raiden.constants import BLOCK_ID_LATEST
 from raiden.utils.typing import (
@@ -92,6 +97,18 @@ def put(self, **kwargs: Any) -> Response:
         )
 
 
+class ChannelBatchResource(BaseResource):
+
+    put_schema = ChannelBatchPutSchema()
+
+    @if_api_available
+    def put(self) -> Response:
+        kwargs = validate_json(self.put_schema)
+        return self.rest_api.open_batch(
+            registry_address=self.rest_api.raiden_api.raiden.default_registry.address, **kwargs
+        )
+
+
 class ChannelsResourceByTokenAddress(BaseResource):
     @if_api_available
     def get(self, **kwargs: Any) -> Response:
@@ -284,6 +301,25 @@ def post(self, token_address: TokenAddress, target_address: TargetAddress) -> Re
         )
 
 
+class PaymentBatchesResource(BaseResource):
+
+    post_schema = PaymentBatchSchema()
+
+    @if_api_available
+    def post(self) -> Response:
+        kwargs = validate_json(self.post_schema)
+
+        return self.rest_api.initiate_payment_batch(
+            registry_address=self.rest_api.raiden_api.raiden.default_registry.address, **kwargs
+        )
+
+
+class PaymentBatchResource(BaseResource):
+    @if_api_available
+    def get(self, batch_identifier: int) -> Response:
+        return self.rest_api.get_payment_batch(batch_identifier)
+
+
 class PendingTransfersResource(BaseResource):
     @if_api_available
     def get(self) -> Response:
@@ -307,6 +343,55 @@ def get(self) -> Response:
         return self.rest_api.get_status()
 
 
+class MetricsResource(BaseResource):
+    def get(self) -> Response:
+        return self.rest_api.get_metrics()
+
+
+class ProfilerResource(BaseResource):
+
+    post_schema = ProfilerSchema()
+
+    def get(self) -> Response:
+        return self.rest_api.get_profile()
+
+    def post(self) -> Response:
+        # All the parameters are optional, so an empty body is allowed
+        kwargs = _validate(self.post_schema, request.get_json(silent=True) or dict())
+        return self.rest_api.start_profiler(**kwargs)
+
+    def delete(self) -> Response:
+        return self.rest_api.stop_profiler()
+
+
+class PaymentTasksResource(BaseResource):
+
+    get_schema = PaymentTasksRequestSchema()
+
+    @if_api_available
+    def get(self) -> Response:
+        kwargs = validate_query_params(self.get_schema)
+        return self.rest_api.get_payment_tasks(**kwargs)
+
+
+class StreamResource(BaseResource):
+
+    get_schema = StreamRequestSchema()
+
+    @if_api_available
+    def get(self) -> Response:
+        kwargs = validate_query_params(self.get_schema)
+        # Sent by the browsers when they reconnect
+        if kwargs["last_event_id"] is None:
+            kwargs["last_event_id"] = request.headers.get("Last-Event-ID")
+        return self.rest_api.get_stream(**kwargs)
+
+
+class HubBlockingResource(BaseResource):
+    def get(self) -> Response:
+        return self.rest_api.get_hub_blocking_reports()
+
+
 class ShutdownResource(BaseResource):
     @if_api_available
     def post(self) -> Response:
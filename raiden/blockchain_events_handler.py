@@ -6,6 +6,7 @@
     ContractReceiveChannelDeposit,
     ContractReceiveChannelNew,
     ContractReceiveRouteNew,
+    ContractReceiveSecretReveal,
 )
 from raiden.utils.gevent import spawn_named
 from raiden.utils.typing import MYPY_ANNOTATION
@@ -78,3 +79,7 @@ def after_blockchain_statechange(raiden: "RaidenService", state_change: StateCha
     elif type(state_change) == ContractReceiveChannelDeposit:
         assert isinstance(state_change, ContractReceiveChannelDeposit), MYPY_ANNOTATION
         after_new_deposit_join_network(raiden, state_change)
+
+    elif type(state_change) == ContractReceiveSecretReveal:
+        assert isinstance(state_change, ContractReceiveSecretReveal), MYPY_ANNOTATION
+        raiden.secret_registrations.on_secret_registered(state_change.secrethash)
@@ -407,6 +407,49 @@ def _join_partner(self, partner: Address) -> None:
                 partner=to_checksum_address(partner),
             )
 
+    def _join_new_partners(self, partners: List[Address]) -> None:
+        """ Open and fund channels with partners which have no channel yet """
+        log.info(
+            "Trying to open and fund channels with new partners",
+            node=to_checksum_address(self.raiden.address),
+            partners=[to_checksum_address(partner) for partner in partners],
+        )
+        total_deposit = self._initial_funding_per_partner
+
+        try:
+            results = self.api.channel_batch_open(
+                registry_address=self.registry_address,
+                token_address=self.token_address,
+                partners_total_deposits={partner: total_deposit for partner in partners},
+            )
+        except InvalidDBData:
+            raise
+        except RECOVERABLE_ERRORS:
+            log.info("Opening channels failed", node=to_checksum_address(self.raiden.address))
+            return
+        except RaidenUnrecoverableError:
+            should_crash = (
+                self.raiden.config.environment_type != Environment.PRODUCTION
+                or self.raiden.config.unrecoverable_error_should_crash
+            )
+            if should_crash:
+                raise
+
+            log.critical("Opening channels failed", node=to_checksum_address(self.raiden.address))
+            return
+
+        for partner, result in results.items():
+            if isinstance(result.error, DuplicatedChannelError):
+                # The partner opened the channel first, it still has to be funded
+                self._join_partner(partner)
+            elif result.error is not None:
+                log.info(
+                    "Opening or funding channel failed",
+                    node=to_checksum_address(self.raiden.address),
+                    partner=to_checksum_address(partner),
+                    error=str(result.error),
+                )
+
     def _open_channels(self) -> bool:
         """ Open channels until there are `self.initial_channel_target`
         channels open. Do nothing if there are enough channels open already.
@@ -471,12 +514,20 @@ def _open_channels(self) -> bool:
             num_greenlets=len(join_partners),
         )
 
+        # The channels with new partners are opened at once, this allows the
+        # transactions to be sent without waiting for each other
+        new_partners = [partner for partner in join_partners if partner not in nonfunded_partners]
         greenlets = set(
             spawn_named(
                 f"cm-join_partner-{to_checksum_address(partner)}", self._join_partner, partner
             )
             for partner in join_partners
+            if partner in nonfunded_partners
         )
+        if new_partners:
+            greenlets.add(
+                spawn_named("cm-join_new_partners", self._join_new_partners, new_partners)
+            )
         gevent.joinall(greenlets, raise_error=True)
         return True
 
@@ -159,6 +159,17 @@ class RoutingMode(Enum):
 CHECK_NETWORK_ID_INTERVAL = 5 * 60
 
 DEFAULT_HTTP_REQUEST_TIMEOUT = 10.0  # seconds
+# A short connect timeout, the connections to the services are kept alive and
+# a service which doesn't accept a connection quickly is likely down
+DEFAULT_HTTP_CONNECT_TIMEOUT = 3.0  # seconds
+# Connections kept alive per service host, sized for concurrent payments
+DEFAULT_HTTP_POOL_MAXSIZE = 32
+# Retries of the failed connections, and of the idempotent requests which got
+# a gateway error, with an exponential backoff
+DEFAULT_HTTP_RETRIES = 2
+DEFAULT_HTTP_RETRY_BACKOFF = 0.2  # seconds
+RESOLVER_RETRY_TIMEOUT = 1.0  # seconds
+RESOLVER_RETRY_MAXIMUM = 16.0  # seconds
 
 DISCOVERY_DEFAULT_ROOM = "discovery"
 MONITORING_BROADCASTING_ROOM = "monitoring"
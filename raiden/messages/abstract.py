@@ -3,7 +3,16 @@
 from raiden.exceptions import InvalidSignature
 from raiden.messages.cmdid import CmdId
 from raiden.utils.signer import Signer, recover
-from raiden.utils.typing import Address, Any, Callable, ClassVar, MessageID, Optional, Signature
+from raiden.utils.typing import (
+    Address,
+    Any,
+    Callable,
+    ClassVar,
+    MessageID,
+    Optional,
+    Signature,
+    Tuple,
+)
 
 
 class cached_property:
@@ -55,8 +64,24 @@ class SignedMessage(AuthenticatedMessage):
     # by changing the order to packing then signing
     signature: Signature
 
+    # Values derived from the message fields which are cached on the instance.
+    # Assigning to a field (e.g. signing the message) invalidates them. The
+    # nested values which are hashed, the lock and the metadata, are frozen,
+    # so the fields are the only way to change the signed data.
+    _cached_properties: ClassVar[Tuple[str, ...]] = ("data_to_sign", "sender")
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        self.invalidate_cache()
+
+    def invalidate_cache(self) -> None:
+        """ Drops the cached values, they are computed again on the next access. """
+        instance_dict = self.__dict__
+        for attrname in self._cached_properties:
+            instance_dict.pop(attrname, None)
+
     def __hash__(self) -> int:
-        return hash((self._data_to_sign(), self.signature))
+        return hash((self.data_to_sign, self.signature))
 
     def __eq__(self, other: Any) -> bool:
         return isinstance(other, self.__class__) and hash(self) == hash(other)
@@ -74,16 +99,31 @@ def _data_to_sign(self) -> bytes:
         """
         raise NotImplementedError
 
+    @cached_property
+    def data_to_sign(self) -> bytes:
+        """ Cached version of `_data_to_sign`, used for hashing, signing and
+        recovering the sender.
+        """
+        return self._data_to_sign()
+
     def sign(self, signer: Signer) -> None:
         """ Sign message using signer. """
-        message_data = self._data_to_sign()
+        message_data = self.data_to_sign
         self.signature = signer.sign(data=message_data)
 
+    @property
+    def has_recovered_sender(self) -> bool:
+        return "sender" in self.__dict__
+
+    def set_recovered_sender(self, sender: Optional[Address]) -> None:
+        """ Cache a sender recovered elsewhere, e.g. by a pool of worker processes. """
+        self.__dict__["sender"] = sender
+
     @cached_property
     def sender(self) -> Optional[Address]:  # type: ignore
         if not self.signature:
             return None
-        data_that_was_signed = self._data_to_sign()
+        data_that_was_signed = self.data_to_sign
         message_signature = self.signature
 
         try:
@@ -7,7 +7,9 @@
 
 def balanceproof_from_envelope(envelope_message: EnvelopeMessage) -> BalanceProofSignedState:
     assert envelope_message.sender, "envelope_message must be signed"
-    return BalanceProofSignedState(
+    return BalanceProofSignedState.from_message(
+        # Computed for the signature check of the message already
+        balance_hash=envelope_message.balance_hash,
         nonce=envelope_message.nonce,
         transferred_amount=envelope_message.transferred_amount,
         locked_amount=envelope_message.locked_amount,
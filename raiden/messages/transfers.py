@@ -6,7 +6,7 @@
 from eth_utils import keccak
 
 from raiden.constants import EMPTY_SIGNATURE, UINT64_MAX, UINT256_MAX
-from raiden.messages.abstract import SignedRetrieableMessage
+from raiden.messages.abstract import SignedRetrieableMessage, cached_property
 from raiden.messages.cmdid import CmdId
 from raiden.messages.metadata import Metadata, RouteMetadata
 from raiden.transfer.identifiers import CanonicalIdentifier
@@ -24,6 +24,7 @@
 from raiden.utils.typing import (
     AdditionalHash,
     Address,
+    BalanceHash,
     BlockExpiration,
     ChainID,
     ChannelID,
@@ -41,6 +42,7 @@
     TokenAddress,
     TokenAmount,
     TokenNetworkAddress,
+    Tuple,
 )
 
 
@@ -95,7 +97,7 @@ def assert_transfer_values(
         raise ValueError("recipient is an invalid address")
 
 
-@dataclass(repr=False, eq=False)
+@dataclass(repr=False, eq=False, frozen=True)
 class Lock:
     """ The lock datastructure.
 
@@ -178,17 +180,24 @@ def __post_init__(self) -> None:
             self.locksroot,
         )
 
-    @property
+    _cached_properties: ClassVar[Tuple[str, ...]] = (
+        *SignedRetrieableMessage._cached_properties,
+        "balance_hash",
+        "message_hash",
+    )
+
+    @cached_property
     def message_hash(self) -> bytes:
         raise NotImplementedError
 
+    @cached_property
+    def balance_hash(self) -> BalanceHash:
+        return hash_balance_data(self.transferred_amount, self.locked_amount, self.locksroot)
+
     def _data_to_sign(self) -> bytes:
-        balance_hash = hash_balance_data(
-            self.transferred_amount, self.locked_amount, self.locksroot
-        )
         balance_proof_packed = pack_balance_proof(
             nonce=self.nonce,
-            balance_hash=balance_hash,
+            balance_hash=self.balance_hash,
             additional_hash=AdditionalHash(self.message_hash),
             canonical_identifier=CanonicalIdentifier(
                 chain_identifier=self.chain_id,
@@ -301,7 +310,7 @@ def from_event(cls, event: SendUnlock) -> "Unlock":
             signature=EMPTY_SIGNATURE,
         )
 
-    @property
+    @cached_property
     def message_hash(self) -> bytes:
         return eth_hash.keccak(
             bytes([self.cmdid.value])
@@ -450,7 +459,7 @@ class LockedTransfer(LockedTransferBase):
 
     cmdid: ClassVar[CmdId] = CmdId.LOCKEDTRANSFER
 
-    @property
+    @cached_property
     def message_hash(self) -> bytes:
         metadata_hash = (self.metadata and self.metadata.hash) or b""
         return keccak(self._packed_data() + metadata_hash)
@@ -468,7 +477,7 @@ class RefundTransfer(LockedTransferBase):
 
     cmdid: ClassVar[CmdId] = CmdId.REFUNDTRANSFER
 
-    @property
+    @cached_property
     def message_hash(self) -> bytes:
         return keccak(self._packed_data())
 
@@ -515,7 +524,7 @@ def from_event(cls, event: SendLockExpired) -> "LockExpired":
             signature=EMPTY_SIGNATURE,
         )
 
-    @property
+    @cached_property
     def message_hash(self) -> bytes:
         return eth_hash.keccak(
             bytes([self.cmdid.value])
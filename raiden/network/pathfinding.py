@@ -1,18 +1,21 @@
 import json
 import random
-from dataclasses import dataclass
+from collections import defaultdict
+from dataclasses import dataclass, replace
 from datetime import datetime
 from urllib.parse import urlparse
 from uuid import UUID
 
 import click
 import gevent
+import gevent.lock
 import requests
 import structlog
 from eth_utils import decode_hex, to_canonical_address, to_hex
 from web3 import Web3
 
 from raiden.constants import (
+    DEFAULT_HTTP_CONNECT_TIMEOUT,
     DEFAULT_HTTP_REQUEST_TIMEOUT,
     MATRIX_AUTO_SELECT_SERVER,
     ZERO_TOKENS,
@@ -26,7 +29,7 @@
     ServiceRequestIOURejected,
 )
 from raiden.network.proxies.service_registry import ServiceRegistry
-from raiden.network.utils import get_response_json
+from raiden.network.utils import get_response_json, make_http_session
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.signer import LocalSigner
 from raiden.utils.transfers import to_rdn
@@ -45,6 +48,7 @@
     Optional,
     PaymentAmount,
     PrivateKey,
+    Set,
     Signature,
     TargetAddress,
     TokenAmount,
@@ -55,7 +59,11 @@
 from raiden_contracts.utils.proofs import sign_one_to_n_iou
 
 log = structlog.get_logger(__name__)
-iou_semaphore = gevent.lock.BoundedSemaphore()
+
+# Shared by all requests to the PFSs, so that a payment reuses an open
+# connection instead of paying for the TCP and TLS handshakes
+session = make_http_session("pfs")
+HTTP_TIMEOUT = (DEFAULT_HTTP_CONNECT_TIMEOUT, DEFAULT_HTTP_REQUEST_TIMEOUT)
 
 
 @dataclass(frozen=True)
@@ -80,6 +88,13 @@ class PFSConfig:
     maximum_fee: TokenAmount
     iou_timeout: BlockTimeout
     max_paths: int
+    # Hedged routing, see `raiden.routing.get_best_routes_hedged`. The
+    # secondary PFS is queried when the primary didn't answer within
+    # `hedging_delay` seconds, the routes found by the node are used when no
+    # PFS answered within `latency_budget` seconds.
+    latency_budget: Optional[float] = None
+    hedging_delay: float = 0.0
+    secondary: Optional["PFSConfig"] = None
 
 
 @dataclass
@@ -126,7 +141,7 @@ def as_json(self) -> Dict[str, Any]:
 
 def get_pfs_info(url: str) -> PFSInfo:
     try:
-        response = requests.get(f"{url}/api/v1/info", timeout=DEFAULT_HTTP_REQUEST_TIMEOUT)
+        response = session.get(f"{url}/api/v1/info", timeout=HTTP_TIMEOUT)
         infos = get_response_json(response)
         matrix_server_info = urlparse(infos["matrix_server"])
 
@@ -197,11 +212,13 @@ def get_random_pfs(
     service_registry: ServiceRegistry,
     block_identifier: BlockIdentifier,
     pathfinding_max_fee: TokenAmount,
+    excluded_url: Optional[str] = None,
 ) -> Optional[str]:
     """Selects a random PFS from service_registry.
 
     Returns a tuple of the chosen services url and eth address.
     If there are no PFS in the given registry, it returns (None, None).
+    The PFS at `excluded_url` is never chosen.
     """
     number_of_addresses = service_registry.ever_made_deposits_len(
         block_identifier=block_identifier
@@ -217,7 +234,7 @@ def get_random_pfs(
             block_identifier=block_identifier,
             pathfinding_max_fee=pathfinding_max_fee,
         )
-        if url:
+        if url and url != excluded_url:
             return url
 
     return None
@@ -323,6 +340,57 @@ def configure_pfs_or_exit(
     return pathfinding_service_info
 
 
+def configure_secondary_pfs(
+    pfs_url: str,
+    primary_info: PFSInfo,
+    service_registry: Optional[ServiceRegistry],
+    node_network_id: ChainID,
+    token_network_registry_address: TokenNetworkRegistryAddress,
+    pathfinding_max_fee: TokenAmount,
+) -> Optional[PFSInfo]:
+    """ Return the info of the PFS used to hedge the path requests.
+
+    If `pfs_url` is 'auto' a PFS other than the primary one is chosen from the
+    service registry. The node works without a secondary PFS, so unlike for
+    the primary PFS the errors are logged and None is returned.
+    """
+    if pfs_url == MATRIX_AUTO_SELECT_SERVER:
+        if service_registry is None:
+            log.warning("No service registry to choose the secondary Pathfinding Service from")
+            return None
+
+        maybe_pfs_url = get_random_pfs(
+            service_registry=service_registry,
+            block_identifier=service_registry.client.get_confirmed_blockhash(),
+            pathfinding_max_fee=pathfinding_max_fee,
+            excluded_url=primary_info.url,
+        )
+        if maybe_pfs_url is None:
+            log.warning("No other Pathfinding Service is registered")
+            return None
+        pfs_url = maybe_pfs_url
+
+    try:
+        pfs_info = get_pfs_info(pfs_url)
+    except ServiceRequestFailed as e:
+        log.warning("Secondary Pathfinding Service is not available", url=pfs_url, error=str(e))
+        return None
+
+    usable = (
+        pfs_info.url != primary_info.url
+        and pfs_info.chain_id == node_network_id
+        and pfs_info.token_network_registry_address == token_network_registry_address
+        and pfs_info.price <= pathfinding_max_fee
+        and (pfs_info.price == 0 or pfs_info.payment_address)
+    )
+    if not usable:
+        log.warning("Secondary Pathfinding Service can't be used", pfs_info=pfs_info)
+        return None
+
+    log.info("Using secondary Pathfinding Service", pfs_info=pfs_info)
+    return pfs_info
+
+
 def check_pfs_for_production(
     service_registry: Optional[ServiceRegistry], pfs_info: PFSInfo
 ) -> None:
@@ -369,7 +437,7 @@ def get_last_iou(
     signature = to_hex(LocalSigner(privkey).sign(signature_data))
 
     try:
-        response = requests.get(
+        response = session.get(
             f"{url}/api/v1/{to_checksum_address(token_network_address)}/payment/iou",
             params=dict(
                 sender=to_checksum_address(sender),
@@ -377,7 +445,7 @@ def get_last_iou(
                 timestamp=timestamp,
                 signature=signature,
             ),
-            timeout=DEFAULT_HTTP_REQUEST_TIMEOUT,
+            timeout=HTTP_TIMEOUT,
         )
 
         data = json.loads(response.content).get("last_iou")
@@ -454,51 +522,138 @@ def update_iou(
     return iou
 
 
-def create_current_iou(
-    pfs_config: PFSConfig,
-    token_network_address: TokenNetworkAddress,
-    one_to_n_address: OneToNAddress,
-    our_address: Address,
-    privkey: PrivateKey,
-    block_number: BlockNumber,
-    chain_id: ChainID,
-    offered_fee: TokenAmount,
-    scrap_existing_iou: bool = False,
-) -> IOU:
+IOULedgerKey = Tuple[TokenNetworkAddress, Address, Address]
+
+
+class IOULedger:
+    """ Keeps track of the last IOU sent to each Pathfinding Service.
 
-    latest_iou = None
-    if not scrap_existing_iou:
+    The IOU amount must increase monotonically. Fetching the last IOU from the
+    PFS before every path request required holding a lock across the network
+    round-trips, allowing a single path query at a time. The ledger instead
+    synchronizes with the PFS only for the first request, or after a request
+    failed, and otherwise reserves the next amount locally. The reservation
+    does not yield to other greenlets, so concurrent queries always get
+    distinct and increasing amounts.
+    """
+
+    def __init__(self) -> None:
+        # A key without an IOU means the next one must be created from scratch
+        self._ious: Dict[IOULedgerKey, Optional[IOU]] = dict()
+        self._stale: Set[IOULedgerKey] = set()
+        self._sync_locks: Dict[IOULedgerKey, gevent.lock.Semaphore] = defaultdict(
+            gevent.lock.Semaphore
+        )
+
+    @staticmethod
+    def key(
+        pfs_config: PFSConfig, token_network_address: TokenNetworkAddress, our_address: Address
+    ) -> IOULedgerKey:
+        return token_network_address, our_address, pfs_config.info.payment_address
+
+    def _needs_synchronization(self, key: IOULedgerKey) -> bool:
+        return key not in self._ious or key in self._stale
+
+    def reserve(
+        self,
+        pfs_config: PFSConfig,
+        token_network_address: TokenNetworkAddress,
+        one_to_n_address: OneToNAddress,
+        our_address: Address,
+        privkey: PrivateKey,
+        block_number: BlockNumber,
+        chain_id: ChainID,
+        offered_fee: TokenAmount,
+    ) -> IOU:
+        """ Return a new signed IOU which pays `offered_fee` to the PFS. """
+        key = self.key(pfs_config, token_network_address, our_address)
+
+        if self._needs_synchronization(key):
+            with self._sync_locks[key]:
+                # Another greenlet may have synchronized while this one waited
+                if self._needs_synchronization(key):
+                    self._synchronize(key, pfs_config, token_network_address, privkey)
+
+        # There must be no context switches from here on, otherwise two
+        # queries could reserve the same amount.
+        last_iou = self._ious[key]
+        if last_iou is None:
+            iou = make_iou(
+                pfs_config=pfs_config,
+                our_address=our_address,
+                privkey=privkey,
+                block_number=block_number,
+                chain_id=chain_id,
+                offered_fee=offered_fee,
+                one_to_n_address=one_to_n_address,
+            )
+        else:
+            iou = replace(last_iou, amount=TokenAmount(last_iou.amount + offered_fee))
+            iou.sign(privkey)
+
+        self._ious[key] = iou
+        return iou
+
+    def invalidate(
+        self,
+        pfs_config: PFSConfig,
+        token_network_address: TokenNetworkAddress,
+        our_address: Address,
+    ) -> None:
+        """ The PFS may not have accepted the last IOU, synchronize before the next one. """
+        self._stale.add(self.key(pfs_config, token_network_address, our_address))
+
+    def scrap(
+        self,
+        pfs_config: PFSConfig,
+        token_network_address: TokenNetworkAddress,
+        our_address: Address,
+    ) -> None:
+        """ The last IOU can not be used anymore, start a new one. """
+        key = self.key(pfs_config, token_network_address, our_address)
+        self._ious[key] = None
+        self._stale.discard(key)
+
+    def _synchronize(
+        self,
+        key: IOULedgerKey,
+        pfs_config: PFSConfig,
+        token_network_address: TokenNetworkAddress,
+        privkey: PrivateKey,
+    ) -> None:
+        _, our_address, receiver = key
         latest_iou = get_last_iou(
             url=pfs_config.info.url,
             token_network_address=token_network_address,
             sender=our_address,
-            receiver=pfs_config.info.payment_address,
+            receiver=receiver,
             privkey=privkey,
         )
+        if latest_iou is not None:
+            # Checks the signature of the IOU given by the PFS
+            latest_iou = update_iou(iou=latest_iou, privkey=privkey)
+
+        # The PFS is trusted even if it is behind the ledger, otherwise the
+        # fees of the rejected IOUs would be paid. Should a concurrent query
+        # reuse an amount the PFS rejects it, and that query synchronizes
+        # again.
+        self._ious[key] = latest_iou
+        self._stale.discard(key)
 
-    if latest_iou is None:
-        return make_iou(
-            pfs_config=pfs_config,
-            our_address=our_address,
-            privkey=privkey,
-            block_number=block_number,
-            chain_id=chain_id,
-            offered_fee=offered_fee,
-            one_to_n_address=one_to_n_address,
-        )
-    else:
-        added_amount = offered_fee
-        return update_iou(iou=latest_iou, privkey=privkey, added_amount=added_amount)
+
+# Used by the queries which are not given the ledger of their node, so that
+# their IOUs are serialized all the same.
+default_iou_ledger = IOULedger()
 
 
 def post_pfs_paths(
     url: str, token_network_address: TokenNetworkAddress, payload: Dict[str, Any]
 ) -> Tuple[List[Dict[str, Any]], UUID]:
     try:
-        response = requests.post(
+        response = session.post(
             f"{url}/api/v1/{to_checksum_address(token_network_address)}/paths",
             json=payload,
-            timeout=DEFAULT_HTTP_REQUEST_TIMEOUT,
+            timeout=HTTP_TIMEOUT,
         )
     except requests.RequestException as e:
         raise ServiceRequestFailed(
@@ -548,12 +703,19 @@ def query_paths(
     route_to: TargetAddress,
     value: PaymentAmount,
     pfs_wait_for_block: BlockNumber,
+    iou_ledger: Optional[IOULedger] = None,
 ) -> Tuple[List[Dict[str, Any]], Optional[UUID]]:
     """ Query paths from the PFS.
 
     Send a request to the /paths endpoint of the PFS specified in service_config, and
     retry in case of a failed request if it makes sense.
+
+    The IOUs are reserved from `iou_ledger`, which must be shared by all the
+    queries of the node. Without it the ledger of the module is used.
     """
+    if iou_ledger is None:
+        iou_ledger = default_iou_ledger
+
     payload = {
         "from": to_checksum_address(route_from),
         "to": to_checksum_address(route_to),
@@ -561,7 +723,6 @@ def query_paths(
         "max_paths": pfs_config.max_paths,
     }
     offered_fee = pfs_config.info.price
-    scrap_existing_iou = False
 
     current_info = get_pfs_info(pfs_config.info.url)
     while current_info.confirmed_block_number < pfs_wait_for_block:
@@ -574,75 +735,69 @@ def query_paths(
         current_info = get_pfs_info(pfs_config.info.url)
 
     for retries in reversed(range(MAX_PATHS_QUERY_ATTEMPTS)):
-        # Since the IOU amount is monotonically increasing, only a single
-        # greenlet can be in charge of increasing it at the same time. Using a
-        # semaphore in this primitive way limits the speed at which we can do
-        # simultaneous transfers.
-        # See https://github.com/raiden-network/raiden/issues/5647
-        with iou_semaphore:
-            if offered_fee > 0:
-                new_iou = create_current_iou(
-                    pfs_config=pfs_config,
-                    token_network_address=token_network_address,
-                    one_to_n_address=one_to_n_address,
-                    our_address=our_address,
-                    privkey=privkey,
-                    chain_id=chain_id,
-                    block_number=current_block_number,
-                    offered_fee=offered_fee,
-                    scrap_existing_iou=scrap_existing_iou,
-                )
-                payload["iou"] = new_iou.as_json()
+        if offered_fee > 0:
+            new_iou = iou_ledger.reserve(
+                pfs_config=pfs_config,
+                token_network_address=token_network_address,
+                one_to_n_address=one_to_n_address,
+                our_address=our_address,
+                privkey=privkey,
+                chain_id=chain_id,
+                block_number=current_block_number,
+                offered_fee=offered_fee,
+            )
+            payload["iou"] = new_iou.as_json()
 
-            log.info(
-                "Requesting paths from Pathfinding Service",
+        log.info(
+            "Requesting paths from Pathfinding Service",
+            url=pfs_config.info.url,
+            token_network_address=to_checksum_address(token_network_address),
+            payload=payload,
+        )
+
+        try:
+            return post_pfs_paths(
                 url=pfs_config.info.url,
-                token_network_address=to_checksum_address(token_network_address),
+                token_network_address=token_network_address,
                 payload=payload,
             )
-
-            try:
-                return post_pfs_paths(
-                    url=pfs_config.info.url,
-                    token_network_address=token_network_address,
-                    payload=payload,
-                )
-            except ServiceRequestIOURejected as error:
-                code = error.error_code
-                log.debug(
-                    "Pathfinding Service rejected IOU", error=error, details=error.error_details
-                )
-
-                if retries == 0 or code in (
-                    PFSError.WRONG_IOU_RECIPIENT,
-                    PFSError.DEPOSIT_TOO_LOW,
-                ):
-                    raise
-                elif code in (PFSError.IOU_ALREADY_CLAIMED, PFSError.IOU_EXPIRED_TOO_EARLY):
-                    scrap_existing_iou = True
-                elif code == PFSError.INSUFFICIENT_SERVICE_PAYMENT:
-                    try:
-                        new_info = get_pfs_info(pfs_config.info.url)
-                    except ServiceRequestFailed:
-                        raise ServiceRequestFailed(
-                            "Could not get updated fee information from Pathfinding Service."
-                        )
-                    if new_info.price > pfs_config.maximum_fee:
-                        raise ServiceRequestFailed("PFS fees too high.")
-                    if new_info.price > pfs_config.info.price:
-                        log.info("Pathfinding Service increased fees", new_price=new_info.price)
-                        pfs_config.info = new_info
-                    else:
-                        log.error(
-                            "Concurrent Pathfinding Service requests by same node",
-                            value=str(iou_semaphore),
-                        )
-                elif code == PFSError.NO_ROUTE_FOUND:
-                    log.info(f"Pathfinding Service can not find a route: {error}.")
-                    return list(), None
-                log.info(
-                    f"Pathfinding Service rejected our payment. Reason: {error}. Attempting again."
-                )
+        except ServiceRequestIOURejected as error:
+            code = error.error_code
+            log.debug("Pathfinding Service rejected IOU", error=error, details=error.error_details)
+
+            if code in (PFSError.IOU_ALREADY_CLAIMED, PFSError.IOU_EXPIRED_TOO_EARLY):
+                iou_ledger.scrap(pfs_config, token_network_address, our_address)
+            else:
+                iou_ledger.invalidate(pfs_config, token_network_address, our_address)
+
+            if retries == 0 or code in (PFSError.WRONG_IOU_RECIPIENT, PFSError.DEPOSIT_TOO_LOW):
+                raise
+            elif code == PFSError.INSUFFICIENT_SERVICE_PAYMENT:
+                try:
+                    new_info = get_pfs_info(pfs_config.info.url)
+                except ServiceRequestFailed:
+                    raise ServiceRequestFailed(
+                        "Could not get updated fee information from Pathfinding Service."
+                    )
+                if new_info.price > pfs_config.maximum_fee:
+                    raise ServiceRequestFailed("PFS fees too high.")
+                if new_info.price > pfs_config.info.price:
+                    log.info("Pathfinding Service increased fees", new_price=new_info.price)
+                    pfs_config.info = new_info
+                else:
+                    # The IOU was processed after a concurrent one with a
+                    # higher amount, or the ledger is behind the PFS.
+                    log.info("Pathfinding Service IOU amount out of sync")
+            elif code == PFSError.NO_ROUTE_FOUND:
+                log.info(f"Pathfinding Service can not find a route: {error}.")
+                return list(), None
+            log.info(
+                f"Pathfinding Service rejected our payment. Reason: {error}. Attempting again."
+            )
+        except ServiceRequestFailed:
+            # It is unknown whether the PFS accepted the IOU
+            iou_ledger.invalidate(pfs_config, token_network_address, our_address)
+            raise
 
     # If we got no results after MAX_PATHS_QUERY_ATTEMPTS return empty list of paths
     return list(), None
@@ -672,10 +827,10 @@ def post_pfs_feedback(
     )
 
     try:
-        requests.post(
+        session.post(
             f"{pfs_config.info.url}/api/v1/{to_checksum_address(token_network_address)}/feedback",
             json=payload,
-            timeout=DEFAULT_HTTP_REQUEST_TIMEOUT,
+            timeout=HTTP_TIMEOUT,
         )
     except requests.RequestException as e:
         log.warning(
@@ -6,6 +6,8 @@
 from raiden.exceptions import RaidenRecoverableError
 from raiden.network.rpc.client import (
     JSONRPCClient,
+    TransactionMined,
+    TransactionSent,
     check_address_has_code_handle_pruned_block,
     check_transaction_failure,
     was_transaction_successfully_mined,
@@ -83,6 +85,17 @@ def approve(self, allowed_address: Address, allowance: TokenAmount) -> None:
             We assume there to be sufficient balance as a precondition if this
             is called, so it is not checked as a precondition here.
         """
+        with self.token_lock:
+            transaction_sent = self.send_approve(allowed_address, allowance)
+            transaction_mined = self.client.poll_transaction(transaction_sent)
+            self.check_approve_mined(transaction_mined, allowance)
+
+    def send_approve(self, allowed_address: Address, allowance: TokenAmount) -> TransactionSent:
+        """ Send the transaction of `approve` without waiting for it to be mined.
+
+        Consecutive calls to approve overwrite each other, the `token_lock`
+        must be held until the transaction is mined and the allowance used.
+        """
         # Note that given_block_identifier is not used here as there
         # are no preconditions to check before sending the transaction
         # There are no direct calls to this method in any event handler,
@@ -96,65 +109,68 @@ def approve(self, allowed_address: Address, allowance: TokenAmount) -> None:
             )
 
             if estimated_transaction is not None:
-                error_prefix = "Call to approve failed"
-                transaction_sent = self.client.transact(estimated_transaction)
-                transaction_mined = self.client.poll_transaction(transaction_sent)
+                return self.client.transact(estimated_transaction)
 
-                if not was_transaction_successfully_mined(transaction_mined):
-                    failed_receipt = transaction_mined.receipt
-                    failed_at_blockhash = encode_hex(failed_receipt["blockHash"])
-
-                    check_transaction_failure(transaction_mined, self.client)
-
-                    balance = self.balance_of(self.client.address, failed_at_blockhash)
-                    if balance < allowance:
-                        msg = (
-                            f"{error_prefix} Your balance of {balance} is "
-                            "below the required amount of {allowance}."
-                        )
-                        if balance == 0:
-                            msg += (
-                                " Note: The balance was 0, which may also happen "
-                                "if the contract is not a valid ERC20 token "
-                                "(balanceOf method missing)."
-                            )
-                        raise RaidenRecoverableError(msg)
-
-                    raise RaidenRecoverableError(
-                        f"{error_prefix}. The reason is unknown, you have enough tokens for "
-                        f"the requested allowance and enough eth to pay the gas. There may "
-                        f"be a problem with the token contract."
-                    )
+            failed_at = self.client.get_block(BLOCK_ID_LATEST)
+            failed_at_blockhash = encode_hex(failed_at["hash"])
+            failed_at_blocknumber = failed_at["number"]
 
-            else:
-                failed_at = self.client.get_block(BLOCK_ID_LATEST)
-                failed_at_blockhash = encode_hex(failed_at["hash"])
-                failed_at_blocknumber = failed_at["number"]
-
-                self.client.check_for_insufficient_eth(
-                    transaction_name="approve",
-                    transaction_executed=False,
-                    required_gas=GAS_REQUIRED_FOR_APPROVE,
-                    block_identifier=failed_at_blocknumber,
-                )
+            self.client.check_for_insufficient_eth(
+                transaction_name="approve",
+                transaction_executed=False,
+                required_gas=GAS_REQUIRED_FOR_APPROVE,
+                block_identifier=failed_at_blocknumber,
+            )
 
-                balance = self.balance_of(self.client.address, failed_at_blockhash)
-                if balance < allowance:
-                    msg = (
-                        f"{error_prefix} Your balance of {balance} is "
-                        "below the required amount of {allowance}."
+            balance = self.balance_of(self.client.address, failed_at_blockhash)
+            if balance < allowance:
+                msg = (
+                    f"{error_prefix} Your balance of {balance} is "
+                    "below the required amount of {allowance}."
+                )
+                if balance == 0:
+                    msg += (
+                        " Note: The balance was 0, which may also happen if the contract "
+                        "is not a valid ERC20 token (balanceOf method missing)."
                     )
-                    if balance == 0:
-                        msg += (
-                            " Note: The balance was 0, which may also happen if the contract "
-                            "is not a valid ERC20 token (balanceOf method missing)."
-                        )
-                    raise RaidenRecoverableError(msg)
+                raise RaidenRecoverableError(msg)
 
-                raise RaidenRecoverableError(
-                    f"{error_prefix} Gas estimation failed for unknown reason. "
-                    f"Please make sure the contract is a valid ERC20 token."
+            raise RaidenRecoverableError(
+                f"{error_prefix} Gas estimation failed for unknown reason. "
+                f"Please make sure the contract is a valid ERC20 token."
+            )
+
+    def check_approve_mined(
+        self, transaction_mined: TransactionMined, allowance: TokenAmount
+    ) -> None:
+        """ Raise if the transaction sent by `send_approve` failed. """
+        error_prefix = "Call to approve failed"
+
+        if not was_transaction_successfully_mined(transaction_mined):
+            failed_receipt = transaction_mined.receipt
+            failed_at_blockhash = encode_hex(failed_receipt["blockHash"])
+
+            check_transaction_failure(transaction_mined, self.client)
+
+            balance = self.balance_of(self.client.address, failed_at_blockhash)
+            if balance < allowance:
+                msg = (
+                    f"{error_prefix} Your balance of {balance} is "
+                    "below the required amount of {allowance}."
                 )
+                if balance == 0:
+                    msg += (
+                        " Note: The balance was 0, which may also happen "
+                        "if the contract is not a valid ERC20 token "
+                        "(balanceOf method missing)."
+                    )
+                raise RaidenRecoverableError(msg)
+
+            raise RaidenRecoverableError(
+                f"{error_prefix}. The reason is unknown, you have enough tokens for "
+                f"the requested allowance and enough eth to pay the gas. There may "
+                f"be a problem with the token contract."
+            )
 
     def balance_of(
         self, address: Address, block_identifier: BlockIdentifier = BLOCK_ID_LATEST
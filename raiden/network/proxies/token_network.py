@@ -19,6 +19,7 @@
     BrokenPreconditionError,
     DepositOverLimit,
     DuplicatedChannelError,
+    InsufficientEth,
     InvalidChannelID,
     InvalidSettleTimeout,
     RaidenRecoverableError,
@@ -30,6 +31,8 @@
 from raiden.network.proxies.utils import raise_on_call_returned_empty
 from raiden.network.rpc.client import (
     JSONRPCClient,
+    TransactionMined,
+    TransactionSent,
     check_address_has_code_handle_pruned_block,
     check_transaction_failure,
     was_transaction_successfully_mined,
@@ -43,6 +46,7 @@
 from raiden.utils.signer import recover
 from raiden.utils.smart_contracts import safe_gas_limit
 from raiden.utils.typing import (
+    MYPY_ANNOTATION,
     TYPE_CHECKING,
     AdditionalHash,
     Address,
@@ -59,6 +63,7 @@
     Locksroot,
     NamedTuple,
     Nonce,
+    NoReturn,
     Optional,
     Signature,
     T_ChannelID,
@@ -86,6 +91,9 @@
 
 log = structlog.get_logger(__name__)
 
+# Errors which fail a single channel of `TokenNetwork.new_netting_channels`
+NEW_CHANNEL_ERRORS = (DepositOverLimit, InsufficientEth, RaidenRecoverableError)
+
 
 def raise_if_invalid_address_pair(address1: Address, address2: Address) -> None:
     msg = "The null address is not allowed as a channel participant."
@@ -131,6 +139,16 @@ class TokenNetworkMetadata(SmartContractMetadata):
     token_network_registry_address: Optional[TokenNetworkRegistryAddress]
 
 
+@dataclass
+class NewChannelResult:
+    """ The outcome for one partner of `TokenNetwork.new_netting_channels`. """
+
+    total_deposit: TokenAmount
+    channel_identifier: Optional[ChannelID] = None
+    deposited: bool = False
+    error: Optional[Exception] = None
+
+
 class TokenNetwork:
     def __init__(
         self,
@@ -224,16 +242,7 @@ def new_netting_channel(
             The ChannelID of the new netting channel.
         """
         raise_if_invalid_address_pair(self.node_address, partner)
-
-        timeout_min = self.settlement_timeout_min()
-        timeout_max = self.settlement_timeout_max()
-        invalid_timeout = settle_timeout < timeout_min or settle_timeout > timeout_max
-        if invalid_timeout:
-            msg = (
-                f"settle_timeout must be in range [{timeout_min}, "
-                f"{timeout_max}], is {settle_timeout}"
-            )
-            raise InvalidSettleTimeout(msg)
+        self._raise_if_invalid_settle_timeout(settle_timeout)
 
         # Currently only one channel per address pair is allowed. I.e. if the
         # node sends two transactions to open a channel with the same partner
@@ -278,89 +287,309 @@ def new_netting_channel(
 
             return channel_identifier
 
-    def _new_netting_channel(
-        self, partner: Address, settle_timeout: int
-    ) -> Tuple[ChannelID, BlockHash, BlockNumber]:
-        estimated_transaction = self.client.estimate_gas(
-            self.proxy,
-            "openChannel",
-            extra_log_details={},
-            participant1=self.node_address,
-            participant2=partner,
-            settle_timeout=settle_timeout,
-        )
+    def new_netting_channels(
+        self,
+        partners_total_deposits: Dict[Address, TokenAmount],
+        settle_timeout: int,
+        given_block_identifier: BlockIdentifier,
+    ) -> Dict[Address, NewChannelResult]:
+        """ Creates and funds new channels with many partners at once.
 
-        if estimated_transaction is None:
-            failed_at = self.client.get_block(BLOCK_ID_LATEST)
-            failed_at_blockhash = encode_hex(failed_at["hash"])
-            failed_at_blocknumber = failed_at["number"]
+        Instead of waiting for each transaction to be mined before sending the
+        next, the transactions are sent back-to-back with consecutive nonces
+        and their receipts are waited for together. This is done in two
+        rounds, first the `openChannel` transactions, then a single `approve`
+        for the sum of the deposits and the `setTotalDeposit` transactions,
+        which need the channel identifiers. The `token_lock` is only held
+        for the second round, until the deposits are sent, and the lock of a
+        partner only until its channel is done.
 
-            self.client.check_for_insufficient_eth(
-                transaction_name="openChannel",
-                transaction_executed=False,
-                required_gas=self.metadata.gas_measurements["TokenNetwork.openChannel"],
-                block_identifier=failed_at_blocknumber,
-            )
+        The failure of a channel does not stop the others, it is reported in
+        the channel's result.
 
-            existing_channel_identifier = self.get_channel_identifier_or_none(
-                participant1=self.node_address,
-                participant2=partner,
-                block_identifier=failed_at_blockhash,
-            )
-            if existing_channel_identifier is not None:
-                raise DuplicatedChannelError("Channel with given partner address already exists")
+        Args:
+            partners_total_deposits: The total deposit of the channel with
+                each partner, if it is zero the channel is only opened.
+            settle_timeout: The settle timeout to use for the channels.
+            given_block_identifier: The block identifier of the state change that
+                                    prompted this proxy action
 
-            network_total_deposit = self.token.balance_of(
-                address=Address(self.address), block_identifier=failed_at_blockhash
-            )
-            limit = self.token_network_deposit_limit(block_identifier=failed_at_blockhash)
-            if network_total_deposit >= limit:
-                raise DepositOverLimit(
-                    "Could open another channel, token network deposit limit has been reached."
-                )
+        Raises:
+            BrokenPreconditionError: If the token network is deprecated, or the
+                deposits are over the deposit limits or the account's balance.
+        """
+        for partner in partners_total_deposits:
+            raise_if_invalid_address_pair(self.node_address, partner)
+        self._raise_if_invalid_settle_timeout(settle_timeout)
 
-            if self.safety_deprecation_switch(block_identifier=failed_at_blockhash):
-                raise RaidenRecoverableError("This token network is deprecated.")
+        results = {
+            partner: NewChannelResult(total_deposit=total_deposit)
+            for partner, total_deposit in partners_total_deposits.items()
+        }
 
-            raise RaidenRecoverableError(
-                f"Creating a new channel will fail - Gas estimation failed for "
-                f"unknown reason. Reference block {failed_at_blockhash} "
-                f"{failed_at_blocknumber}."
-            )
-        else:
-            estimated_transaction.estimated_gas = safe_gas_limit(
-                estimated_transaction.estimated_gas,
-                self.metadata.gas_measurements["TokenNetwork.openChannel"],
+        # The locks are acquired in order, otherwise two batches with the
+        # same partners could deadlock. The lock of a partner is released as
+        # soon as its channel needs no more transactions.
+        partner_locks = {
+            partner: self.channel_operations_lock[partner]
+            for partner in sorted(partners_total_deposits)
+        }
+        for lock in partner_locks.values():
+            lock.acquire()
+
+        try:
+            self._check_new_netting_channels_preconditions(results, given_block_identifier)
+            self._release_finished_partners(results, partner_locks)
+            self._open_new_netting_channels(results, settle_timeout, partner_locks)
+
+            # The allowance is approved once for all the deposits, the token
+            # lock is held until the deposits are sent for the same reasons as
+            # in `_approve_and_set_total_deposit`.
+            with self.token.token_lock:
+                deposits_sent = self._send_new_netting_channels_deposits(results)
+            self._release_finished_partners(results, partner_locks)
+
+            for partner, transaction_sent in deposits_sent.items():
+                result = results[partner]
+                assert result.channel_identifier is not None, MYPY_ANNOTATION
+
+                transaction_mined = self.client.poll_transaction(transaction_sent)
+                try:
+                    if not was_transaction_successfully_mined(transaction_mined):
+                        self._raise_on_failed_set_total_deposit(
+                            transaction_mined=transaction_mined,
+                            channel_identifier=result.channel_identifier,
+                            total_deposit=result.total_deposit,
+                            partner=partner,
+                            amount_to_deposit=result.total_deposit,
+                        )
+                except NEW_CHANNEL_ERRORS as e:
+                    result.error = e
+                else:
+                    result.deposited = True
+                partner_locks.pop(partner).release()
+        finally:
+            for lock in partner_locks.values():
+                lock.release()
+
+        return results
+
+    @staticmethod
+    def _release_finished_partners(
+        results: Dict[Address, NewChannelResult], partner_locks: Dict[Address, RLock]
+    ) -> None:
+        """ Release the locks of the partners whose channel needs no more transactions. """
+        for partner in list(partner_locks):
+            result = results[partner]
+            is_open_without_deposit = (
+                result.channel_identifier is not None and result.total_deposit == 0
             )
-            transaction_sent = self.client.transact(estimated_transaction)
-            transaction_mined = self.client.poll_transaction(transaction_sent)
-            receipt = transaction_mined.receipt
+            if result.error is not None or result.deposited or is_open_without_deposit:
+                partner_locks.pop(partner).release()
 
-            if not was_transaction_successfully_mined(transaction_mined):
-                failed_at_blockhash = encode_hex(receipt["blockHash"])
-                existing_channel_identifier = self.get_channel_identifier_or_none(
+    def _check_new_netting_channels_preconditions(
+        self, results: Dict[Address, NewChannelResult], given_block_identifier: BlockIdentifier
+    ) -> None:
+        try:
+            existing_channel_identifiers = {
+                partner: self.get_channel_identifier_or_none(
                     participant1=self.node_address,
                     participant2=partner,
-                    block_identifier=failed_at_blockhash,
+                    block_identifier=given_block_identifier,
                 )
+                for partner in results
+            }
+            network_total_deposit = self.token.balance_of(
+                address=Address(self.address), block_identifier=given_block_identifier
+            )
+            current_balance = self.token.balance_of(
+                address=self.node_address, block_identifier=given_block_identifier
+            )
+            token_network_deposit_limit = self.token_network_deposit_limit(
+                block_identifier=given_block_identifier
+            )
+            channel_participant_deposit_limit = self.channel_participant_deposit_limit(
+                block_identifier=given_block_identifier
+            )
+            safety_deprecation_switch = self.safety_deprecation_switch(given_block_identifier)
+        except ValueError:
+            # If `given_block_identifier` has been pruned the checks cannot be
+            # performed.
+            pass
+        except BadFunctionCallOutput:
+            raise_on_call_returned_empty(given_block_identifier)
+        else:
+            for partner, existing_channel_identifier in existing_channel_identifiers.items():
                 if existing_channel_identifier is not None:
-                    raise DuplicatedChannelError(
-                        "Channel with given partner address already exists"
+                    results[partner].error = BrokenPreconditionError(
+                        "A channel with the given partner address already exists."
                     )
 
-                network_total_deposit = self.token.balance_of(
-                    address=Address(self.address), block_identifier=failed_at_blockhash
+            total_deposits = sum(
+                result.total_deposit for result in results.values() if result.error is None
+            )
+
+            if safety_deprecation_switch:
+                raise BrokenPreconditionError("This token network is deprecated.")
+
+            if network_total_deposit >= token_network_deposit_limit:
+                raise BrokenPreconditionError(
+                    "Cannot open another channel, token network deposit limit reached."
                 )
-                limit = self.token_network_deposit_limit(block_identifier=failed_at_blockhash)
-                if network_total_deposit >= limit:
-                    raise DepositOverLimit(
-                        "Could open another channel, token network deposit limit has been reached."
+
+            if network_total_deposit + total_deposits > token_network_deposit_limit:
+                msg = (
+                    f"Deposits of {total_deposits} will have "
+                    f"exceeded the token network deposit limit."
+                )
+                raise BrokenPreconditionError(msg)
+
+            if any(
+                result.total_deposit > channel_participant_deposit_limit
+                for result in results.values()
+            ):
+                msg = (
+                    f"A deposit is larger than the channel participant deposit limit "
+                    f"of {channel_participant_deposit_limit}"
+                )
+                raise BrokenPreconditionError(msg)
+
+            if current_balance < total_deposits:
+                msg = (
+                    f"The sum of the deposits {total_deposits} can not be larger "
+                    f"than the available balance {current_balance}, for token at "
+                    f"address {to_checksum_address(self.token.address)}"
+                )
+                raise BrokenPreconditionError(msg)
+
+    def _open_new_netting_channels(
+        self,
+        results: Dict[Address, NewChannelResult],
+        settle_timeout: int,
+        partner_locks: Dict[Address, RLock],
+    ) -> None:
+        """ Open the channels and wait for all of them to be mined. """
+        partners = [partner for partner, result in results.items() if result.error is None]
+
+        self.opening_channels_count += len(partners)
+        try:
+            channels_sent = dict()
+            for partner in partners:
+                try:
+                    channels_sent[partner] = self._send_new_netting_channel(
+                        partner, settle_timeout
                     )
+                except NEW_CHANNEL_ERRORS as e:
+                    results[partner].error = e
+            self._release_finished_partners(results, partner_locks)
+
+            for partner, transaction_sent in channels_sent.items():
+                transaction_mined = self.client.poll_transaction(transaction_sent)
+                try:
+                    channel_identifier, _, _ = self._new_netting_channel_mined(
+                        partner, transaction_mined
+                    )
+                except NEW_CHANNEL_ERRORS as e:
+                    results[partner].error = e
+                else:
+                    results[partner].channel_identifier = channel_identifier
+                self._release_finished_partners(results, partner_locks)
+        finally:
+            self.opening_channels_count -= len(partners)
+
+    def _send_new_netting_channels_deposits(
+        self, results: Dict[Address, NewChannelResult]
+    ) -> Dict[Address, TransactionSent]:
+        """ Approve the sum of the deposits of the opened channels and send
+        the deposits. Must be called with the `token_lock` held.
+        """
+        to_deposit = [
+            partner
+            for partner, result in results.items()
+            if result.error is None
+            and result.channel_identifier is not None
+            and result.total_deposit > 0
+        ]
+        if not to_deposit:
+            return dict()
+
+        # The same HACK as in `_approve_and_set_total_deposit`, the allowance
+        # does not go back to zero once the deposits are mined.
+        total_deposits = sum(results[partner].total_deposit for partner in to_deposit)
+        try:
+            self.token.approve(
+                allowed_address=Address(self.address), allowance=TokenAmount(total_deposits + 1)
+            )
+        except NEW_CHANNEL_ERRORS as e:
+            for partner in to_deposit:
+                results[partner].error = e
+            return dict()
+
+        deposits_sent = dict()
+        for partner in to_deposit:
+            result = results[partner]
+            assert result.channel_identifier is not None, MYPY_ANNOTATION
+            try:
+                estimated_transaction = self.client.estimate_gas(
+                    self.proxy,
+                    "setTotalDeposit",
+                    extra_log_details={"previous_total_deposit": 0},
+                    channel_identifier=result.channel_identifier,
+                    participant=self.node_address,
+                    total_deposit=result.total_deposit,
+                    partner=partner,
+                )
+                if estimated_transaction is None:
+                    self._raise_on_set_total_deposit_estimation_failure(
+                        channel_identifier=result.channel_identifier,
+                        total_deposit=result.total_deposit,
+                        partner=partner,
+                        amount_to_deposit=result.total_deposit,
+                    )
+
+                estimated_transaction.estimated_gas = safe_gas_limit(
+                    estimated_transaction.estimated_gas,
+                    self.metadata.gas_measurements["TokenNetwork.setTotalDeposit"],
+                )
+                deposits_sent[partner] = self.client.transact(estimated_transaction)
+            except NEW_CHANNEL_ERRORS as e:
+                result.error = e
 
-                if self.safety_deprecation_switch(block_identifier=failed_at_blockhash):
-                    raise RaidenRecoverableError("This token network is deprecated.")
+        return deposits_sent
 
-                raise RaidenRecoverableError("Creating new channel failed.")
+    def _new_netting_channel(
+        self, partner: Address, settle_timeout: int
+    ) -> Tuple[ChannelID, BlockHash, BlockNumber]:
+        transaction_sent = self._send_new_netting_channel(partner, settle_timeout)
+        transaction_mined = self.client.poll_transaction(transaction_sent)
+        return self._new_netting_channel_mined(partner, transaction_mined)
+
+    def _send_new_netting_channel(self, partner: Address, settle_timeout: int) -> TransactionSent:
+        estimated_transaction = self.client.estimate_gas(
+            self.proxy,
+            "openChannel",
+            extra_log_details={},
+            participant1=self.node_address,
+            participant2=partner,
+            settle_timeout=settle_timeout,
+        )
+
+        if estimated_transaction is None:
+            self._raise_on_new_netting_channel_estimation_failure(partner)
+
+        estimated_transaction.estimated_gas = safe_gas_limit(
+            estimated_transaction.estimated_gas,
+            self.metadata.gas_measurements["TokenNetwork.openChannel"],
+        )
+        return self.client.transact(estimated_transaction)
+
+    def _new_netting_channel_mined(
+        self, partner: Address, transaction_mined: TransactionMined
+    ) -> Tuple[ChannelID, BlockHash, BlockNumber]:
+        receipt = transaction_mined.receipt
+
+        if not was_transaction_successfully_mined(transaction_mined):
+            self._raise_on_failed_new_netting_channel(partner, transaction_mined)
 
         channel_identifier: ChannelID = self._detail_channel(
             participant1=self.node_address,
@@ -374,6 +603,82 @@ def _new_netting_channel(
             BlockNumber(receipt["blockNumber"]),
         )
 
+    def _raise_on_failed_new_netting_channel(
+        self, partner: Address, transaction_mined: TransactionMined
+    ) -> NoReturn:
+        receipt = transaction_mined.receipt
+        failed_at_blockhash = encode_hex(receipt["blockHash"])
+        existing_channel_identifier = self.get_channel_identifier_or_none(
+            participant1=self.node_address,
+            participant2=partner,
+            block_identifier=failed_at_blockhash,
+        )
+        if existing_channel_identifier is not None:
+            raise DuplicatedChannelError("Channel with given partner address already exists")
+
+        network_total_deposit = self.token.balance_of(
+            address=Address(self.address), block_identifier=failed_at_blockhash
+        )
+        limit = self.token_network_deposit_limit(block_identifier=failed_at_blockhash)
+        if network_total_deposit >= limit:
+            raise DepositOverLimit(
+                "Could open another channel, token network deposit limit has been reached."
+            )
+
+        if self.safety_deprecation_switch(block_identifier=failed_at_blockhash):
+            raise RaidenRecoverableError("This token network is deprecated.")
+
+        raise RaidenRecoverableError("Creating new channel failed.")
+
+    def _raise_on_new_netting_channel_estimation_failure(self, partner: Address) -> NoReturn:
+        failed_at = self.client.get_block(BLOCK_ID_LATEST)
+        failed_at_blockhash = encode_hex(failed_at["hash"])
+        failed_at_blocknumber = failed_at["number"]
+
+        self.client.check_for_insufficient_eth(
+            transaction_name="openChannel",
+            transaction_executed=False,
+            required_gas=self.metadata.gas_measurements["TokenNetwork.openChannel"],
+            block_identifier=failed_at_blocknumber,
+        )
+
+        existing_channel_identifier = self.get_channel_identifier_or_none(
+            participant1=self.node_address,
+            participant2=partner,
+            block_identifier=failed_at_blockhash,
+        )
+        if existing_channel_identifier is not None:
+            raise DuplicatedChannelError("Channel with given partner address already exists")
+
+        network_total_deposit = self.token.balance_of(
+            address=Address(self.address), block_identifier=failed_at_blockhash
+        )
+        limit = self.token_network_deposit_limit(block_identifier=failed_at_blockhash)
+        if network_total_deposit >= limit:
+            raise DepositOverLimit(
+                "Could open another channel, token network deposit limit has been reached."
+            )
+
+        if self.safety_deprecation_switch(block_identifier=failed_at_blockhash):
+            raise RaidenRecoverableError("This token network is deprecated.")
+
+        raise RaidenRecoverableError(
+            f"Creating a new channel will fail - Gas estimation failed for "
+            f"unknown reason. Reference block {failed_at_blockhash} "
+            f"{failed_at_blocknumber}."
+        )
+
+    def _raise_if_invalid_settle_timeout(self, settle_timeout: int) -> None:
+        timeout_min = self.settlement_timeout_min()
+        timeout_max = self.settlement_timeout_max()
+        invalid_timeout = settle_timeout < timeout_min or settle_timeout > timeout_max
+        if invalid_timeout:
+            msg = (
+                f"settle_timeout must be in range [{timeout_min}, "
+                f"{timeout_max}], is {settle_timeout}"
+            )
+            raise InvalidSettleTimeout(msg)
+
     def get_channel_identifier(
         self, participant1: Address, participant2: Address, block_identifier: BlockIdentifier
     ) -> ChannelID:
@@ -902,275 +1207,299 @@ def _approve_and_set_total_deposit(
                 partner=partner,
             )
 
-        if estimated_transaction is not None:
-            estimated_transaction.estimated_gas = safe_gas_limit(
-                estimated_transaction.estimated_gas,
-                self.metadata.gas_measurements["TokenNetwork.setTotalDeposit"],
+        if estimated_transaction is None:
+            self._raise_on_set_total_deposit_estimation_failure(
+                channel_identifier=channel_identifier,
+                total_deposit=total_deposit,
+                partner=partner,
+                amount_to_deposit=amount_to_deposit,
             )
-            transaction_sent = self.client.transact(estimated_transaction)
-            transaction_mined = self.client.poll_transaction(transaction_sent)
 
-            if not was_transaction_successfully_mined(transaction_mined):
-                receipt = transaction_mined.receipt
-                # Because the gas estimation succeeded it is known that:
-                # - The channel id was correct, i.e. this node and partner are
-                #   participants of the chanenl with id `channel_identifier`.
-                # - The channel was open.
-                # - The account had enough tokens to deposit
-                # - The account had enough balance to pay for the gas (however
-                #   there is a race condition for multiple transactions #3890)
-                failed_at_blockhash = encode_hex(receipt["blockHash"])
-                failed_at_blocknumber = BlockNumber(receipt["blockNumber"])
+        estimated_transaction.estimated_gas = safe_gas_limit(
+            estimated_transaction.estimated_gas,
+            self.metadata.gas_measurements["TokenNetwork.setTotalDeposit"],
+        )
+        transaction_sent = self.client.transact(estimated_transaction)
+        transaction_mined = self.client.poll_transaction(transaction_sent)
 
-                check_transaction_failure(transaction_mined, self.client)
+        if not was_transaction_successfully_mined(transaction_mined):
+            self._raise_on_failed_set_total_deposit(
+                transaction_mined=transaction_mined,
+                channel_identifier=channel_identifier,
+                total_deposit=total_deposit,
+                partner=partner,
+                amount_to_deposit=amount_to_deposit,
+            )
 
-                safety_deprecation_switch = self.safety_deprecation_switch(
-                    block_identifier=failed_at_blockhash
-                )
-                if safety_deprecation_switch:
-                    msg = "This token_network has been deprecated."
-                    raise RaidenRecoverableError(msg)
+    def _raise_on_failed_set_total_deposit(
+        self,
+        transaction_mined: TransactionMined,
+        channel_identifier: ChannelID,
+        total_deposit: TokenAmount,
+        partner: Address,
+        amount_to_deposit: TokenAmount,
+    ) -> NoReturn:
+        receipt = transaction_mined.receipt
+        # Because the gas estimation succeeded it is known that:
+        # - The channel id was correct, i.e. this node and partner are
+        #   participants of the chanenl with id `channel_identifier`.
+        # - The channel was open.
+        # - The account had enough tokens to deposit
+        # - The account had enough balance to pay for the gas (however
+        #   there is a race condition for multiple transactions #3890)
+        failed_at_blockhash = encode_hex(receipt["blockHash"])
+        failed_at_blocknumber = BlockNumber(receipt["blockNumber"])
+
+        check_transaction_failure(transaction_mined, self.client)
+
+        safety_deprecation_switch = self.safety_deprecation_switch(
+            block_identifier=failed_at_blockhash
+        )
+        if safety_deprecation_switch:
+            msg = "This token_network has been deprecated."
+            raise RaidenRecoverableError(msg)
 
-                # Query the channel state when the transaction was mined
-                # to check for transaction races
-                our_details = self._detail_participant(
-                    channel_identifier=channel_identifier,
-                    detail_for=self.node_address,
-                    partner=partner,
-                    block_identifier=failed_at_blockhash,
-                )
-                partner_details = self._detail_participant(
-                    channel_identifier=channel_identifier,
-                    detail_for=self.node_address,
-                    partner=partner,
-                    block_identifier=failed_at_blockhash,
-                )
-                channel_data = self._detail_channel(
-                    participant1=self.node_address,
-                    participant2=partner,
-                    block_identifier=failed_at_blockhash,
-                    channel_identifier=channel_identifier,
-                )
+        # Query the channel state when the transaction was mined
+        # to check for transaction races
+        our_details = self._detail_participant(
+            channel_identifier=channel_identifier,
+            detail_for=self.node_address,
+            partner=partner,
+            block_identifier=failed_at_blockhash,
+        )
+        partner_details = self._detail_participant(
+            channel_identifier=channel_identifier,
+            detail_for=self.node_address,
+            partner=partner,
+            block_identifier=failed_at_blockhash,
+        )
+        channel_data = self._detail_channel(
+            participant1=self.node_address,
+            participant2=partner,
+            block_identifier=failed_at_blockhash,
+            channel_identifier=channel_identifier,
+        )
 
-                if channel_data.state == ChannelState.CLOSED:
-                    msg = "Deposit failed because the channel was closed meanwhile"
-                    raise RaidenRecoverableError(msg)
+        if channel_data.state == ChannelState.CLOSED:
+            msg = "Deposit failed because the channel was closed meanwhile"
+            raise RaidenRecoverableError(msg)
 
-                if channel_data.state == ChannelState.SETTLED:
-                    msg = "Deposit failed because the channel was settled meanwhile"
-                    raise RaidenRecoverableError(msg)
+        if channel_data.state == ChannelState.SETTLED:
+            msg = "Deposit failed because the channel was settled meanwhile"
+            raise RaidenRecoverableError(msg)
 
-                if channel_data.state == ChannelState.REMOVED:
-                    msg = "Deposit failed because the channel was settled and unlocked meanwhile"
-                    raise RaidenRecoverableError(msg)
+        if channel_data.state == ChannelState.REMOVED:
+            msg = "Deposit failed because the channel was settled and unlocked meanwhile"
+            raise RaidenRecoverableError(msg)
 
-                deposit_amount = total_deposit - our_details.deposit
+        deposit_amount = total_deposit - our_details.deposit
 
-                # If an overflow is possible then we are interacting with a bad token.
-                # This must not crash the client, because it is not a Raiden bug,
-                # and otherwise this could be an attack vector.
-                total_channel_deposit = total_deposit + partner_details.deposit
-                if total_channel_deposit > UINT256_MAX:
-                    raise RaidenRecoverableError("Deposit overflow")
+        # If an overflow is possible then we are interacting with a bad token.
+        # This must not crash the client, because it is not a Raiden bug,
+        # and otherwise this could be an attack vector.
+        total_channel_deposit = total_deposit + partner_details.deposit
+        if total_channel_deposit > UINT256_MAX:
+            raise RaidenRecoverableError("Deposit overflow")
 
-                total_deposit_done = our_details.deposit >= total_deposit
-                if total_deposit_done:
-                    raise RaidenRecoverableError("Requested total deposit was already performed")
+        total_deposit_done = our_details.deposit >= total_deposit
+        if total_deposit_done:
+            raise RaidenRecoverableError("Requested total deposit was already performed")
 
-                token_network_deposit_limit = self.token_network_deposit_limit(
-                    block_identifier=receipt["blockHash"]
-                )
+        token_network_deposit_limit = self.token_network_deposit_limit(
+            block_identifier=receipt["blockHash"]
+        )
 
-                network_total_deposit = self.token.balance_of(
-                    address=Address(self.address), block_identifier=receipt["blockHash"]
-                )
+        network_total_deposit = self.token.balance_of(
+            address=Address(self.address), block_identifier=receipt["blockHash"]
+        )
 
-                if network_total_deposit + deposit_amount > token_network_deposit_limit:
-                    msg = (
-                        f"Deposit of {deposit_amount} would have "
-                        f"exceeded the token network deposit limit."
-                    )
-                    raise RaidenRecoverableError(msg)
+        if network_total_deposit + deposit_amount > token_network_deposit_limit:
+            msg = (
+                f"Deposit of {deposit_amount} would have "
+                f"exceeded the token network deposit limit."
+            )
+            raise RaidenRecoverableError(msg)
 
-                channel_participant_deposit_limit = self.channel_participant_deposit_limit(
-                    block_identifier=receipt["blockHash"]
-                )
-                if total_deposit > channel_participant_deposit_limit:
-                    msg = (
-                        f"Deposit of {total_deposit} is larger than the "
-                        f"channel participant deposit limit"
-                    )
-                    raise RaidenRecoverableError(msg)
+        channel_participant_deposit_limit = self.channel_participant_deposit_limit(
+            block_identifier=receipt["blockHash"]
+        )
+        if total_deposit > channel_participant_deposit_limit:
+            msg = (
+                f"Deposit of {total_deposit} is larger than the "
+                f"channel participant deposit limit"
+            )
+            raise RaidenRecoverableError(msg)
 
-                has_sufficient_balance = (
-                    self.token.balance_of(self.node_address, failed_at_blocknumber)
-                    < amount_to_deposit
-                )
-                if not has_sufficient_balance:
-                    raise RaidenRecoverableError(
-                        "The account does not have enough balance to complete the deposit"
-                    )
+        has_sufficient_balance = (
+            self.token.balance_of(self.node_address, failed_at_blocknumber) < amount_to_deposit
+        )
+        if not has_sufficient_balance:
+            raise RaidenRecoverableError(
+                "The account does not have enough balance to complete the deposit"
+            )
 
-                allowance = self.token.allowance(
-                    owner=self.node_address,
-                    spender=Address(self.address),
-                    block_identifier=failed_at_blockhash,
-                )
-                if allowance < amount_to_deposit:
-                    msg = (
-                        f"The allowance of the {amount_to_deposit} deposit changed. "
-                        f"Check concurrent deposits "
-                        f"for the same token network but different proxies."
-                    )
-                    raise RaidenRecoverableError(msg)
+        allowance = self.token.allowance(
+            owner=self.node_address,
+            spender=Address(self.address),
+            block_identifier=failed_at_blockhash,
+        )
+        if allowance < amount_to_deposit:
+            msg = (
+                f"The allowance of the {amount_to_deposit} deposit changed. "
+                f"Check concurrent deposits "
+                f"for the same token network but different proxies."
+            )
+            raise RaidenRecoverableError(msg)
 
-                latest_deposit = self._detail_participant(
-                    channel_identifier=channel_identifier,
-                    detail_for=self.node_address,
-                    partner=partner,
-                    block_identifier=failed_at_blockhash,
-                ).deposit
-                if latest_deposit < total_deposit:
-                    raise RaidenRecoverableError("The tokens were not transferred")
+        latest_deposit = self._detail_participant(
+            channel_identifier=channel_identifier,
+            detail_for=self.node_address,
+            partner=partner,
+            block_identifier=failed_at_blockhash,
+        ).deposit
+        if latest_deposit < total_deposit:
+            raise RaidenRecoverableError("The tokens were not transferred")
 
-                # Here, we don't know what caused the failure. But because we are
-                # dealing with an external token contract, it is assumed that it is
-                # malicious and therefore we raise a Recoverable error here.
-                raise RaidenRecoverableError("Unlocked failed for an unknown reason")
-        else:
-            # The latest block can not be used reliably because of reorgs,
-            # therefore every call using this block has to handle pruned data.
-            failed_at = self.client.get_block(BLOCK_ID_LATEST)
-            failed_at_blockhash = encode_hex(failed_at["hash"])
-            failed_at_blocknumber = failed_at["number"]
+        # Here, we don't know what caused the failure. But because we are
+        # dealing with an external token contract, it is assumed that it is
+        # malicious and therefore we raise a Recoverable error here.
+        raise RaidenRecoverableError("Unlocked failed for an unknown reason")
 
-            self.client.check_for_insufficient_eth(
-                transaction_name="setTotalDeposit",
-                transaction_executed=False,
-                required_gas=self.metadata.gas_measurements["TokenNetwork.setTotalDeposit"],
-                block_identifier=failed_at_blocknumber,
-            )
+    def _raise_on_set_total_deposit_estimation_failure(
+        self,
+        channel_identifier: ChannelID,
+        total_deposit: TokenAmount,
+        partner: Address,
+        amount_to_deposit: TokenAmount,
+    ) -> NoReturn:
+        # The latest block can not be used reliably because of reorgs,
+        # therefore every call using this block has to handle pruned data.
+        failed_at = self.client.get_block(BLOCK_ID_LATEST)
+        failed_at_blockhash = encode_hex(failed_at["hash"])
+        failed_at_blocknumber = failed_at["number"]
+
+        self.client.check_for_insufficient_eth(
+            transaction_name="setTotalDeposit",
+            transaction_executed=False,
+            required_gas=self.metadata.gas_measurements["TokenNetwork.setTotalDeposit"],
+            block_identifier=failed_at_blocknumber,
+        )
 
-            safety_deprecation_switch = self.safety_deprecation_switch(
-                block_identifier=failed_at_blockhash
-            )
-            if safety_deprecation_switch:
-                msg = "This token_network has been deprecated."
-                raise RaidenRecoverableError(msg)
+        safety_deprecation_switch = self.safety_deprecation_switch(
+            block_identifier=failed_at_blockhash
+        )
+        if safety_deprecation_switch:
+            msg = "This token_network has been deprecated."
+            raise RaidenRecoverableError(msg)
 
-            allowance = self.token.allowance(
-                owner=self.node_address,
-                spender=Address(self.address),
-                block_identifier=failed_at_blockhash,
-            )
-            has_sufficient_balance = (
-                self.token.balance_of(self.node_address, failed_at_blocknumber) < amount_to_deposit
+        allowance = self.token.allowance(
+            owner=self.node_address,
+            spender=Address(self.address),
+            block_identifier=failed_at_blockhash,
+        )
+        has_sufficient_balance = (
+            self.token.balance_of(self.node_address, failed_at_blocknumber) < amount_to_deposit
+        )
+        if allowance < amount_to_deposit:
+            msg = (
+                "The allowance is insufficient. Check concurrent deposits "
+                "for the same token network but different proxies."
             )
-            if allowance < amount_to_deposit:
-                msg = (
-                    "The allowance is insufficient. Check concurrent deposits "
-                    "for the same token network but different proxies."
-                )
-                raise RaidenRecoverableError(msg)
+            raise RaidenRecoverableError(msg)
 
-            if has_sufficient_balance:
-                msg = "The address doesnt have enough tokens"
-                raise RaidenRecoverableError(msg)
+        if has_sufficient_balance:
+            msg = "The address doesnt have enough tokens"
+            raise RaidenRecoverableError(msg)
 
-            queried_channel_identifier = self.get_channel_identifier_or_none(
-                participant1=self.node_address,
-                participant2=partner,
-                block_identifier=failed_at_blockhash,
-            )
-            our_details = self._detail_participant(
-                channel_identifier=channel_identifier,
-                detail_for=self.node_address,
-                partner=partner,
-                block_identifier=failed_at_blockhash,
-            )
-            partner_details = self._detail_participant(
-                channel_identifier=channel_identifier,
-                detail_for=self.node_address,
-                partner=partner,
-                block_identifier=failed_at_blockhash,
-            )
-            channel_data = self._detail_channel(
-                participant1=self.node_address,
-                participant2=partner,
-                block_identifier=failed_at_blockhash,
-                channel_identifier=channel_identifier,
-            )
-            token_network_deposit_limit = self.token_network_deposit_limit(
-                block_identifier=failed_at_blockhash
-            )
-            channel_participant_deposit_limit = self.channel_participant_deposit_limit(
-                block_identifier=failed_at_blockhash
-            )
+        queried_channel_identifier = self.get_channel_identifier_or_none(
+            participant1=self.node_address,
+            participant2=partner,
+            block_identifier=failed_at_blockhash,
+        )
+        our_details = self._detail_participant(
+            channel_identifier=channel_identifier,
+            detail_for=self.node_address,
+            partner=partner,
+            block_identifier=failed_at_blockhash,
+        )
+        partner_details = self._detail_participant(
+            channel_identifier=channel_identifier,
+            detail_for=self.node_address,
+            partner=partner,
+            block_identifier=failed_at_blockhash,
+        )
+        channel_data = self._detail_channel(
+            participant1=self.node_address,
+            participant2=partner,
+            block_identifier=failed_at_blockhash,
+            channel_identifier=channel_identifier,
+        )
+        token_network_deposit_limit = self.token_network_deposit_limit(
+            block_identifier=failed_at_blockhash
+        )
+        channel_participant_deposit_limit = self.channel_participant_deposit_limit(
+            block_identifier=failed_at_blockhash
+        )
 
-            total_channel_deposit = total_deposit + partner_details.deposit
+        total_channel_deposit = total_deposit + partner_details.deposit
 
-            network_total_deposit = self.token.balance_of(
-                Address(self.address), failed_at_blocknumber
-            )
+        network_total_deposit = self.token.balance_of(Address(self.address), failed_at_blocknumber)
 
-            # This check can only be done if the channel is in the open/closed
-            # states because from the settled state and after the id is removed
-            # from the smart contract.
-            is_invalid_channel_id = (
-                channel_data.state in (ChannelState.OPENED, ChannelState.CLOSED)
-                and queried_channel_identifier != channel_identifier
+        # This check can only be done if the channel is in the open/closed
+        # states because from the settled state and after the id is removed
+        # from the smart contract.
+        is_invalid_channel_id = (
+            channel_data.state in (ChannelState.OPENED, ChannelState.CLOSED)
+            and queried_channel_identifier != channel_identifier
+        )
+        if is_invalid_channel_id:
+            msg = (
+                f"There is an open channel with the id {channel_identifier}. "
+                f"However addresses {to_checksum_address(self.node_address)} "
+                f"and {to_checksum_address(partner)} are not participants of "
+                f"that channel. The correct id is {queried_channel_identifier}."
             )
-            if is_invalid_channel_id:
-                msg = (
-                    f"There is an open channel with the id {channel_identifier}. "
-                    f"However addresses {to_checksum_address(self.node_address)} "
-                    f"and {to_checksum_address(partner)} are not participants of "
-                    f"that channel. The correct id is {queried_channel_identifier}."
-                )
-                raise RaidenUnrecoverableError(msg)  # This error is considered a bug
+            raise RaidenUnrecoverableError(msg)  # This error is considered a bug
 
-            if channel_data.state == ChannelState.CLOSED:
-                msg = "Deposit was prohibited because the channel is closed"
-                raise RaidenRecoverableError(msg)
+        if channel_data.state == ChannelState.CLOSED:
+            msg = "Deposit was prohibited because the channel is closed"
+            raise RaidenRecoverableError(msg)
 
-            if channel_data.state == ChannelState.SETTLED:
-                msg = "Deposit was prohibited because the channel is settled"
-                raise RaidenRecoverableError(msg)
+        if channel_data.state == ChannelState.SETTLED:
+            msg = "Deposit was prohibited because the channel is settled"
+            raise RaidenRecoverableError(msg)
 
-            if channel_data.state == ChannelState.REMOVED:
-                msg = "Deposit was prohibited because the channel is settled and unlocked"
-                raise RaidenRecoverableError(msg)
+        if channel_data.state == ChannelState.REMOVED:
+            msg = "Deposit was prohibited because the channel is settled and unlocked"
+            raise RaidenRecoverableError(msg)
 
-            if our_details.deposit >= total_deposit:
-                msg = "Attempted deposit has already been done"
-                raise RaidenRecoverableError(msg)
+        if our_details.deposit >= total_deposit:
+            msg = "Attempted deposit has already been done"
+            raise RaidenRecoverableError(msg)
 
-            # Check if deposit is being made on a nonexistent channel
-            if channel_data.state == ChannelState.NONEXISTENT:
-                msg = (
-                    f"Channel between participant {to_checksum_address(self.node_address)} "
-                    f"and {to_checksum_address(partner)} does not exist"
-                )
-                raise RaidenUnrecoverableError(msg)
+        # Check if deposit is being made on a nonexistent channel
+        if channel_data.state == ChannelState.NONEXISTENT:
+            msg = (
+                f"Channel between participant {to_checksum_address(self.node_address)} "
+                f"and {to_checksum_address(partner)} does not exist"
+            )
+            raise RaidenUnrecoverableError(msg)
 
-            if total_channel_deposit >= UINT256_MAX:
-                raise RaidenRecoverableError("Deposit overflow")
+        if total_channel_deposit >= UINT256_MAX:
+            raise RaidenRecoverableError("Deposit overflow")
 
-            if total_deposit > channel_participant_deposit_limit:
-                msg = (
-                    f"Deposit of {total_deposit} exceeded the "
-                    f"channel participant deposit limit"
-                )
-                raise RaidenRecoverableError(msg)
+        if total_deposit > channel_participant_deposit_limit:
+            msg = f"Deposit of {total_deposit} exceeded the " f"channel participant deposit limit"
+            raise RaidenRecoverableError(msg)
 
-            if network_total_deposit + amount_to_deposit > token_network_deposit_limit:
-                msg = f"Deposit of {amount_to_deposit} exceeded the token network deposit limit."
-                raise RaidenRecoverableError(msg)
+        if network_total_deposit + amount_to_deposit > token_network_deposit_limit:
+            msg = f"Deposit of {amount_to_deposit} exceeded the token network deposit limit."
+            raise RaidenRecoverableError(msg)
 
-            raise RaidenRecoverableError(
-                f"Deposit gas estimatation failed for unknown reasons. Reference "
-                f"block {failed_at_blockhash} {failed_at_blocknumber}."
-            )
+        raise RaidenRecoverableError(
+            f"Deposit gas estimatation failed for unknown reasons. Reference "
+            f"block {failed_at_blockhash} {failed_at_blocknumber}."
+        )
 
     def set_total_withdraw(
         self,
@@ -7,6 +7,14 @@
 import structlog
 from eth_utils import to_bytes, to_hex
 
+from raiden.constants import (
+    DEFAULT_HTTP_CONNECT_TIMEOUT,
+    DEFAULT_HTTP_REQUEST_TIMEOUT,
+    RESOLVER_RETRY_MAXIMUM,
+    RESOLVER_RETRY_TIMEOUT,
+)
+from raiden.network.transport.utils import timeout_exponential_backoff
+from raiden.network.utils import make_http_session
 from raiden.storage.wal import WriteAheadLog
 from raiden.transfer import views
 from raiden.transfer.mediated_transfer.events import SendSecretRequest
@@ -21,6 +29,8 @@
 
 log = structlog.get_logger(__name__)
 
+session = make_http_session("resolver")
+
 
 def reveal_secret_with_resolver(
     raiden: "RaidenService", chain_state: ChainState, secret_request_event: SendSecretRequest
@@ -52,6 +62,10 @@ def reveal_secret_with_resolver(
         "chain_id": chain_state.chain_id,
     }
 
+    retry_timeouts = timeout_exponential_backoff(
+        retries=3, timeout=RESOLVER_RETRY_TIMEOUT, maximum=RESOLVER_RETRY_MAXIMUM
+    )
+
     # loop until we get a valid response from the resolver or until timeout
     while True:
         current_state = views.state_from_raiden(raiden)
@@ -70,7 +84,11 @@ def reveal_secret_with_resolver(
         try:
             # before calling resolver, update block height
             request["chain_height"] = chain_state.block_number
-            response = requests.post(resolver_endpoint, json=request)
+            response = session.post(
+                resolver_endpoint,
+                json=request,
+                timeout=(DEFAULT_HTTP_CONNECT_TIMEOUT, DEFAULT_HTTP_REQUEST_TIMEOUT),
+            )
         except requests.exceptions.RequestException:
             pass
 
@@ -85,7 +103,7 @@ def reveal_secret_with_resolver(
             else:
                 # on any other status code, treat the request as having failed and return False
                 return False
-        gevent.sleep(5)
+        gevent.sleep(next(retry_timeouts))
 
     log.debug(
         "Got secret from resolver, dispatching secret reveal", resolver_endpoint=resolver_endpoint
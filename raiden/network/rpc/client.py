@@ -1,4 +1,6 @@
+import bisect
 import json
+import time
 from abc import ABC
 from dataclasses import dataclass
 from enum import Enum
@@ -16,7 +18,6 @@
     to_hex,
 )
 from eth_utils.toolz import assoc
-from gevent.lock import Semaphore
 from hexbytes import HexBytes
 from requests.exceptions import ReadTimeout
 from web3 import HTTPProvider, Web3
@@ -64,7 +65,8 @@
     RaidenUnrecoverableError,
     ReplacementTransactionUnderpriced,
 )
-from raiden.network.rpc.middleware import block_hash_cache_middleware
+from raiden.network.rpc.middleware import block_hash_cache_middleware, metrics_middleware
+from raiden.utils import metrics
 from raiden.utils.ethereum_clients import is_supported_client
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.keys import privatekey_to_address
@@ -95,6 +97,15 @@
 PARITY_REQUIRE_ERROR = "Bad instruction"
 EXTRA_DATA_LENGTH = 66  # 32 bytes hex encoded + `0x` prefix
 
+TRANSACTION_SUBMISSION_DURATION = metrics.Histogram(
+    "raiden_jsonrpc_transaction_submission_seconds",
+    "Latency to sign and send a transaction to the Ethereum client",
+)
+NONCE_GAPS = metrics.Gauge(
+    "raiden_jsonrpc_nonce_gaps",
+    "Nonces released by transactions which could not be sent, while later ones were sent",
+)
+
 
 def logs_blocks_sanity_check(from_block: BlockIdentifier, to_block: BlockIdentifier) -> None:
     """Checks that the from/to blocks passed onto log calls contain only appropriate types"""
@@ -331,6 +342,63 @@ def discover_next_available_nonce(web3: Web3, eth_node: EthClient, address: Addr
     return available_nonce
 
 
+class NonceManager:
+    """ Hands out the nonces for the transactions of an account.
+
+    A nonce is reserved without waiting for the transactions with the previous
+    nonces to be sent, this allows the transactions of concurrent greenlets to
+    be signed and sent in parallel. The Ethereum nodes accept the transactions
+    out of order, a transaction waits in the pool until the transactions with
+    the lower nonces arrive.
+
+    The nonce of a transaction which could not be sent must be released. If
+    there are no transactions with higher nonces the nonce is simply used by
+    the next transaction. Otherwise there is a gap which stalls all later
+    transactions of the account, the gaps are filled first by the next
+    reservations. Since there may be no next transaction, the client fills
+    the gaps right away, see `reserve_gap`.
+    """
+
+    def __init__(self, available_nonce: Nonce) -> None:
+        self.available_nonce = available_nonce
+        self.gaps: List[Nonce] = list()
+
+    def reserve(self) -> Nonce:
+        if self.gaps:
+            nonce = self.gaps.pop(0)
+        else:
+            nonce = self.available_nonce
+            self.available_nonce = Nonce(nonce + 1)
+
+        NONCE_GAPS.set(len(self.gaps))
+        return nonce
+
+    def reserve_gap(self) -> Optional[Nonce]:
+        """ Reserve the lowest nonce of a gap, if there is one. """
+        if not self.gaps:
+            return None
+
+        nonce = self.gaps.pop(0)
+        NONCE_GAPS.set(len(self.gaps))
+        return nonce
+
+    def release(self, nonce: Nonce) -> None:
+        bisect.insort(self.gaps, nonce)
+
+        # The released nonces at the end are not gaps
+        while self.gaps and self.gaps[-1] == self.available_nonce - 1:
+            self.available_nonce = self.gaps.pop()
+
+        if self.gaps:
+            log.warning(
+                "Gap in the transaction nonces, later transactions will not be "
+                "mined until it is filled",
+                nonce_gaps=self.gaps,
+                available_nonce=self.available_nonce,
+            )
+        NONCE_GAPS.set(len(self.gaps))
+
+
 def check_address_has_code(
     client: "JSONRPCClient",
     address: Address,
@@ -766,6 +834,9 @@ def monkey_patch_web3(web3: Web3, gas_price_strategy: Callable) -> None:
         # The built-in `geth_poa_middleware` doesn't correctly deal with `null` responses
         # to `eth_getBlockBy*` calls.
         web3.middleware_onion.inject(make_sane_poa_middleware, layer=0)
+
+        # Innermost layer, to measure only the requests sent to the client
+        web3.middleware_onion.inject(metrics_middleware, layer=0)
     except ValueError:
         # `middleware_onion.inject()` raises a value error if the same middleware is
         # injected twice. This happens with `eth-tester` setup where a single session
@@ -1041,8 +1112,7 @@ def __init__(
         # Ask for the chain id only once and store it here
         self.chain_id = ChainID(self.web3.eth.chainId)
 
-        self._available_nonce = available_nonce
-        self._nonce_lock = Semaphore()
+        self._nonces = NonceManager(available_nonce)
 
         log.debug(
             "JSONRPCClient created",
@@ -1054,7 +1124,7 @@ def __init__(
     def __repr__(self) -> str:
         return (
             f"<JSONRPCClient "
-            f"node:{to_checksum_address(self.address)} nonce:{self._available_nonce}"
+            f"node:{to_checksum_address(self.address)} nonce:{self._nonces.available_nonce}"
             f">"
         )
 
@@ -1142,6 +1212,9 @@ def estimate_gas(
     def transact(self, transaction: Union[TransactionEstimated, EthTransfer]) -> TransactionSent:
         """ Allocates an unique `nonce` and send the transaction to the blockchain.
 
+        Concurrent calls are not serialized, the transactions of different
+        greenlets are sent in parallel, see `NonceManager`.
+
         This can fail for a few reasons:
 
         - The account doesn't have sufficient Eth to pay for the gas.
@@ -1235,93 +1308,87 @@ def to_log_details(self) -> Dict[str, Any]:
                 )
                 return log_details
 
+        # The nonce is reserved without waiting for the transactions of
+        # other greenlets to be sent, so that the transactions are sent in
+        # parallel. The `nonce` must be released if the transaction is not
+        # sent, otherwise there will be a gap in the account's transactions,
+        # effectively stalling all transactions until the spare nonce is used.
+        nonce = self._nonces.reserve()
+        nonce_used = False
+        submission_start = time.monotonic()
         try:
-            with self._nonce_lock:
-                # This value can only be updated after the transaction is sent, the
-                # lock has to be held until then.
-                available_nonce = self._available_nonce
-
-                # A EthTransfer doesn't need gas estimation, it should always
-                # use the `TRANSACTION_INTRINSIC_GAS`. This is why it has a
-                # special case.
-                if isinstance(transaction, EthTransfer):
-                    slot = TransactionSlot(
-                        from_address=self.address,
-                        eth_node=self.eth_node,
-                        data=transaction,
-                        extra_log_details={},
-                        startgas=TRANSACTION_INTRINSIC_GAS,
-                        gas_price=transaction.gas_price,
-                        nonce=available_nonce,
-                    )
-                else:
-                    slot = TransactionSlot(
-                        from_address=transaction.from_address,
-                        eth_node=transaction.eth_node,
-                        data=transaction.data,
-                        extra_log_details=transaction.extra_log_details,
-                        startgas=transaction.estimated_gas,
-                        gas_price=transaction.gas_price,
-                        nonce=available_nonce,
-                    )
+            # A EthTransfer doesn't need gas estimation, it should always
+            # use the `TRANSACTION_INTRINSIC_GAS`. This is why it has a
+            # special case.
+            if isinstance(transaction, EthTransfer):
+                slot = TransactionSlot(
+                    from_address=self.address,
+                    eth_node=self.eth_node,
+                    data=transaction,
+                    extra_log_details={},
+                    startgas=TRANSACTION_INTRINSIC_GAS,
+                    gas_price=transaction.gas_price,
+                    nonce=nonce,
+                )
+            else:
+                slot = TransactionSlot(
+                    from_address=transaction.from_address,
+                    eth_node=transaction.eth_node,
+                    data=transaction.data,
+                    extra_log_details=transaction.extra_log_details,
+                    startgas=transaction.estimated_gas,
+                    gas_price=transaction.gas_price,
+                    nonce=nonce,
+                )
 
-                log_details = slot.to_log_details()
+            log_details = slot.to_log_details()
 
-                if isinstance(slot.data, SmartContractCall):
-                    function_call = slot.data
-                    data = get_transaction_data(
-                        web3=function_call.contract.web3,
-                        abi=function_call.contract.abi,
-                        function_name=function_call.function,
-                        args=function_call.args,
-                        kwargs=function_call.kwargs,
-                    )
-                    transaction_data = {
-                        "data": decode_hex(data),
-                        "gas": slot.startgas,
-                        "nonce": slot.nonce,
-                        "value": slot.data.value,
-                        "to": function_call.contract.address,
-                        "gasPrice": slot.gas_price,
-                    }
+            if isinstance(slot.data, SmartContractCall):
+                function_call = slot.data
+                data = get_transaction_data(
+                    web3=function_call.contract.web3,
+                    abi=function_call.contract.abi,
+                    function_name=function_call.function,
+                    args=function_call.args,
+                    kwargs=function_call.kwargs,
+                )
+                transaction_data = {
+                    "data": decode_hex(data),
+                    "gas": slot.startgas,
+                    "nonce": slot.nonce,
+                    "value": slot.data.value,
+                    "to": function_call.contract.address,
+                    "gasPrice": slot.gas_price,
+                }
 
-                    log.debug(
-                        "Transaction to call smart contract function will be sent", **log_details
-                    )
-                elif isinstance(slot.data, EthTransfer):
-                    transaction_data = {
-                        "to": to_checksum_address(slot.data.to_address),
-                        "gas": slot.startgas,
-                        "nonce": slot.nonce,
-                        "value": slot.data.value,
-                        "gasPrice": slot.gas_price,
-                    }
+                log.debug(
+                    "Transaction to call smart contract function will be sent", **log_details
+                )
+            elif isinstance(slot.data, EthTransfer):
+                transaction_data = {
+                    "to": to_checksum_address(slot.data.to_address),
+                    "gas": slot.startgas,
+                    "nonce": slot.nonce,
+                    "value": slot.data.value,
+                    "gasPrice": slot.gas_price,
+                }
 
-                    log.debug("Transaction to transfer ether will be sent", **log_details)
-                else:
-                    transaction_data = {
-                        "data": slot.data.bytecode,
-                        "gas": slot.startgas,
-                        "nonce": slot.nonce,
-                        "value": 0,
-                        "gasPrice": slot.gas_price,
-                    }
+                log.debug("Transaction to transfer ether will be sent", **log_details)
+            else:
+                transaction_data = {
+                    "data": slot.data.bytecode,
+                    "gas": slot.startgas,
+                    "nonce": slot.nonce,
+                    "value": 0,
+                    "gasPrice": slot.gas_price,
+                }
 
-                    log.debug("Transaction to deploy smart contract will be sent", **log_details)
+                log.debug("Transaction to deploy smart contract will be sent", **log_details)
 
-                signed_txn = client.web3.eth.account.sign_transaction(
-                    transaction_data, client.privkey
-                )
-                tx_hash = client.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
+            signed_txn = client.web3.eth.account.sign_transaction(transaction_data, client.privkey)
+            tx_hash = client.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
 
-                # Increase the `nonce` only after sending the transaction. This
-                # is necessary because the send itself can fail, e.g. because
-                # of an invalid value which leads to a `ValueError` or if the
-                # received node rejects the transaction. When this happens, the
-                # `_available_nonce` must not be incremented, since that may
-                # lead to gaps in the account's transactions, effectivelly
-                # stalling all transactions until the spare nonce is used.
-                self._available_nonce = Nonce(self._available_nonce + 1)
+            nonce_used = True
 
         except ValueError as e:
             if isinstance(slot.data, SmartContractCall):
@@ -1333,6 +1400,9 @@ def to_log_details(self) -> Dict[str, Any]:
 
             action = inspect_client_error(e, self.eth_node)
 
+            # The nonce was used by another transaction, it must not be reused
+            nonce_used = action in THE_NONCE_WAS_REUSED
+
             if action == ClientErrorInspectResult.INSUFFICIENT_FUNDS:
                 reason = (
                     "Transaction failed due to insufficient ETH balance. "
@@ -1365,6 +1435,11 @@ def to_log_details(self) -> Dict[str, Any]:
             reason = f"Unexpected error in underlying Ethereum node: {str(e)}"
             log.critical(error_msg, **log_details, reason=reason)
             raise RaidenUnrecoverableError(reason)
+        finally:
+            TRANSACTION_SUBMISSION_DURATION.observe(time.monotonic() - submission_start)
+            if not nonce_used:
+                self._nonces.release(nonce)
+                self._fill_nonce_gaps()
 
         transaction_sent = TransactionSentImplementation(
             from_address=slot.from_address,
@@ -1379,6 +1454,47 @@ def to_log_details(self) -> Dict[str, Any]:
         log.debug("Transaction sent", **transaction_sent.to_log_details())
         return transaction_sent
 
+    def _fill_nonce_gaps(self) -> None:
+        """ Send a zero value transfer to ourselves with the nonces of the gaps.
+
+        The transactions after a gap are not mined until it is filled. The next
+        transaction of the node would fill it, but there may be none, which
+        would leave the sent transactions, and whoever polls them, waiting.
+        """
+        while True:
+            nonce = self._nonces.reserve_gap()
+            if nonce is None:
+                return
+
+            transaction_data = {
+                "to": to_checksum_address(self.address),
+                "gas": TRANSACTION_INTRINSIC_GAS,
+                "nonce": nonce,
+                "value": 0,
+                "gasPrice": gas_price_for_fast_transaction(self.web3),
+            }
+            log_details = {
+                "node": to_checksum_address(self.address),
+                "nonce": nonce,
+                "gas_price": transaction_data["gasPrice"],
+            }
+            log.info("Filling the nonce gap", **log_details)
+
+            try:
+                signed_txn = self.web3.eth.account.sign_transaction(transaction_data, self.privkey)
+                self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
+            except ValueError as e:
+                action = inspect_client_error(e, self.eth_node)
+                nonce_used = (
+                    action in THE_NONCE_WAS_REUSED
+                    or action == ClientErrorInspectResult.TRANSACTION_UNDERPRICED
+                )
+                if not nonce_used:
+                    # Filled by the next transaction of the node
+                    self._nonces.release(nonce)
+                    log.error("Filling the nonce gap failed", **log_details, error=str(e))
+                    return
+
     def new_contract_proxy(self, abi: ABI, contract_address: Address) -> Contract:
         return self.web3.eth.contract(abi=abi, address=contract_address)
 
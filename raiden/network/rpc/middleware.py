@@ -1,12 +1,36 @@
 import functools
+import math
+import operator
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 from cachetools import LRUCache
-from web3.gas_strategies.time_based import construct_time_based_gas_price_strategy
+from eth_typing import ChecksumAddress
+from gevent.lock import Semaphore
+from hexbytes import HexBytes
+from web3 import Web3
 from web3.middleware.cache import construct_simple_cache_middleware
-from web3.types import RPCEndpoint
+from web3.types import BlockData, RPCEndpoint, RPCResponse, TxParams, Wei
+
+from raiden.utils import metrics
 
 BLOCK_HASH_CACHE_RPC_WHITELIST = {RPCEndpoint("eth_getBlockByHash")}
 
+# Maximum number of blocks fetched by a gas price oracle per update, the
+# sample is filled over a few blocks instead of at once
+GAS_PRICE_ORACLE_BLOCKS_PER_UPDATE = 20
+
+RPC_REQUEST_DURATION = metrics.Histogram(
+    "raiden_jsonrpc_request_seconds",
+    "Latency of the JSON-RPC requests sent to the Ethereum client",
+    labelnames=("method",),
+)
+GAS_PRICE_ORACLE_BLOCKS = metrics.Counter(
+    "raiden_gas_price_oracle_blocks_total",
+    "Blocks fetched by the gas price oracles to update their statistics",
+)
+
 
 block_hash_cache_middleware = construct_simple_cache_middleware(
     # default sample size of gas price strategies is 120
@@ -14,6 +38,255 @@
     rpc_whitelist=BLOCK_HASH_CACHE_RPC_WHITELIST,
 )
 
-faster_gas_price_strategy = construct_time_based_gas_price_strategy(
-    max_wait_seconds=15, sample_size=120, probability=99
-)
+
+class BlockGasPrices(NamedTuple):
+    block_hash: HexBytes
+    parent_hash: HexBytes
+    number: int
+    timestamp: int
+    miner: ChecksumAddress
+    gas_prices: Tuple[Wei, ...]
+
+
+class MinerData(NamedTuple):
+    miner: ChecksumAddress
+    num_blocks: int
+    min_gas_price: Wei
+    low_percentile_gas_price: float
+
+
+class Probability(NamedTuple):
+    gas_price: float
+    prob: float
+
+
+# The functions below are the ones of web3's time based gas price strategy,
+# which are private to web3.
+
+
+def percentile(values: Sequence[int], percent: float) -> float:
+    """ Weighted average percentile of the non-empty `values`. """
+    sorted_values = sorted(values)
+
+    rank = len(values) * percent / 100
+    if rank > 0:
+        index = rank - 1
+        if index < 0:
+            return sorted_values[0]
+    else:
+        index = rank
+
+    if index % 1 == 0:
+        return sorted_values[int(index)]
+
+    fractional = index % 1
+    integer = int(index - fractional)
+    lower = sorted_values[integer]
+    higher = sorted_values[integer + 1]
+    return lower + fractional * (higher - lower)
+
+
+def compute_probabilities(
+    miner_data: List[MinerData], wait_blocks: int, sample_size: int
+) -> List[Probability]:
+    """ The probabilities that a transaction is mined within `wait_blocks`, for
+    each of the gas prices accepted by the miners, from the highest price.
+    """
+    miner_data_by_price = sorted(
+        miner_data, key=operator.attrgetter("low_percentile_gas_price"), reverse=True
+    )
+    probabilities = list()
+    for index, data in enumerate(miner_data_by_price):
+        num_blocks_accepting_price = sum(m.num_blocks for m in miner_data_by_price[index:])
+        inv_prob_per_block = (sample_size - num_blocks_accepting_price) / sample_size
+        probability_accepted = 1 - inv_prob_per_block ** wait_blocks
+        probabilities.append(Probability(data.low_percentile_gas_price, probability_accepted))
+    return probabilities
+
+
+def compute_gas_price(probabilities: List[Probability], desired_probability: float) -> Wei:
+    """ Interpolate the gas price for `desired_probability` from the
+    `probabilities` computed by `compute_probabilities`.
+    """
+    first = probabilities[0]
+    last = probabilities[-1]
+
+    if desired_probability >= first.prob:
+        return Wei(int(first.gas_price))
+    if desired_probability <= last.prob:
+        return Wei(int(last.gas_price))
+
+    for left, right in zip(probabilities, probabilities[1:]):
+        if desired_probability < right.prob:
+            continue
+
+        assert desired_probability <= left.prob, "The probabilities must be sorted"
+        position = (desired_probability - right.prob) / (left.prob - right.prob)
+        gas_window_size = left.gas_price - right.gas_price
+        return Wei(int(math.ceil(right.gas_price + gas_window_size * position)))
+
+    raise AssertionError("The probabilities must be sorted")
+
+
+class GasPriceOracle:
+    """ Gas price strategy which computes the same price as web3's time based
+    strategy, without fetching the sampled blocks every time.
+
+    The gas prices of the sampled blocks are kept, only new blocks are fetched
+    when the chain advances, and the price is computed once per block. The
+    oracle is updated by the alarm task, see `on_new_block`, then a price is
+    served without any request. Otherwise the latest block is queried every
+    time a price is asked for.
+
+    At most `GAS_PRICE_ORACLE_BLOCKS_PER_UPDATE` blocks are fetched per update,
+    until the sample is complete the price is computed from the blocks
+    fetched so far.
+
+    The statistics are about the chain of a single client, every client must
+    have its own oracle.
+    """
+
+    def __init__(self, max_wait_seconds: int, sample_size: int, probability: int) -> None:
+        self.max_wait_seconds = max_wait_seconds
+        self.sample_size = sample_size
+        self.probability = probability
+
+        # The block sampled for the block time is one older than the blocks
+        # sampled for the gas prices
+        self.blocks: Deque[BlockGasPrices] = deque(maxlen=sample_size + 1)
+        self.gas_price: Optional[Wei] = None
+        self.updated_by_alarm = False
+        self._web3: Optional[Web3] = None
+        self._lock = Semaphore()
+
+    def __call__(self, web3: Web3, transaction_params: TxParams) -> Optional[Wei]:
+        self._check_client(web3)
+        if not self.updated_by_alarm:
+            self.update(web3, web3.eth.getBlock("latest"))
+        return self.gas_price
+
+    def on_new_block(self, web3: Web3, latest_block: BlockData) -> None:
+        self.updated_by_alarm = True
+        self.update(web3, latest_block)
+
+    def update(self, web3: Web3, latest_block: BlockData) -> None:
+        with self._lock:
+            self._check_client(web3)
+            if self.blocks and self.blocks[-1].block_hash == latest_block["hash"]:
+                return
+
+            known_blocks = {block.block_hash: index for index, block in enumerate(self.blocks)}
+            new_blocks: List[BlockGasPrices] = list()
+            block_hash = latest_block["hash"]
+            common_ancestor = None
+            while len(new_blocks) < GAS_PRICE_ORACLE_BLOCKS_PER_UPDATE:
+                if block_hash in known_blocks:
+                    common_ancestor = known_blocks[block_hash]
+                    break
+
+                # The parent hash is followed instead of the block numbers,
+                # which also makes the requests cacheable
+                block = self._fetch_block(web3, block_hash)
+                new_blocks.append(block)
+                if block.number == 0:
+                    break
+                block_hash = block.parent_hash
+
+            # Blocks after the common ancestor were reorged away, without one
+            # the sample is started again from the new blocks
+            if common_ancestor is None:
+                self.blocks.clear()
+            else:
+                for _ in range(len(self.blocks) - common_ancestor - 1):
+                    self.blocks.pop()
+            self.blocks.extend(reversed(new_blocks))
+
+            # Complete the sample with older blocks, a few per update
+            fetched = len(new_blocks)
+            while (
+                len(self.blocks) < self.sample_size + 1
+                and self.blocks[0].number > 0
+                and fetched < GAS_PRICE_ORACLE_BLOCKS_PER_UPDATE
+            ):
+                self.blocks.appendleft(self._fetch_block(web3, self.blocks[0].parent_hash))
+                fetched += 1
+
+            self.gas_price = self._compute_gas_price()
+
+    def _check_client(self, web3: Web3) -> None:
+        if self._web3 is None:
+            self._web3 = web3
+        assert web3 is self._web3, "A gas price oracle can only be used by one client"
+
+    @staticmethod
+    def _fetch_block(web3: Web3, block_hash: HexBytes) -> BlockGasPrices:
+        block = web3.eth.getBlock(block_hash, full_transactions=True)
+        GAS_PRICE_ORACLE_BLOCKS.inc()
+        return BlockGasPrices(
+            block_hash=block["hash"],
+            parent_hash=block["parentHash"],
+            number=block["number"],
+            timestamp=block["timestamp"],
+            miner=block["miner"],
+            gas_prices=tuple(
+                transaction["gasPrice"] for transaction in block["transactions"]  # type: ignore
+            ),
+        )
+
+    def _compute_gas_price(self) -> Optional[Wei]:
+        if len(self.blocks) < 2:
+            return None
+
+        sampled_blocks = list(self.blocks)[-self.sample_size :]
+        avg_block_time = (self.blocks[-1].timestamp - self.blocks[0].timestamp) / (
+            len(self.blocks) - 1
+        )
+        wait_blocks = int(math.ceil(self.max_wait_seconds / avg_block_time))
+
+        miners_blocks: Dict[ChecksumAddress, List[BlockGasPrices]] = dict()
+        for block in sampled_blocks:
+            if block.gas_prices:
+                miners_blocks.setdefault(block.miner, list()).append(block)
+
+        miner_data = list()
+        for miner, blocks in miners_blocks.items():
+            gas_prices = set(price for block in blocks for price in block.gas_prices)
+            miner_data.append(
+                MinerData(
+                    miner=miner,
+                    num_blocks=len(blocks),
+                    min_gas_price=min(gas_prices),
+                    low_percentile_gas_price=percentile(list(gas_prices), percent=20),
+                )
+            )
+
+        if not miner_data:
+            return None
+
+        probabilities = compute_probabilities(
+            miner_data, wait_blocks=wait_blocks, sample_size=len(sampled_blocks)
+        )
+        return compute_gas_price(probabilities, self.probability / 100)
+
+
+def make_faster_gas_price_strategy() -> GasPriceOracle:
+    return GasPriceOracle(max_wait_seconds=15, sample_size=120, probability=99)
+
+
+def make_fast_gas_price_strategy() -> GasPriceOracle:
+    return GasPriceOracle(max_wait_seconds=60, sample_size=120, probability=98)
+
+
+def metrics_middleware(
+    make_request: Callable[[RPCEndpoint, Any], Any], web3: Web3  # pylint: disable=unused-argument
+) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+    """ Records the latency of the requests which were not answered by a cache. """
+
+    def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+        start = time.monotonic()
+        try:
+            return make_request(method, params)
+        finally:
+            RPC_REQUEST_DURATION.labels(method).observe(time.monotonic() - start)
+
+    return middleware
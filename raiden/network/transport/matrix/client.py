@@ -24,6 +24,7 @@
 from raiden.constants import Environment
 from raiden.exceptions import MatrixSyncMaxTimeoutReached, TransportError
 from raiden.network.transport.matrix.sync_progress import SyncProgress
+from raiden.utils import metrics
 from raiden.utils.datastructures import merge_dict
 from raiden.utils.debugging import IDLE
 from raiden.utils.notifying_queue import NotifyingQueue
@@ -34,6 +35,17 @@
 SHUTDOWN_TIMEOUT = 35
 MSG_QUEUE_MAX_SIZE = 10  # This are matrix sync batches, not messages
 
+SYNC_DURATION = metrics.Histogram(
+    "raiden_matrix_sync_seconds",
+    "Duration of the Matrix sync requests, including the long polling timeout",
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 90.0),
+)
+SYNC_EVENTS = metrics.Histogram(
+    "raiden_matrix_sync_events",
+    "Number of timeline and to-device events per Matrix sync response",
+    buckets=metrics.SIZE_BUCKETS,
+)
+
 MatrixMessage = Dict[str, Any]
 MatrixRoomMessages = Tuple["Room", List[MatrixMessage]]
 MatrixSyncMessages = List[MatrixRoomMessages]
@@ -614,6 +626,7 @@ def _sync(self, timeout_ms: int, latency_ms: int) -> None:
             since=self.sync_token, timeout_ms=timeout_ms, filter=self._sync_filter_id
         )
         time_after_sync = time.monotonic()
+        SYNC_DURATION.observe(time_after_sync - time_before_sync)
 
         log.debug(
             "api.sync returned",
@@ -626,6 +639,12 @@ def _sync(self, timeout_ms: int, latency_ms: int) -> None:
 
         if response:
             token = uuid4()
+            SYNC_EVENTS.observe(
+                len(response["to_device"]["events"])
+                + sum(
+                    len(room["timeline"]["events"]) for room in response["rooms"]["join"].values()
+                )
+            )
 
             log.debug(
                 "Sync returned",
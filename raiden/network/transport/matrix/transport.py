@@ -1,4 +1,7 @@
+import heapq
+import itertools
 import json
+import math
 import time
 from collections import Counter, defaultdict
 from dataclasses import dataclass
@@ -19,7 +22,12 @@
 import raiden
 from raiden.constants import EMPTY_SIGNATURE, MATRIX_AUTO_SELECT_SERVER, Environment
 from raiden.exceptions import RaidenUnrecoverableError, TransportError
-from raiden.messages.abstract import Message, RetrieableMessage, SignedRetrieableMessage
+from raiden.messages.abstract import (
+    Message,
+    RetrieableMessage,
+    SignedMessage,
+    SignedRetrieableMessage,
+)
 from raiden.messages.healthcheck import Ping, Pong
 from raiden.messages.synchronization import Delivered, Processed
 from raiden.network.transport.matrix.client import (
@@ -35,6 +43,7 @@
     AddressReachability,
     DisplayNameCache,
     MessageAckTimingKeeper,
+    SignatureRecoveryPool,
     UserAddressManager,
     UserPresence,
     join_broadcast_room,
@@ -43,7 +52,8 @@
     make_message_batches,
     make_room_alias,
     my_place_or_yours,
-    validate_and_parse_message,
+    parse_messages,
+    validate_message_senders,
     validate_userid_signature,
 )
 from raiden.network.transport.utils import timeout_exponential_backoff
@@ -54,6 +64,7 @@
 from raiden.transfer.identifiers import CANONICAL_IDENTIFIER_UNORDERED_QUEUE, QueueIdentifier
 from raiden.transfer.state import NetworkState, QueueIdsToQueues
 from raiden.transfer.state_change import ActionChangeNodeNetworkState
+from raiden.utils import metrics
 from raiden.utils.formatting import to_checksum_address, to_hex_address
 from raiden.utils.logging import redact_secret
 from raiden.utils.notifying_queue import NotifyingQueue
@@ -70,7 +81,6 @@
     Iterator,
     List,
     MessageID,
-    NamedTuple,
     Optional,
     RoomID,
     Set,
@@ -86,9 +96,22 @@
 # Combined with 10 retries (``..utils.JOIN_RETRIES``) this will give a total wait time of ~15s
 RETRY_INTERVAL = 0.1
 RETRY_INTERVAL_MULTIPLIER = 1.55
-# A RetryQueue is considered idle after this many iterations without a message
+# A RetryQueue is discarded after having no messages for this many retry intervals
 RETRY_QUEUE_IDLE_AFTER = 10
 
+RETRY_QUEUE_MESSAGES = metrics.Gauge(
+    "raiden_matrix_retry_queue_messages", "Number of messages waiting in the retry queues"
+)
+RETRY_QUEUES = metrics.Gauge("raiden_matrix_retry_queues", "Number of retry queues")
+RETRY_GREENLETS = metrics.Gauge(
+    "raiden_matrix_retry_greenlets",
+    "Number of greenlets used to send the retry queues, including the scheduler",
+)
+RETRY_LATENCY = metrics.Histogram(
+    "raiden_matrix_retry_latency_seconds",
+    "Delay between the time a queued message is due and the time it is sent",
+)
+
 
 @dataclass
 class MessagesQueue:
@@ -96,52 +119,49 @@ class MessagesQueue:
     messages: List[Message]
 
 
-class _RetryQueue(Runnable):
-    """ A helper Runnable to send batched messages to receiver through transport """
+class _RetryQueue:
+    """ The messages waiting to be sent to a receiver through transport
+
+    The queue does not have a greenlet of its own, it is sent by the transport's
+    `_RetryScheduler` whenever one of its messages is due.
+    """
 
-    class _MessageData(NamedTuple):
+    @dataclass
+    class _MessageData:
         """ Small helper data structure for message queue """
 
         queue_identifier: QueueIdentifier
         message: Message
         text: str
-        # generator that tells if the message should be sent now
-        expiration_generator: Iterator[bool]
+        # retry intervals of the message
+        timeouts: Iterator[float]
+        # time.monotonic() at which the message is sent next
+        send_at: float
 
     def __init__(self, transport: "MatrixTransport", receiver: Address) -> None:
         self.transport = transport
         self.receiver = receiver
         self._message_queue: List[_RetryQueue._MessageData] = list()
-        self._notify_event = gevent.event.Event()
         self._lock = gevent.lock.Semaphore()
-        self._idle_since: int = 0  # Counter of idle iterations
-        super().__init__()
-        self.greenlet.name = f"RetryQueue recipient:{to_checksum_address(self.receiver)}"
+        self._idle_since = time.monotonic()
+
+        # Bookkeeping of the scheduler, the queue is due at `_scheduled_at`
+        # unless an earlier entry with another `_schedule_id` superseded it.
+        self._scheduled_at = math.inf
+        self._schedule_id = -1
+        self._sending: Optional[gevent.Greenlet] = None
+        self._check_again = False
 
     @property
     def log(self) -> Any:
         return self.transport.log
 
-    @staticmethod
-    def _expiration_generator(
-        timeout_generator: Iterable[float], now: Callable[[], float] = time.time
-    ) -> Iterator[bool]:
-        """Stateful generator that yields True if more than timeout has passed since previous True,
-        False otherwise.
-
-        Helper method to tell when a message needs to be retried (more than timeout seconds
-        passed since last time it was sent).
-        timeout is iteratively fetched from timeout_generator
-        First value is True to always send message at least once
-        """
-        for timeout in timeout_generator:
-            _next = now() + timeout  # next value is now + next generated timeout
-            yield True
-            while now() < _next:  # yield False while next is still in the future
-                yield False
+    @property
+    def message_count(self) -> int:
+        return len(self._message_queue)
 
     def enqueue(self, queue_identifier: QueueIdentifier, messages: List[Message]) -> None:
-        """ Enqueue a message to be sent, and notify main loop """
+        """ Enqueue a message to be sent, and notify the scheduler """
         msg = (
             f"queue_identifier.recipient ({to_checksum_address(queue_identifier.recipient)}) "
             f" must match self.receiver ({to_checksum_address(self.receiver)})."
@@ -149,12 +169,7 @@ def enqueue(self, queue_identifier: QueueIdentifier, messages: List[Message]) ->
         assert queue_identifier.recipient == self.receiver, msg
 
         with self._lock:
-            timeout_generator = timeout_exponential_backoff(
-                self.transport._config.retries_before_backoff,
-                self.transport._config.retry_interval_initial,
-                self.transport._config.retry_interval_max,
-            )
-
+            now = time.monotonic()
             encoded_messages = list()
             for message in messages:
                 already_queued = any(
@@ -170,12 +185,17 @@ def enqueue(self, queue_identifier: QueueIdentifier, messages: List[Message]) ->
                         message=redact_secret(DictSerializer.serialize(message)),
                     )
                 else:
-                    expiration_generator = self._expiration_generator(timeout_generator)
+                    timeouts = timeout_exponential_backoff(
+                        self.transport._config.retries_before_backoff,
+                        self.transport._config.retry_interval_initial,
+                        self.transport._config.retry_interval_max,
+                    )
                     data = _RetryQueue._MessageData(
                         queue_identifier=queue_identifier,
                         message=message,
                         text=MessageSerializer.serialize(message),
-                        expiration_generator=expiration_generator,
+                        timeouts=timeouts,
+                        send_at=now,
                     )
                     encoded_messages.append(data)
 
@@ -193,22 +213,24 @@ def enqueue_unordered(self, message: Message) -> None:
         )
 
     def notify(self) -> None:
-        """ Notify main loop to check if anything needs to be sent """
-        with self._lock:
-            self._notify_event.set()
+        """ Ask the scheduler to check right away if anything needs to be sent """
+        self.transport._retry_scheduler.schedule(self, time.monotonic())
 
-    def _check_and_send(self) -> None:
+    def _check_and_send(self) -> Optional[float]:
         """Check and send all pending/queued messages that are not waiting on retry timeout
 
         After composing the to-be-sent message, also message queue from messages that are not
         present in the respective SendMessageEvent queue anymore
+
+        Returns the `time.monotonic()` at which the queue must be checked again, or None if
+        there is nothing left to send.
         """
         if not self.transport.greenlet:
             self.log.warning("Can't retry", reason="Transport not yet started")
-            return
+            return None
         if self.transport._stop_event.ready():
             self.log.warning("Can't retry", reason="Transport stopped")
-            return
+            return None
 
         assert self._lock.locked(), "RetryQueue lock must be held while messages are being sent"
 
@@ -225,13 +247,14 @@ def _check_and_send(self) -> None:
         )
         status = self.transport._address_mgr.get_address_reachability(self.receiver)
         if status is not AddressReachability.REACHABLE:
-            # if partner is not reachable, return
+            # if partner is not reachable, check again after the initial retry interval,
+            # the queue is also notified when the partner becomes reachable
             self.log.debug(
                 "Partner not reachable. Skipping.",
                 partner=to_checksum_address(self.receiver),
                 status=status,
             )
-            return
+            return time.monotonic() + self.transport._config.retry_interval_initial
 
         def message_is_in_queue(message_data: _RetryQueue._MessageData) -> bool:
             if message_data.queue_identifier not in self.transport._queueids_to_queues:
@@ -243,13 +266,14 @@ def message_is_in_queue(message_data: _RetryQueue._MessageData) -> bool:
                 for send_event in self.transport._queueids_to_queues[message_data.queue_identifier]
             )
 
+        now = time.monotonic()
         message_texts: List[str] = list()
         for message_data in self._message_queue[:]:
             # Messages are sent on two conditions:
             # - Non-retryable (e.g. Delivered)
             #   - Those are immediately remove from the local queue since they are only sent once
             # - Retryable
-            #   - Those are retried according to their retry generator as long as they haven't been
+            #   - Those are retried according to their timeouts as long as they haven't been
             #     removed from the Raiden queue
             remove = False
             if isinstance(message_data.message, (Delivered, Ping, Pong)):
@@ -258,6 +282,7 @@ def message_is_in_queue(message_data: _RetryQueue._MessageData) -> bool:
                 #       later `Processed` message?
                 remove = True
                 message_texts.append(message_data.text)
+                RETRY_LATENCY.observe(now - message_data.send_at)
             elif not message_is_in_queue(message_data):
                 remove = True
                 self.log.debug(
@@ -266,19 +291,19 @@ def message_is_in_queue(message_data: _RetryQueue._MessageData) -> bool:
                     message=message_data.message,
                     reason="Message was removed from queue or queue was removed",
                 )
-            else:
-                # The message is still eligible for retry, consult the expiration generator if
-                # it should be retried now
-                if next(message_data.expiration_generator):
-                    message_texts.append(message_data.text)
-                    if self.transport._environment is Environment.DEVELOPMENT:
-                        if isinstance(message_data.message, RetrieableMessage):
-                            self.transport._counters["retry"][
-                                (
-                                    message_data.message.__class__.__name__,
-                                    message_data.message.message_identifier,
-                                )
-                            ] += 1
+            elif message_data.send_at <= now:
+                # The message is still eligible for retry and its timeout expired
+                message_texts.append(message_data.text)
+                RETRY_LATENCY.observe(now - message_data.send_at)
+                message_data.send_at = now + next(message_data.timeouts)
+                if self.transport._environment is Environment.DEVELOPMENT:
+                    if isinstance(message_data.message, RetrieableMessage):
+                        self.transport._counters["retry"][
+                            (
+                                message_data.message.__class__.__name__,
+                                message_data.message.message_identifier,
+                            )
+                        ] += 1
 
             if remove:
                 self._message_queue.remove(message_data)
@@ -290,46 +315,129 @@ def message_is_in_queue(message_data: _RetryQueue._MessageData) -> bool:
             for message_batch in make_message_batches(message_texts):
                 self.transport._send_raw(self.receiver, message_batch)
 
-    def _run(self) -> None:  # type: ignore
-        msg = (
-            """_RetryQueue started before transport._raiden_service is set. """
-            """_RetryQueue should not be started before transport.start() is called"""
+        if not self._message_queue:
+            self._idle_since = time.monotonic()
+            return None
+        return min(message_data.send_at for message_data in self._message_queue)
+
+    @property
+    def idle_at(self) -> float:
+        """ The `time.monotonic()` after which the queue is discarded if it stays empty """
+        idle_timeout = RETRY_QUEUE_IDLE_AFTER * self.transport._config.retry_interval_initial
+        return self._idle_since + idle_timeout
+
+    @property
+    def is_idle(self) -> bool:
+        return (
+            not self._message_queue
+            and not self._lock.locked()
+            and self._sending is None
+            and time.monotonic() >= self.idle_at
         )
 
-        assert self.transport._raiden_service is not None, msg
+    def __str__(self) -> str:
+        return f"RetryQueue recipient:{to_checksum_address(self.receiver)}"
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} for {to_normalized_address(self.receiver)}>"
+
+
+class _RetryScheduler(Runnable):
+    """ Sends the retry queues of all receivers from a single greenlet
+
+    The queues are kept in a heap ordered by the time their next message is
+    due. A due queue is sent by a short lived greenlet, so that a receiver with
+    a slow room does not delay the others, and there is at most one such
+    greenlet per queue to keep its messages in order.
+    """
+
+    def __init__(self, transport: "MatrixTransport") -> None:
+        self.transport = transport
+        self._heap: List[Tuple[float, int, _RetryQueue]] = list()
+        self._schedule_ids = itertools.count()
+        self._wakeup_event = Event()
+        super().__init__()
+
+    def schedule(self, retrier: _RetryQueue, at: float) -> None:
+        """ Check `retrier` at the `time.monotonic()` given by `at`, unless it is due earlier """
+        if at >= retrier._scheduled_at:
+            return
+
+        schedule_id = next(self._schedule_ids)
+        retrier._scheduled_at = at
+        retrier._schedule_id = schedule_id
+        heapq.heappush(self._heap, (at, schedule_id, retrier))
+
+        if self._heap[0][1] == schedule_id:
+            self._wakeup_event.set()
+
+    def _run(self) -> None:  # type: ignore
+        assert self.transport._raiden_service is not None, "_raiden_service not set"
         self.greenlet.name = (
-            f"RetryQueue "
-            f"node:{to_checksum_address(self.transport._raiden_service.address)} "
-            f"recipient:{to_checksum_address(self.receiver)}"
+            f"RetryScheduler node:{to_checksum_address(self.transport._raiden_service.address)}"
         )
+
         # run while transport parent is running
         while not self.transport._stop_event.ready():
-            # once entered the critical section, block any other enqueue or notify attempt
-            with self._lock:
-                self._notify_event.clear()
-                if self._message_queue:
-                    self._idle_since = 0
-                    self._check_and_send()
-                else:
-                    self._idle_since += 1
+            self._wakeup_event.clear()
+
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                _, schedule_id, retrier = heapq.heappop(self._heap)
+                # Skip the entries superseded by a call to `schedule` with an earlier time
+                if schedule_id == retrier._schedule_id:
+                    retrier._scheduled_at = math.inf
+                    self._check(retrier)
+
+            timeout = self._heap[0][0] - now if self._heap else None
+            self._wakeup_event.wait(timeout)
+
+    def _check(self, retrier: _RetryQueue) -> None:
+        if retrier._sending is not None:
+            # The messages enqueued while sending are checked once the send is done
+            retrier._check_again = True
+        elif retrier.message_count:
+            retrier._sending = self._schedule_new_greenlet(self._send, retrier)
+            retrier._sending.name = f"RetryQueue recipient:{to_checksum_address(retrier.receiver)}"
+        elif retrier.is_idle:
+            # A new instance will be created by `MatrixTransport._get_retrier()` if necessary
+            if self.transport._address_to_retrier.get(retrier.receiver) is retrier:
+                self.log.debug("Discarding idle RetryQueue", queue=retrier)
+                del self.transport._address_to_retrier[retrier.receiver]
+        else:
+            self.schedule(retrier, retrier.idle_at)
 
-            if self.is_idle:
-                # There have been no messages to process for a while. Exit.
-                # A new instance will be created by `MatrixTransport._get_retrier()` if necessary
-                self.log.debug("Exiting idle RetryQueue", queue=self)
-                return
-            # wait up to retry_interval (or to be notified) before checking again
-            self._notify_event.wait(self.transport._config.retry_interval_initial)
+    def _send(self, retrier: _RetryQueue) -> None:
+        with retrier._lock:
+            check_at = retrier._check_and_send()
+        retrier._sending = None
+
+        if retrier._check_again:
+            retrier._check_again = False
+            self.schedule(retrier, time.monotonic())
+        elif check_at is not None:
+            self.schedule(retrier, check_at)
+        elif not retrier.message_count:
+            self.schedule(retrier, retrier.idle_at)
 
     @property
-    def is_idle(self) -> bool:
-        return self._idle_since >= RETRY_QUEUE_IDLE_AFTER
+    def log(self) -> Any:
+        return self.transport.log
 
-    def __str__(self) -> str:
-        return self.greenlet.name
+    def stop(self) -> None:
+        """ Wait for the scheduler and its sends to exit, the transport must be stopped """
+        self._wakeup_event.set()
+        # No need to get on them, exceptions are re-raised because of the
+        # `link_exception`
+        gevent.wait(  # pylint: disable=gevent-disable-wait
+            [greenlet for greenlet in [self.greenlet, *self.greenlets] if greenlet]
+        )
+        self._heap.clear()
 
-    def __repr__(self) -> str:
-        return f"<{self.__class__.__name__} for {to_normalized_address(self.receiver)}>"
+    @property
+    def greenlet_count(self) -> int:
+        """ Number of greenlets used to send the queues, including the scheduler """
+        return len(self.greenlets) + int(bool(self.greenlet))
 
 
 class MatrixTransport(Runnable):
@@ -380,7 +488,12 @@ def _http_retry_delay() -> Iterable[float]:
         self.greenlets: List[gevent.Greenlet] = list()
 
         self._address_to_retrier: Dict[Address, _RetryQueue] = dict()
+        self._retry_scheduler = _RetryScheduler(self)
         self._displayname_cache = DisplayNameCache()
+        self._signature_recovery_pool = SignatureRecoveryPool(
+            processes=config.signature_recovery_processes,
+            min_batch_size=config.signature_recovery_min_batch,
+        )
 
         self._broadcast_rooms: Dict[str, Room] = dict()
         self._broadcast_queue: JoinableQueue[Tuple[str, Message]] = JoinableQueue()
@@ -468,16 +581,22 @@ def start(  # type: ignore
         self._initialize_health_check(health_check_list)
         self._initialize_sync()
 
-        # (re)start any _RetryQueue which was initialized before start
-        for retrier in self._address_to_retrier.values():
-            if not retrier:
-                self.log.debug("Starting retrier", retrier=retrier)
-                retrier.start()
+        RETRY_QUEUES.set_function(lambda: len(self._address_to_retrier))
+        RETRY_QUEUE_MESSAGES.set_function(
+            lambda: sum(retrier.message_count for retrier in self._address_to_retrier.values())
+        )
+        RETRY_GREENLETS.set_function(lambda: self._retry_scheduler.greenlet_count)
 
         super().start()  # start greenlet
         self._starting = False
         self._started = True
 
+        self._retry_scheduler.start()
+        self._retry_scheduler.greenlet.link_exception(self.on_error)
+        # schedule any _RetryQueue which was initialized before start
+        for retrier in self._address_to_retrier.values():
+            retrier.notify()
+
         self.log.debug("Matrix started", config=self._config)
 
         # Handle any delayed invites in the future
@@ -505,6 +624,7 @@ def _run(self) -> None:  # type: ignore
         except gevent.GreenletExit:  # killed without exception
             self._stop_event.set()
             gevent.killall(self.greenlets)  # kill children
+            gevent.killall([self._retry_scheduler.greenlet, *self._retry_scheduler.greenlets])
             raise  # re-raise to keep killed status
         except Exception:
             self.stop()  # ensure cleanup and wait on subtasks
@@ -522,20 +642,14 @@ def stop(self) -> None:
         self._stop_event.set()
         self._broadcast_event.set()
 
-        for retrier in self._address_to_retrier.values():
-            if retrier:
-                retrier.notify()
-
-        # Wait for retriers which already started to exit, then discard them
-        # Retriers which have not been started yet just get discarded
-        # In the meanwhile no other retriers should be started since stop_event is set
-        #
-        # No need to get on them, exceptions are re-raised because of the
-        # `link_exception`
-        gevent.wait(  # pylint: disable=gevent-disable-wait
-            {r.greenlet for r in self._address_to_retrier.values() if r.greenlet}
-        )
+        # Wait for the scheduler and the queues being sent to exit, then
+        # discard the queues. In the meanwhile nothing else is sent since
+        # stop_event is set
+        self._retry_scheduler.stop()
         self._address_to_retrier = {}
+        RETRY_QUEUES.set_function(None)
+        RETRY_QUEUE_MESSAGES.set_function(None)
+        RETRY_GREENLETS.set_function(None)
 
         self._address_mgr.stop()
         self._client.stop()  # stop sync_thread, wait on client's greenlets
@@ -549,6 +663,8 @@ def stop(self) -> None:
         # Ensure keep-alive http connections are closed
         self._client.api.session.close()
 
+        self._signature_recovery_pool.stop()
+
         if self._environment is Environment.DEVELOPMENT:
             assert self._message_timing_keeper is not None, MYPY_ANNOTATION
             counters_most_common = {
@@ -1063,27 +1179,31 @@ def _handle_member_join(self, room: Room) -> None:
                 [room], "Users from more than one address joined the room"
             )
 
-    def _handle_text(self, room: Room, message: MatrixMessage) -> List[Message]:
+    def _handle_text(
+        self, room: Room, message: MatrixMessage
+    ) -> Optional[Tuple[Address, List[SignedMessage]]]:
         """Handle a single Matrix message.
 
         The matrix message is expected to be a NDJSON, and each entry should be
         a valid JSON encoded Raiden message.
 
         Return::
-            If any of the validations fail emtpy is returned, otherwise a list
-            contained all parsed messages is returned.
+            If any of the validations fail None is returned, otherwise the
+            address of the peer and a list containing all parsed messages is
+            returned. The signers of the messages are not validated yet, this
+            is done for the whole sync batch by `_handle_sync_messages`.
         """
 
         is_valid_type = (
             message["type"] == "m.room.message" and message["content"]["msgtype"] == "m.text"
         )
         if not is_valid_type:
-            return []
+            return None
 
         # Ignore our own messages
         sender_id = message["sender"]
         if sender_id == self._user_id:
-            return []
+            return None
 
         user = self._client.get_user(sender_id)
         self._displayname_cache.warm_users([user])
@@ -1095,7 +1215,7 @@ def _handle_text(self, room: Room, message: MatrixMessage) -> List[Message]:
                 peer_user=user.user_id,
                 room=room,
             )
-            return []
+            return None
 
         if self._is_broadcast_room(room):
             # This must not happen. Nodes must not listen on broadcast rooms.
@@ -1110,7 +1230,7 @@ def _handle_text(self, room: Room, message: MatrixMessage) -> List[Message]:
                 sender_address=to_checksum_address(peer_address),
                 room=room,
             )
-            return []
+            return None
 
         # rooms we created and invited user, or we're invited specifically by them
         room_ids = self._get_room_ids_for_address(peer_address)
@@ -1124,9 +1244,9 @@ def _handle_text(self, room: Room, message: MatrixMessage) -> List[Message]:
                 expected_room_ids=room_ids,
                 reason="unknown room for user",
             )
-            return []
+            return None
 
-        return validate_and_parse_message(message["content"]["body"], peer_address)
+        return peer_address, parse_messages(message["content"]["body"], peer_address)
 
     def _handle_sync_messages(self, sync_messages: MatrixSyncMessages) -> bool:
         """ Handle text messages sent to listening rooms """
@@ -1135,12 +1255,24 @@ def _handle_sync_messages(self, sync_messages: MatrixSyncMessages) -> bool:
 
         assert self._raiden_service is not None, "_raiden_service not set"
 
-        all_messages: List[Message] = list()
+        received: List[Tuple[Address, List[SignedMessage]]] = list()
         for room, room_messages in sync_messages:
             # TODO: Don't fetch messages from the broadcast rooms. #5535
             if not self._is_broadcast_room(room):
                 for text in room_messages:
-                    all_messages.extend(self._handle_text(room, text))
+                    parsed = self._handle_text(room, text)
+                    if parsed is not None:
+                        received.append(parsed)
+
+        # Recover the signers of the whole batch at once, so the work can be
+        # spread over multiple cores
+        self._signature_recovery_pool.recover_senders(
+            message for _, messages in received for message in messages
+        )
+
+        all_messages: List[Message] = list()
+        for peer_address, messages in received:
+            all_messages.extend(validate_message_senders(messages, peer_address))
 
         # Remove this #3254
         for message in all_messages:
@@ -1169,14 +1301,12 @@ def _handle_sync_messages(self, sync_messages: MatrixSyncMessages) -> bool:
     def _get_retrier(self, receiver: Address) -> _RetryQueue:
         """ Construct and return a _RetryQueue for receiver """
         retrier = self._address_to_retrier.get(receiver)
-        # The RetryQueue may have exited due to being idle
-        if retrier is None or retrier.greenlet.ready():
+        # The RetryQueue may have been discarded due to being idle
+        if retrier is None:
             retrier = _RetryQueue(transport=self, receiver=receiver)
             self._address_to_retrier[receiver] = retrier
-            if not self._stop_event.ready():
-                retrier.start()
-            # ``Runnable.start()`` may re-create the internal greenlet
-            retrier.greenlet.link_exception(self.on_error)
+            # Discard the queue if nothing is ever enqueued
+            self._retry_scheduler.schedule(retrier, retrier.idle_at)
         return retrier
 
     def _send_with_retry(self, queue: MessagesQueue) -> None:
@@ -1383,7 +1513,7 @@ def _address_reachability_changed(
             node_reachability = NetworkState.REACHABLE
             # _QueueRetry.notify when partner comes online
             retrier = self._address_to_retrier.get(address)
-            if retrier:
+            if retrier is not None:
                 retrier.notify()
         elif reachability is AddressReachability.UNKNOWN:
             node_reachability = NetworkState.UNKNOWN
@@ -1,7 +1,9 @@
 import json
+import math
 import re
+import sys
 import time
-from binascii import Error as DecodeError
+from binascii import Error as DecodeError, hexlify, unhexlify
 from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
@@ -36,6 +38,7 @@
 )
 from gevent.event import Event
 from gevent.lock import Semaphore
+from gevent.subprocess import PIPE, Popen, TimeoutExpired
 from matrix_client.errors import MatrixError, MatrixRequestError
 from structlog._config import BoundLoggerLazyProxy
 
@@ -72,6 +75,7 @@
 # The maximum matrix event size is 65 kB. Since events are larger than just the message
 # content we chose a conservative value
 MATRIX_MAX_BATCH_SIZE = 50_000
+SIGNATURE_RECOVERY_WORKER_EXIT_TIMEOUT = 5
 JSONResponse = Dict[str, Any]
 
 
@@ -863,8 +867,12 @@ def make_room_alias(chain_id: ChainID, *suffixes: str) -> str:
     return ROOM_NAME_SEPARATOR.join([ROOM_NAME_PREFIX, network_name, *suffixes])
 
 
-def validate_and_parse_message(data: Any, peer_address: Address) -> List[Message]:
-    messages: List[Message] = list()
+def parse_messages(data: Any, peer_address: Address) -> List[SignedMessage]:
+    """ Deserialize the signed messages of a matrix message body.
+
+    The signers are not verified, see `validate_message_senders`.
+    """
+    messages: List[SignedMessage] = list()
 
     if not isinstance(data, str):
         log.warning(
@@ -895,6 +903,18 @@ def validate_and_parse_message(data: Any, peer_address: Address) -> List[Message
                 peer_address=to_checksum_address(peer_address),
             )
             continue
+        messages.append(message)
+
+    return messages
+
+
+def validate_message_senders(
+    messages: List[SignedMessage], peer_address: Address
+) -> List[Message]:
+    """ Return the messages which were signed by `peer_address`. """
+    valid_messages: List[Message] = list()
+
+    for message in messages:
         if message.sender != peer_address:
             log.warning(
                 "Message not signed by sender!",
@@ -903,9 +923,125 @@ def validate_and_parse_message(data: Any, peer_address: Address) -> List[Message
                 peer_address=to_checksum_address(peer_address),
             )
             continue
-        messages.append(message)
+        valid_messages.append(message)
 
-    return messages
+    return valid_messages
+
+
+class SignatureRecoveryPool:
+    """ Recovers the signers of received messages with worker processes.
+
+    The ECDSA recovery is the most expensive part of validating a received
+    message. Done in the node's process it limits the node to a single core,
+    which is the bottleneck of a mediator receiving hundreds of messages per
+    sync.
+
+    Batches with at least `min_batch_size` messages without a known sender are
+    split between `processes` worker processes, see `serve_recoveries`. The
+    workers are talked to through gevent's pipes, so the hub keeps running
+    while they work. The recovered senders are cached on the messages. Smaller
+    batches, and all of them with `processes` set to zero, are recovered on
+    demand as before.
+
+    If a worker fails the pool is disabled, the senders of the following
+    batches are recovered on demand too.
+    """
+
+    def __init__(self, processes: int, min_batch_size: int) -> None:
+        self.processes = processes
+        self.min_batch_size = min_batch_size
+        self._workers: List[Popen] = list()
+        self._disabled = False
+        self._lock = Semaphore()
+
+    def recover_senders(self, messages: Iterable[SignedMessage]) -> None:
+        # Deduplicate by identity, `cached_deserialize` returns the same
+        # instance for messages which were received more than once.
+        unique_messages = {id(message): message for message in messages}
+        pending = [
+            message for message in unique_messages.values() if not message.has_recovered_sender
+        ]
+        if self.processes == 0 or len(pending) < self.min_batch_size:
+            return
+
+        with self._lock:
+            if self._disabled:
+                return
+
+            if not self._workers:
+                command = _signature_recovery_worker_command()
+                self._workers = [
+                    Popen(command, stdin=PIPE, stdout=PIPE) for _ in range(self.processes)
+                ]
+
+            chunk_size = math.ceil(len(pending) / len(self._workers))
+            chunks = [pending[i : i + chunk_size] for i in range(0, len(pending), chunk_size)]
+            greenlets = [
+                spawn_named("recover_senders", _recover_chunk_senders, worker, chunk)
+                for worker, chunk in zip(self._workers, chunks)
+            ]
+            try:
+                gevent.joinall(set(greenlets), raise_error=True)
+            except (OSError, EOFError, ValueError) as e:
+                log.warning(
+                    "Signature recovery worker failed, disabling the worker processes",
+                    exception=e,
+                )
+                gevent.killall(greenlets)
+                self._disabled = True
+                self._stop_workers()
+                return
+
+        for chunk, greenlet in zip(chunks, greenlets):
+            for message, sender in zip(chunk, greenlet.get()):
+                message.set_recovered_sender(sender)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stop_workers()
+
+    def _stop_workers(self) -> None:
+        workers, self._workers = self._workers, list()
+        for worker in workers:
+            # Closing the pipe ends the loop of the worker
+            try:
+                worker.stdin.close()
+            except OSError:
+                # The worker exited with a request in flight
+                pass
+        for worker in workers:
+            try:
+                worker.wait(timeout=SIGNATURE_RECOVERY_WORKER_EXIT_TIMEOUT)
+            except TimeoutExpired:
+                worker.kill()
+                worker.wait()
+
+
+def _signature_recovery_worker_command() -> List[str]:
+    # In the PyInstaller bundle `sys.executable` is the raiden CLI, which runs
+    # the loop of the workers with a hidden subcommand
+    if getattr(sys, "frozen", False):
+        return [sys.executable, "--disable-debug-logfile", "signature-recovery-worker"]
+    return [sys.executable, "-m", "raiden.utils.signer"]
+
+
+def _recover_chunk_senders(
+    worker: Popen, messages: List[SignedMessage]
+) -> List[Optional[Address]]:
+    request = b"".join(
+        hexlify(message.data_to_sign) + b" " + hexlify(message.signature) + b"\n"
+        for message in messages
+    )
+    worker.stdin.write(request + b"\n")
+    worker.stdin.flush()
+
+    senders: List[Optional[Address]] = list()
+    for _ in messages:
+        reply = worker.stdout.readline().strip()
+        if not reply:
+            raise EOFError("The signature recovery worker exited")
+        senders.append(None if reply == b"-" else Address(unhexlify(reply)))
+    return senders
 
 
 def my_place_or_yours(our_address: Address, partner_address: Address) -> Address:
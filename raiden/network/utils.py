@@ -1,23 +1,39 @@
 import errno
+import functools
 import json
 import socket
 import sys
 from contextlib import closing
 from itertools import count, repeat
 from socket import SocketKind
+from urllib.parse import urlparse
 
 import gevent
 import psutil
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
 from structlog import get_logger
-
+from urllib3.util.retry import Retry
+
+from raiden.constants import (
+    DEFAULT_HTTP_POOL_MAXSIZE,
+    DEFAULT_HTTP_RETRIES,
+    DEFAULT_HTTP_RETRY_BACKOFF,
+)
+from raiden.utils import metrics
 from raiden.utils.typing import Any, Iterator, Optional, Port, Tuple
 
 LOOPBACK = "127.0.0.1"
 
 log = get_logger(__name__)
 
+HTTP_REQUEST_DURATION = metrics.Histogram(
+    "raiden_http_request_seconds",
+    "Latency of the HTTP requests sent to the services",
+    labelnames=("service", "endpoint"),
+)
+
 
 def get_response_json(response: Response) -> Any:
     """Decode response.
@@ -28,6 +44,43 @@ def get_response_json(response: Response) -> Any:
     return json.loads(response.content)
 
 
+def _observe_request_duration(
+    service: str, response: Response, *args: Any, **kwargs: Any  # pylint: disable=unused-argument
+) -> None:
+    # The last component of the path names the endpoint, the others contain
+    # addresses which would make too many label values
+    endpoint = urlparse(response.url).path.rstrip("/").rsplit("/", 1)[-1]
+    HTTP_REQUEST_DURATION.labels(service, endpoint).observe(response.elapsed.total_seconds())
+
+
+def make_http_session(
+    service: str,
+    pool_maxsize: int = DEFAULT_HTTP_POOL_MAXSIZE,
+    retries: int = DEFAULT_HTTP_RETRIES,
+    backoff: float = DEFAULT_HTTP_RETRY_BACKOFF,
+) -> requests.Session:
+    """ Returns a session which keeps the connections to the `service` alive.
+
+    Failed connections are retried, as are the idempotent requests which got a
+    gateway error. Requests which may have been processed by the service are
+    not retried. The latency of the responses is recorded per endpoint.
+    """
+    retry = Retry(
+        total=retries,
+        read=0,
+        backoff_factor=backoff,
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.hooks["response"].append(functools.partial(_observe_request_duration, service))
+    return session
+
+
 # The solution based on psutils does not work on MacOS because it needs
 # root access
 if sys.platform == "darwin":  # pragma: no cover
@@ -1,4 +1,5 @@
 # pylint: disable=too-many-lines
+import functools
 import os
 import random
 import time
@@ -52,26 +53,35 @@
 from raiden.message_handler import MessageHandler
 from raiden.messages.abstract import Message, SignedMessage
 from raiden.messages.encode import message_from_sendevent
+from raiden.network.pathfinding import IOULedger
 from raiden.network.proxies.proxy_manager import ProxyManager
 from raiden.network.proxies.secret_registry import SecretRegistry
 from raiden.network.proxies.service_registry import ServiceRegistry
 from raiden.network.proxies.token_network_registry import TokenNetworkRegistry
 from raiden.network.proxies.user_deposit import UserDeposit
 from raiden.network.rpc.client import JSONRPCClient
+from raiden.network.rpc.middleware import GasPriceOracle
 from raiden.network.transport.matrix.transport import MatrixTransport, MessagesQueue
 from raiden.raiden_event_handler import EventHandler
-from raiden.services import send_pfs_update, update_monitoring_service_from_balance_proof
-from raiden.settings import RaidenConfig
+from raiden.services import (
+    MonitoringRequestPublisher,
+    PFSUpdatePublisher,
+    SecretRegistrationCache,
+    UserDepositBalanceCache,
+    update_monitoring_service_from_balance_proof,
+)
+from raiden.settings import STATE_CHANGE_DISPATCH_LATENCY_BUDGET, RaidenConfig
 from raiden.storage import sqlite, wal
 from raiden.storage.serialization import DictSerializer, JSONSerializer
 from raiden.storage.wal import WriteAheadLog
-from raiden.tasks import AlarmTask
+from raiden.tasks import AlarmTask, StateChangeDispatcher
 from raiden.transfer import node, views
 from raiden.transfer.architecture import (
     BalanceProofSignedState,
     ContractSendEvent,
     Event as RaidenEvent,
     StateChange,
+    TransferTask,
 )
 from raiden.transfer.channel import get_capacity
 from raiden.transfer.events import (
@@ -108,11 +118,13 @@
     BalanceProofStateChange,
     Block,
     ContractReceiveChannelDeposit,
+    ContractReceiveChannelNew,
     ContractReceiveNewTokenNetworkRegistry,
     ReceiveUnlock,
     ReceiveWithdrawExpired,
     ReceiveWithdrawRequest,
 )
+from raiden.utils import metrics
 from raiden.utils.formatting import lpex, to_checksum_address
 from raiden.utils.gevent import spawn_named
 from raiden.utils.logging import redact_secret
@@ -146,6 +158,16 @@
 from raiden_contracts.contract_manager import ContractManager
 
 log = structlog.get_logger(__name__)
+EVENT_HANDLER_DURATION = metrics.Histogram(
+    "raiden_event_handler_seconds",
+    "Time to handle the events of a state change batch, blocking events are handled alone",
+    labelnames=("handler",),
+)
+PAYMENT_TASKS = metrics.Gauge(
+    "raiden_payment_tasks",
+    "Number of payment tasks in the chain state (live) and in the database (archived)",
+    labelnames=("storage",),
+)
 StatusesDict = Dict[TargetAddress, Dict[PaymentID, "PaymentStatus"]]
 ConnectionManagerDict = Dict[TokenNetworkAddress, ConnectionManager]
 
@@ -198,6 +220,7 @@ def initiator_init(
     token_network_address: TokenNetworkAddress,
     target_address: TargetAddress,
     lock_timeout: BlockTimeout = None,
+    batch_route_cache: routing.RouteCache = None,
 ) -> Tuple[Optional[str], ActionInitInitiator]:
     transfer_state = TransferDescriptionWithSecretState(
         token_network_registry_address=raiden.default_registry.address,
@@ -211,7 +234,11 @@ def initiator_init(
         lock_timeout=lock_timeout,
     )
 
-    error_msg, routes, feedback_token = routing.get_best_routes(
+    get_best_routes = routing.get_best_routes
+    if batch_route_cache is not None:
+        get_best_routes = batch_route_cache.get_best_routes
+
+    error_msg, routes, feedback_token = get_best_routes(
         chain_state=views.state_from_raiden(raiden),
         token_network_address=token_network_address,
         one_to_n_address=raiden.default_one_to_n_address,
@@ -221,6 +248,8 @@ def initiator_init(
         previous_address=None,
         pfs_config=raiden.config.pfs_config,
         privkey=raiden.privkey,
+        iou_ledger=raiden.iou_ledger,
+        route_cache=raiden.route_cache,
     )
 
     # Only prepare feedback when token is available
@@ -342,10 +371,29 @@ def __init__(
         self.transport = transport
 
         self.user_deposit = user_deposit
+        self.user_deposit_balance = UserDepositBalanceCache(raiden=self)
+        self.secret_registrations = SecretRegistrationCache(raiden=self)
+        self.monitoring_request_publisher = MonitoringRequestPublisher(raiden=self)
+        self.iou_ledger = IOULedger()
+        self.route_cache: Optional[routing.RouteCache] = None
+        if self.config.services.pathfinding_route_cache_ttl > 0:
+            self.route_cache = routing.RouteCache(
+                ttl=self.config.services.pathfinding_route_cache_ttl
+            )
+
+        self.pfs_update_publisher = PFSUpdatePublisher(
+            raiden=self,
+            window=self.config.services.pfs_update_window,
+            min_interval=self.config.services.pfs_update_min_interval,
+        )
 
         self.alarm = AlarmTask(
             proxy_manager=proxy_manager, sleep_time=self.config.blockchain.query_interval
         )
+        self.state_change_dispatcher = StateChangeDispatcher(
+            dispatch_batches=self._dispatch_state_changes,
+            latency_budget=STATE_CHANGE_DISPATCH_LATENCY_BUDGET,
+        )
         self.raiden_event_handler = raiden_event_handler
         self.message_handler = message_handler
         self.blockchain_events: Optional[BlockchainEvents] = None
@@ -360,6 +408,10 @@ def __init__(
         self.stop_event = Event()
         self.stop_event.set()  # inits as stopped
         self.greenlets: List[Greenlet] = list()
+        # Finished payment tasks which are not written to the database yet
+        self._unarchived_payment_tasks: List[
+            Tuple[sqlite.StateChangeID, SecretHash, TransferTask]
+        ] = list()
 
         self.last_log_time = time.monotonic()
         self.last_log_block = BlockNumber(0)
@@ -438,6 +490,11 @@ def start(self) -> None:
         # - React to incoming messages
         # - Send pending transactions
         # - Send pending message
+        # The state changes are dispatched inline until here, the startup
+        # doesn't have concurrent callers.
+        self.state_change_dispatcher.start()
+        self.state_change_dispatcher.greenlet.link_exception(self.on_error)
+
         self.alarm.greenlet.link_exception(self.on_error)
         self.transport.greenlet.link_exception(self.on_error)
         self._start_transport(chain_state)
@@ -455,7 +512,8 @@ def _run(self, *args: Any, **kwargs: Any) -> None:  # pylint: disable=method-hid
             self.stop_event.wait()
         except gevent.GreenletExit:  # killed without exception
             self.stop_event.set()
-            gevent.killall([self.alarm, self.transport])  # kill children
+            # kill children
+            gevent.killall([self.alarm, self.transport, self.state_change_dispatcher])
             raise  # re-raise to keep killed status
         except Exception:
             self.stop()
@@ -478,6 +536,9 @@ def stop(self) -> None:
         # contact the disconnected client
         if self.api_server is not None:
             self.api_server.stop()
+        # The pending updates must be queued before the transport is stopped
+        self.pfs_update_publisher.flush()
+        self.monitoring_request_publisher.flush()
         self.transport.stop()
         self.alarm.stop()
 
@@ -485,6 +546,8 @@ def stop(self) -> None:
             self.api_server.greenlet.join()
         self.transport.greenlet.join()
         self.alarm.greenlet.join()
+        # Dispatches the state changes which are still queued
+        self.state_change_dispatcher.stop()
 
         assert (
             self.blockchain_events
@@ -495,6 +558,7 @@ def stop(self) -> None:
         assert (
             self.wal
         ), f"The Service must have been started before it can be stopped. node:{self!r}"
+        self._write_payment_task_archive()
         self.wal.storage.close()
         self.wal = None
 
@@ -662,6 +726,8 @@ def _initialize_wal(self) -> None:
                     f"smart contracts {known_registries}"
                 )
 
+        PAYMENT_TASKS.labels("archived").set(self.wal.storage.count_payment_tasks())
+
         # Restore the current snapshot group
         state_change_qty = self.wal.storage.count_state_changes()
         self.snapshot_group = state_change_qty // SNAPSHOT_STATE_CHANGES_COUNT
@@ -742,6 +808,18 @@ def _synchronize_with_blockchain(self) -> None:
             synchronization_state = self._best_effort_synchronize(latest_block)
 
         self.alarm.register_callback(self._best_effort_synchronize)
+        self.alarm.register_callback(self.secret_registrations.on_new_block)
+
+        # The gas price statistics are updated with the new blocks, so that
+        # sending a transaction does not wait for the sampled blocks
+        gas_price_strategy = cast(Any, self.rpc_client.web3.eth.gasPriceStrategy)
+        if isinstance(gas_price_strategy, GasPriceOracle):
+            self.alarm.register_callback(
+                functools.partial(gas_price_strategy.on_new_block, self.rpc_client.web3)
+            )
+
+        if self.config.services.monitoring_enabled:
+            self.alarm.register_callback(self.user_deposit_balance.on_new_block)
 
     def _start_alarm_task(self) -> None:
         """Start the alarm task.
@@ -807,8 +885,21 @@ def handle_state_changes(self, state_changes: List[StateChange]) -> List[Greenle
 
         Use this for error reporting, failures in the returned greenlets,
         should be re-raised using `gevent.joinall` with `raise_error=True`.
+
+        The state changes of concurrent callers are dispatched together by
+        the `state_change_dispatcher`, this blocks until they are dispatched.
+        """
+        return self.state_change_dispatcher.dispatch(state_changes)
+
+    def _dispatch_state_changes(
+        self, state_changes_batches: List[List[StateChange]]
+    ) -> List[List[Greenlet]]:
+        """ Dispatch the state changes of a batch of callers at once.
+
+        Returns the greenlets processing the events of every caller.
         """
         assert self.wal, f"WAL not restored. node:{self!r}"
+        state_changes = [state_change for batch in state_changes_batches for state_change in batch]
         log.debug(
             "State changes",
             node=to_checksum_address(self.address),
@@ -819,7 +910,9 @@ def handle_state_changes(self, state_changes: List[StateChange]) -> List[Greenle
         )
 
         old_state = views.state_from_raiden(self)
-        new_state, raiden_event_list = self.wal.log_and_dispatch(state_changes)
+        new_state, events_per_state_change = self.wal.log_and_dispatch(state_changes)
+        raiden_event_list = [event for events in events_per_state_change for event in events]
+        self._archive_finished_payment_tasks(old_state, new_state)
 
         # For safety of the mediation the monitoring service must be updated
         # before the balance proof is sent. Otherwise a timing attack would be
@@ -862,21 +955,21 @@ def handle_state_changes(self, state_changes: List[StateChange]) -> List[Greenle
                 pfs_capacity_updates.add(event.canonical_identifier)
 
         for monitoring_update in monitoring_updates.values():
-            update_monitoring_service_from_balance_proof(
-                raiden=self,
-                chain_state=old_state,
-                new_balance_proof=monitoring_update.balance_proof,
-                non_closing_participant=self.address,
+            self.monitoring_request_publisher.publish(
+                chain_state=old_state, balance_proof=monitoring_update.balance_proof
             )
 
         for canonical_identifier in pfs_capacity_updates:
-            send_pfs_update(raiden=self, canonical_identifier=canonical_identifier)
+            self.pfs_update_publisher.publish(canonical_identifier=canonical_identifier)
 
         for canonical_identifier in pfs_fee_updates:
-            send_pfs_update(
-                raiden=self, canonical_identifier=canonical_identifier, update_fee_schedule=True
+            self.pfs_update_publisher.publish(
+                canonical_identifier=canonical_identifier, update_fee_schedule=True
             )
 
+        if self.route_cache is not None:
+            self._invalidate_cached_routes(state_changes, raiden_event_list, pfs_fee_updates)
+
         for state_change in state_changes:
             after_blockchain_statechange(self, state_change)
 
@@ -893,10 +986,95 @@ def handle_state_changes(self, state_changes: List[StateChange]) -> List[Greenle
         if self.state_change_qty > self.state_change_qty_snapshot + SNAPSHOT_STATE_CHANGES_COUNT:
             self.snapshot()
 
-        if self.ready_to_process_events:
-            return self.async_handle_events(chain_state=new_state, raiden_events=raiden_event_list)
-        else:
-            return list()
+        if not self.ready_to_process_events:
+            return [list() for _ in state_changes_batches]
+
+        # The events of every caller are handled by its own greenlets, all of
+        # them with the state after the whole batch
+        greenlets = list()
+        position = 0
+        for batch in state_changes_batches:
+            batch_events = events_per_state_change[position : position + len(batch)]
+            position += len(batch)
+            greenlets.append(
+                self.async_handle_events(
+                    chain_state=new_state,
+                    raiden_events=[event for events in batch_events for event in events],
+                )
+            )
+        return greenlets
+
+    def _invalidate_cached_routes(
+        self,
+        state_changes: List[StateChange],
+        raiden_events: List[RaidenEvent],
+        fee_updates: Set[CanonicalIdentifier],
+    ) -> None:
+        """ Drop the cached PFS routes which are outdated by the state changes.
+
+        The routes over which a payment failed are dropped. The deposits and
+        withdraws trigger a fee update, together with new channels they change
+        the routes the PFS would find in the token network. The transfers are
+        not considered, the cached routes are filtered by the current capacity
+        of our channels before they are used.
+        """
+        assert self.route_cache, "Route cache must be enabled."
+
+        token_networks = {
+            canonical_identifier.token_network_address for canonical_identifier in fee_updates
+        }
+        for state_change in state_changes:
+            if isinstance(state_change, ContractReceiveChannelNew):
+                token_networks.add(state_change.token_network_address)
+
+        for token_network_address in token_networks:
+            self.route_cache.invalidate_token_network(token_network_address)
+
+        for event in raiden_events:
+            if isinstance(event, EventRouteFailed):
+                self.route_cache.invalidate_route(event.token_network_address, event.route)
+
+    def _archive_finished_payment_tasks(
+        self, old_state: Optional[ChainState], new_state: ChainState
+    ) -> None:
+        """ Archive the payment tasks which were removed from the chain state.
+
+        The state machine removes a task once the payment is finished, i.e.
+        the lock was unlocked or expired. The last state of these tasks is
+        saved in the database, so that it is still available for debugging
+        while the chain state and its snapshots only hold the payments which
+        are in flight.
+
+        The tasks are serialized and written by a separate greenlet, once the
+        batch of state changes was dispatched.
+        """
+        assert self.wal, "WAL must be set."
+
+        new_tasks = new_state.payment_mapping.secrethashes_to_task
+        PAYMENT_TASKS.labels("live").set(len(new_tasks))
+
+        if old_state is None:
+            return
+
+        old_tasks = old_state.payment_mapping.secrethashes_to_task
+        finished_secrethashes = old_tasks.keys() - new_tasks.keys()
+        if finished_secrethashes:
+            if not self._unarchived_payment_tasks:
+                self.add_pending_greenlet(
+                    spawn_named("rs-archive_payment_tasks", self._write_payment_task_archive)
+                )
+
+            state_change_id = self.wal.saved_state.state_change_id
+            self._unarchived_payment_tasks.extend(
+                (state_change_id, secrethash, old_tasks[secrethash])
+                for secrethash in finished_secrethashes
+            )
+
+    def _write_payment_task_archive(self) -> None:
+        payment_tasks, self._unarchived_payment_tasks = self._unarchived_payment_tasks, list()
+        if payment_tasks and self.wal is not None:
+            self.wal.storage.write_payment_tasks(payment_tasks)
+            PAYMENT_TASKS.labels("archived").inc(len(payment_tasks))
 
     def snapshot(self) -> None:
         assert self.wal, "WAL must be set."
@@ -964,10 +1142,16 @@ def async_handle_events(
         return greenlets
 
     def _handle_events(self, chain_state: ChainState, raiden_events: List[RaidenEvent]) -> None:
+        if len(raiden_events) == 1:
+            handler = type(raiden_events[0]).__name__
+        else:
+            handler = "batch"
+
         try:
-            self.raiden_event_handler.on_raiden_events(
-                raiden=self, chain_state=chain_state, events=raiden_events
-            )
+            with EVENT_HANDLER_DURATION.labels(handler).time():
+                self.raiden_event_handler.on_raiden_events(
+                    raiden=self, chain_state=chain_state, events=raiden_events
+                )
         except RaidenRecoverableError as e:
             log.info(str(e))
         except InvalidDBData:
@@ -1379,10 +1563,8 @@ def _initialize_channel_fees(self) -> None:
                     proportional=proportional_fee,
                     imbalance_penalty=imbalance_penalty,
                 )
-                send_pfs_update(
-                    raiden=self,
-                    canonical_identifier=channel.canonical_identifier,
-                    update_fee_schedule=True,
+                self.pfs_update_publisher.publish(
+                    canonical_identifier=channel.canonical_identifier, update_fee_schedule=True
                 )
 
     def _get_initial_health_check_list(self, chain_state: ChainState) -> List[Address]:
@@ -1444,6 +1626,7 @@ def mediated_transfer_async(
         secret: Secret = None,
         secrethash: SecretHash = None,
         lock_timeout: BlockTimeout = None,
+        batch_route_cache: routing.RouteCache = None,
     ) -> PaymentStatus:
         """ Transfer `amount` between this node and `target`.
 
@@ -1454,7 +1637,11 @@ def mediated_transfer_async(
               or intermediary channels.
             - Network speed, making the transfer sufficiently fast so it doesn't
               expire.
+
+        The routes found by `batch_route_cache` are shared with the other
+        payments started with it.
         """
+        secret_generated = secret is None and secrethash is None
         if secret is None:
             if secrethash is None:
                 secret = random_secret()
@@ -1469,6 +1656,8 @@ def mediated_transfer_async(
             secret=secret,
             secrethash=secrethash,
             lock_timeout=lock_timeout,
+            batch_route_cache=batch_route_cache,
+            secret_generated=secret_generated,
         )
 
         return payment_status
@@ -1482,8 +1671,15 @@ def start_mediated_transfer_with_secret(
         secret: Secret,
         secrethash: SecretHash = None,
         lock_timeout: BlockTimeout = None,
+        batch_route_cache: routing.RouteCache = None,
+        secret_generated: bool = False,
     ) -> PaymentStatus:
+        """ Start a payment with the given `secret` or `secrethash`.
 
+        `secret_generated` must only be set if the secret was just generated
+        by the node, the on-chain registration of the secret is not checked
+        since nobody else can know it.
+        """
         if secrethash is None:
             secrethash = sha256_secrethash(secret)
         elif secret != ABSENT_SECRET:
@@ -1510,10 +1706,9 @@ def start_mediated_transfer_with_secret(
         # For this particular case, it's preferable to use `latest` instead of
         # having a specific block_hash, because it's preferable to know if the secret
         # was ever known, rather than having a consistent view of the blockchain.
-        secret_registered = self.default_secret_registry.is_secret_registered(
-            secrethash=secrethash, block_identifier=BLOCK_ID_LATEST
-        )
-        if secret_registered:
+        #
+        # A secret which was just generated by the node can't be registered.
+        if not secret_generated and self.secret_registrations.is_secret_registered(secrethash):
             raise RaidenUnrecoverableError(
                 f"Attempted to initiate a locked transfer with secrethash {to_hex(secrethash)}."
                 f" That secret is already registered onchain."
@@ -1554,6 +1749,7 @@ def start_mediated_transfer_with_secret(
             token_network_address=token_network_address,
             target_address=target,
             lock_timeout=lock_timeout,
+            batch_route_cache=batch_route_cache,
         )
 
         # FIXME: Dispatch the state change even if there are no routes to
@@ -1,21 +1,29 @@
+import time
 from heapq import heappop, heappush
 from uuid import UUID
 
 import networkx
 import structlog
 from eth_utils import to_canonical_address
+from gevent import Greenlet
+from gevent.event import Event
+from gevent.queue import Empty, Queue
 
 from raiden.exceptions import ServiceRequestFailed
 from raiden.messages.metadata import RouteMetadata
-from raiden.network.pathfinding import PFSConfig, query_paths
-from raiden.settings import INTERNAL_ROUTING_DEFAULT_FEE_PERC
+from raiden.network.pathfinding import IOULedger, PFSConfig, default_iou_ledger, query_paths
+from raiden.settings import INTERNAL_ROUTING_DEFAULT_FEE_PERC, MAX_PFS_ROUTE_CACHE_ENTRIES
 from raiden.transfer import channel, views
 from raiden.transfer.state import ChainState, ChannelState, NetworkState, RouteState
+from raiden.utils import metrics
 from raiden.utils.formatting import to_checksum_address
+from raiden.utils.gevent import spawn_named
 from raiden.utils.typing import (
+    MYPY_ANNOTATION,
     Address,
     BlockNumber,
     ChannelID,
+    Dict,
     FeeAmount,
     InitiatorAddress,
     List,
@@ -32,6 +40,30 @@
 
 log = structlog.get_logger(__name__)
 
+ROUTE_CACHE_LOOKUPS = metrics.Counter(
+    "raiden_pfs_route_cache_lookups_total",
+    "Lookups in the route caches of the node and of the payment batches, by result",
+    labelnames=("result",),
+)
+ROUTE_QUERY_DURATION = metrics.Histogram(
+    "raiden_hedged_route_query_duration_seconds",
+    "Time until a source answered a hedged route query, by source",
+    labelnames=("source",),
+)
+HEDGED_ROUTE_ANSWERS = metrics.Counter(
+    "raiden_hedged_route_answers_total",
+    "Source of the routes used for the hedged route queries",
+    labelnames=("source",),
+)
+ROUTE_CACHE_INVALIDATIONS = metrics.Counter(
+    "raiden_pfs_route_cache_invalidations_total",
+    "Routes removed from the route cache before they expired, by reason",
+    labelnames=("reason",),
+)
+
+RoutesResult = Tuple[Optional[str], List[RouteState], Optional[UUID]]
+RouteLookupKey = Tuple[TokenNetworkAddress, TargetAddress, PaymentAmount]
+
 
 def get_best_routes(
     chain_state: ChainState,
@@ -43,7 +75,9 @@ def get_best_routes(
     previous_address: Optional[Address],
     pfs_config: Optional[PFSConfig],
     privkey: PrivateKey,
-) -> Tuple[Optional[str], List[RouteState], Optional[UUID]]:
+    iou_ledger: Optional[IOULedger] = None,
+    route_cache: Optional["RouteCache"] = None,
+) -> RoutesResult:
 
     token_network = views.get_token_network_by_address(chain_state, token_network_address)
     assert token_network, "The token network must be validated and exist."
@@ -176,18 +210,40 @@ def get_best_routes(
         return (error_msg, list(), None)
 
     if pfs_config is not None and one_to_n_address is not None:
-        pfs_error_msg, pfs_routes, pfs_feedback_token = get_best_routes_pfs(
-            chain_state=chain_state,
-            token_network_address=token_network_address,
-            one_to_n_address=one_to_n_address,
-            from_address=from_address,
-            to_address=to_address,
-            amount=amount,
-            previous_address=previous_address,
-            pfs_config=pfs_config,
-            privkey=privkey,
-            pfs_wait_for_block=latest_channel_opened_at,
-        )
+        if route_cache is not None:
+            cached = route_cache.get(chain_state, token_network_address, to_address, amount)
+            if cached is not None:
+                return cached
+
+        if pfs_config.latency_budget is not None:
+            pfs_error_msg, pfs_routes, pfs_feedback_token = get_best_routes_hedged(
+                chain_state=chain_state,
+                token_network_address=token_network_address,
+                one_to_n_address=one_to_n_address,
+                from_address=from_address,
+                to_address=to_address,
+                amount=amount,
+                previous_address=previous_address,
+                pfs_config=pfs_config,
+                privkey=privkey,
+                pfs_wait_for_block=latest_channel_opened_at,
+                internal_routes=get_internal_routes(shortest_routes, amount),
+                iou_ledger=iou_ledger,
+            )
+        else:
+            pfs_error_msg, pfs_routes, pfs_feedback_token = get_best_routes_pfs(
+                chain_state=chain_state,
+                token_network_address=token_network_address,
+                one_to_n_address=one_to_n_address,
+                from_address=from_address,
+                to_address=to_address,
+                amount=amount,
+                previous_address=previous_address,
+                pfs_config=pfs_config,
+                privkey=privkey,
+                pfs_wait_for_block=latest_channel_opened_at,
+                iou_ledger=iou_ledger,
+            )
 
         if not pfs_error_msg:
             # As of version 0.5 it is possible for the PFS to return an empty
@@ -198,6 +254,10 @@ def get_best_routes(
             log.info(
                 "Received route(s) from PFS", routes=pfs_routes, feedback_token=pfs_feedback_token
             )
+            # The routes of the hedged fallbacks have no feedback token, they
+            # are not cached
+            if route_cache is not None and pfs_feedback_token is not None:
+                route_cache.put(token_network_address, to_address, amount, pfs_routes)
             return (pfs_error_msg, pfs_routes, pfs_feedback_token)
 
         log.warning(
@@ -208,28 +268,221 @@ def get_best_routes(
         return (pfs_error_msg, list(), None)
 
     else:
-        available_routes = list()
+        return (None, get_internal_routes(shortest_routes, amount), None)
 
-        while shortest_routes:
-            neighbour = heappop(shortest_routes)
 
-            # https://github.com/raiden-network/raiden/issues/4751
-            # Internal routing doesn't know how much fees the initiator will be charged,
-            # so it should set a percentage on top of the original amount
-            # for the whole route.
-            estimated_fee = FeeAmount(round(INTERNAL_ROUTING_DEFAULT_FEE_PERC * amount))
-            if neighbour.length == 1:  # Target is our direct neighbour, pay no fees.
-                estimated_fee = FeeAmount(0)
+def get_internal_routes(
+    shortest_routes: List["Neighbour"], amount: PaymentAmount
+) -> List[RouteState]:
+    """ Return the routes found in the node's network graph, shortest first. """
+    available_routes = list()
+
+    shortest_routes = list(shortest_routes)
+    while shortest_routes:
+        neighbour = heappop(shortest_routes)
+
+        # https://github.com/raiden-network/raiden/issues/4751
+        # Internal routing doesn't know how much fees the initiator will be charged,
+        # so it should set a percentage on top of the original amount
+        # for the whole route.
+        estimated_fee = FeeAmount(round(INTERNAL_ROUTING_DEFAULT_FEE_PERC * amount))
+        if neighbour.length == 1:  # Target is our direct neighbour, pay no fees.
+            estimated_fee = FeeAmount(0)
+
+        available_routes.append(
+            RouteState(
+                route=neighbour.route,
+                forward_channel_id=neighbour.channelid,
+                estimated_fee=estimated_fee,
+            )
+        )
 
-            available_routes.append(
-                RouteState(
-                    route=neighbour.route,
-                    forward_channel_id=neighbour.channelid,
-                    estimated_fee=estimated_fee,
-                )
+    return available_routes
+
+
+class CachedRoutes(NamedTuple):
+    routes: List[RouteState]
+    expires_at: Optional[float]
+
+
+class RouteCache:
+    """ Keeps the routes found for the repeated payments to a target.
+
+    The routes are shared by the payments in the same token network to the
+    same target with the same amount, the fees estimated by the PFS depend on
+    the amount. Only the payment which did the lookup gets the feedback token
+    of the PFS, the payments which reuse the routes get none. An entry is
+    dropped:
+
+    - Once it is older than `ttl` seconds, if a `ttl` is given.
+    - When a payment over one of its routes failed.
+    - When none of its routes can be used with the current capacity of our
+      channels.
+    - When our channels in the token network got more capacity, the PFS may
+      find better routes.
+
+    The node's cache is filled by `get_best_routes` with the routes of the
+    PFS. A batch of payments has its own cache without `ttl`, which is filled
+    with all the routes found for its payments, see `RouteCache.get_best_routes`.
+    """
+
+    def __init__(
+        self, ttl: Optional[float] = None, max_entries: int = MAX_PFS_ROUTE_CACHE_ENTRIES
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[RouteLookupKey, CachedRoutes] = dict()
+        self._lookups: Dict[RouteLookupKey, Event] = dict()
+
+    def get(
+        self,
+        chain_state: ChainState,
+        token_network_address: TokenNetworkAddress,
+        to_address: TargetAddress,
+        amount: PaymentAmount,
+    ) -> Optional[RoutesResult]:
+        key = (token_network_address, to_address, amount)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            ROUTE_CACHE_LOOKUPS.labels("miss").inc()
+            return None
+
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            ROUTE_CACHE_LOOKUPS.labels("expired").inc()
+            return None
+
+        usable_routes = filter_usable_routes(
+            chain_state, token_network_address, entry.routes, amount
+        )
+        if not usable_routes:
+            del self._entries[key]
+            ROUTE_CACHE_INVALIDATIONS.labels("capacity").inc()
+            ROUTE_CACHE_LOOKUPS.labels("miss").inc()
+            return None
+
+        ROUTE_CACHE_LOOKUPS.labels("hit").inc()
+        return None, usable_routes, None
+
+    def put(
+        self,
+        token_network_address: TokenNetworkAddress,
+        to_address: TargetAddress,
+        amount: PaymentAmount,
+        routes: List[RouteState],
+    ) -> None:
+        key = (token_network_address, to_address, amount)
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_entries:
+            # The dictionary is in insertion order, drop the oldest entry
+            del self._entries[next(iter(self._entries))]
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = CachedRoutes(routes=routes, expires_at=expires_at)
+
+    def get_best_routes(
+        self,
+        chain_state: ChainState,
+        token_network_address: TokenNetworkAddress,
+        one_to_n_address: Optional[OneToNAddress],
+        from_address: InitiatorAddress,
+        to_address: TargetAddress,
+        amount: PaymentAmount,
+        previous_address: Optional[Address],
+        pfs_config: Optional[PFSConfig],
+        privkey: PrivateKey,
+        iou_ledger: Optional[IOULedger] = None,
+        route_cache: Optional["RouteCache"] = None,
+    ) -> RoutesResult:
+        """ `get_best_routes` which reuses the routes of this cache.
+
+        This is used for the payments of a batch, which are started
+        concurrently. A payment waits for a lookup with the same key which is
+        in flight instead of querying the PFS again. Lookups which found no
+        route are not kept.
+        """
+        key = (token_network_address, to_address, amount)
+        while True:
+            cached = self.get(chain_state, token_network_address, to_address, amount)
+            if cached is not None:
+                return cached
+
+            lookup = self._lookups.get(key)
+            if lookup is None:
+                break
+            lookup.wait()
+
+        lookup = Event()
+        self._lookups[key] = lookup
+        try:
+            result = get_best_routes(
+                chain_state=chain_state,
+                token_network_address=token_network_address,
+                one_to_n_address=one_to_n_address,
+                from_address=from_address,
+                to_address=to_address,
+                amount=amount,
+                previous_address=previous_address,
+                pfs_config=pfs_config,
+                privkey=privkey,
+                iou_ledger=iou_ledger,
+                route_cache=route_cache,
             )
+            error_msg, routes, _ = result
+            if error_msg is None and routes:
+                self.put(token_network_address, to_address, amount, routes)
+            return result
+        finally:
+            del self._lookups[key]
+            lookup.set()
+
+    def invalidate_route(
+        self, token_network_address: TokenNetworkAddress, route: List[Address]
+    ) -> None:
+        """ Drop the entries with `route`, a payment over it failed. """
+        failed_route = list(route)
+        for key, entry in list(self._entries.items()):
+            if key[0] == token_network_address and any(
+                route_state.route == failed_route for route_state in entry.routes
+            ):
+                del self._entries[key]
+                ROUTE_CACHE_INVALIDATIONS.labels("route_failed").inc()
+
+    def invalidate_token_network(self, token_network_address: TokenNetworkAddress) -> None:
+        """ Drop the entries of the token network, the capacity of our channels changed. """
+        for key in list(self._entries):
+            if key[0] == token_network_address:
+                del self._entries[key]
+                ROUTE_CACHE_INVALIDATIONS.labels("capacity").inc()
+
+
+def filter_usable_routes(
+    chain_state: ChainState,
+    token_network_address: TokenNetworkAddress,
+    routes: List[RouteState],
+    amount: PaymentAmount,
+) -> List[RouteState]:
+    """ Return the routes for which our channel can still be used to pay `amount`. """
+    token_network = views.get_token_network_by_address(chain_state, token_network_address)
+    if token_network is None:
+        return list()
 
-        return (None, available_routes, None)
+    usable_routes = list()
+    for route_state in routes:
+        channel_state = token_network.channelidentifiers_to_channels.get(
+            route_state.forward_channel_id
+        )
+        if channel_state is None:
+            continue
+
+        is_usable = channel.is_channel_usable_for_new_transfer(
+            channel_state, PaymentWithFeeAmount(amount + route_state.estimated_fee), None
+        )
+        if is_usable is channel.ChannelUsability.USABLE:
+            usable_routes.append(route_state)
+
+    return usable_routes
 
 
 class Neighbour(NamedTuple):
@@ -251,7 +504,8 @@ def get_best_routes_pfs(
     pfs_config: PFSConfig,
     privkey: PrivateKey,
     pfs_wait_for_block: BlockNumber,
-) -> Tuple[Optional[str], List[RouteState], Optional[UUID]]:
+    iou_ledger: Optional[IOULedger] = None,
+) -> RoutesResult:
     try:
         pfs_routes, feedback_token = query_paths(
             pfs_config=pfs_config,
@@ -265,6 +519,7 @@ def get_best_routes_pfs(
             route_to=to_address,
             value=amount,
             pfs_wait_for_block=pfs_wait_for_block,
+            iou_ledger=iou_ledger,
         )
     except ServiceRequestFailed as e:
         log_message = ("PFS: " + e.args[0]) if e.args[0] else None
@@ -316,6 +571,120 @@ def get_best_routes_pfs(
     return None, paths, feedback_token
 
 
+def get_best_routes_hedged(
+    chain_state: ChainState,
+    token_network_address: TokenNetworkAddress,
+    one_to_n_address: OneToNAddress,
+    from_address: InitiatorAddress,
+    to_address: TargetAddress,
+    amount: PaymentAmount,
+    previous_address: Optional[Address],
+    pfs_config: PFSConfig,
+    privkey: PrivateKey,
+    pfs_wait_for_block: BlockNumber,
+    internal_routes: List[RouteState],
+    iou_ledger: Optional[IOULedger] = None,
+) -> RoutesResult:
+    """ Query the PFSs concurrently and return the first answer.
+
+    The primary PFS is queried right away, the secondary one once the
+    primary failed or didn't answer within `hedging_delay` seconds. Every
+    query costs an IOU, so the secondary PFS is not queried when the primary
+    is fast. If no PFS answered within `latency_budget` seconds, or all of
+    them failed, the `internal_routes` found in the node's network graph are
+    returned. The queries still in flight are killed.
+
+    The routes of the secondary PFS are returned without feedback token, the
+    feedback is only sent to the primary PFS.
+    """
+    assert pfs_config.latency_budget is not None, "Hedged routing must be enabled."
+
+    ledger = iou_ledger if iou_ledger is not None else default_iou_ledger
+    start = time.monotonic()
+    deadline = start + pfs_config.latency_budget
+    answers: Queue = Queue()
+
+    def query(source: str, source_config: PFSConfig) -> None:
+        try:
+            result = get_best_routes_pfs(
+                chain_state=chain_state,
+                token_network_address=token_network_address,
+                one_to_n_address=one_to_n_address,
+                from_address=from_address,
+                to_address=to_address,
+                amount=amount,
+                previous_address=previous_address,
+                pfs_config=source_config,
+                privkey=privkey,
+                pfs_wait_for_block=pfs_wait_for_block,
+                iou_ledger=ledger,
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            # A failing PFS is like one which found no route, the other one
+            # may still answer
+            log.warning("Pathfinding Service request failed", source=source, exc_info=True)
+            # It is unknown whether the PFS accepted the IOU
+            ledger.invalidate(source_config, token_network_address, chain_state.our_address)
+            answers.put((source, (f"Pathfinding Service request failed: {e}", list(), None)))
+        else:
+            ROUTE_QUERY_DURATION.labels(source).observe(time.monotonic() - start)
+            answers.put((source, result))
+
+    queries: Dict[str, Tuple[Greenlet, PFSConfig]] = dict()
+
+    def start_query(source: str, source_config: PFSConfig) -> None:
+        greenlet = spawn_named(f"hedged_route_query:{source}", query, source, source_config)
+        queries[source] = (greenlet, source_config)
+
+    start_query("primary", pfs_config)
+    secondary_at = start + pfs_config.hedging_delay
+    error_msg: Optional[str] = None
+
+    try:
+        while True:
+            can_hedge = pfs_config.secondary is not None and "secondary" not in queries
+            all_failed = answers.qsize() == 0 and all(
+                greenlet.ready() for greenlet, _ in queries.values()
+            )
+            if all_failed and not can_hedge:
+                break
+
+            wait_until = min(deadline, secondary_at) if can_hedge else deadline
+            try:
+                source, answer = answers.get(timeout=max(0.0, wait_until - time.monotonic()))
+            except Empty:
+                if not can_hedge or time.monotonic() >= deadline:
+                    break
+                assert pfs_config.secondary is not None, MYPY_ANNOTATION
+                start_query("secondary", pfs_config.secondary)
+                continue
+
+            error_msg, routes, feedback_token = answer
+            if error_msg is None:
+                HEDGED_ROUTE_ANSWERS.labels(source).inc()
+                if source != "primary":
+                    feedback_token = None
+                return None, routes, feedback_token
+
+            log.info("Pathfinding Service failed", source=source, error_msg=error_msg)
+            if pfs_config.secondary is not None and "secondary" not in queries:
+                start_query("secondary", pfs_config.secondary)
+    finally:
+        for greenlet, source_config in queries.values():
+            if not greenlet.ready():
+                greenlet.kill()
+                # It is unknown whether the PFS accepted the IOU
+                ledger.invalidate(source_config, token_network_address, chain_state.our_address)
+
+    if internal_routes:
+        log.info("No Pathfinding Service answered in time, using internal routing")
+        HEDGED_ROUTE_ANSWERS.labels("internal").inc()
+        return None, internal_routes, None
+
+    HEDGED_ROUTE_ANSWERS.labels("none").inc()
+    return error_msg or "No Pathfinding Service answered in time", list(), None
+
+
 def resolve_routes(
     routes: List[RouteMetadata],
     token_network_address: TokenNetworkAddress,
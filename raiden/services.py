@@ -1,4 +1,10 @@
+import time
+
+import gevent
 import structlog
+from gevent import Greenlet
+from gevent.event import AsyncResult
+from web3.types import BlockData
 
 from raiden import constants
 from raiden.constants import BLOCK_ID_LATEST, RoutingMode
@@ -11,7 +17,17 @@
 from raiden.transfer.state import ChainState
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.transfers import to_rdn
-from raiden.utils.typing import TYPE_CHECKING, Address
+from raiden.utils.typing import (
+    TYPE_CHECKING,
+    Address,
+    Balance,
+    BlockNumber,
+    Dict,
+    Optional,
+    SecretHash,
+    Set,
+    Tuple,
+)
 
 if TYPE_CHECKING:
     from raiden.raiden_service import RaidenService
@@ -24,16 +40,19 @@ def send_pfs_update(
     raiden: "RaidenService",
     canonical_identifier: CanonicalIdentifier,
     update_fee_schedule: bool = False,
-) -> None:
+) -> bool:
+    """ Sends the current capacity, and optionally the fee schedule, of the
+    channel to the PFS. Returns whether the update was sent.
+    """
     if raiden.routing_mode == RoutingMode.PRIVATE:
-        return
+        return False
 
     channel_state = views.get_channelstate_by_canonical_identifier(
         chain_state=views.state_from_raiden(raiden), canonical_identifier=canonical_identifier
     )
 
     if channel_state is None:
-        return
+        return False
 
     capacity_msg = PFSCapacityUpdate.from_channel_state(channel_state)
     capacity_msg.sign(raiden.signer)
@@ -57,6 +76,252 @@ def send_pfs_update(
             channel_state=channel_state,
         )
 
+    return True
+
+
+class PFSUpdatePublisher:
+    """ Coalesces and rate limits the capacity and fee updates sent to the PFS.
+
+    Every dispatched batch of state changes may require an update for the
+    affected channels, a busy channel would produce dozens of updates per
+    second. Instead of sending each one, the publisher waits for `window`
+    seconds after the first request for a channel, and then sends a single
+    update built from the channel state at that time, so the latest capacity is
+    always the one published. Additionally, updates for the same channel are
+    sent at most once every `min_interval` seconds.
+    """
+
+    def __init__(self, raiden: "RaidenService", window: float, min_interval: float) -> None:
+        self.raiden = raiden
+        self.window = window
+        self.min_interval = min_interval
+
+        # Channels with an update waiting to be sent, the value is whether the
+        # fee schedule must be sent too
+        self._pending: Dict[CanonicalIdentifier, bool] = dict()
+        self._timers: Dict[CanonicalIdentifier, Greenlet] = dict()
+        self._last_sent: Dict[CanonicalIdentifier, float] = dict()
+
+        self.requested_updates = 0
+        self.suppressed_updates = 0
+        self.sent_capacity_updates = 0
+        self.sent_fee_updates = 0
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return {
+            "requested": self.requested_updates,
+            "suppressed": self.suppressed_updates,
+            "sent_capacity": self.sent_capacity_updates,
+            "sent_fee": self.sent_fee_updates,
+        }
+
+    def publish(
+        self, canonical_identifier: CanonicalIdentifier, update_fee_schedule: bool = False
+    ) -> None:
+        """ Request an update for the given channel. """
+        if self.raiden.routing_mode == RoutingMode.PRIVATE:
+            return
+
+        self.requested_updates += 1
+
+        if canonical_identifier in self._pending:
+            self.suppressed_updates += 1
+            self._pending[canonical_identifier] |= update_fee_schedule
+            return
+
+        self._pending[canonical_identifier] = update_fee_schedule
+
+        delay = self.window
+        last_sent = self._last_sent.get(canonical_identifier)
+        if last_sent is not None:
+            delay = max(delay, last_sent + self.min_interval - time.monotonic())
+
+        if delay <= 0:
+            self._send(canonical_identifier)
+        else:
+            timer = gevent.spawn_later(delay, self._send, canonical_identifier)
+            timer.name = f"PFSUpdatePublisher channel:{canonical_identifier.channel_identifier}"
+            self._timers[canonical_identifier] = timer
+            self.raiden.add_pending_greenlet(timer)
+
+    def flush(self) -> None:
+        """ Send all the pending updates immediately. """
+        for timer in list(self._timers.values()):
+            timer.kill()
+
+        for canonical_identifier in list(self._pending):
+            self._send(canonical_identifier)
+
+    def _send(self, canonical_identifier: CanonicalIdentifier) -> None:
+        self._timers.pop(canonical_identifier, None)
+        update_fee_schedule = self._pending.pop(canonical_identifier, None)
+        if update_fee_schedule is None:
+            return
+
+        self._last_sent[canonical_identifier] = time.monotonic()
+        sent = send_pfs_update(
+            raiden=self.raiden,
+            canonical_identifier=canonical_identifier,
+            update_fee_schedule=update_fee_schedule,
+        )
+        if sent:
+            self.sent_capacity_updates += 1
+            if update_fee_schedule:
+                self.sent_fee_updates += 1
+        else:
+            # The channel is gone, there is nothing to rate limit
+            self._last_sent.pop(canonical_identifier, None)
+
+
+class UserDepositBalanceCache:
+    """ Tracks the effective balance of the node in the UserDeposit contract.
+
+    The balance is checked before every monitoring request, querying the
+    contract each time would add a blocking `eth_call` to the processing of
+    every balance proof. Instead the balance is refreshed once per block by
+    the alarm task, and it is queried on demand only if no block was seen
+    yet.
+    """
+
+    def __init__(self, raiden: "RaidenService") -> None:
+        self.raiden = raiden
+        self.balance: Optional[Balance] = None
+        self.block_number: Optional[BlockNumber] = None
+
+    def on_new_block(self, latest_block: BlockData) -> None:
+        """ AlarmTask callback, refreshes the balance for the new block. """
+        if self.raiden.user_deposit is None:
+            return
+
+        block_number = BlockNumber(latest_block["number"])
+        if block_number == self.block_number:
+            return
+
+        self.balance = self.raiden.user_deposit.effective_balance(
+            self.raiden.address, latest_block["hash"]
+        )
+        self.block_number = block_number
+
+    def effective_balance(self) -> Balance:
+        if self.balance is None:
+            msg = "Monitoring is enabled but the `UserDeposit` contract is None."
+            assert self.raiden.user_deposit is not None, msg
+            self.balance = self.raiden.user_deposit.effective_balance(
+                self.raiden.address, BLOCK_ID_LATEST
+            )
+
+        return self.balance
+
+
+class SecretRegistrationCache:
+    """ Tracks which secrets are registered in the SecretRegistry contract.
+
+    A payment must not be started with a secret which is registered, since
+    someone else knows it. Checking the contract for every payment adds a
+    blocking `eth_call` to the payment initiation. Instead:
+
+    - The registered secrets are learned from the `ContractReceiveSecretReveal`
+      state changes and never forgotten, a registration which was forked away
+      still means that the secret is known.
+    - The secrethashes which are not registered are cached until the alarm
+      task sees a new block. The lookup is done against `latest`, so the
+      answer is at least as recent as the block it is cached for.
+    - Concurrent lookups of the same secrethash share a single `eth_call`.
+    """
+
+    def __init__(self, raiden: "RaidenService") -> None:
+        self.raiden = raiden
+        self.registered: Set[SecretHash] = set()
+        self.block_number: Optional[BlockNumber] = None
+        # The lookups done since the last block
+        self._lookups: Dict[SecretHash, AsyncResult] = dict()
+
+    def on_new_block(self, latest_block: BlockData) -> None:
+        """ AlarmTask callback, forgets the lookups done for the previous block. """
+        block_number = BlockNumber(latest_block["number"])
+        if block_number != self.block_number:
+            self.block_number = block_number
+            self._lookups = dict()
+
+    def on_secret_registered(self, secrethash: SecretHash) -> None:
+        self.registered.add(secrethash)
+
+    def is_secret_registered(self, secrethash: SecretHash) -> bool:
+        if secrethash in self.registered:
+            return True
+
+        lookups = self._lookups
+        lookup = lookups.get(secrethash)
+        if lookup is None:
+            lookup = AsyncResult()
+            lookups[secrethash] = lookup
+            try:
+                registered = self.raiden.default_secret_registry.is_secret_registered(
+                    secrethash=secrethash, block_identifier=BLOCK_ID_LATEST
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                # Don't cache the failure, the next caller does a new lookup
+                del lookups[secrethash]
+                lookup.set_exception(e)
+                raise
+            lookup.set(registered)
+
+            # Without blocks from the alarm task there is nothing which would
+            # invalidate the answer
+            if self.block_number is None:
+                del lookups[secrethash]
+
+        registered = lookup.get()
+        if registered:
+            self.registered.add(secrethash)
+        return registered
+
+
+class MonitoringRequestPublisher:
+    """ Sends the monitoring requests outside of the state change processing.
+
+    Creating and signing the requests is deferred to a separate greenlet, so
+    the messages produced by the state changes are sent first. Balance proofs
+    received for a channel before its request is sent replace the previous
+    ones, only the latest is sent to the monitoring service.
+    """
+
+    def __init__(self, raiden: "RaidenService") -> None:
+        self.raiden = raiden
+        self._pending: Dict[CanonicalIdentifier, Tuple[ChainState, BalanceProofSignedState]] = {}
+        self._greenlet: Optional[Greenlet] = None
+
+    def publish(self, chain_state: ChainState, balance_proof: BalanceProofSignedState) -> None:
+        if self.raiden.config.services.monitoring_enabled is False:
+            return
+
+        self._pending[balance_proof.canonical_identifier] = (chain_state, balance_proof)
+
+        if self._greenlet is None:
+            self._greenlet = gevent.spawn(self._send_pending)
+            self._greenlet.name = "MonitoringRequestPublisher"
+            self.raiden.add_pending_greenlet(self._greenlet)
+
+    def flush(self) -> None:
+        """ Send all the pending requests immediately. """
+        self._send_pending()
+
+    def _send_pending(self) -> None:
+        # Balance proofs published while a request is broadcast are picked up
+        # by this loop, the greenlet is only cleared once it is done.
+        while self._pending:
+            canonical_identifier = next(iter(self._pending))
+            chain_state, balance_proof = self._pending.pop(canonical_identifier)
+            update_monitoring_service_from_balance_proof(
+                raiden=self.raiden,
+                chain_state=chain_state,
+                new_balance_proof=balance_proof,
+                non_closing_participant=self.raiden.address,
+            )
+
+        self._greenlet = None
+
 
 def update_monitoring_service_from_balance_proof(
     raiden: "RaidenService",
@@ -81,9 +346,7 @@ def update_monitoring_service_from_balance_proof(
     )
     assert channel_state, msg
 
-    msg = "Monitoring is enabled but the `UserDeposit` contract is None."
-    assert raiden.user_deposit is not None, msg
-    rei_balance = raiden.user_deposit.effective_balance(raiden.address, BLOCK_ID_LATEST)
+    rei_balance = raiden.user_deposit_balance.effective_balance()
     if rei_balance < MONITORING_REWARD:
         rdn_balance = to_rdn(rei_balance)
         rdn_reward = to_rdn(MONITORING_REWARD)
@@ -42,6 +42,9 @@
 # - Network latency
 # - The Raiden node might not be able to process the messages immediately
 DEFAULT_TRANSPORT_MATRIX_SYNC_LATENCY = 15_000
+# Received batches with fewer messages are verified on the main thread, sending
+# them to the worker processes costs more than it gains.
+DEFAULT_TRANSPORT_MATRIX_SIGNATURE_RECOVERY_MIN_BATCH = 32
 DEFAULT_MATRIX_KNOWN_SERVERS = {
     # FIXME, XXX: Change to new mainet known servers file after mainnet testing is done!
     Environment.PRODUCTION: (
@@ -70,11 +73,39 @@
 
 DEFAULT_SHUTDOWN_TIMEOUT = 2
 
+# Upper bound in seconds for the dispatch of a batch of state changes, the
+# state changes queued by concurrent greenlets are dispatched together as long
+# as the batch is estimated to take less than this.
+STATE_CHANGE_DISPATCH_LATENCY_BUDGET = 0.05
+
+# Number of payments of a batch started through the API which are in flight at
+# the same time
+DEFAULT_PAYMENT_BATCH_CONCURRENCY = 20
+MAX_PAYMENT_BATCH_CONCURRENCY = 500
+MAX_PAYMENT_BATCH_SIZE = 10_000
+
+# Number of channels opened by a single request to the API, the transactions of
+# all of them are sent without waiting for each other to be mined
+MAX_CHANNEL_BATCH_SIZE = 500
+
 DEFAULT_PATHFINDING_MAX_PATHS = 3
 DEFAULT_PATHFINDING_MAX_FEE = TokenAmount(5 * 10 ** 16)  # about .01$
 # PFS has 200 000 blocks (~40days) to cash in
 DEFAULT_PATHFINDING_IOU_TIMEOUT = BlockTimeout(2 * 10 ** 5)
 
+# Updates for the same channel requested within the window are sent together,
+# and at most one update per channel is sent within the interval
+DEFAULT_PFS_UPDATE_WINDOW = 0.5
+DEFAULT_PFS_UPDATE_MIN_INTERVAL = 2.0
+
+# Seconds for which the routes found by the PFS are reused for the payments to
+# the same target, `0` disables the cache
+DEFAULT_PATHFINDING_ROUTE_CACHE_TTL = 0.0
+MAX_PFS_ROUTE_CACHE_ENTRIES = 10_000
+# With hedged routing the secondary PFS is queried once the primary one didn't
+# answer for this many seconds
+DEFAULT_PATHFINDING_HEDGING_DELAY = 0.5
+
 DEFAULT_MEDIATION_FLAT_FEE = FeeAmount(0)
 DEFAULT_MEDIATION_PROPORTIONAL_FEE = ProportionalFeeAmount(4000)  # 0.4% in parts per million
 DEFAULT_MEDIATION_PROPORTIONAL_IMBALANCE_FEE = ProportionalFeeAmount(
@@ -136,6 +167,10 @@ class MatrixTransportConfig:
     available_servers: List[str]
     sync_timeout: int = DEFAULT_TRANSPORT_MATRIX_SYNC_TIMEOUT
     sync_latency: int = DEFAULT_TRANSPORT_MATRIX_SYNC_LATENCY
+    # Number of worker processes recovering the signers of received messages,
+    # with `0` they are recovered in the node's process.
+    signature_recovery_processes: int = 0
+    signature_recovery_min_batch: int = DEFAULT_TRANSPORT_MATRIX_SIGNATURE_RECOVERY_MIN_BATCH
 
 
 @dataclass
@@ -144,6 +179,13 @@ class ServiceConfig:
     pathfinding_max_paths: int = DEFAULT_PATHFINDING_MAX_PATHS
     pathfinding_max_fee: TokenAmount = DEFAULT_PATHFINDING_MAX_FEE
     pathfinding_iou_timeout: BlockTimeout = DEFAULT_PATHFINDING_IOU_TIMEOUT
+    pathfinding_route_cache_ttl: float = DEFAULT_PATHFINDING_ROUTE_CACHE_TTL
+    # Hedged routing is enabled by the latency budget
+    pathfinding_latency_budget: Optional[float] = None
+    pathfinding_hedging_delay: float = DEFAULT_PATHFINDING_HEDGING_DELAY
+    pathfinding_secondary_service_address: Optional[str] = None
+    pfs_update_window: float = DEFAULT_PFS_UPDATE_WINDOW
+    pfs_update_min_interval: float = DEFAULT_PFS_UPDATE_MIN_INTERVAL
     monitoring_enabled: bool = False
 
 
@@ -0,0 +1,426 @@
+""" Compiled fast paths for the dataclass serializers.
+
+The schemas generated by ``marshmallow_dataclass`` are generic, every value goes
+through several layers of indirection (hooks, field lookups, error
+accumulation), and loading requires a defensive copy of the input because the
+type hooks mutate it. This is expensive for the state changes and events which
+are written to the WAL for every message and read back on every restore.
+
+This module compiles, once per dataclass, a flat list of converters from the
+fields of the schema, which are themselves derived from the type annotations.
+The conversions for the common field types (integers encoded as strings, hex
+encoded bytes and addresses, plain types, nested dataclasses, lists, tuples,
+dicts and the polymorphic fields) are inlined, everything else is delegated to
+the marshmallow field. The result is identical to the result of the schema.
+
+The fast path only handles well formed data, whenever a value does not have
+the exact shape it expects ``FallbackToSchema`` is raised and the caller must
+use the schema, which is also responsible for producing the validation errors.
+"""
+import dataclasses
+
+import marshmallow
+from eth_utils import to_bytes, to_canonical_address, to_hex
+from marshmallow import ValidationError
+
+from raiden.storage.serialization.cache import SchemaCache
+from raiden.storage.serialization.fields import (
+    AddressField,
+    BytesField,
+    CallablePolyField,
+    IntegerToStringField,
+    OptionalIntegerToStringField,
+)
+from raiden.utils.formatting import to_hex_address
+from raiden.utils.typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Only the dataclasses from these packages are serialized with the compiled
+# fast path, everything else (e.g. classes defined by the tests) uses the
+# schema. Nested dataclasses are always compiled.
+FAST_PATH_MODULES = ("raiden.transfer.", "raiden.messages.")
+
+TYPE_KEY = "_type"
+
+INTEGER_FIELDS = (marshmallow.fields.Integer, IntegerToStringField, OptionalIntegerToStringField)
+
+Dumper = Callable[[Any], Any]
+Loader = Callable[[Any, Any], Any]
+
+NoneType = type(None)
+
+# Errors which can be raised by the converters for malformed values or the
+# constructors of the dataclasses. All of these are handled by using the
+# schema instead.
+CONVERSION_ERRORS = (AttributeError, KeyError, TypeError, ValueError, ValidationError)
+
+
+class FallbackToSchema(Exception):
+    """ The value can not be (de)serialized by the fast path, the marshmallow
+    schema must be used instead.
+    """
+
+
+class UnsupportedField(Exception):
+    """ Raised while compiling a dataclass that has a field without a fast
+    path and that can not be safely delegated to marshmallow.
+    """
+
+
+def _unwrap_optional(hint: Any) -> Any:
+    args = getattr(hint, "__args__", None)
+    if args and len(args) == 2 and NoneType in args:
+        return next(arg for arg in args if arg is not NoneType)
+    return hint
+
+
+def _type_arguments(hint: Any, count: int) -> Tuple[Any, ...]:
+    """ Returns the type arguments of a generic alias, or ``None`` for each of
+    the `count` arguments if they are unknown.
+    """
+    args = getattr(_unwrap_optional(hint), "__args__", None)
+    if args is None or len(args) != count:
+        return (None,) * count
+    return args
+
+
+def _load_none(allow_none: bool) -> None:
+    if allow_none:
+        return None
+    raise FallbackToSchema()
+
+
+def _compile_integer(field: marshmallow.fields.Integer) -> Tuple[Dumper, Loader]:
+    allow_none = field.allow_none
+
+    if field.as_string:
+
+        def dump(value: Any) -> Any:
+            return None if value is None else str(int(value))
+
+    else:
+
+        def dump(value: Any) -> Any:
+            return None if value is None else int(value)
+
+    def load(value: Any, data: Any) -> Any:  # pylint: disable=unused-argument
+        value_type = value.__class__
+        # Booleans are rejected by marshmallow, so they must not be passed to
+        # `int`
+        if value_type is str or value_type is int:
+            return int(value)
+        if value is None:
+            return _load_none(allow_none)
+        raise FallbackToSchema()
+
+    return dump, load
+
+
+def _compile_exact(field: marshmallow.fields.Field, type_: type) -> Tuple[Dumper, Loader]:
+    """ Fast path for fields which don't need a conversion if the value already
+    has the expected type.
+    """
+    allow_none = field.allow_none
+
+    def dump(value: Any) -> Any:
+        if value.__class__ is type_ or value is None:
+            return value
+        raise FallbackToSchema()
+
+    def load(value: Any, data: Any) -> Any:  # pylint: disable=unused-argument
+        if value.__class__ is type_:
+            return value
+        if value is None:
+            return _load_none(allow_none)
+        raise FallbackToSchema()
+
+    return dump, load
+
+
+def _compile_hex(
+    field: marshmallow.fields.Field, encode: Callable, decode: Callable
+) -> Tuple[Dumper, Loader]:
+    allow_none = field.allow_none
+
+    def load(value: Any, data: Any) -> Any:  # pylint: disable=unused-argument
+        if value.__class__ is str:
+            return decode(value)
+        if value is None:
+            return _load_none(allow_none)
+        raise FallbackToSchema()
+
+    return encode, load
+
+
+def _dump_bytes(value: Optional[bytes]) -> Optional[str]:
+    return None if value is None else to_hex(value)
+
+
+def _load_bytes(value: str) -> bytes:
+    return to_bytes(hexstr=value)
+
+
+def _compile_nested(field: marshmallow.fields.Nested, hint: Any) -> Tuple[Dumper, Loader]:
+    klass = _unwrap_optional(hint)
+    if not (isinstance(klass, type) and dataclasses.is_dataclass(klass)):
+        raise UnsupportedField(f"Unknown type for nested field {field}")
+    if field.many or field.only or field.exclude:
+        raise UnsupportedField(f"Nested field {field} is not a single dataclass")
+
+    allow_none = field.allow_none
+
+    def dump(value: Any) -> Any:
+        if value is None:
+            return None
+        if value.__class__ is not klass:
+            raise FallbackToSchema()
+        return compile_dataclass(klass).dump_fields(value)
+
+    def load(value: Any, data: Any) -> Any:  # pylint: disable=unused-argument
+        if value.__class__ is dict:
+            return compile_dataclass(klass).load_fields(value, has_type=False)
+        if value is None:
+            return _load_none(allow_none)
+        raise FallbackToSchema()
+
+    return dump, load
+
+
+def _compile_polymorphic(field: CallablePolyField) -> Tuple[Dumper, Loader]:
+    if field.many:
+        raise UnsupportedField(f"Polymorphic field {field} with many values")
+
+    allow_none = field.allow_none
+
+    def dump(value: Any) -> Any:
+        if value is None:
+            return None
+        return compile_dataclass(value.__class__).dump(value)
+
+    def load(value: Any, data: Any) -> Any:  # pylint: disable=unused-argument
+        if value.__class__ is dict:
+            klass = field.class_from_type_name(value[TYPE_KEY])
+            return compile_dataclass(klass).load_fields(value, has_type=True)
+        if value is None:
+            return _load_none(allow_none)
+        raise FallbackToSchema()
+
+    return dump, load
+
+
+def _compile_list(field: marshmallow.fields.List, hint: Any) -> Tuple[Dumper, Loader]:
+    (item_hint,) = _type_arguments(hint, 1)
+    dump_item, load_item = _compile_field(field.inner, item_hint)
+    allow_none = field.allow_none
+
+    def dump(value: Any) -> Any:
+        if value is None:
+            return None
+        return [dump_item(item) for item in value]
+
+    def load(value: Any, data: Any) -> Any:  # pylint: disable=unused-argument
+        if value.__class__ is list:
+            return [load_item(item, None) for item in value]
+        if value is None:
+            return _load_none(allow_none)
+        raise FallbackToSchema()
+
+    return dump, load
+
+
+def _compile_tuple(field: marshmallow.fields.Tuple, hint: Any) -> Tuple[Dumper, Loader]:
+    item_hints = _type_arguments(hint, len(field.tuple_fields))
+    converters = [
+        _compile_field(item_field, item_hint)
+        for item_field, item_hint in zip(field.tuple_fields, item_hints)
+    ]
+    dumpers = [dump_item for dump_item, _ in converters]
+    loaders = [load_item for _, load_item in converters]
+    length = len(converters)
+    allow_none = field.allow_none
+
+    def dump(value: Any) -> Any:
+        if value is None:
+            return None
+        return tuple(dump_item(item) for dump_item, item in zip(dumpers, value))
+
+    def load(value: Any, data: Any) -> Any:  # pylint: disable=unused-argument
+        if value.__class__ is list and len(value) == length:
+            return tuple(load_item(item, None) for load_item, item in zip(loaders, value))
+        if value is None:
+            return _load_none(allow_none)
+        raise FallbackToSchema()
+
+    return dump, load
+
+
+def _compile_dict(field: marshmallow.fields.Dict, hint: Any) -> Tuple[Dumper, Loader]:
+    if field.key_field is None or field.value_field is None:
+        return _compile_generic(field, None)
+
+    key_hint, value_hint = _type_arguments(hint, 2)
+    dump_key, load_key = _compile_field(field.key_field, key_hint)
+    dump_value, load_value = _compile_field(field.value_field, value_hint)
+    allow_none = field.allow_none
+
+    def dump(value: Any) -> Any:
+        if value is None:
+            return None
+        return {dump_key(key): dump_value(item) for key, item in value.items()}
+
+    def load(value: Any, data: Any) -> Any:  # pylint: disable=unused-argument
+        if value.__class__ is dict:
+            return {load_key(key, None): load_value(item, None) for key, item in value.items()}
+        if value is None:
+            return _load_none(allow_none)
+        raise FallbackToSchema()
+
+    return dump, load
+
+
+def _compile_generic(
+    field: marshmallow.fields.Field, name: Optional[str]
+) -> Tuple[Dumper, Loader]:
+    """ Delegate the (de)serialization to the marshmallow field. """
+
+    # Nested schemas and polymorphic fields may mutate the input while
+    # loading, which would break the fallback to the schema.
+    if isinstance(field, (marshmallow.fields.Nested, CallablePolyField)):
+        raise UnsupportedField(f"Can not delegate {field}")
+
+    def dump(value: Any) -> Any:
+        # Inner fields are serialized without a name by marshmallow as well
+        return field._serialize(  # pylint: disable=protected-access
+            value, name, None  # type: ignore
+        )
+
+    def load(value: Any, data: Any) -> Any:
+        return field.deserialize(value, name, data)
+
+    return dump, load
+
+
+def _compile_field(
+    field: marshmallow.fields.Field, hint: Any, name: Optional[str] = None
+) -> Tuple[Dumper, Loader]:
+    # pylint: disable=too-many-return-statements
+    if field.validators:
+        return _compile_generic(field, name)
+
+    field_type = type(field)
+
+    if isinstance(field, marshmallow.fields.Integer):
+        if field_type in INTEGER_FIELDS and not field.strict:
+            return _compile_integer(field)
+        return _compile_generic(field, name)
+    if field_type is BytesField:
+        return _compile_hex(field, _dump_bytes, _load_bytes)
+    if field_type is AddressField:
+        return _compile_hex(field, to_hex_address, to_canonical_address)
+    if field_type is marshmallow.fields.String:
+        return _compile_exact(field, str)
+    if field_type is marshmallow.fields.Boolean:
+        return _compile_exact(field, bool)
+    if isinstance(field, CallablePolyField):
+        return _compile_polymorphic(field)
+    if isinstance(field, marshmallow.fields.Nested) and field_type is marshmallow.fields.Nested:
+        return _compile_nested(field, hint)
+    if isinstance(field, marshmallow.fields.List) and field_type is marshmallow.fields.List:
+        return _compile_list(field, hint)
+    if isinstance(field, marshmallow.fields.Tuple) and field_type is marshmallow.fields.Tuple:
+        return _compile_tuple(field, hint)
+    if isinstance(field, marshmallow.fields.Dict) and field_type is marshmallow.fields.Dict:
+        return _compile_dict(field, hint)
+
+    return _compile_generic(field, name)
+
+
+class CompiledDataclass:
+    """ The compiled converters for all the fields of a dataclass. """
+
+    def __init__(self, klass: type) -> None:
+        schema = SchemaCache.get_or_create_schema(klass)
+        hints = {field.name: field.type for field in dataclasses.fields(klass)}
+
+        self.klass = klass
+        self.type_name = f"{klass.__module__}.{klass.__name__}"
+        self.fields: List[Tuple[str, Dumper, Loader]] = [
+            (name, *_compile_field(field, hints.get(name), name))
+            for name, field in schema.fields.items()
+        ]
+
+    def dump_fields(self, obj: Any) -> Dict[str, Any]:
+        return {name: dump(getattr(obj, name)) for name, dump, _ in self.fields}
+
+    def dump(self, obj: Any) -> Dict[str, Any]:
+        data = self.dump_fields(obj)
+        # The type is added by a post dump hook, and therefore is the last key
+        data[TYPE_KEY] = self.type_name
+        return data
+
+    def load_fields(self, data: Dict[str, Any], has_type: bool) -> Any:
+        # Missing values with defaults and unknown keys are handled by the
+        # schema
+        if len(data) != len(self.fields) + has_type:
+            raise FallbackToSchema()
+
+        kwargs = {name: load(data[name], data) for name, _, load in self.fields}
+        return self.klass(**kwargs)
+
+
+_COMPILED_DATACLASSES: Dict[type, Optional[CompiledDataclass]] = {}
+
+
+def compile_dataclass(klass: type) -> CompiledDataclass:
+    """ Returns the compiled converters for `klass`, compiling them on first
+    use.
+
+    Raises ``FallbackToSchema`` if the class can not be compiled.
+    """
+    try:
+        compiled = _COMPILED_DATACLASSES[klass]
+    except KeyError:
+        try:
+            compiled = CompiledDataclass(klass)
+        except (UnsupportedField, TypeError):
+            compiled = None
+        _COMPILED_DATACLASSES[klass] = compiled
+
+    if compiled is None:
+        raise FallbackToSchema()
+
+    return compiled
+
+
+def has_fast_path(klass: Any) -> bool:
+    return isinstance(klass, type) and klass.__module__.startswith(FAST_PATH_MODULES)
+
+
+def serialize(obj: Any) -> Dict[str, Any]:
+    """ Serialize the dataclass instance `obj` with the compiled converters.
+
+    Raises ``FallbackToSchema`` if the schema must be used instead.
+    """
+    klass = obj.__class__
+    if not has_fast_path(klass):
+        raise FallbackToSchema()
+
+    try:
+        return compile_dataclass(klass).dump(obj)
+    except CONVERSION_ERRORS as ex:
+        raise FallbackToSchema() from ex
+
+
+def deserialize(klass: type, data: Dict[str, Any]) -> Any:
+    """ Deserialize `data`, which must contain the type key, into an instance
+    of the dataclass `klass`.
+
+    The input is not modified. Raises ``FallbackToSchema`` if the schema must
+    be used instead.
+    """
+    if not has_fast_path(klass):
+        raise FallbackToSchema()
+
+    try:
+        return compile_dataclass(klass).load_fields(data, has_type=True)
+    except CONVERSION_ERRORS as ex:
+        raise FallbackToSchema() from ex
@@ -141,12 +141,17 @@ def serialization_schema_selector(obj: Any, parent: Any) -> Schema:
         # pylint: disable=unused-argument
         return SchemaCache.get_or_create_schema(obj.__class__)
 
+    def class_from_type_name(self, type_name: str) -> type:
+        """ Returns the allowed class for the serialized ``_type`` value. """
+        return self._class_of_classname[type_name.split(".")[-1]]
+
     def deserialization_schema_selector(
         self, deserializable_dict: Dict[str, Any], parent: Dict[str, Any]
     ) -> Schema:
         # pylint: disable=unused-argument
-        type_ = deserializable_dict["_type"].split(".")[-1]
-        return SchemaCache.get_or_create_schema(self._class_of_classname[type_])
+        return SchemaCache.get_or_create_schema(
+            self.class_from_type_name(deserializable_dict["_type"])
+        )
 
     def __call__(self, **metadata: Any) -> "CallablePolyField":
         self.metadata = metadata
@@ -7,18 +7,21 @@
 import importlib
 import json
 from dataclasses import is_dataclass
+from functools import lru_cache
 from json import JSONDecodeError
 from typing import Mapping
 
 from marshmallow import ValidationError
 
 from raiden.exceptions import SerializationError
+from raiden.storage.serialization import compiled
 from raiden.storage.serialization.cache import SchemaCache
 from raiden.storage.serialization.types import MESSAGE_NAME_TO_QUALIFIED_NAME
 from raiden.utils.copy import deepcopy
 from raiden.utils.typing import Any, Dict
 
 
+@lru_cache(maxsize=1024)
 def _import_type(type_name: str) -> type:
     module_name, _, klass_name = type_name.rpartition(".")
 
@@ -53,6 +56,11 @@ def serialize(obj: Any) -> Dict:
         # Default, in case this is not a dataclass
         data = obj
         if is_dataclass(obj):
+            try:
+                return compiled.serialize(obj)
+            except compiled.FallbackToSchema:
+                pass
+
             try:
                 schema = SchemaCache.get_or_create_schema(obj.__class__)
                 data = schema.dump(obj)
@@ -67,14 +75,24 @@ def serialize(obj: Any) -> Dict:
     def deserialize(data: Dict) -> Any:
         """ Deserialize a dict-like object.
 
-        If the key ``_type`` is present, import the target and deserialize via Marshmallow.
-        Raises ``SerializationError`` for invalid inputs.
+        If the key ``_type`` is present, import the target and deserialize it,
+        either with the compiled fast path or via Marshmallow. Raises
+        ``SerializationError`` for invalid inputs.
         """
         if not isinstance(data, Mapping):
             raise SerializationError(f"Can't deserialize non dict-like objects: {data}")
         if "_type" in data:
             try:
                 klass = _import_type(data["_type"])
+            except (ValueError, TypeError) as ex:
+                raise SerializationError(f"Can't deserialize: {data}") from ex
+
+            try:
+                return compiled.deserialize(klass, data)
+            except compiled.FallbackToSchema:
+                pass
+
+            try:
                 schema = SchemaCache.get_or_create_schema(klass)
                 return schema.load(deepcopy(data))
             except (ValueError, TypeError, ValidationError) as ex:
@@ -13,7 +13,8 @@
 from raiden.storage.serialization import SerializationBase
 from raiden.storage.ulid import ULID, ULIDMonotonicFactory
 from raiden.storage.utils import DB_SCRIPT_CREATE_TABLES, TimestampedEvent
-from raiden.transfer.architecture import Event, State, StateChange
+from raiden.transfer.architecture import Event, State, StateChange, TransferTask
+from raiden.utils import metrics
 from raiden.utils.system import get_system_spec
 from raiden.utils.typing import (
     Any,
@@ -26,6 +27,7 @@
     NewType,
     Optional,
     RaidenDBVersion,
+    SecretHash,
     Tuple,
     Type,
     TypeVar,
@@ -35,7 +37,8 @@
 StateChangeID = NewType("StateChangeID", ULID)
 SnapshotID = NewType("SnapshotID", ULID)
 EventID = NewType("EventID", ULID)
-ID = TypeVar("ID", StateChangeID, SnapshotID, EventID)
+PaymentTaskID = NewType("PaymentTaskID", ULID)
+ID = TypeVar("ID", StateChangeID, SnapshotID, EventID, PaymentTaskID)
 
 
 @dataclass
@@ -55,6 +58,10 @@ def __post_init__(self) -> None:
 HIGH_STATECHANGE_ULID = StateChangeID(ULID((2 ** 128 - 1).to_bytes(16, "big")))
 RANGE_ALL_STATE_CHANGES = Range(LOW_STATECHANGE_ULID, HIGH_STATECHANGE_ULID)
 
+SNAPSHOT_SIZE = metrics.Histogram(
+    "raiden_snapshot_bytes", "Size of the serialized snapshots", buckets=metrics.SIZE_BUCKETS
+)
+
 
 class Operator(Enum):
     NONE = ""
@@ -96,6 +103,13 @@ class SnapshotEncodedRecord(NamedTuple):
     data: str
 
 
+class PaymentTaskEncodedRecord(NamedTuple):
+    identifier: PaymentTaskID
+    state_change_identifier: StateChangeID
+    data: str
+    log_time: datetime
+
+
 class EventRecord(NamedTuple):
     event_identifier: EventID
     state_change_identifier: StateChangeID
@@ -114,6 +128,13 @@ class SnapshotRecord(NamedTuple):
     data: State
 
 
+class PaymentTaskRecord(NamedTuple):
+    identifier: PaymentTaskID
+    state_change_identifier: StateChangeID
+    data: TransferTask
+    log_time: datetime
+
+
 def assert_sqlite_version() -> bool:  # pragma: no unittest
     if sqlite3.sqlite_version_info < SQLITE_MIN_REQUIRED_VERSION:
         return False
@@ -261,6 +282,7 @@ def _ulid_factory(self, id_type: Type[ID]) -> ULIDMonotonicFactory[ID]:
             StateChangeID: "state_changes",
             EventID: "state_events",
             SnapshotID: "state_snapshot",
+            PaymentTaskID: "payment_task_archive",
         }
         table_name = expected_types.get(id_type)
 
@@ -375,6 +397,41 @@ def write_events(self, events: List[Tuple[StateChangeID, str]]) -> List[EventID]
 
         return events_ids
 
+    def write_payment_tasks(
+        self, payment_tasks: List[Tuple[StateChangeID, SecretHash, str]]
+    ) -> List[PaymentTaskID]:
+        """ Archive finished payment tasks, together with the id of the last
+        state change of the batch which removed them from the chain state.
+        """
+        ulid_factory = self._ulid_factory(PaymentTaskID)
+        payment_task_ids: List[PaymentTaskID] = list()
+
+        query = (
+            "INSERT INTO payment_task_archive("
+            "   identifier, source_statechange_id, secrethash, data"
+            ") VALUES(?, ?, ?, ?)"
+        )
+        self.conn.executemany(
+            query, ulid_factory.prepend_and_save_ids(payment_task_ids, payment_tasks)
+        )
+        self.maybe_commit()
+
+        return payment_task_ids
+
+    def get_payment_tasks(self, secrethash: SecretHash) -> List[PaymentTaskEncodedRecord]:
+        """ Return the archived payment tasks for `secrethash`, oldest first. """
+        cursor = self.conn.execute(
+            "SELECT identifier, source_statechange_id, data, timestamp "
+            "FROM payment_task_archive WHERE secrethash = ? "
+            "ORDER BY identifier ASC",
+            (secrethash,),
+        )
+        return [PaymentTaskEncodedRecord(row[0], row[1], row[2], row[3]) for row in cursor]
+
+    def count_payment_tasks(self) -> int:
+        cursor = self.conn.execute("SELECT COUNT(1) FROM payment_task_archive")
+        return int(cursor.fetchone()[0])
+
     def delete_state_changes(self, state_changes_to_delete: List[Tuple[StateChangeID]]) -> None:
         self.conn.executemany(
             "DELETE FROM state_changes WHERE identifier = ?", state_changes_to_delete
@@ -680,6 +737,32 @@ def get_events(self, limit: int = None, offset: int = None) -> List[str]:
         entries = self._query_events(limit, offset)
         return [entry[0] for entry in entries]
 
+    def get_events_with_timestamps_after(
+        self, event_identifier: EventID, limit: int = None, filters: List[Tuple[str, Any]] = None,
+    ) -> List[Tuple[EventID, str, datetime]]:
+        """ Return the events saved after `event_identifier` in order, the
+        `filters` are combined with OR.
+        """
+        limit, _ = _sanitize_limit_and_offset(limit, None)
+        where_clauses = ["identifier > ?"]
+        args: List[Any] = [event_identifier]
+        if filters:
+            json_clauses = list()
+            for field, value in filters:
+                json_clauses.append("json_extract(data, ?) = ?")
+                args.append(f"$.{field}")
+                args.append(value)
+            where_clauses.append(f"({' OR '.join(json_clauses)})")
+        args.append(limit)
+
+        cursor = self.conn.execute(
+            f"SELECT identifier, data, timestamp FROM state_events "
+            f"WHERE {' AND '.join(where_clauses)} "
+            f"ORDER BY identifier ASC LIMIT ?",
+            args,
+        )
+        return cursor.fetchall()
+
     def get_state_changes(self, limit: int = None, offset: int = None) -> List[str]:
         entries = self._get_state_changes(limit, offset)
         return [entry.data for entry in entries]
@@ -784,6 +867,7 @@ def write_state_snapshot(
         self, snapshot: State, statechange_id: StateChangeID, statechange_qty: int
     ) -> SnapshotID:
         serialized_data = self.serializer.serialize(snapshot)
+        SNAPSHOT_SIZE.observe(len(serialized_data))
 
         return self.database.write_state_snapshot(serialized_data, statechange_id, statechange_qty)
 
@@ -800,6 +884,29 @@ def write_events(self, events: List[Tuple[StateChangeID, Event]]) -> List[EventI
         ]
         return self.database.write_events(events_data)
 
+    def write_payment_tasks(
+        self, payment_tasks: List[Tuple[StateChangeID, SecretHash, TransferTask]]
+    ) -> List[PaymentTaskID]:
+        payment_tasks_data = [
+            (state_change_id, secrethash, self.serializer.serialize(payment_task))
+            for state_change_id, secrethash, payment_task in payment_tasks
+        ]
+        return self.database.write_payment_tasks(payment_tasks_data)
+
+    def get_payment_tasks(self, secrethash: SecretHash) -> List[PaymentTaskRecord]:
+        return [
+            PaymentTaskRecord(
+                identifier=record.identifier,
+                state_change_identifier=record.state_change_identifier,
+                data=self.serializer.deserialize(record.data),
+                log_time=record.log_time,
+            )
+            for record in self.database.get_payment_tasks(secrethash)
+        ]
+
+    def count_payment_tasks(self) -> int:
+        return self.database.count_payment_tasks()
+
     def get_snapshot_before_state_change(
         self, state_change_identifier: StateChangeID
     ) -> Optional[SnapshotRecord]:
@@ -885,6 +992,17 @@ def get_events_with_timestamps(
             for event in events
         ]
 
+    def get_events_with_timestamps_after(
+        self, event_identifier: EventID, limit: int = None, filters: List[Tuple[str, Any]] = None,
+    ) -> List[Tuple[EventID, TimestampedEvent]]:
+        events = self.database.get_events_with_timestamps_after(
+            event_identifier=event_identifier, limit=limit, filters=filters
+        )
+        return [
+            (identifier, TimestampedEvent(self.serializer.deserialize(data), log_time))
+            for identifier, data, log_time in events
+        ]
+
     def get_events(self, limit: int = None, offset: int = None) -> List[Event]:
         events = self.database.get_events(limit, offset)
         return [self.serializer.deserialize(event) for event in events]
@@ -92,10 +92,25 @@ def __getattr__(self, item: str) -> Event:
 );
 """
 
+# Payment tasks are removed from the chain state once they are finished, the
+# last state of each task is kept here for the API and debugging.
+DB_CREATE_PAYMENT_TASK_ARCHIVE = """
+CREATE TABLE IF NOT EXISTS payment_task_archive (
+    identifier ULID PRIMARY KEY NOT NULL,
+    source_statechange_id ULID NOT NULL,
+    secrethash BLOB NOT NULL,
+    data JSON,
+    timestamp TIMESTAMP DEFAULT(STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')) NOT NULL,
+    FOREIGN KEY(source_statechange_id) REFERENCES state_changes(identifier)
+);
+CREATE INDEX IF NOT EXISTS payment_task_archive_secrethash
+    ON payment_task_archive(secrethash);
+"""
+
 DB_SCRIPT_CREATE_TABLES = """
 PRAGMA foreign_keys=off;
 BEGIN TRANSACTION;
-{}{}{}{}{}
+{}{}{}{}{}{}
 COMMIT;
 PRAGMA foreign_keys=on;
 """.format(
@@ -104,4 +119,5 @@ def __getattr__(self, item: str) -> Event:
     DB_CREATE_SNAPSHOT,
     DB_CREATE_STATE_EVENTS,
     DB_CREATE_RUNS,
+    DB_CREATE_PAYMENT_TASK_ARCHIVE,
 )
@@ -6,11 +6,13 @@
 from raiden.storage.serialization import DictSerializer
 from raiden.storage.sqlite import (
     LOW_STATECHANGE_ULID,
+    EventID,
     Range,
     SerializedSQLiteStorage,
     StateChangeID,
 )
 from raiden.transfer.architecture import Event, State, StateChange, StateManager
+from raiden.utils import metrics
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.logging import redact_secret
 from raiden.utils.typing import (
@@ -26,6 +28,15 @@
 
 log = structlog.get_logger(__name__)
 
+WAL_WRITE_DURATION = metrics.Histogram(
+    "raiden_wal_write_seconds",
+    "Time to write a batch of state changes or events to the WAL",
+    labelnames=("table",),
+)
+SNAPSHOT_DURATION = metrics.Histogram(
+    "raiden_snapshot_seconds", "Time to serialize and store a snapshot of the state"
+)
+
 
 def restore_to_state_change(
     transition_function: Callable,
@@ -81,6 +92,9 @@ def restore_to_state_change(
 
 
 ST = TypeVar("ST", bound=State)
+# Called with the new state, the dispatched state changes and the saved events
+# after every dispatch
+DispatchListener = Callable[[ST, List[StateChange], List[Tuple[EventID, Event]]], None]
 
 
 @dataclass(frozen=True)
@@ -108,18 +122,24 @@ def __init__(self, state_manager: StateManager[ST], storage: SerializedSQLiteSto
         # execution order.
         self._lock = gevent.lock.Semaphore()
 
-    def log_and_dispatch(self, state_changes: List[StateChange]) -> Tuple[ST, List[Event]]:
+        # The listeners are called once the lock is released, in the order of
+        # the dispatches. They must not block.
+        self.dispatch_listeners: List[DispatchListener[ST]] = list()
+
+    def log_and_dispatch(self, state_changes: List[StateChange]) -> Tuple[ST, List[List[Event]]]:
         """ Log and apply a state change.
 
         This function will first write the state change to the write-ahead-log,
         in case of a node crash the state change can be recovered and replayed
         to restore the node state.
 
-        Events produced by applying state change are also saved.
+        Events produced by applying state change are also saved, they are
+        returned grouped by state change.
         """
 
         with self._lock:
-            all_state_change_ids = self.storage.write_state_changes(state_changes)
+            with WAL_WRITE_DURATION.labels("state_changes").time():
+                all_state_change_ids = self.storage.write_state_changes(state_changes)
 
             latest_state, all_events = self.state_manager.dispatch(state_changes)
             latest_state_change_id = all_state_change_ids[-1]
@@ -135,9 +155,17 @@ def log_and_dispatch(self, state_changes: List[StateChange]) -> Tuple[ST, List[E
                 for event in events:
                     event_data.append((state_change_id, event))
 
-            self.storage.write_events(event_data)
+            with WAL_WRITE_DURATION.labels("events").time():
+                event_ids = self.storage.write_events(event_data)
+
+        # There is no context switch from the release of the lock to the
+        # listeners, so they are called in order
+        if self.dispatch_listeners:
+            saved_events = list(zip(event_ids, flattened_events))
+            for listener in self.dispatch_listeners:
+                listener(latest_state, state_changes, saved_events)
 
-        return latest_state, flattened_events
+        return latest_state, all_events
 
     def snapshot(self, statechange_qty: int) -> None:
         """ Snapshot the application state.
@@ -151,7 +179,10 @@ def snapshot(self, statechange_qty: int) -> None:
 
             # otherwise no state change was dispatched
             if state_change_id and current_state is not None:
-                self.storage.write_state_snapshot(current_state, state_change_id, statechange_qty)
+                with SNAPSHOT_DURATION.time():
+                    self.storage.write_state_snapshot(
+                        current_state, state_change_id, statechange_qty
+                    )
 
     @property
     def version(self) -> RaidenDBVersion:
@@ -1,4 +1,6 @@
 import re
+import time
+from collections import deque
 from typing import TYPE_CHECKING
 
 import click
@@ -6,7 +8,8 @@
 import requests
 import structlog
 from eth_utils import to_hex
-from gevent.event import AsyncResult
+from gevent import Greenlet
+from gevent.event import AsyncResult, Event
 from pkg_resources import parse_version
 from web3 import Web3
 from web3.types import BlockData
@@ -24,11 +27,22 @@
 from raiden.network.proxies.proxy_manager import ProxyManager
 from raiden.network.proxies.user_deposit import UserDeposit
 from raiden.settings import MIN_REI_THRESHOLD
-from raiden.utils import gas_reserve
+from raiden.transfer.architecture import StateChange
+from raiden.utils import gas_reserve, metrics
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.runnable import Runnable
 from raiden.utils.transfers import to_rdn
-from raiden.utils.typing import Any, BlockNumber, Callable, ChainID, List, Optional, Tuple
+from raiden.utils.typing import (
+    Any,
+    BlockNumber,
+    Callable,
+    ChainID,
+    Deque,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
 if TYPE_CHECKING:
     from raiden.raiden_service import RaidenService
@@ -36,6 +50,22 @@
 REMOVE_CALLBACK = object()
 log = structlog.get_logger(__name__)
 
+# Weight of the latest batch in the estimated duration of a state change dispatch
+DISPATCH_DURATION_SMOOTHING = 0.2
+
+STATE_CHANGE_BATCH_SIZE = metrics.Histogram(
+    "raiden_state_change_batch_size",
+    "Number of state changes dispatched together",
+    buckets=metrics.SIZE_BUCKETS,
+)
+STATE_CHANGE_QUEUEING_DELAY = metrics.Histogram(
+    "raiden_state_change_queueing_delay_seconds",
+    "Time the state changes waited for the dispatch of their batch to start",
+)
+QUEUED_STATE_CHANGES = metrics.Gauge(
+    "raiden_state_change_queued", "Number of state changes waiting to be dispatched"
+)
+
 
 def _do_check_version(current_version: Tuple[str, ...]) -> bool:
     content = requests.get(LATEST).json()
@@ -253,3 +283,142 @@ def stop(self) -> Any:
         # Callbacks should be cleaned after join
         self.callbacks = []
         return result
+
+
+class _DispatchRequest(NamedTuple):
+    state_changes: List[StateChange]
+    result: AsyncResult
+    queued_at: float
+
+
+class StateChangeDispatcher(Runnable):
+    """ Dispatches the state changes of the node's greenlets in batches.
+
+    Every dispatch writes the state changes to the database and copies the
+    chain state, the copy costs the same for a single state change or for
+    many. The greenlets which produce state changes concurrently, e.g. the API,
+    the transport and the alarm task, queue them here and block until the
+    batch with their state changes was dispatched.
+
+    A batch has the state changes of the callers which queued them while the
+    previous batch was dispatched, in order, so the order of the state changes
+    of every caller is kept. The size of a batch is bounded by the number of
+    state changes which can be dispatched within `latency_budget` seconds,
+    estimated from the previous batches. The state changes of a caller are
+    never split.
+
+    `dispatch_batches` is called with the state changes of every caller of a
+    batch and returns, for every caller, the greenlets handling the events of
+    its state changes.
+
+    The events of every caller are handled with the chain state after the
+    whole batch, i.e. the events of a caller may see the state changes of the
+    callers queued after it. This is the same as for the state changes of a
+    single caller, whose events are handled with the state after the last
+    one.
+    """
+
+    def __init__(
+        self,
+        dispatch_batches: Callable[[List[List[StateChange]]], List[List[Greenlet]]],
+        latency_budget: float,
+    ) -> None:
+        super().__init__()
+        self.dispatch_batches = dispatch_batches
+        self.latency_budget = latency_budget
+
+        # Estimated duration of the dispatch of a single state change
+        self.state_change_duration: Optional[float] = None
+
+        self._queue: Deque[_DispatchRequest] = deque()
+        self._wakeup = Event()
+        self._stop_requested = False
+
+    def start(self) -> None:
+        self._stop_requested = False
+        super().start()
+
+    def _run(self, *args: Any, **kwargs: Any) -> None:  # pylint: disable=method-hidden
+        self.greenlet.name = "StateChangeDispatcher._run"
+        try:
+            while not self._stop_requested or self._queue:
+                self._wakeup.wait()
+                self._wakeup.clear()
+
+                while self._queue:
+                    self._dispatch_next_batch()
+        except BaseException as e:  # pylint: disable=broad-except
+            # Don't leave the callers waiting for a batch which won't be dispatched
+            while self._queue:
+                self._queue.popleft().result.set_exception(e)
+            raise
+
+    def stop(self) -> None:
+        """ Stop once the queued state changes are dispatched. """
+        self._stop_requested = True
+        self._wakeup.set()
+        self.greenlet.join()
+
+    def dispatch(self, state_changes: List[StateChange]) -> List[Greenlet]:
+        """ Dispatch `state_changes` and return the greenlets handling their events.
+
+        Blocks until the batch with the state changes was dispatched. The state
+        changes are dispatched directly while the dispatcher is not running,
+        e.g. while the node is starting, and when called by the dispatcher
+        itself.
+        """
+        if not state_changes:
+            return list()
+
+        if not self.greenlet or gevent.getcurrent() is self.greenlet:
+            return self.dispatch_batches([state_changes])[0]
+
+        request = _DispatchRequest(state_changes, AsyncResult(), time.monotonic())
+        self._queue.append(request)
+        QUEUED_STATE_CHANGES.inc(len(state_changes))
+        self._wakeup.set()
+
+        return request.result.get()
+
+    def _dispatch_next_batch(self) -> None:
+        batch = [self._queue.popleft()]
+        batch_size = len(batch[0].state_changes)
+
+        if self.state_change_duration is not None:
+            max_batch_size = self.latency_budget / self.state_change_duration
+            while self._queue and batch_size + len(self._queue[0].state_changes) <= max_batch_size:
+                batch.append(self._queue.popleft())
+                batch_size += len(batch[-1].state_changes)
+        else:
+            while self._queue:
+                batch.append(self._queue.popleft())
+                batch_size += len(batch[-1].state_changes)
+
+        start = time.monotonic()
+        QUEUED_STATE_CHANGES.dec(batch_size)
+        STATE_CHANGE_BATCH_SIZE.observe(batch_size)
+        for request in batch:
+            STATE_CHANGE_QUEUEING_DELAY.observe(start - request.queued_at)
+
+        try:
+            results = self.dispatch_batches([request.state_changes for request in batch])
+        except BaseException as e:  # pylint: disable=broad-except
+            for request in batch:
+                request.result.set_exception(e)
+            raise
+
+        for request, greenlets in zip(batch, results):
+            request.result.set(greenlets)
+
+        # Callers without state changes are not queued, this is just a guard
+        # for the estimate
+        if batch_size == 0:
+            return
+
+        duration = (time.monotonic() - start) / batch_size
+        if self.state_change_duration is None:
+            self.state_change_duration = duration
+        else:
+            self.state_change_duration += DISPATCH_DURATION_SMOOTHING * (
+                duration - self.state_change_duration
+            )
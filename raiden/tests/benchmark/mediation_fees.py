@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark for the mediation fee calculation done by a mediator for each
+candidate route of a received transfer.
+
+The baseline searches the intersection of the fee function linearly, as it was
+done before the binary search over the slope bounds.
+
+Usage: python -m raiden.tests.benchmark.mediation_fees --routes 5 --payments 100
+"""
+import random
+
+import click
+
+from raiden.exceptions import UndefinedMediationFee
+from raiden.tests.benchmark.utils import measure, print_comparison
+from raiden.tests.utils import factories
+from raiden.tests.utils.factories import (
+    NettingChannelEndStateProperties,
+    NettingChannelStateProperties,
+)
+from raiden.transfer.channel import get_balance
+from raiden.transfer.mediated_transfer.mediation_fee import (
+    FeeScheduleState,
+    calculate_imbalance_fees,
+)
+from raiden.transfer.mediated_transfer.mediator import (
+    find_intersection_linear,
+    get_amount_without_fees,
+)
+from raiden.utils.mediation_fees import ppm_fee_per_channel
+from raiden.utils.typing import FeeAmount, ProportionalFeeAmount, TokenAmount
+
+DEPOSIT = TokenAmount(10 ** 18)
+
+
+def baseline_amount_without_fees(amount_with_fees, channel_in, channel_out):
+    """ Same as `get_amount_without_fees` without the binary search """
+    balance_in = get_balance(channel_in.our_state, channel_in.partner_state)
+    balance_out = get_balance(channel_out.our_state, channel_out.partner_state)
+    receivable = channel_in.our_total_deposit + channel_in.partner_total_deposit - balance_in
+    try:
+        fee_func = FeeScheduleState.mediation_fee_func(
+            schedule_in=channel_in.fee_schedule,
+            schedule_out=channel_out.fee_schedule,
+            balance_in=balance_in,
+            balance_out=balance_out,
+            receivable=receivable,
+            amount_with_fees=amount_with_fees,
+            cap_fees=channel_in.fee_schedule.cap_fees,
+        )
+    except UndefinedMediationFee:
+        return None
+
+    amount_without_fees = find_intersection_linear(
+        fee_func, lambda i: amount_with_fees - fee_func.x_list[i]
+    )
+    if amount_without_fees is None or amount_without_fees <= 0:
+        return None
+    return int(round(amount_without_fees))
+
+
+def make_channel(fee_schedule, our_balance):
+    return factories.create(
+        NettingChannelStateProperties(
+            our_state=NettingChannelEndStateProperties(balance=our_balance),
+            partner_state=NettingChannelEndStateProperties(balance=2 * DEPOSIT - our_balance),
+            fee_schedule=fee_schedule,
+        )
+    )
+
+
+def make_channels(number_of_routes, rng):
+    fee_schedule = FeeScheduleState(
+        flat=FeeAmount(50),
+        proportional=ppm_fee_per_channel(ProportionalFeeAmount(10_000)),
+        imbalance_penalty=calculate_imbalance_fees(
+            TokenAmount(2 * DEPOSIT), ProportionalFeeAmount(20_000)
+        ),
+    )
+    channel_in = make_channel(fee_schedule, rng.randint(0, 2 * DEPOSIT))
+    channels_out = [
+        make_channel(fee_schedule, rng.randint(0, 2 * DEPOSIT)) for _ in range(number_of_routes)
+    ]
+    return channel_in, channels_out
+
+
+def mediate(amount_function, amounts, channel_in, channels_out):
+    return [
+        [amount_function(amount, channel_in, channel_out) for channel_out in channels_out]
+        for amount in amounts
+    ]
+
+
+@click.command()
+@click.option("--routes", default=5, help="Number of candidate routes per transfer")
+@click.option("--payments", default=100, help="Number of mediated payments per measurement")
+@click.option("--number", default=5, help="Number of calls per measurement")
+@click.option("--seed", default=0, help="Seed for the channel balances and amounts")
+def main(routes, payments, number, seed):
+    rng = random.Random(seed)
+    channel_in, channels_out = make_channels(routes, rng)
+    amounts = [rng.randint(1, DEPOSIT // 2) for _ in range(payments)]
+
+    def current(amount, channel_in, channel_out):
+        return get_amount_without_fees(
+            amount_with_fees=amount, channel_in=channel_in, channel_out=channel_out
+        )
+
+    expected = mediate(baseline_amount_without_fees, amounts, channel_in, channels_out)
+    assert mediate(current, amounts, channel_in, channels_out) == expected, "Results differ"
+
+    print(f"{'mediation fees':<40} {'baseline':>14} {'binary search':>14} {'speedup':>9}")
+    print_comparison(
+        f"{payments} payments",
+        measure(
+            lambda: mediate(baseline_amount_without_fees, amounts, channel_in, channels_out),
+            number=number,
+        ),
+        measure(lambda: mediate(current, amounts, channel_in, channels_out), number=number),
+    )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark for the processing of a received LockedTransfer: de-duplication
+of the batch, recovery of the sender and creation of the state change.
+
+The baseline recomputes the signing data, the message hash and the sender on
+every access, as it was done before these values were cached on the message.
+
+Usage: python -m raiden.tests.benchmark.messages --batch-size 50
+"""
+import click
+
+from raiden.messages.decode import lockedtransfersigned_from_message
+from raiden.storage.serialization.serializer import MessageSerializer
+from raiden.tests.benchmark.utils import measure, print_comparison
+from raiden.tests.utils import factories
+
+
+def invalidate_derived_values(message):
+    """ Drop the values computed from the message fields, the sender was
+    already cached before.
+    """
+    for attrname in ("data_to_sign", "balance_hash", "message_hash"):
+        message.__dict__.pop(attrname, None)
+
+
+def process_uncached(messages):
+    unique_messages = set()
+    for message in messages:
+        invalidate_derived_values(message)
+        unique_messages.add(message)
+
+    for message in unique_messages:
+        invalidate_derived_values(message)
+        assert message.sender
+        invalidate_derived_values(message)
+        lockedtransfersigned_from_message(message)
+
+
+def process_cached(messages):
+    for message in set(messages):
+        assert message.sender
+        lockedtransfersigned_from_message(message)
+
+
+@click.command()
+@click.option("--batch-size", default=50, help="Number of messages received in a batch")
+@click.option("--number", default=20, help="Number of batches per measurement")
+def main(batch_size, number):
+    serialized = [
+        MessageSerializer.serialize(factories.create(factories.LockedTransferProperties()))
+        for _ in range(batch_size)
+    ]
+
+    def batch():
+        return [MessageSerializer.deserialize(data) for data in serialized]
+
+    deserialization = measure(batch, number=number)
+
+    print(f"{'LockedTransfer batch':<40} {'uncached':>14} {'cached':>14} {'speedup':>9}")
+    print_comparison(
+        f"process {batch_size} messages",
+        measure(lambda: process_uncached(batch()), number=number) - deserialization,
+        measure(lambda: process_cached(batch()), number=number) - deserialization,
+    )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Measures how many payments per second a running node completes when they are
+sent one request at a time and when they are sent as batches.
+
+The payments go from the node at `--api` to `--target`, which must be
+reachable in the token network of `--token`. The sequential measurement waits
+for every payment before sending the next, as a client of the single payment
+endpoint does. The batch measurements post all payments at once and poll the
+batch until it is finished.
+
+Usage: python -m raiden.tests.benchmark.payment_batch --api http://127.0.0.1:5001 \
+    --token 0x... --target 0x... --payments 200 --concurrency 1 --concurrency 20
+"""
+import time
+
+import click
+import requests
+
+
+def pay_sequentially(api, token, target, payments, amount):
+    url = f"{api}/api/v1/payments/{token}/{target}"
+    for _ in range(payments):
+        response = requests.post(url, json={"amount": str(amount)})
+        response.raise_for_status()
+
+
+def pay_batch(api, token, target, payments, amount, concurrency):
+    payment = {"token_address": token, "target_address": target, "amount": str(amount)}
+    response = requests.post(
+        f"{api}/api/v1/payments/batches",
+        json={"payments": [payment] * payments, "max_concurrency": concurrency},
+    )
+    response.raise_for_status()
+    batch_url = f"{api}/api/v1/payments/batches/{response.json()['batch_identifier']}"
+
+    while True:
+        response = requests.get(batch_url)
+        response.raise_for_status()
+        result = response.json()
+        if result["finished"]:
+            assert result["summary"]["failed"] == 0, "Payments of the batch failed"
+            return
+        time.sleep(0.1)
+
+
+@click.command()
+@click.option("--api", default="http://127.0.0.1:5001", help="URL of the node's API")
+@click.option("--token", required=True, help="Checksummed address of the token")
+@click.option("--target", required=True, help="Checksummed address of the target")
+@click.option("--payments", default=200, help="Number of payments per measurement")
+@click.option("--amount", default=1, help="Amount of each payment")
+@click.option(
+    "--concurrency", multiple=True, type=int, default=[1, 5, 20, 50], help="Batch concurrency"
+)
+def main(api, token, target, payments, amount, concurrency):
+    print(f"{'mode':<16} {'payments/s':>12} {'speedup':>9}")
+
+    start = time.perf_counter()
+    pay_sequentially(api, token, target, payments, amount)
+    baseline = payments / (time.perf_counter() - start)
+    print(f"{'sequential':<16} {baseline:>12.1f} {1:>8.2f}x")
+
+    for max_concurrency in concurrency:
+        start = time.perf_counter()
+        pay_batch(api, token, target, payments, amount, max_concurrency)
+        throughput = payments / (time.perf_counter() - start)
+        print(
+            f"{f'batch {max_concurrency}':<16} {throughput:>12.1f} {throughput / baseline:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Compares the compiled serializers against the plain marshmallow schemas on the
+objects written to the WAL for a mediated transfer, the messages exchanged for
+it, and a chain state with a configurable number of channels. The chain state
+is the one of the state machine benchmark, which round-trips through the
+serializers unlike the one of the factories.
+
+Usage: python -m raiden.tests.benchmark.serialization --channels 100
+"""
+import json
+from dataclasses import replace
+
+import click
+
+from raiden.storage.serialization import JSONSerializer
+from raiden.storage.serialization.cache import SchemaCache
+from raiden.storage.serialization.serializer import MessageSerializer
+from raiden.storage.serialization.types import MESSAGE_NAME_TO_QUALIFIED_NAME
+from raiden.tests.benchmark.state_machine import make_chain_state
+from raiden.tests.benchmark.utils import measure, print_comparison
+from raiden.tests.utils import factories
+from raiden.transfer.mediated_transfer.events import SendLockedTransfer
+from raiden.transfer.mediated_transfer.state_change import ReceiveSecretReveal
+from raiden.transfer.state_change import Block
+from raiden.utils.copy import deepcopy
+from raiden.utils.typing import BlockGasLimit
+
+
+def schema_serialize(obj):
+    return json.dumps(SchemaCache.get_or_create_schema(obj.__class__).dump(obj))
+
+
+def schema_deserialize(klass, data):
+    decoded = json.loads(data)
+    return SchemaCache.get_or_create_schema(klass).load(deepcopy(decoded))
+
+
+def schema_deserialize_message(klass, data):
+    decoded = json.loads(data)
+    decoded["_type"] = MESSAGE_NAME_TO_QUALIFIED_NAME[decoded.pop("type")]
+    return SchemaCache.get_or_create_schema(klass).load(deepcopy(decoded))
+
+
+def make_payloads(number_of_channels):
+    pair = factories.make_transfers_pair(number_of_channels=3)
+    payer_transfer = pair.transfers_pair[0].payer_transfer
+    payee_transfer = pair.transfers_pair[0].payee_transfer
+
+    send_locked_transfer = SendLockedTransfer(
+        recipient=pair.transfers_pair[0].payee_address,
+        canonical_identifier=payee_transfer.balance_proof.canonical_identifier,
+        message_identifier=factories.make_message_identifier(),
+        transfer=payee_transfer,
+    )
+    # Routes without a forward channel can not be deserialized
+    init_mediator = replace(
+        factories.mediator_make_init_action(pair.channels, payer_transfer),
+        route_states=[
+            factories.make_route_from_channel(channel) for channel in pair.channels.channels
+        ],
+    )
+    chain_state, _ = make_chain_state(
+        number_of_token_networks=1, number_of_channels=number_of_channels
+    )
+
+    return {
+        "Block": Block(
+            block_number=pair.block_number,
+            gas_limit=BlockGasLimit(1),
+            block_hash=factories.make_block_hash(),
+        ),
+        "ReceiveSecretReveal": ReceiveSecretReveal(
+            secret=factories.UNIT_SECRET, sender=factories.make_address()
+        ),
+        "ActionInitMediator": init_mediator,
+        "SendLockedTransfer": send_locked_transfer,
+        "MediationPairState": pair.transfers_pair[0],
+        f"ChainState ({number_of_channels} channels)": chain_state,
+    }
+
+
+@click.command()
+@click.option("--channels", default=100, help="Number of channels in the chain state")
+@click.option("--number", default=200, help="Number of calls per measurement")
+def main(channels, number):
+    # pylint: disable=cell-var-from-loop
+    print(f"{'payload':<40} {'marshmallow':>14} {'compiled':>14} {'speedup':>9}")
+
+    for name, obj in make_payloads(channels).items():
+        data = JSONSerializer.serialize(obj)
+        assert data == schema_serialize(obj), f"{name} serialized data differs"
+        assert JSONSerializer.deserialize(data) == obj, f"{name} does not round-trip"
+        assert schema_deserialize(type(obj), data) == obj, f"{name} does not round-trip"
+
+        print_comparison(
+            f"serialize {name}",
+            measure(lambda: schema_serialize(obj), number=number),
+            measure(lambda: JSONSerializer.serialize(obj), number=number),
+        )
+        print_comparison(
+            f"deserialize {name}",
+            measure(lambda: schema_deserialize(type(obj), data), number=number),
+            measure(lambda: JSONSerializer.deserialize(data), number=number),
+        )
+
+    message = factories.create(factories.LockedTransferProperties())
+    message_data = MessageSerializer.serialize(message)
+    assert MessageSerializer.deserialize(message_data) == message, "The message must round-trip"
+    print_comparison(
+        "serialize LockedTransfer message",
+        measure(lambda: schema_serialize(message), number=number),
+        measure(lambda: MessageSerializer.serialize(message), number=number),
+    )
+    print_comparison(
+        "deserialize LockedTransfer message",
+        measure(lambda: schema_deserialize_message(type(message), message_data), number=number),
+        measure(lambda: MessageSerializer.deserialize(message_data), number=number),
+    )
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
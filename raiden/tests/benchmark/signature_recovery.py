@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Measures how many received messages per second can be verified depending on
+the number of processes recovering the signers.
+
+Every measurement deserializes a batch of LockedTransfers, as received in a
+single Matrix sync, recovers the senders with the `SignatureRecoveryPool` and
+checks them against the expected peer. Zero processes recovers them on the
+main thread.
+
+Usage: python -m raiden.tests.benchmark.signature_recovery --batch-size 500 --max-processes 8
+"""
+import os
+import time
+
+import click
+
+from raiden.network.transport.matrix.utils import SignatureRecoveryPool, validate_message_senders
+from raiden.storage.serialization.serializer import MessageSerializer
+from raiden.tests.utils import factories
+
+
+def verify_batch(pool, serialized, peer_address):
+    messages = [MessageSerializer.deserialize(data) for data in serialized]
+    pool.recover_senders(messages)
+    valid_messages = validate_message_senders(messages, peer_address)
+    assert len(valid_messages) == len(serialized), "Senders differ"
+
+
+@click.command()
+@click.option("--batch-size", default=500, help="Number of messages received in a sync")
+@click.option("--batches", default=10, help="Number of batches per measurement")
+@click.option("--max-processes", default=os.cpu_count(), help="Highest number of processes")
+def main(batch_size, batches, max_processes):
+    peer_address = factories.UNIT_TRANSFER_SENDER
+    serialized = [
+        MessageSerializer.serialize(factories.create(factories.LockedTransferProperties()))
+        for _ in range(batch_size)
+    ]
+
+    print(f"{'processes':<12} {'messages/s':>12} {'speedup':>9}")
+    baseline = None
+    for processes in range(max_processes + 1):
+        pool = SignatureRecoveryPool(processes=processes, min_batch_size=1)
+        try:
+            # Start the worker processes before measuring
+            verify_batch(pool, serialized, peer_address)
+
+            start = time.perf_counter()
+            for _ in range(batches):
+                verify_batch(pool, serialized, peer_address)
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.stop()
+
+        throughput = batch_size * batches / elapsed
+        baseline = baseline or throughput
+        print(f"{processes:<12} {throughput:>12.0f} {throughput / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
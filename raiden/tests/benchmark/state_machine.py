@@ -0,0 +1,481 @@
+#!/usr/bin/env python
+"""
+Offline benchmark of the state machine hot path.
+
+A synthetic `ChainState` is built with the factories, the node being a
+mediator in every token network. Mediated transfers are then driven through
+`node.state_transition` and the `WriteAheadLog`, backed by a SQLite database
+in a temporary directory, with the same state changes the message handler
+creates for the received messages:
+
+- `ActionInitMediator` for the `LockedTransfer` of the payer,
+- `ReceiveSecretReveal` for the `RevealSecret` of the payee,
+- `ReceiveUnlock` for the `Unlock` of the payer,
+- `ReceiveProcessed` for every message sent by the node,
+
+interleaved with `Block` state changes. The messages are created and signed
+before they are dispatched, outside of the measurements.
+
+Usage: python -m raiden.tests.benchmark.state_machine --channels 100 --in-flight 50
+"""
+import os
+import random
+import resource
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from hashlib import sha256
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import click
+
+from raiden import routing
+from raiden.constants import EMPTY_SIGNATURE, SNAPSHOT_STATE_CHANGES_COUNT
+from raiden.messages.decode import balanceproof_from_envelope, lockedtransfersigned_from_message
+from raiden.messages.metadata import Metadata, RouteMetadata
+from raiden.messages.transfers import Lock, LockedTransfer, Unlock
+from raiden.storage.serialization import JSONSerializer, SerializationBase
+from raiden.storage.sqlite import SerializedSQLiteStorage
+from raiden.storage.wal import WriteAheadLog
+from raiden.tests.utils import factories
+from raiden.transfer import architecture, channel, node, views
+from raiden.transfer.architecture import SendMessageEvent, StateManager
+from raiden.transfer.events import SendProcessed
+from raiden.transfer.mediated_transfer.state_change import ActionInitMediator, ReceiveSecretReveal
+from raiden.transfer.state import (
+    ChainState,
+    HashTimeLockState,
+    HopState,
+    NetworkState,
+    TokenNetworkGraphState,
+    TokenNetworkRegistryState,
+    TokenNetworkState,
+)
+from raiden.transfer.state_change import Block, ReceiveProcessed, ReceiveUnlock
+from raiden.utils.copy import deepcopy
+from raiden.utils.signer import LocalSigner
+from raiden.utils.typing import (
+    Any,
+    BlockGasLimit,
+    BlockNumber,
+    BlockTimeout,
+    ChannelID,
+    Dict,
+    Nonce,
+    Optional,
+    SecretHash,
+    TokenAmount,
+)
+
+REVEAL_TIMEOUT = BlockTimeout(10)
+SETTLE_TIMEOUT = BlockTimeout(500)
+DEPOSIT = TokenAmount(10 ** 12)
+
+
+class Timings:
+    """ Accumulates the time spent in the wrapped functions. """
+
+    def __init__(self):
+        self.totals: Dict[str, float] = defaultdict(float)
+
+    def wrap(self, name, func):
+        totals = self.totals
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                totals[name] += time.perf_counter() - start
+
+        return timed
+
+
+def make_timed_serializer(timings: Timings) -> SerializationBase:
+    timed_serialize = timings.wrap("serialization", JSONSerializer.serialize)
+
+    class TimedSerializer(JSONSerializer):
+        @staticmethod
+        def serialize(obj: Any) -> Any:
+            return timed_serialize(obj)
+
+    return TimedSerializer()
+
+
+def make_chain_state(number_of_token_networks, number_of_channels):
+    """ Returns a chain state with `number_of_channels` open channels in each
+    token network, and the private keys of the partners.
+    """
+    our_address = factories.UNIT_OUR_ADDRESS
+    registry_address = factories.make_token_network_registry_address()
+    partner_keys = dict()
+    token_networks = list()
+
+    for _ in range(number_of_token_networks):
+        token_network_address = factories.make_token_network_address()
+        token_address = factories.make_token_address()
+        token_network = TokenNetworkState(
+            address=token_network_address,
+            token_address=token_address,
+            network_graph=TokenNetworkGraphState(token_network_address),
+        )
+
+        for identifier in range(1, number_of_channels + 1):
+            channel_identifier = ChannelID(identifier)
+            partner_key, partner_address = factories.make_privkey_address()
+            partner_keys[partner_address] = partner_key
+
+            channel_state = factories.create(
+                factories.NettingChannelStateProperties(
+                    canonical_identifier=factories.make_canonical_identifier(
+                        token_network_address=token_network_address,
+                        channel_identifier=channel_identifier,
+                    ),
+                    token_address=token_address,
+                    token_network_registry_address=registry_address,
+                    reveal_timeout=REVEAL_TIMEOUT,
+                    settle_timeout=SETTLE_TIMEOUT,
+                    our_state=factories.NettingChannelEndStateProperties(
+                        address=our_address, balance=DEPOSIT
+                    ),
+                    partner_state=factories.NettingChannelEndStateProperties(
+                        address=partner_address, balance=DEPOSIT
+                    ),
+                )
+            )
+            token_network.channelidentifiers_to_channels[channel_identifier] = channel_state
+            token_network.partneraddresses_to_channelidentifiers[partner_address].append(
+                channel_identifier
+            )
+            token_network.network_graph.network.add_edge(our_address, partner_address)
+
+        token_networks.append(token_network)
+
+    chain_state = ChainState(
+        pseudo_random_generator=random.Random(),
+        block_number=BlockNumber(1),
+        block_hash=factories.make_block_hash(),
+        our_address=our_address,
+        chain_id=factories.UNIT_CHAIN_ID,
+    )
+    registry = TokenNetworkRegistryState(
+        address=registry_address, token_network_list=token_networks
+    )
+    chain_state.identifiers_to_tokennetworkregistries[registry_address] = registry
+    for token_network in token_networks:
+        chain_state.tokennetworkaddresses_to_tokennetworkregistryaddresses[
+            token_network.address
+        ] = registry_address
+    chain_state.nodeaddresses_to_networkstates = {
+        address: NetworkState.REACHABLE for address in partner_keys
+    }
+
+    return chain_state, partner_keys
+
+
+class Payment:
+    """ A mediated transfer from `payer` to `payee` through the node. """
+
+    def __init__(self, payment_identifier, token_network, payer_channel, payee_channel, amount):
+        self.payment_identifier = payment_identifier
+        self.token_network_address = token_network.address
+        self.token_address = token_network.token_address
+        self.payer = payer_channel.partner_state.address
+        self.payee = payee_channel.partner_state.address
+        self.amount = amount
+        self.secret = factories.make_secret()
+        self.secrethash = SecretHash(sha256(self.secret).digest())
+        self.lock_state: Optional[HashTimeLockState] = None
+        self.steps = deque((self.locked_transfer, self.secret_reveal, self.unlock))
+
+    def payer_channel(self, chain_state):
+        return views.get_channelstate_by_token_network_and_partner(
+            chain_state, self.token_network_address, self.payer
+        )
+
+    def locked_transfer(self, chain_state, partner_keys):
+        payer_channel = self.payer_channel(chain_state)
+        partner_state = payer_channel.partner_state
+        _, nonce, transferred_amount, locked_amount = channel.get_current_balanceproof(
+            partner_state
+        )
+
+        lock = Lock(
+            amount=self.amount,
+            expiration=chain_state.block_number + 5 * REVEAL_TIMEOUT,
+            secrethash=self.secrethash,
+        )
+        self.lock_state = HashTimeLockState(lock.amount, lock.expiration, lock.secrethash)
+        pending_locks = channel.compute_locks_with(partner_state.pending_locks, self.lock_state)
+        assert pending_locks is not None, "The lock of the payment must be new"
+
+        message = LockedTransfer(
+            chain_id=payer_channel.chain_id,
+            message_identifier=factories.make_message_identifier(),
+            payment_identifier=self.payment_identifier,
+            nonce=Nonce(nonce + 1),
+            token_network_address=self.token_network_address,
+            token=self.token_address,
+            channel_identifier=payer_channel.identifier,
+            transferred_amount=transferred_amount,
+            locked_amount=locked_amount + self.amount,
+            recipient=chain_state.our_address,
+            locksroot=channel.compute_locksroot(pending_locks),
+            lock=lock,
+            target=self.payee,
+            initiator=self.payer,
+            metadata=Metadata(routes=[RouteMetadata(route=[chain_state.our_address, self.payee])]),
+            signature=EMPTY_SIGNATURE,
+        )
+        message.sign(LocalSigner(partner_keys[self.payer]))
+
+        # Same as `MessageHandler.handle_message_lockedtransfer`
+        from_transfer = lockedtransfersigned_from_message(message)
+        return ActionInitMediator(
+            from_hop=HopState(message.sender, payer_channel.identifier),
+            route_states=routing.resolve_routes(
+                routes=message.metadata.routes,
+                token_network_address=self.token_network_address,
+                chain_state=chain_state,
+            ),
+            from_transfer=from_transfer,
+            balance_proof=from_transfer.balance_proof,
+            sender=from_transfer.balance_proof.sender,
+        )
+
+    def secret_reveal(self, chain_state, partner_keys):  # pylint: disable=unused-argument
+        return ReceiveSecretReveal(secret=self.secret, sender=self.payee)
+
+    def unlock(self, chain_state, partner_keys):
+        payer_channel = self.payer_channel(chain_state)
+        partner_state = payer_channel.partner_state
+        _, nonce, transferred_amount, locked_amount = channel.get_current_balanceproof(
+            partner_state
+        )
+        assert self.lock_state is not None, "The locked transfer must be sent first"
+        pending_locks = channel.compute_locks_without(
+            partner_state.pending_locks, self.lock_state.encoded
+        )
+        assert pending_locks is not None, "The lock of the payment must be pending"
+
+        message = Unlock(
+            chain_id=payer_channel.chain_id,
+            message_identifier=factories.make_message_identifier(),
+            payment_identifier=self.payment_identifier,
+            nonce=Nonce(nonce + 1),
+            token_network_address=self.token_network_address,
+            channel_identifier=payer_channel.identifier,
+            transferred_amount=transferred_amount + self.amount,
+            locked_amount=locked_amount - self.amount,
+            locksroot=channel.compute_locksroot(pending_locks),
+            secret=self.secret,
+            signature=EMPTY_SIGNATURE,
+        )
+        message.sign(LocalSigner(partner_keys[self.payer]))
+
+        # Same as `MessageHandler.handle_message_unlock`
+        balance_proof = balanceproof_from_envelope(message)
+        return ReceiveUnlock(
+            message_identifier=message.message_identifier,
+            secret=message.secret,
+            balance_proof=balance_proof,
+            sender=balance_proof.sender,
+        )
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def print_latencies(latencies):
+    print(
+        f"{'state change':<24} {'count':>8} {'p50':>10} {'p90':>10} "
+        f"{'p99':>10} {'max':>10}  (milliseconds)"
+    )
+    all_latencies = [value for values in latencies.values() for value in values]
+    for name, values in sorted(latencies.items()) + [("total", all_latencies)]:
+        values = sorted(values)
+        print(
+            f"{name:<24} {len(values):>8} "
+            f"{percentile(values, 50) * 1e3:>10.3f} {percentile(values, 90) * 1e3:>10.3f} "
+            f"{percentile(values, 99) * 1e3:>10.3f} {values[-1] * 1e3:>10.3f}"
+        )
+
+
+@click.command()
+@click.option("--token-networks", default=1, help="Number of token networks")
+@click.option("--channels", default=100, help="Number of channels per token network")
+@click.option("--in-flight", default=20, help="Number of payments being mediated at once")
+@click.option("--payments", default=1000, help="Total number of payments to mediate")
+@click.option("--state-changes-per-block", default=100, help="Frequency of Block state changes")
+@click.option(
+    "--snapshot-every",
+    default=SNAPSHOT_STATE_CHANGES_COUNT,
+    help="Take a snapshot every n state changes, 0 disables snapshots",
+)
+@click.option("--trace-memory", is_flag=True, help="Trace the allocations with tracemalloc")
+@click.option("--seed", default=0, help="Seed used to pick the channels of the payments")
+def main(
+    token_networks,
+    channels,
+    in_flight,
+    payments,
+    state_changes_per_block,
+    snapshot_every,
+    trace_memory,
+    seed,
+):
+    # pylint: disable=too-many-locals,too-many-statements
+    assert channels >= 2, "Mediation requires at least two channels"
+    rng = random.Random(seed)
+
+    if trace_memory:
+        tracemalloc.start()
+
+    chain_state, partner_keys = make_chain_state(token_networks, channels)
+    token_network_states = [
+        token_network
+        for registry in chain_state.identifiers_to_tokennetworkregistries.values()
+        for token_network in registry.token_network_list
+    ]
+
+    timings = Timings()
+    # The module attribute is replaced, so the copy done by `StateManager.dispatch` is measured
+    architecture.deepcopy = timings.wrap("deepcopy", deepcopy)
+    state_manager = StateManager(
+        timings.wrap("state transition", node.state_transition), chain_state
+    )
+
+    with TemporaryDirectory() as tmpdir:
+        database_path = os.path.join(tmpdir, "benchmark.db")
+        storage = SerializedSQLiteStorage(Path(database_path), make_timed_serializer(timings))
+        wal = WriteAheadLog(state_manager, storage)
+
+        def start_payment(payment_identifier):
+            token_network = rng.choice(token_network_states)
+            payer_channel, payee_channel = rng.sample(
+                list(token_network.channelidentifiers_to_channels.values()), 2
+            )
+            return Payment(
+                payment_identifier=payment_identifier,
+                token_network=token_network,
+                payer_channel=payer_channel,
+                payee_channel=payee_channel,
+                amount=rng.randint(1, 100),
+            )
+
+        # The work queue interleaves the steps of the in-flight payments and
+        # the acknowledgments of the messages sent by the node
+        work = deque(
+            start_payment(identifier) for identifier in range(1, min(in_flight, payments) + 1)
+        )
+        started = len(work)
+        finished = 0
+
+        latencies = defaultdict(list)
+        invalid_events: Dict[str, int] = defaultdict(int)
+        snapshot_times = list()
+
+        def dispatch(state_change):
+            start = time.perf_counter()
+            _, (events,) = wal.log_and_dispatch([state_change])
+            latencies[type(state_change).__name__].append(time.perf_counter() - start)
+
+            for event in events:
+                if type(event).__name__.startswith("EventInvalid"):
+                    invalid_events[type(event).__name__] += 1
+                elif isinstance(event, SendMessageEvent) and not isinstance(event, SendProcessed):
+                    work.append(ReceiveProcessed(event.recipient, event.message_identifier))
+
+        state_change_qty = 0
+        while work:
+            item = work.popleft()
+
+            if isinstance(item, Payment):
+                step = item.steps.popleft()
+                state_change = step(state_manager.current_state, partner_keys)
+                if item.steps:
+                    work.append(item)
+                else:
+                    finished += 1
+                    if started < payments:
+                        started += 1
+                        work.append(start_payment(started))
+            else:
+                state_change = item
+
+            dispatch(state_change)
+            state_change_qty += 1
+
+            if state_change_qty % state_changes_per_block == 0:
+                assert state_manager.current_state is not None, "The state was initialized"
+                dispatch(
+                    Block(
+                        block_number=BlockNumber(state_manager.current_state.block_number + 1),
+                        gas_limit=BlockGasLimit(1),
+                        block_hash=factories.make_block_hash(),
+                    )
+                )
+
+            if snapshot_every and state_change_qty % snapshot_every == 0:
+                # The snapshot is not part of the dispatch, its serialization
+                # must not be accounted for in the shares
+                serialization_time = timings.totals["serialization"]
+                start = time.perf_counter()
+                wal.snapshot(state_change_qty)
+                snapshot_times.append(time.perf_counter() - start)
+                timings.totals["serialization"] = serialization_time
+
+        database_size = os.path.getsize(database_path)
+        storage.close()
+
+    assert state_manager.current_state is not None, "The state was initialized"
+    pending_tasks = len(state_manager.current_state.payment_mapping.secrethashes_to_task)
+    dispatch_qty = sum(len(values) for values in latencies.values())
+    dispatch_time = sum(sum(values) for values in latencies.values())
+
+    print(
+        f"{token_networks} token network(s), {channels} channels each, "
+        f"{in_flight} payments in flight, {finished} payments mediated"
+    )
+    print()
+    print_latencies(latencies)
+    print()
+    print(f"dispatch throughput      {dispatch_qty / dispatch_time:>10.1f} state changes/s")
+    print(f"payment throughput       {finished / dispatch_time:>10.1f} payments/s")
+    for name in ("deepcopy", "state transition", "serialization"):
+        share = timings.totals[name] / dispatch_time * 100
+        print(f"{name + ' share':<24} {share:>10.1f} %")
+    sqlite_share = 100 - sum(timings.totals.values()) / dispatch_time * 100
+    print(f"{'sqlite and other share':<24} {sqlite_share:>10.1f} %")
+    if snapshot_times:
+        print(
+            f"snapshots                {len(snapshot_times):>10} "
+            f"(mean {sum(snapshot_times) / len(snapshot_times) * 1e3:.3f} ms, "
+            f"not included in the dispatch time)"
+        )
+    print()
+    print(f"database size            {database_size / 2 ** 20:>10.2f} MiB")
+    print(
+        f"max RSS                  "
+        f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10:>10.2f} MiB"
+    )
+    if trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        print(
+            f"traced memory            {current / 2 ** 20:>10.2f} MiB "
+            f"(peak {peak / 2 ** 20:.2f} MiB)"
+        )
+
+    if pending_tasks:
+        print(f"WARNING: {pending_tasks} payment tasks were not cleared")
+    for name, count in invalid_events.items():
+        print(f"WARNING: {count} {name} events")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
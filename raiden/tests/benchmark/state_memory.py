@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+Measures the memory footprint of a large synthetic `ChainState` and the cost
+of copying it, which is done with pickle on every state change.
+
+Every channel of the chain state built by the state machine benchmark gets
+`--locks` pending locks, as many unlocked locks, a signed balance proof from
+the partner and a queued `SendProcessed` per lock.
+
+The first table compares the per instance size of the slotted state classes
+with the size the same fields take in an instance with a `__dict__`.
+
+Usage: python -m raiden.tests.benchmark.state_memory --channels 100 --locks 10
+"""
+import pickle
+import sys
+import tracemalloc
+from dataclasses import fields
+
+import click
+
+from raiden.tests.benchmark.state_machine import make_chain_state
+from raiden.tests.benchmark.utils import measure
+from raiden.tests.utils import factories
+from raiden.transfer import channel
+from raiden.transfer.events import SendProcessed
+from raiden.transfer.identifiers import QueueIdentifier
+from raiden.transfer.state import (
+    HashTimeLockState,
+    HopState,
+    RouteState,
+    TransactionExecutionStatus,
+    UnlockPartialProofState,
+)
+from raiden.utils.copy import deepcopy
+from raiden.utils.typing import BlockExpiration, BlockNumber, ChannelID, PaymentWithFeeAmount
+
+
+class WithDict:
+    """ Holds the fields of a dataclass instance in a `__dict__`. """
+
+    def __init__(self, instance):
+        for field in fields(instance):
+            setattr(self, field.name, getattr(instance, field.name))
+
+
+def instance_size(instance):
+    size = sys.getsizeof(instance)
+    if hasattr(instance, "__dict__"):
+        size += sys.getsizeof(instance.__dict__)
+    return size
+
+
+def make_instances():
+    lock = factories.make_lock()
+    return [
+        factories.UNIT_CANONICAL_ID,
+        QueueIdentifier(factories.make_address(), factories.UNIT_CANONICAL_ID),
+        lock,
+        UnlockPartialProofState(lock, factories.make_secret()),
+        factories.create(factories.BalanceProofProperties()),
+        factories.create(factories.BalanceProofSignedStateProperties()),
+        factories.create(factories.LockedTransferSignedStateProperties()),
+        RouteState(route=[factories.make_address()], forward_channel_id=ChannelID(1)),
+        HopState(factories.make_address(), ChannelID(1)),
+        TransactionExecutionStatus(started_block_number=BlockNumber(1)),
+    ]
+
+
+def fill_channels(chain_state, number_of_locks):
+    for registry in chain_state.identifiers_to_tokennetworkregistries.values():
+        for token_network in registry.tokennetworkaddresses_to_tokennetworks.values():
+            for channel_state in token_network.channelidentifiers_to_channels.values():
+                partner_state = channel_state.partner_state
+                queue_identifier = QueueIdentifier(
+                    recipient=partner_state.address,
+                    canonical_identifier=channel_state.canonical_identifier,
+                )
+                queue = chain_state.queueids_to_queues.setdefault(queue_identifier, [])
+
+                for _ in range(number_of_locks):
+                    secret, secrethash = factories.make_secret_with_hash()
+                    lock = HashTimeLockState(
+                        amount=PaymentWithFeeAmount(1),
+                        expiration=BlockExpiration(factories.make_block_number()),
+                        secrethash=secrethash,
+                    )
+                    partner_state.secrethashes_to_lockedlocks[secrethash] = lock
+                    partner_state.pending_locks = channel.compute_locks_with(
+                        partner_state.pending_locks, lock
+                    )
+
+                    secret, secrethash = factories.make_secret_with_hash()
+                    unlocked_lock = HashTimeLockState(
+                        amount=PaymentWithFeeAmount(1),
+                        expiration=BlockExpiration(factories.make_block_number()),
+                        secrethash=secrethash,
+                    )
+                    partner_state.secrethashes_to_unlockedlocks[
+                        secrethash
+                    ] = UnlockPartialProofState(unlocked_lock, secret)
+
+                    queue.append(
+                        SendProcessed(
+                            recipient=partner_state.address,
+                            message_identifier=factories.make_message_identifier(),
+                            canonical_identifier=channel_state.canonical_identifier,
+                        )
+                    )
+
+                partner_state.balance_proof = factories.create(
+                    factories.BalanceProofSignedStateProperties(
+                        canonical_identifier=channel_state.canonical_identifier,
+                        sender=partner_state.address,
+                    )
+                )
+
+
+@click.command()
+@click.option("--token-networks", default=1, help="Number of token networks")
+@click.option("--channels", default=100, help="Number of channels per token network")
+@click.option("--locks", default=10, help="Number of pending and unlocked locks per channel")
+@click.option("--number", default=10, help="Number of copies per measurement")
+def main(token_networks, channels, locks, number):
+    print(f"{'instance size':<40} {'__dict__':>12} {'__slots__':>12} {'saved':>9}")
+    for instance in make_instances():
+        assert not hasattr(instance, "__dict__"), f"{type(instance).__name__} has a __dict__"
+
+        baseline = instance_size(WithDict(instance))
+        slotted = instance_size(instance)
+        name = type(instance).__name__
+        print(f"{name:<40} {baseline:>11}B {slotted:>11}B {1 - slotted / baseline:>8.0%}")
+
+    tracemalloc.start()
+    chain_state, _ = make_chain_state(token_networks, channels)
+    fill_channels(chain_state, locks)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    pickled = pickle.dumps(chain_state, pickle.HIGHEST_PROTOCOL)
+    assert deepcopy(chain_state) == chain_state, "The copy differs"
+
+    dumps = measure(lambda: pickle.dumps(chain_state, pickle.HIGHEST_PROTOCOL), number=number)
+    loads = measure(lambda: pickle.loads(pickled), number=number)
+
+    print()
+    print(f"{'chain state':<40} {'value':>12}")
+    print(f"{'allocated':<40} {allocated / 2 ** 20:>10.2f}MB")
+    print(f"{'pickled':<40} {len(pickled) / 2 ** 20:>10.2f}MB")
+    print(f"{'pickle.dumps':<40} {dumps * 1e3:>10.2f}ms")
+    print(f"{'pickle.loads':<40} {loads * 1e3:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -1,3 +1,6 @@
+import timeit
+
+
 def print_serialization(pstats):  # pylint: disable=too-many-locals
     print("ncalls         tottime  percall  %    cumtime  percall  function")
     total_pct = 0.0
@@ -42,3 +45,14 @@ def print_slow_path(pstats):
 
 def print_slow_function(pstats):
     pstats.strip_dirs().sort_stats("time").print_stats(15)
+
+
+def measure(func, number=1000, repeat=5):
+    """ Returns the best time per call of `func` in seconds. """
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def print_comparison(name, baseline, candidate):
+    speedup = baseline / candidate if candidate else float("inf")
+    print(f"{name:<40} {baseline * 1e6:>12.2f}us {candidate * 1e6:>12.2f}us {speedup:>8.2f}x")
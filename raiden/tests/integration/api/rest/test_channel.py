@@ -7,6 +7,7 @@
 
 from raiden.api.rest import APIServer
 from raiden.constants import BLOCK_ID_LATEST, NULL_ADDRESS_HEX
+from raiden.settings import MAX_CHANNEL_BATCH_SIZE
 from raiden.tests.integration.api.rest.test_rest import DEPOSIT_FOR_TEST_API_DEPOSIT_LIMIT
 from raiden.tests.integration.api.rest.utils import (
     api_url_for,
@@ -337,6 +338,38 @@ def test_api_channel_open_and_deposit_race(
     assert channel_info["total_deposit"] == str(deposit_amount)
 
 
+@raise_on_failure
+@pytest.mark.parametrize("number_of_nodes", [1])
+@pytest.mark.parametrize("channels_per_node", [0])
+@pytest.mark.parametrize("enable_rest_api", [True])
+def test_api_channel_list_conditional_get(
+    api_server_test_instance: APIServer, token_addresses, reveal_timeout
+):
+    url = api_url_for(api_server_test_instance, "channelsresource")
+    response = grequests.get(url).send().response
+    assert_proper_response(response, HTTPStatus.OK)
+    assert get_json_response(response) == []
+    etag = response.headers["ETag"]
+
+    response = grequests.get(url, headers={"If-None-Match": etag}).send().response
+    assert_response_with_code(response, HTTPStatus.NOT_MODIFIED)
+
+    channel_data_obj = {
+        "partner_address": "0x61C808D82A3Ac53231750daDc13c777b59310bD9",
+        "token_address": to_checksum_address(token_addresses[0]),
+        "settle_timeout": str(1650),
+        "reveal_timeout": str(reveal_timeout),
+    }
+    response = grequests.put(url, json=channel_data_obj).send().response
+    assert_proper_response(response, HTTPStatus.CREATED)
+
+    # The new channel is a state change, the cached response is outdated
+    response = grequests.get(url, headers={"If-None-Match": etag}).send().response
+    assert_proper_response(response, HTTPStatus.OK)
+    assert len(get_json_response(response)) == 1
+    assert response.headers["ETag"] != etag
+
+
 @raise_on_failure
 @pytest.mark.parametrize("number_of_nodes", [1])
 @pytest.mark.parametrize("channels_per_node", [0])
@@ -531,6 +564,141 @@ def test_api_channel_open_channel_invalid_input(
     assert_response_with_error(response, status_code=HTTPStatus.CONFLICT)
 
 
+@raise_on_failure
+@pytest.mark.parametrize("number_of_nodes", [1])
+@pytest.mark.parametrize("channels_per_node", [0])
+@pytest.mark.parametrize("enable_rest_api", [True])
+def test_api_channel_batch_open(api_server_test_instance: APIServer, token_addresses):
+    token_address = token_addresses[0]
+    existing_partner = to_checksum_address(factories.make_address())
+    request = grequests.put(
+        api_url_for(api_server_test_instance, "channelsresource"),
+        json={
+            "partner_address": existing_partner,
+            "token_address": to_checksum_address(token_address),
+        },
+    )
+    assert_proper_response(request.send().response, HTTPStatus.CREATED)
+
+    funded_partner = to_checksum_address(factories.make_address())
+    unfunded_partner = to_checksum_address(factories.make_address())
+    request = grequests.put(
+        api_url_for(api_server_test_instance, "channelbatchresource"),
+        json={
+            "token_address": to_checksum_address(token_address),
+            "channels": [
+                {"partner_address": funded_partner, "total_deposit": "100"},
+                {"partner_address": unfunded_partner},
+                {"partner_address": existing_partner, "total_deposit": "100"},
+            ],
+        },
+    )
+    response = request.send().response
+    assert_proper_response(response, HTTPStatus.CREATED)
+    channels = {
+        channel["partner_address"]: channel for channel in get_json_response(response)["channels"]
+    }
+
+    assert channels[funded_partner]["deposited"] is True
+    assert channels[funded_partner]["total_deposit"] == "100"
+    assert channels[funded_partner]["errors"] is None
+    assert channels[unfunded_partner]["deposited"] is False
+    assert channels[unfunded_partner]["total_deposit"] == "0"
+    assert channels[unfunded_partner]["errors"] is None
+    assert {
+        channels[funded_partner]["channel_identifier"],
+        channels[unfunded_partner]["channel_identifier"],
+    } == {"2", "3"}
+
+    # An existing channel does not fail the others
+    assert channels[existing_partner]["channel_identifier"] is None
+    assert channels[existing_partner]["deposited"] is False
+    assert "already exists" in channels[existing_partner]["errors"]
+
+    for partner_address, total_deposit in [(funded_partner, "100"), (unfunded_partner, "0")]:
+        request = grequests.get(
+            api_url_for(
+                api_server_test_instance,
+                "channelsresourcebytokenandpartneraddress",
+                token_address=token_address,
+                partner_address=partner_address,
+            )
+        )
+        response = request.send().response
+        assert_proper_response(response)
+        json_response = get_json_response(response)
+        assert json_response["state"] == ChannelState.STATE_OPENED.value
+        assert json_response["total_deposit"] == total_deposit
+
+
+@raise_on_failure
+@pytest.mark.parametrize("number_of_nodes", [1])
+@pytest.mark.parametrize("channels_per_node", [0])
+@pytest.mark.parametrize("enable_rest_api", [True])
+def test_api_channel_batch_open_invalid_input(
+    api_server_test_instance: APIServer, token_addresses
+):
+    token_address = to_checksum_address(token_addresses[0])
+    partner_address = to_checksum_address(factories.make_address())
+
+    def batch_open(channel_batch_data_obj):
+        request = grequests.put(
+            api_url_for(api_server_test_instance, "channelbatchresource"),
+            json=channel_batch_data_obj,
+        )
+        return request.send().response
+
+    channel_data_obj = {"partner_address": partner_address}
+    invalid_requests = [
+        # No channels
+        {"token_address": token_address, "channels": []},
+        # A partner twice
+        {"token_address": token_address, "channels": [channel_data_obj, channel_data_obj]},
+        # Invalid partner address
+        {"token_address": token_address, "channels": [{"partner_address": "0x1234"}]},
+        # Too many channels
+        {
+            "token_address": token_address,
+            "channels": [
+                {"partner_address": to_checksum_address(factories.make_address())}
+                for _ in range(MAX_CHANNEL_BATCH_SIZE + 1)
+            ],
+        },
+    ]
+    for channel_batch_data_obj in invalid_requests:
+        assert_response_with_error(
+            batch_open(channel_batch_data_obj), status_code=HTTPStatus.BAD_REQUEST
+        )
+
+    # Too low a settle timeout
+    response = batch_open(
+        {
+            "token_address": token_address,
+            "channels": [{"partner_address": partner_address}],
+            "settle_timeout": str(TEST_SETTLE_TIMEOUT_MIN - 1),
+        }
+    )
+    assert_response_with_error(response, status_code=HTTPStatus.CONFLICT)
+
+    # Unknown token
+    response = batch_open(
+        {
+            "token_address": to_checksum_address(factories.make_address()),
+            "channels": [{"partner_address": partner_address}],
+        }
+    )
+    assert_response_with_error(response, status_code=HTTPStatus.CONFLICT)
+
+    # More than the balance
+    response = batch_open(
+        {
+            "token_address": token_address,
+            "channels": [{"partner_address": partner_address, "total_deposit": str(2 ** 200)}],
+        }
+    )
+    assert_response_with_error(response, status_code=HTTPStatus.PAYMENT_REQUIRED)
+
+
 @raise_on_failure
 @pytest.mark.parametrize("number_of_nodes", [1])
 @pytest.mark.parametrize("channels_per_node", [0])
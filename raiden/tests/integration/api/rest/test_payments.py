@@ -1,6 +1,7 @@
 from hashlib import sha256
 from http import HTTPStatus
 
+import gevent
 import grequests
 import pytest
 from eth_utils import decode_hex, encode_hex, to_bytes, to_checksum_address, to_hex
@@ -134,6 +135,54 @@ def test_api_payments(
     assert all("TimestampedEvent" in event for event in events)
 
 
+@raise_on_failure
+@pytest.mark.parametrize("number_of_nodes", [2])
+@pytest.mark.parametrize("enable_rest_api", [True])
+def test_api_payment_tasks(api_server_test_instance: APIServer, raiden_network, token_addresses):
+    _, app1 = raiden_network
+    token_address = token_addresses[0]
+    target_address = app1.raiden.address
+
+    request = grequests.post(
+        api_url_for(
+            api_server_test_instance,
+            "token_target_paymentresource",
+            token_address=to_checksum_address(token_address),
+            target_address=to_checksum_address(target_address),
+        ),
+        json={"amount": "100", "identifier": "42"},
+    )
+    with watch_for_unlock_failures(*raiden_network):
+        response = request.send().response
+    assert_proper_response(response)
+    secret_hash = get_json_response(response)["secret_hash"]
+
+    # The initiator task is archived once the unlock is sent
+    with gevent.Timeout(10):
+        while True:
+            request = grequests.get(
+                api_url_for(
+                    api_server_test_instance, "paymenttasksresource", secret_hash=secret_hash
+                )
+            )
+            response = request.send().response
+            assert_proper_response(response)
+            json_response = get_json_response(response)
+            if json_response["archived"]:
+                break
+            gevent.sleep(0.1)
+
+    assert json_response["live"] is None
+    (archived,) = json_response["archived"]
+    assert archived["task"]["_type"].endswith("InitiatorTask")
+
+    request = grequests.get(
+        api_url_for(api_server_test_instance, "paymenttasksresource", secret_hash="0x123")
+    )
+    response = request.send().response
+    assert_proper_response(response, status_code=HTTPStatus.BAD_REQUEST)
+
+
 @raise_on_failure
 @pytest.mark.parametrize("number_of_nodes", [2])
 @pytest.mark.parametrize("enable_rest_api", [True])
@@ -476,6 +525,62 @@ def test_api_payments_conflicts(
     assert all(response.status_code == HTTPStatus.OK for response in responses)
 
 
+@raise_on_failure
+@pytest.mark.parametrize("number_of_nodes", [2])
+@pytest.mark.parametrize("enable_rest_api", [True])
+def test_api_payment_batch(
+    api_server_test_instance: APIServer, raiden_network, token_addresses, deposit
+):
+    _, app1 = raiden_network
+    token_address = to_checksum_address(token_addresses[0])
+    target_address = to_checksum_address(app1.raiden.address)
+
+    # The last payment fails since the channel was drained by the others
+    amounts = ["5"] * 10 + ["0", str(deposit)]
+    payments = [
+        {"token_address": token_address, "target_address": target_address, "amount": amount}
+        for amount in amounts
+    ]
+
+    request = grequests.post(
+        api_url_for(api_server_test_instance, "paymentbatchesresource"),
+        json={"payments": payments, "max_concurrency": 3},
+    )
+    with watch_for_unlock_failures(*raiden_network):
+        response = request.send().response
+        assert_proper_response(response, status_code=HTTPStatus.ACCEPTED)
+        batch_identifier = get_json_response(response)["batch_identifier"]
+
+        batch_url = api_url_for(
+            api_server_test_instance, "paymentbatchresource", batch_identifier=batch_identifier
+        )
+        with gevent.Timeout(30):
+            while True:
+                response = grequests.get(batch_url).send().response
+                assert_proper_response(response)
+                json_response = get_json_response(response)
+                if json_response["finished"]:
+                    break
+                gevent.sleep(0.1)
+
+    assert json_response["summary"] == {"pending": 0, "success": 10, "failed": 2}
+    results = json_response["payments"]
+    assert all(result["status"] == "success" for result in results[:10])
+    assert len({result["identifier"] for result in results[:10]}) == 10
+    for result in results[:10]:
+        assert sha256_secrethash(Secret(decode_hex(result["secret"]))) == decode_hex(
+            result["secret_hash"]
+        )
+    assert [result["status"] for result in results[10:]] == ["failed", "failed"]
+    assert results[10]["errors"] == "Amount negative"
+
+    request = grequests.get(
+        api_url_for(api_server_test_instance, "paymentbatchresource", batch_identifier=0)
+    )
+    response = request.send().response
+    assert_response_with_error(response, status_code=HTTPStatus.NOT_FOUND)
+
+
 @raise_on_failure
 @pytest.mark.parametrize("number_of_nodes", [2])
 @pytest.mark.parametrize("enable_rest_api", [True])
@@ -35,6 +35,7 @@
 from raiden.transfer import views
 from raiden.transfer.mediated_transfer.initiator import calculate_fee_margin
 from raiden.transfer.state import ChannelState
+from raiden.utils import metrics
 from raiden.utils.secrethash import sha256_secrethash
 from raiden.utils.system import get_system_spec
 from raiden.utils.typing import FeeAmount, PaymentAmount, PaymentID
@@ -190,6 +191,44 @@ def test_api_get_raiden_version(api_server_test_instance: APIServer):
     assert get_json_response(response) == {"version": raiden_version}
 
 
+@raise_on_failure
+@pytest.mark.parametrize("enable_rest_api", [True])
+def test_api_get_metrics(api_server_test_instance: APIServer):
+    request = grequests.get(api_url_for(api_server_test_instance, "metricsresource"))
+    response = request.send().response
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["Content-Type"] == metrics.CONTENT_TYPE
+
+    assert "# TYPE raiden_state_change_dispatch_seconds histogram" in response.text
+    assert 'raiden_state_changes_total{type="Block"}' in response.text
+
+
+@raise_on_failure
+@pytest.mark.parametrize("enable_rest_api", [True])
+def test_api_profiler(api_server_test_instance: APIServer):
+    profiler_url = api_url_for(api_server_test_instance, "profilerresource")
+
+    response = grequests.delete(profiler_url).send().response
+    assert_response_with_error(response, HTTPStatus.CONFLICT)
+
+    response = grequests.post(profiler_url, json={"interval": 0.5}).send().response
+    assert_proper_response(response, HTTPStatus.CREATED)
+    assert get_json_response(response) == {"interval": 0.5, "duration": 60}
+
+    response = grequests.post(profiler_url).send().response
+    assert_response_with_error(response, HTTPStatus.CONFLICT)
+
+    response = grequests.post(profiler_url, json={"duration": 0}).send().response
+    assert_response_with_error(response, HTTPStatus.BAD_REQUEST)
+
+    response = grequests.delete(profiler_url).send().response
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["Content-Type"].startswith("text/plain")
+
+    response = grequests.get(profiler_url).send().response
+    assert response.status_code == HTTPStatus.OK
+
+
 @raise_on_failure
 @pytest.mark.parametrize("number_of_nodes", [1])
 @pytest.mark.parametrize("channels_per_node", [0])
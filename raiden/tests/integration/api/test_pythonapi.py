@@ -7,12 +7,14 @@
 from raiden import waiting
 from raiden.api.python import RaidenAPI
 from raiden.app import App
-from raiden.constants import UINT256_MAX, Environment
+from raiden.constants import BLOCK_ID_LATEST, UINT256_MAX, Environment
 from raiden.exceptions import (
     AlreadyRegisteredTokenAddress,
     DepositMismatch,
     DepositOverLimit,
+    DuplicatedChannelError,
     InsufficientEth,
+    InsufficientFunds,
     InsufficientGasReserve,
     InvalidBinaryAddress,
     InvalidSettleTimeout,
@@ -863,3 +865,82 @@ def test_same_addresses_for_payment(raiden_network, token_addresses):
             target=app0.raiden.address,
             amount=PaymentAmount(1),
         )
+
+
+def is_locked(lock) -> bool:
+    """ Whether another greenlet holds `lock`, which may be reentrant. """
+
+    def try_acquire():
+        if lock.acquire(blocking=False):
+            lock.release()
+            return False
+        return True
+
+    return gevent.spawn(try_acquire).get()
+
+
+@raise_on_failure
+@pytest.mark.parametrize("number_of_nodes", [3])
+@pytest.mark.parametrize("channels_per_node", [0])
+def test_raidenapi_channel_batch_open(raiden_network, token_addresses):
+    app0, app1, app2 = raiden_network
+    api0 = RaidenAPI(app0.raiden)
+    registry_address = app0.raiden.default_registry.address
+    token_address = token_addresses[0]
+    token_network_address = views.get_token_network_address_by_token_address(
+        views.state_from_app(app0), registry_address, token_address
+    )
+    assert token_network_address
+
+    api0.channel_open(registry_address, token_address, app1.raiden.address)
+
+    unfunded_partner = make_address()
+    partners_total_deposits = {
+        app1.raiden.address: TokenAmount(10),
+        app2.raiden.address: TokenAmount(10),
+        unfunded_partner: TokenAmount(0),
+    }
+    results = api0.channel_batch_open(
+        registry_address=registry_address,
+        token_address=token_address,
+        partners_total_deposits=partners_total_deposits,
+    )
+    assert set(results) == set(partners_total_deposits)
+
+    # An existing channel does not fail the others
+    existing_result = results[app1.raiden.address]
+    assert isinstance(existing_result.error, DuplicatedChannelError)
+    assert existing_result.channel_identifier is None
+    assert not existing_result.deposited
+
+    for partner_address in (app2.raiden.address, unfunded_partner):
+        result = results[partner_address]
+        assert result.error is None
+        assert result.deposited is (result.total_deposit > 0)
+
+        channel_state = views.get_channelstate_for(
+            views.state_from_app(app0), registry_address, token_address, partner_address
+        )
+        assert channel_state, "The channel must exist"
+        assert channel_state.identifier == result.channel_identifier
+        assert channel.get_status(channel_state) == ChannelState.STATE_OPENED
+        total_deposit = partners_total_deposits[partner_address]
+        assert channel_state.our_state.contract_balance == int(total_deposit)
+
+    # The locks are released once the channels are done
+    token_network_proxy = app0.raiden.proxy_manager.token_network(
+        token_network_address, BLOCK_ID_LATEST
+    )
+    assert not is_locked(token_network_proxy.token.token_lock)
+    assert not any(
+        is_locked(lock) for lock in token_network_proxy.channel_operations_lock.values()
+    )
+
+    # The deposits are checked for the whole batch
+    balance = token_network_proxy.token.balance_of(app0.raiden.address)
+    with pytest.raises(InsufficientFunds):
+        api0.channel_batch_open(
+            registry_address=registry_address,
+            token_address=token_address,
+            partners_total_deposits={make_address(): TokenAmount(balance + 1)},
+        )
@@ -1,8 +1,11 @@
+from unittest.mock import patch
+
 import gevent
 import pytest
 
 from raiden import routing, waiting
 from raiden.api.python import RaidenAPI
+from raiden.connection_manager import ConnectionManager
 from raiden.exceptions import InvalidAmount
 from raiden.tests.utils.detect_failure import raise_on_failure
 from raiden.tests.utils.transfer import block_offset_timeout, watch_for_unlock_failures
@@ -380,3 +383,50 @@ def test_transfer_after_connect_works(raiden_network, token_addresses):
         target=app0.raiden.address,
     ).payment_done.get()
     assert isinstance(payment_result, EventPaymentSentSuccess)
+
+
+@raise_on_failure
+@pytest.mark.parametrize("number_of_nodes", [4])
+@pytest.mark.parametrize("channels_per_node", [0])
+def test_connect_opens_channels_with_new_partners_at_once(raiden_network, token_addresses):
+    """ The connection manager funds the existing channels one by one and
+    opens the channels with new partners with a single batch.
+    """
+    registry_address = raiden_network[0].raiden.default_registry.address
+    token_address = token_addresses[0]
+    app0, app1, app2, app3 = raiden_network
+    api0 = RaidenAPI(app0.raiden)
+    api1 = RaidenAPI(app1.raiden)
+
+    # app0 has an unfunded channel with app1, app2 and app3 are new partners
+    api1.channel_open(registry_address, token_address, app2.raiden.address)
+    api1.channel_open(registry_address, token_address, app3.raiden.address)
+    api0.channel_open(registry_address, token_address, app1.raiden.address)
+    current_block = app1.raiden.get_block_number()
+    wait_for_block(app0.raiden, current_block, 1)
+
+    with patch.object(
+        ConnectionManager,
+        "_join_new_partners",
+        autospec=True,
+        side_effect=ConnectionManager._join_new_partners,
+    ) as join_new_partners:
+        api0.token_network_connect(
+            registry_address=registry_address,
+            token_address=token_address,
+            funds=TokenAmount(300),
+            initial_channel_target=3,
+            joinable_funds_target=0,
+        )
+
+    assert join_new_partners.call_count == 1
+    _, new_partners = join_new_partners.call_args[0]
+    assert set(new_partners) == {app2.raiden.address, app3.raiden.address}
+
+    for app in (app1, app2, app3):
+        channel_state = views.get_channelstate_for(
+            views.state_from_app(app0), registry_address, token_address, app.raiden.address
+        )
+        assert channel_state, "The channel must exist"
+        assert channel.get_status(channel_state) == ChannelState.STATE_OPENED
+        assert channel_state.our_state.contract_balance == 100
@@ -31,7 +31,7 @@
 from raiden.tests.utils.factories import make_address
 from raiden.utils.formatting import to_hex_address
 from raiden.utils.signer import LocalSigner
-from raiden.utils.typing import Set, T_ChannelID
+from raiden.utils.typing import Set, T_ChannelID, TokenAmount
 from raiden_contracts.constants import (
     TEST_SETTLE_TIMEOUT_MAX,
     TEST_SETTLE_TIMEOUT_MIN,
@@ -978,3 +978,43 @@ def open_channel() -> None:
 
     all_greenlets: Set[Greenlet] = channel_grenlets.union(deposit_greenlets)
     gevent.joinall(set(all_greenlets), raise_error=True)
+
+
+def test_new_netting_channels(token_network_proxy: TokenNetwork) -> None:
+    existing_partner = factories.make_address()
+    token_network_proxy.new_netting_channel(
+        partner=existing_partner,
+        settle_timeout=TEST_SETTLE_TIMEOUT_MIN,
+        given_block_identifier=BLOCK_ID_LATEST,
+    )
+
+    partners_total_deposits = {
+        factories.make_address(): TokenAmount(total_deposit) for total_deposit in [0, 1, 2]
+    }
+    results = token_network_proxy.new_netting_channels(
+        partners_total_deposits={**partners_total_deposits, existing_partner: TokenAmount(1)},
+        settle_timeout=TEST_SETTLE_TIMEOUT_MIN,
+        given_block_identifier=BLOCK_ID_LATEST,
+    )
+
+    # An existing channel does not stop the others
+    assert isinstance(results[existing_partner].error, BrokenPreconditionError)
+    assert results[existing_partner].channel_identifier is None
+
+    for partner, total_deposit in partners_total_deposits.items():
+        result = results[partner]
+        assert result.error is None
+        assert result.deposited is (total_deposit > 0)
+        assert result.channel_identifier == token_network_proxy.get_channel_identifier(
+            participant1=token_network_proxy.node_address,
+            participant2=partner,
+            block_identifier=BLOCK_ID_LATEST,
+        )
+
+        details = token_network_proxy.detail_participants(
+            participant1=token_network_proxy.node_address,
+            participant2=partner,
+            block_identifier=BLOCK_ID_LATEST,
+            channel_identifier=result.channel_identifier,
+        )
+        assert details.our_details.deposit == total_deposit
@@ -11,6 +11,7 @@
 
 from raiden.constants import MATRIX_AUTO_SELECT_SERVER, RoutingMode
 from raiden.exceptions import RaidenError
+from raiden.network import pathfinding
 from raiden.network.pathfinding import PFSInfo, check_pfs_for_production, configure_pfs_or_exit
 from raiden.settings import DEFAULT_PATHFINDING_MAX_FEE
 from raiden.tests.utils.mocks import mocked_json_response
@@ -77,7 +78,7 @@ def test_configure_pfs(service_registry_address, private_keys, web3, contract_ma
     # Asking for auto address
     # To make this deterministic we need to patch the random selection function
     patch_random = patch("raiden.network.pathfinding.get_random_pfs", return_value="http://foo")
-    with patch.object(requests, "get", return_value=response), patch_random:
+    with patch.object(pathfinding.session, "get", return_value=response), patch_random:
         config = configure_pfs_or_exit(
             pfs_url=MATRIX_AUTO_SELECT_SERVER,
             routing_mode=RoutingMode.PFS,
@@ -92,7 +93,7 @@ def test_configure_pfs(service_registry_address, private_keys, web3, contract_ma
 
     # Configuring a valid given address
     given_address = "http://foo"
-    with patch.object(requests, "get", return_value=response):
+    with patch.object(pathfinding.session, "get", return_value=response):
         config = configure_pfs_or_exit(
             pfs_url=given_address,
             routing_mode=RoutingMode.PFS,
@@ -109,7 +110,7 @@ def test_configure_pfs(service_registry_address, private_keys, web3, contract_ma
     # Bad address, should exit the program
     bad_address = "http://badaddress"
     with pytest.raises(RaidenError):
-        with patch.object(requests, "get", side_effect=requests.RequestException()):
+        with patch.object(pathfinding.session, "get", side_effect=requests.RequestException()):
             # Configuring a given address
             _ = configure_pfs_or_exit(
                 pfs_url=bad_address,
@@ -124,7 +125,7 @@ def test_configure_pfs(service_registry_address, private_keys, web3, contract_ma
     # Addresses of token network registries of pfs and client conflict, should exit the client
     response = mocked_json_response(response_data=json_data)
     with pytest.raises(RaidenError):
-        with patch.object(requests, "get", return_value=response):
+        with patch.object(pathfinding.session, "get", return_value=response):
             _ = configure_pfs_or_exit(
                 pfs_url="http://foo",
                 routing_mode=RoutingMode.PFS,
@@ -140,7 +141,7 @@ def test_configure_pfs(service_registry_address, private_keys, web3, contract_ma
     # ChainIDs of pfs and client conflict, should exit the client
     response = mocked_json_response(response_data=json_data)
     with pytest.raises(RaidenError):
-        with patch.object(requests, "get", return_value=response):
+        with patch.object(pathfinding.session, "get", return_value=response):
             configure_pfs_or_exit(
                 pfs_url="http://foo",
                 routing_mode=RoutingMode.PFS,
@@ -154,7 +155,7 @@ def test_configure_pfs(service_registry_address, private_keys, web3, contract_ma
     # Wrong matrix server
     response = mocked_json_response(response_data=json_data)
     with pytest.raises(RaidenError, match="matrix server"):
-        with patch.object(requests, "get", return_value=response):
+        with patch.object(pathfinding.session, "get", return_value=response):
             configure_pfs_or_exit(
                 pfs_url="http://foo",
                 routing_mode=RoutingMode.PFS,
@@ -342,7 +342,7 @@ def test_matrix_message_retry(
     chain_state = raiden_service.wal.state_manager.current_state
 
     retry_queue: _RetryQueue = transport._get_retrier(partner_address)
-    assert bool(retry_queue), "retry_queue not running"
+    assert bool(transport._retry_scheduler), "retry scheduler not running"
 
     # Send the initial message
     message = Processed(message_identifier=0, signature=EMPTY_SIGNATURE)
@@ -139,4 +139,4 @@ def send_transaction(to: Address) -> None:
     )
     msg = "The nonce must increase exactly once per transaciton."
     assert nonce == 100, msg
-    assert nonce == deploy_client._available_nonce, msg
+    assert nonce == deploy_client._nonces.available_nonce, msg
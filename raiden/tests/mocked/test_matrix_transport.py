@@ -1,4 +1,5 @@
 from typing import List, Optional
+from unittest.mock import patch
 
 import gevent
 import pytest
@@ -8,19 +9,29 @@
 from matrix_client.user import User
 
 from raiden.constants import EMPTY_SIGNATURE, Environment
-from raiden.messages.abstract import Message
+from raiden.messages.abstract import Message, SignedMessage
 from raiden.messages.transfers import SecretRequest
 from raiden.network.transport import MatrixTransport
 from raiden.network.transport.matrix import AddressReachability
 from raiden.network.transport.matrix.client import GMatrixHttpApi, Room
-from raiden.network.transport.matrix.transport import RETRY_QUEUE_IDLE_AFTER, _RetryQueue
-from raiden.network.transport.matrix.utils import UserAddressManager
+from raiden.network.transport.matrix.transport import (
+    RETRY_QUEUE_IDLE_AFTER,
+    MessagesQueue,
+    _RetryQueue,
+    _RetryScheduler,
+)
+from raiden.network.transport.matrix.utils import SignatureRecoveryPool, UserAddressManager
 from raiden.settings import MatrixTransportConfig
 from raiden.storage.serialization.serializer import MessageSerializer
 from raiden.tests.utils import factories
-from raiden.tests.utils.factories import make_message_identifier, make_signer
+from raiden.tests.utils.factories import (
+    make_canonical_identifier,
+    make_message_identifier,
+    make_signer,
+)
 from raiden.tests.utils.mocks import MockRaidenService
 from raiden.transfer.identifiers import CANONICAL_IDENTIFIER_UNORDERED_QUEUE, QueueIdentifier
+from raiden.transfer.mediated_transfer.events import SendSecretRequest
 from raiden.utils.formatting import to_hex_address
 from raiden.utils.signer import LocalSigner
 from raiden.utils.typing import Address, BlockExpiration, PaymentAmount, PaymentID, RoomID
@@ -478,6 +489,72 @@ def test_processing_invalid_message_type_json(  # pylint: disable=unused-argumen
     assert not mock_matrix._handle_sync_messages([(room, [event])])
 
 
+def test_signature_recovery_pool(  # pylint: disable=unused-argument
+    mock_matrix, skip_userid_validation, monkeypatch
+):
+    """ Senders recovered by the worker processes must be validated as before """
+    mock_matrix._signature_recovery_pool = SignatureRecoveryPool(processes=2, min_batch_size=2)
+
+    received_messages: List[SignedMessage] = []
+    monkeypatch.setattr(mock_matrix._raiden_service, "on_messages", received_messages.extend)
+
+    def recover_in_node(*args, **kwargs):  # pylint: disable=unused-argument
+        raise AssertionError("The senders must be recovered by the worker processes")
+
+    room, event = make_message_text()
+    forged_message = make_message(sign=False)
+    assert isinstance(forged_message, SecretRequest)
+    forged_message.sign(make_signer())
+    _, forged_event = make_message_text(overwrite_data=MessageSerializer.serialize(forged_message))
+    events = [event, forged_event, make_message_text()[1]]
+
+    # The hub must keep running while the workers recover the senders
+    ticks: List[None] = []
+
+    def tick():
+        while True:
+            ticks.append(None)
+            gevent.sleep(0.001)
+
+    ticker = gevent.spawn(tick)
+    try:
+        with patch("raiden.messages.abstract.recover", side_effect=recover_in_node):
+            assert mock_matrix._handle_sync_messages([(room, events)])
+    finally:
+        ticker.kill()
+        mock_matrix._signature_recovery_pool.stop()
+
+    assert ticks
+    assert len(received_messages) == 2
+    assert all(message.sender == factories.HOP1 for message in received_messages)
+
+
+def test_signature_recovery_pool_is_disabled_when_a_worker_exits():
+    pool = SignatureRecoveryPool(processes=1, min_batch_size=1)
+    messages = [factories.create(factories.LockedTransferProperties()) for _ in range(2)]
+    for message in messages:
+        message.invalidate_cache()
+
+    try:
+        pool.recover_senders(messages[:1])
+        assert messages[0].has_recovered_sender
+
+        pool._workers[0].kill()
+        pool._workers[0].wait()
+        pool.recover_senders(messages[1:])
+        assert not messages[1].has_recovered_sender
+        assert not pool._workers
+
+        # The pool is disabled, no worker is started again
+        pool.recover_senders(messages[1:])
+        assert not messages[1].has_recovered_sender
+        assert not pool._workers
+    finally:
+        pool.stop()
+
+    assert messages[1].sender == messages[0].sender == factories.UNIT_TRANSFER_SENDER
+
+
 @pytest.mark.parametrize("retry_interval_initial", [0.01])
 @pytest.mark.usefixtures("record_sent_messages", "all_peers_reachable")
 def test_retry_queue_does_not_resend_removed_messages(
@@ -495,8 +572,8 @@ def test_retry_queue_does_not_resend_removed_messages(
     # Pretend the Transport greenlet is running
     mock_matrix.greenlet = True
 
-    # This is intentionally not using ``MatrixTransport._get_retrier()`` since we don't want the
-    # greenlet to run but instead manually call its `_check_and_send()` method.
+    # This is intentionally not using ``MatrixTransport._get_retrier()`` and the retry scheduler
+    # is not started, since we want to manually call `_check_and_send()` instead.
     retry_queue = _RetryQueue(transport=mock_matrix, receiver=Address(factories.HOP1))
 
     message = make_message()
@@ -528,28 +605,39 @@ def test_retry_queue_does_not_resend_removed_messages(
     assert len(mock_matrix.sent_messages) == 1  # type: ignore
 
 
+@pytest.fixture
+def retry_scheduler(mock_matrix):
+    # Pretend the Transport greenlet is running
+    mock_matrix.greenlet = True
+    mock_matrix._retry_scheduler.start()
+
+    yield mock_matrix._retry_scheduler
+
+    mock_matrix._stop_event.set()
+    mock_matrix._retry_scheduler.stop()
+
+
 @pytest.mark.parametrize("retry_interval_initial", [0.05])
+@pytest.mark.usefixtures("retry_scheduler")
 def test_retryqueue_idle_terminate(mock_matrix: MatrixTransport, retry_interval_initial: float):
-    """ Ensure ``RetryQueue``s exit if they are idle for too long. """
+    """ Ensure ``RetryQueue``s are discarded if they are idle for too long. """
     retry_queue = mock_matrix._get_retrier(Address(factories.HOP1))
     idle_after = RETRY_QUEUE_IDLE_AFTER * retry_interval_initial
 
     with Timeout(idle_after + (retry_interval_initial * 5)):
-        # Retry
-        while not gevent.joinall({retry_queue.greenlet}, idle_after / 2, raise_error=True):
-            pass
+        while Address(factories.HOP1) in mock_matrix._address_to_retrier:
+            gevent.sleep(retry_interval_initial)
 
-    assert retry_queue.greenlet.ready()
-    assert retry_queue._idle_since == RETRY_QUEUE_IDLE_AFTER
     assert retry_queue.is_idle
 
     retry_queue_2 = mock_matrix._get_retrier(Address(factories.HOP1))
 
-    # Since the initial RetryQueue has exited `get_retrier()` must return a new instance
+    # Since the initial RetryQueue was discarded `get_retrier()` must return a new instance
     assert retry_queue_2 is not retry_queue
 
 
 @pytest.mark.parametrize("retry_interval_initial", [0.05])
+@pytest.mark.usefixtures("retry_scheduler")
 def test_retryqueue_not_idle_with_messages(
     mock_matrix: MatrixTransport, retry_interval_initial: float
 ) -> None:
@@ -569,10 +657,48 @@ def test_retryqueue_not_idle_with_messages(
     # Wait for the idle timeout to expire
     gevent.sleep(idle_after + (retry_interval_initial * 5))
 
-    assert not retry_queue.greenlet.ready()
-    assert retry_queue._idle_since == 0
+    assert retry_queue.message_count == 1
     assert not retry_queue.is_idle
 
     retry_queue_2 = mock_matrix._get_retrier(Address(factories.HOP1))
     # The first queue has never become idle, therefore the same object must be returned
     assert retry_queue is retry_queue_2
+
+
+@pytest.mark.parametrize("retry_interval_initial", [60])
+@pytest.mark.usefixtures("record_sent_messages", "all_peers_reachable")
+def test_retry_scheduler_sends_all_receivers(
+    mock_matrix: MatrixTransport, retry_scheduler: _RetryScheduler
+) -> None:
+    """ A single greenlet sends the queues of all receivers as soon as they are notified. """
+    receivers = [factories.make_address() for _ in range(10)]
+    messages = list()
+    for receiver in receivers:
+        message = make_message()
+        assert isinstance(message, SecretRequest)
+        send_event = SendSecretRequest(
+            recipient=receiver,
+            canonical_identifier=make_canonical_identifier(),
+            message_identifier=message.message_identifier,
+            payment_identifier=message.payment_identifier,
+            amount=message.amount,
+            expiration=message.expiration,
+            secrethash=message.secrethash,
+        )
+        queue_identifier = send_event.queue_identifier
+        mock_matrix._queueids_to_queues[queue_identifier] = [send_event]
+        mock_matrix._send_with_retry(MessagesQueue(queue_identifier, [message]))
+        messages.append((receiver, MessageSerializer.serialize(message)))
+
+    # Nothing is sent before the scheduler runs, and no greenlet exists per receiver
+    assert mock_matrix.sent_messages == []  # type: ignore
+    assert retry_scheduler.greenlet_count == 1
+
+    # The retry interval is way longer than the test, the queues are sent because of the notify
+    with Timeout(1):
+        while len(mock_matrix.sent_messages) < len(messages):  # type: ignore
+            gevent.sleep(0.01)
+
+    assert sorted(mock_matrix.sent_messages) == sorted(messages)  # type: ignore
+    assert all(mock_matrix._get_retrier(receiver).message_count == 1 for receiver in receivers)
+    assert retry_scheduler.greenlet_count == 1
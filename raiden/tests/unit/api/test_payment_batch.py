@@ -0,0 +1,122 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import gevent
+from gevent.event import AsyncResult
+
+from raiden.api.objects import BatchedPayment, BatchedPaymentStatus
+from raiden.api.payment_batch import PaymentBatch
+from raiden.exceptions import InvalidAmount
+from raiden.tests.utils import factories
+from raiden.transfer.events import EventPaymentSentFailed, EventPaymentSentSuccess
+from raiden.utils.secrethash import sha256_secrethash
+from raiden.utils.typing import PaymentAmount
+
+FAILING_AMOUNT = 13
+BROKEN_AMOUNT = 17
+
+
+class PaymentsAPI:
+    def __init__(self):
+        self.raiden = SimpleNamespace(on_error=Mock())
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.route_caches = set()
+
+    def transfer_async(self, amount, target, identifier, batch_route_cache, **kwargs):
+        if amount <= 0:
+            raise InvalidAmount("Amount negative")
+        if amount == BROKEN_AMOUNT:
+            raise RuntimeError("broken")
+
+        self.route_caches.add(batch_route_cache)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        payment_done = AsyncResult()
+
+        def finish():
+            self.in_flight -= 1
+            if amount == FAILING_AMOUNT:
+                payment_done.set(
+                    EventPaymentSentFailed(
+                        token_network_registry_address=kwargs["registry_address"],
+                        token_network_address=factories.make_token_network_address(),
+                        identifier=identifier,
+                        target=target,
+                        reason="no route",
+                    )
+                )
+            else:
+                payment_done.set(
+                    EventPaymentSentSuccess(
+                        token_network_registry_address=kwargs["registry_address"],
+                        token_network_address=factories.make_token_network_address(),
+                        identifier=identifier,
+                        amount=amount,
+                        target=target,
+                        secret=factories.make_secret(),
+                        route=[],
+                    )
+                )
+
+        gevent.spawn_later(0.001, finish)
+        return SimpleNamespace(payment_done=payment_done)
+
+
+def test_payment_batch():
+    raiden_api = PaymentsAPI()
+    token_address = factories.make_token_address()
+    payments = [
+        BatchedPayment(token_address, factories.make_target_address(), PaymentAmount(amount))
+        for amount in [1, 2, FAILING_AMOUNT, 0] + [5] * 20
+    ]
+    batch = PaymentBatch(
+        identifier=1,
+        raiden_api=raiden_api,  # type: ignore
+        registry_address=factories.make_token_network_registry_address(),
+        payments=payments,
+        max_concurrency=4,
+    )
+    assert all(payment.identifier is not None for payment in payments)
+
+    batch.start()
+    assert batch.finished.wait(timeout=5)
+    assert not raiden_api.raiden.on_error.called
+
+    assert raiden_api.max_in_flight == 4
+    assert raiden_api.route_caches == {batch.route_cache}
+    assert batch.summary() == {"pending": 0, "success": 22, "failed": 2}
+
+    success, _, failed, invalid = payments[:4]
+    assert success.status is BatchedPaymentStatus.SUCCESS
+    assert success.secret is not None
+    assert success.secret_hash == sha256_secrethash(success.secret)
+    assert failed.status is BatchedPaymentStatus.FAILED
+    assert failed.errors == "Payment couldn't be completed because: no route"
+    assert invalid.status is BatchedPaymentStatus.FAILED
+    assert invalid.errors == "Amount negative"
+
+
+def test_payment_batch_unexpected_error():
+    """ An unexpected error is not recorded as a failed payment, it stops the node """
+    raiden_api = PaymentsAPI()
+    token_address = factories.make_token_address()
+    payments = [
+        BatchedPayment(token_address, factories.make_target_address(), PaymentAmount(amount))
+        for amount in [BROKEN_AMOUNT, 1]
+    ]
+    batch = PaymentBatch(
+        identifier=1,
+        raiden_api=raiden_api,  # type: ignore
+        registry_address=factories.make_token_network_registry_address(),
+        payments=payments,
+        max_concurrency=1,
+    )
+
+    batch.start()
+    assert batch.greenlet
+    batch.greenlet.join(timeout=5)
+    assert not batch.finished.is_set()
+    raiden_api.raiden.on_error.assert_called_once_with(batch.greenlet)
+    assert isinstance(batch.greenlet.exception, RuntimeError)
+    assert payments[0].status is BatchedPaymentStatus.PENDING
@@ -0,0 +1,53 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+
+from flask import Flask
+
+from raiden.api.rest_utils import ResponseCache, api_response, cached_by_state_change
+
+
+class StateDependentAPI:
+    def __init__(self):
+        self.saved_state = SimpleNamespace(state_change_id="01E1AD9DYC9E0HX4Y0CSR3CB9F")
+        self.raiden_api = SimpleNamespace(raiden=SimpleNamespace(wal=self))
+        self.response_cache = ResponseCache()
+        self.calls = 0
+
+    @cached_by_state_change
+    def get_items(self, token=None):
+        self.calls += 1
+        return api_response(result=dict(token=token, calls=self.calls))
+
+
+def test_cached_by_state_change():
+    app = Flask(__name__)
+    api = StateDependentAPI()
+
+    with app.test_request_context():
+        response = api.get_items(token="a")
+        etag, _ = response.get_etag()
+        assert response.status_code == HTTPStatus.OK
+        assert response.get_json() == dict(token="a", calls=1)
+
+        # Served from the cache until the next state change, per arguments
+        assert api.get_items(token="a").get_json() == dict(token="a", calls=1)
+        assert api.get_items(token="b").get_json() == dict(token="b", calls=2)
+        assert api.get_items(token="a").get_etag() == (etag, False)
+
+    with app.test_request_context(headers={"If-None-Match": f'"{etag}"'}):
+        response = api.get_items(token="a")
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert api.calls == 2
+
+        api.saved_state.state_change_id = "01E1AD9DYC9E0HX4Y0CSR3CB9G"
+        response = api.get_items(token="a")
+        assert response.status_code == HTTPStatus.OK
+        assert response.get_json() == dict(token="a", calls=3)
+        assert response.get_etag()[0] != etag
+
+    with app.test_request_context(headers={"If-None-Match": response.headers["ETag"]}):
+        # Data which is not part of the state changed
+        api.response_cache.invalidate()
+        response = api.get_items(token="a")
+        assert response.status_code == HTTPStatus.OK
+        assert response.get_json() == dict(token="a", calls=4)
@@ -0,0 +1,124 @@
+import json
+from types import SimpleNamespace
+
+from eth_utils import encode_hex
+
+from raiden.api.stream import EventStream
+from raiden.constants import LOCKSROOT_OF_NO_LOCKS
+from raiden.storage.sqlite import EventID
+from raiden.tests.utils import factories
+from raiden.transfer.events import EventPaymentSentFailed
+from raiden.transfer.state_change import (
+    ActionChannelSetRevealTimeout,
+    ContractReceiveChannelSettled,
+)
+from raiden.utils.copy import deepcopy
+from raiden.utils.typing import Balance
+
+
+def decode(encoded_message):
+    fields = dict(line.split(": ", 1) for line in encoded_message.strip().split("\n"))
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+def make_payment_event(identifier):
+    return EventPaymentSentFailed(
+        token_network_registry_address=factories.make_token_network_registry_address(),
+        token_network_address=factories.make_token_network_address(),
+        identifier=identifier,
+        target=factories.make_target_address(),
+        reason="whatever",
+    )
+
+
+def test_event_stream():
+    container = factories.make_chain_state(number_of_channels=2)
+    changed_channel, removed_channel = container.channel_set.channels
+
+    cursor_ulid, replayed_ulid, event_ulid = sorted(factories.make_ulid() for _ in range(3))
+    replayed_id = EventID(replayed_ulid)
+    storage = SimpleNamespace(
+        get_events_with_timestamps_after=lambda event_identifier, **kwargs: (
+            [(replayed_id, SimpleNamespace(identifier=1))]
+            if event_identifier != replayed_id
+            else []
+        )
+    )
+    wal = SimpleNamespace(
+        saved_state=SimpleNamespace(state=container.chain_state),
+        storage=storage,
+        dispatch_listeners=[],
+    )
+    stream = EventStream(serialize_payment=lambda _, event: {"identifier": event.identifier})
+    messages = stream.stream(
+        SimpleNamespace(wal=wal), EventID(cursor_ulid)  # type: ignore
+    )
+
+    # The current channels are sent first, then the payments saved after the cursor
+    channel_messages = [decode(next(messages)) for _ in range(2)]
+    assert [message["event"] for message in channel_messages] == ["channel", "channel"]
+    channels = {
+        message["data"]["channel_identifier"]: message["data"] for message in channel_messages
+    }
+    assert channels.keys() == {
+        str(channel.identifier) for channel in container.channel_set.channels
+    }
+    assert decode(next(messages)) == {
+        "id": encode_hex(replayed_ulid.identifier),
+        "event": "payment",
+        "data": {"identifier": 1},
+    }
+
+    (on_dispatch,) = wal.dispatch_listeners
+    new_state = deepcopy(container.chain_state)
+    token_network = new_state.identifiers_to_tokennetworkregistries[
+        container.token_network_registry_address
+    ].tokennetworkaddresses_to_tokennetworks[container.token_network_address]
+    our_state = token_network.channelidentifiers_to_channels[changed_channel.identifier].our_state
+    our_state.contract_balance = Balance(our_state.contract_balance + 10)
+    del token_network.channelidentifiers_to_channels[removed_channel.identifier]
+
+    # The channels are only compared when a state change refers to them
+    state_changes = [
+        ActionChannelSetRevealTimeout(
+            canonical_identifier=changed_channel.canonical_identifier,
+            reveal_timeout=changed_channel.reveal_timeout,
+        ),
+        ContractReceiveChannelSettled(
+            transaction_hash=factories.make_transaction_hash(),
+            canonical_identifier=removed_channel.canonical_identifier,
+            our_onchain_locksroot=LOCKSROOT_OF_NO_LOCKS,
+            partner_onchain_locksroot=LOCKSROOT_OF_NO_LOCKS,
+            block_number=factories.make_block_number(),
+            block_hash=factories.make_block_hash(),
+        ),
+    ]
+    on_dispatch(new_state, [], [])
+
+    event_id = EventID(event_ulid)
+    on_dispatch(
+        new_state,
+        state_changes,
+        [(replayed_id, make_payment_event(1)), (event_id, make_payment_event(2))],
+    )
+
+    # The payment which was replayed is not sent twice, the channel updates
+    # follow the order in which the state changes refer to the channels
+    payment, channel_update, channel_removed = [decode(next(messages)) for _ in range(3)]
+    assert payment == {
+        "id": encode_hex(event_ulid.identifier),
+        "event": "payment",
+        "data": {"identifier": 2},
+    }
+    assert channel_update["event"] == "channel"
+    assert channel_update["data"]["channel_identifier"] == str(changed_channel.identifier)
+    assert channel_update["data"]["balance"] == str(
+        int(channels[str(changed_channel.identifier)]["balance"]) + 10
+    )
+    assert channel_removed["event"] == "channel_removed"
+    assert channel_removed["data"]["channel_identifier"] == str(removed_channel.identifier)
+
+    messages.close()
+    on_dispatch(container.chain_state, state_changes, [])
+    assert stream._subscriptions == set()  # pylint: disable=protected-access
@@ -1,4 +1,5 @@
 import json
+from binascii import hexlify
 from functools import partial
 from unittest.mock import patch
 
@@ -19,6 +20,7 @@
 from raiden.ui import cli
 from raiden.ui.cli import ReturnCode
 from raiden.utils.ethereum_clients import is_supported_client
+from raiden.utils.signer import LocalSigner
 
 
 @pytest.fixture
@@ -44,6 +46,22 @@ def test_cli_version(cli_runner):
     assert result.exit_code == 0
 
 
+def test_cli_signature_recovery_worker(cli_runner):
+    """ The hidden subcommand runs the loop of the signature recovery workers
+    in the PyInstaller bundle.
+    """
+    data = b"message"
+    signer = LocalSigner(bytes(range(1, 33)))
+    request = hexlify(data) + b" " + hexlify(signer.sign(data)) + b"\n" + b"00 00\n" + b"\n"
+
+    result = cli_runner(
+        cli.run, ["--disable-debug-logfile", "signature-recovery-worker"], input=request
+    )
+
+    assert result.exit_code == 0
+    assert result.stdout_bytes == hexlify(signer.address) + b"\n-\n"
+
+
 def mock_raises(exception):
     def f(*_, **__):
         raise exception
@@ -1,14 +1,19 @@
+from dataclasses import FrozenInstanceError, replace
+
 import pytest
 from eth_utils import keccak
 
 from raiden.constants import EMPTY_SIGNATURE, UINT64_MAX, UINT256_MAX
+from raiden.messages.decode import balanceproof_from_envelope
 from raiden.messages.healthcheck import Ping
 from raiden.messages.monitoring_service import RequestMonitoring, SignedBlindedBalanceProof
 from raiden.messages.path_finding_service import PFSCapacityUpdate, PFSFeeUpdate
 from raiden.storage.serialization import DictSerializer
 from raiden.tests.utils import factories
 from raiden.tests.utils.tests import fixture_all_combinations
+from raiden.transfer import architecture
 from raiden.transfer.mediated_transfer.mediation_fee import FeeScheduleState
+from raiden.transfer.utils import hash_balance_data
 from raiden.utils.packing import pack_balance_proof, pack_reward_proof, pack_signed_balance_proof
 from raiden.utils.signer import LocalSigner, recover
 from raiden.utils.typing import MonitoringServiceAddress, TokenAmount
@@ -26,6 +31,64 @@ def test_signature():
     assert ping.sender == ADDRESS
 
 
+def test_signed_message_caches_derived_values():
+    locked_transfer = factories.create(factories.LockedTransferProperties())
+
+    data_to_sign = locked_transfer.data_to_sign
+    message_hash = locked_transfer.message_hash
+    assert locked_transfer.data_to_sign is data_to_sign
+    assert locked_transfer.message_hash is message_hash
+    assert locked_transfer.sender == recover(data_to_sign, locked_transfer.signature)
+
+    # Modifying the message invalidates the cached values
+    locked_transfer.transferred_amount += 1
+    assert locked_transfer.data_to_sign == locked_transfer._data_to_sign()
+    assert locked_transfer.data_to_sign != data_to_sign
+    assert locked_transfer.sender != recover(data_to_sign, locked_transfer.signature)
+
+    locked_transfer.sign(signer)
+    assert locked_transfer.sender == ADDRESS
+
+
+def test_decoded_balance_proof_reuses_the_message_hashes(monkeypatch):
+    locked_transfer = factories.create(factories.LockedTransferProperties())
+    balance_hash = locked_transfer.balance_hash
+
+    def hash_balance_data(*args, **kwargs):
+        raise AssertionError("The balance hash of the message must be reused")
+
+    monkeypatch.setattr(architecture, "hash_balance_data", hash_balance_data)
+    balance_proof = balanceproof_from_envelope(locked_transfer)
+    assert balance_proof.balance_hash == balance_hash
+    assert balance_proof.message_hash == locked_transfer.message_hash
+
+    # The hashed values can not be changed behind the back of the cache
+    with pytest.raises(FrozenInstanceError):
+        locked_transfer.lock.amount += 1
+
+    data_to_sign = locked_transfer.data_to_sign
+    locked_transfer.invalidate_cache()
+    assert locked_transfer.data_to_sign is not data_to_sign
+    assert locked_transfer.data_to_sign == data_to_sign
+
+
+def test_balance_proof_computes_the_balance_hash():
+    """ Only the decoder passes a precomputed balance hash, any other value is
+    replaced by the hash of the balance data.
+    """
+    balance_proof = factories.create(factories.BalanceProofSignedStateProperties())
+    expected_balance_hash = balance_proof.balance_hash
+
+    balance_proof.balance_hash = factories.make_32bytes()
+    restored = DictSerializer.deserialize(DictSerializer.serialize(balance_proof))
+    assert restored.balance_hash == expected_balance_hash
+
+    changed = replace(balance_proof, transferred_amount=balance_proof.transferred_amount + 1)
+    assert changed.balance_hash == hash_balance_data(
+        changed.transferred_amount, changed.locked_amount, changed.locksroot
+    )
+
+
 def test_request_monitoring() -> None:
     properties = factories.BalanceProofSignedStateProperties(pkey=PARTNER_PRIVKEY)
     balance_proof = factories.create(properties)
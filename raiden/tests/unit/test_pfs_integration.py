@@ -8,6 +8,7 @@
 import pytest
 import requests
 from eth_utils import is_checksum_address, is_hex, is_hex_address
+from gevent.event import Event
 
 from raiden.constants import RoutingMode
 from raiden.exceptions import ServiceRequestFailed, ServiceRequestIOURejected
@@ -15,6 +16,7 @@
 from raiden.network.pathfinding import (
     IOU,
     MAX_PATHS_QUERY_ATTEMPTS,
+    IOULedger,
     PFSConfig,
     PFSError,
     PFSInfo,
@@ -24,10 +26,10 @@
     query_paths,
     update_iou,
 )
-from raiden.routing import get_best_routes
+from raiden.routing import RouteCache, get_best_routes
 from raiden.tests.utils import factories
 from raiden.tests.utils.mocks import mocked_failed_response, mocked_json_response
-from raiden.transfer.state import NettingChannelState, NetworkState, TokenNetworkState
+from raiden.transfer.state import NettingChannelState, NetworkState, RouteState, TokenNetworkState
 from raiden.utils import typing
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.keys import privatekey_to_address
@@ -166,7 +168,7 @@ def iou_side_effect(*args, **kwargs):
 
             return mocked_json_response(response_data=iou_json_data)
 
-    with patch.object(requests, "get", side_effect=iou_side_effect) as patched:
+    with patch.object(pathfinding.session, "get", side_effect=iou_side_effect) as patched:
         _, best_routes, feedback_token = get_best_routes(
             chain_state=chain_state,
             token_network_address=token_network_state.address,
@@ -221,7 +223,7 @@ def test_routing_mocked_pfs_happy_path(happy_path_fixture, one_to_n_address, our
     _, address2, _, address4 = addresses
     _, channel_state2 = channel_states
 
-    with patch.object(requests, "post", return_value=response) as patched:
+    with patch.object(pathfinding.session, "post", return_value=response) as patched:
         routes, feedback_token = get_best_routes_with_iou_request_mocked(
             chain_state=chain_state,
             token_network_state=token_network_state,
@@ -265,7 +267,7 @@ def test_routing_mocked_pfs_happy_path_with_updated_iou(
     )
     last_iou = copy(iou)
 
-    with patch.object(requests, "post", return_value=response) as patched:
+    with patch.object(pathfinding.session, "post", return_value=response) as patched:
         routes, feedback_token = get_best_routes_with_iou_request_mocked(
             chain_state=chain_state,
             token_network_state=token_network_state,
@@ -308,7 +310,7 @@ def test_routing_mocked_pfs_request_error(
         address3: NetworkState.REACHABLE,
     }
 
-    with patch.object(requests, "post", side_effect=requests.RequestException()):
+    with patch.object(pathfinding.session, "post", side_effect=requests.RequestException()):
         routes, feedback_token = get_best_routes_with_iou_request_mocked(
             chain_state=chain_state,
             token_network_state=token_network_state,
@@ -354,7 +356,7 @@ def test_routing_mocked_pfs_bad_http_code(
 
     response = mocked_json_response(response_data=json_data, status_code=400)
 
-    with patch.object(requests, "post", return_value=response):
+    with patch.object(pathfinding.session, "post", return_value=response):
         routes, feedback_token = get_best_routes_with_iou_request_mocked(
             chain_state=chain_state,
             token_network_state=token_network_state,
@@ -385,7 +387,7 @@ def test_routing_mocked_pfs_invalid_json(
 
     response = mocked_failed_response(error=ValueError(), status_code=200)
 
-    with patch.object(requests, "post", return_value=response):
+    with patch.object(pathfinding.session, "post", return_value=response):
         routes, feedback_token = get_best_routes_with_iou_request_mocked(
             chain_state=chain_state,
             token_network_state=token_network_state,
@@ -416,7 +418,7 @@ def test_routing_mocked_pfs_invalid_json_structure(
 
     response = mocked_json_response(response_data={}, status_code=400)
 
-    with patch.object(requests, "post", return_value=response):
+    with patch.object(pathfinding.session, "post", return_value=response):
         routes, feedback_token = get_best_routes_with_iou_request_mocked(
             chain_state=chain_state,
             token_network_state=token_network_state,
@@ -463,7 +465,7 @@ def test_routing_mocked_pfs_unavailable_peer(
 
     response = mocked_json_response(response_data=json_data, status_code=200)
 
-    with patch.object(requests, "post", return_value=response):
+    with patch.object(pathfinding.session, "post", return_value=response):
         routes, feedback_token = get_best_routes_with_iou_request_mocked(
             chain_state=chain_state,
             token_network_state=token_network_state,
@@ -490,18 +492,18 @@ def test_get_and_update_iou(one_to_n_address):
     )
     # RequestExceptions should be reraised as ServiceRequestFailed
     with pytest.raises(ServiceRequestFailed):
-        with patch.object(requests, "get", side_effect=requests.RequestException):
+        with patch.object(pathfinding.session, "get", side_effect=requests.RequestException):
             get_last_iou(**request_args)
 
     # invalid JSON should raise a ServiceRequestFailed
     response = mocked_failed_response(error=ValueError)
 
     with pytest.raises(ServiceRequestFailed):
-        with patch.object(requests, "get", return_value=response):
+        with patch.object(pathfinding.session, "get", return_value=response):
             get_last_iou(**request_args)
 
     response = mocked_json_response(response_data={"other_key": "other_value"})
-    with patch.object(requests, "get", return_value=response):
+    with patch.object(pathfinding.session, "get", return_value=response):
         iou = get_last_iou(**request_args)
     assert iou is None, "get_pfs_iou should return None if pfs returns no iou."
 
@@ -517,7 +519,7 @@ def test_get_and_update_iou(one_to_n_address):
 
     response = mocked_json_response(response_data=dict(last_iou=last_iou.as_json()))
 
-    with patch.object(requests, "get", return_value=response):
+    with patch.object(pathfinding.session, "get", return_value=response):
         iou = get_last_iou(**request_args)
     assert iou == last_iou
 
@@ -543,7 +545,7 @@ def test_get_pfs_iou(one_to_n_address):
     receiver = factories.make_address()
 
     response = mocked_json_response(response_data={"last_iou": None})
-    with patch.object(requests, "get", return_value=response):
+    with patch.object(pathfinding.session, "get", return_value=response):
         assert (
             get_last_iou("http://example.com", token_network_address, sender, receiver, PRIVKEY)
             is None
@@ -561,7 +563,7 @@ def test_get_pfs_iou(one_to_n_address):
         iou.sign(privkey)
 
     response = mocked_json_response(response_data={"last_iou": iou.as_json()})
-    with patch.object(requests, "get", return_value=response):
+    with patch.object(pathfinding.session, "get", return_value=response):
         assert (
             get_last_iou("http://example.com", token_network_address, sender, receiver, PRIVKEY)
             == iou
@@ -634,6 +636,10 @@ def assert_failed_pfs_request(
     expected_success: bool = False,
     exception_type: typing.Type = ServiceRequestFailed,
 ):
+    # The requests start from the last IOU of the PFS, unless the test shares
+    # a ledger between them
+    paths_args = {"iou_ledger": IOULedger(), **paths_args}
+
     while len(responses) < MAX_PATHS_QUERY_ATTEMPTS:
         responses.append(responses[0])
     for response in responses:
@@ -647,15 +653,19 @@ def assert_failed_pfs_request(
 
     with patch("raiden.network.pathfinding.get_pfs_info") as mocked_pfs_info:
         mocked_pfs_info.return_value = PFS_CONFIG.info
-        with patch.object(requests, "get", return_value=mocked_json_response()) as get_iou:
-            with patch.object(requests, "post", side_effect=path_mocks) as post_paths:
+        with patch.object(
+            pathfinding.session, "get", return_value=mocked_json_response()
+        ) as get_iou:
+            with patch.object(pathfinding.session, "post", side_effect=path_mocks) as post_paths:
                 if expected_success:
                     query_paths(**paths_args)
                 else:
                     with pytest.raises(exception_type) as raised_exception:
                         query_paths(**paths_args)
                         assert "broken iou" in str(raised_exception)
-                assert get_iou.call_count == (expected_get_iou_requests or expected_requests)
+                if expected_get_iou_requests is None:
+                    expected_get_iou_requests = expected_requests
+                assert get_iou.call_count == expected_get_iou_requests
                 assert post_paths.call_count == expected_requests
 
 
@@ -702,6 +712,205 @@ def test_routing_in_direct_channel(happy_path_fixture, our_address, one_to_n_add
         assert pfs_request.called
 
 
+def test_batch_route_cache(happy_path_fixture, our_address, one_to_n_address):
+    addresses, chain_state, channel_states, _, token_network_state = happy_path_fixture
+    _, address2, address3, address4 = addresses
+    _, channel_state2 = channel_states
+
+    route = RouteState(
+        route=[our_address, address2, address3, address4],
+        forward_channel_id=channel_state2.identifier,
+    )
+    route_cache = RouteCache()
+
+    def get_routes(amount):
+        return route_cache.get_best_routes(
+            chain_state=chain_state,
+            token_network_address=token_network_state.address,
+            one_to_n_address=one_to_n_address,
+            from_address=our_address,
+            to_address=address4,
+            amount=PaymentAmount(amount),
+            previous_address=None,
+            pfs_config=PFS_CONFIG,
+            privkey=PRIVKEY,
+        )
+
+    def slow_pfs_request(**kwargs):  # pylint: disable=unused-argument
+        gevent.sleep(0.01)
+        return None, [route], DEFAULT_FEEDBACK_TOKEN
+
+    with patch("raiden.routing.get_best_routes_pfs", side_effect=slow_pfs_request) as pfs_request:
+        # Concurrent lookups for the same amount wait for the first one
+        lookups = [gevent.spawn(get_routes, 50) for _ in range(3)]
+        gevent.joinall(set(lookups), raise_error=True)
+        assert pfs_request.call_count == 1
+        # Only the payment which did the lookup sends feedback
+        results = [lookup.get() for lookup in lookups]
+        assert results.count((None, [route], DEFAULT_FEEDBACK_TOKEN)) == 1
+        assert results.count((None, [route], None)) == 2
+
+        # Lookups are shared per amount
+        get_routes(50)
+        get_routes(40)
+        assert pfs_request.call_count == 2
+
+        # A new lookup is done once the channel of the routes is exhausted
+        channel_state2.our_state.contract_balance = TokenAmount(30)
+        assert get_routes(40) == (None, [route], DEFAULT_FEEDBACK_TOKEN)
+        assert pfs_request.call_count == 3
+
+    with patch("raiden.routing.get_best_routes_pfs") as pfs_request:
+        pfs_request.return_value = "PFS error", [], None
+
+        # Lookups which found no route are not shared
+        assert get_routes(20) == ("PFS error", [], None)
+        assert get_routes(20) == ("PFS error", [], None)
+        assert pfs_request.call_count == 2
+
+
+def test_route_cache(happy_path_fixture, our_address, one_to_n_address):
+    addresses, chain_state, channel_states, _, token_network_state = happy_path_fixture
+    _, address2, address3, address4 = addresses
+    _, channel_state2 = channel_states
+
+    route = RouteState(
+        route=[our_address, address2, address3, address4],
+        forward_channel_id=channel_state2.identifier,
+    )
+    route_cache = RouteCache(ttl=0.05)
+
+    def get_routes(amount):
+        return get_best_routes(
+            chain_state=chain_state,
+            token_network_address=token_network_state.address,
+            one_to_n_address=one_to_n_address,
+            from_address=our_address,
+            to_address=address4,
+            amount=PaymentAmount(amount),
+            previous_address=None,
+            pfs_config=PFS_CONFIG,
+            privkey=PRIVKEY,
+            route_cache=route_cache,
+        )
+
+    with patch("raiden.routing.get_best_routes_pfs") as pfs_request:
+        pfs_request.return_value = None, [route], DEFAULT_FEEDBACK_TOKEN
+
+        # Routes are reused for the same amount, only the lookup which queried
+        # the PFS gets the feedback token
+        assert get_routes(50) == (None, [route], DEFAULT_FEEDBACK_TOKEN)
+        assert get_routes(50) == (None, [route], None)
+        assert pfs_request.call_count == 1
+
+        # The fees of the routes were estimated for the amount of the lookup
+        get_routes(40)
+        get_routes(60)
+        assert pfs_request.call_count == 3
+        get_routes(40)
+        assert pfs_request.call_count == 3
+
+        # The entry expires
+        gevent.sleep(0.06)
+        get_routes(60)
+        assert pfs_request.call_count == 4
+
+        # A payment over the route failed
+        route_cache.invalidate_route(token_network_state.address, route.route)
+        get_routes(60)
+        assert pfs_request.call_count == 5
+
+        # The capacity of our channel increased
+        route_cache.invalidate_token_network(token_network_state.address)
+        get_routes(60)
+        assert pfs_request.call_count == 6
+
+        # The channel of the route can't pay the amount anymore
+        channel_state2.our_state.contract_balance = TokenAmount(30)
+        get_routes(40)
+        assert pfs_request.call_count == 7
+
+    with patch("raiden.routing.get_best_routes_pfs") as pfs_request:
+        pfs_request.return_value = "PFS error", [], None
+
+        # Errors are not cached
+        assert get_routes(10) == ("PFS error", [], None)
+        assert get_routes(10) == ("PFS error", [], None)
+        assert pfs_request.call_count == 2
+
+
+def test_hedged_routing(happy_path_fixture, our_address, one_to_n_address):
+    addresses, chain_state, channel_states, _, token_network_state = happy_path_fixture
+    _, address2, address3, address4 = addresses
+    _, channel_state2 = channel_states
+
+    pfs_route = RouteState(
+        route=[our_address, address2, address3, address4],
+        forward_channel_id=channel_state2.identifier,
+    )
+    secondary = replace(PFS_CONFIG, info=replace(PFS_CONFIG.info, url="def"))
+    pfs_config = replace(PFS_CONFIG, latency_budget=0.1, hedging_delay=0.02, secondary=secondary)
+    delays = {"abc": 0.0, "def": 0.0}
+    iou_ledger = Mock()
+
+    def pfs_request(pfs_config, **kwargs):  # pylint: disable=unused-argument
+        delay = delays[pfs_config.info.url]
+        if delay is None:
+            return "PFS error", [], None
+        if delay < 0:
+            raise ValueError("PFS broken")
+        gevent.sleep(delay)
+        return None, [pfs_route], DEFAULT_FEEDBACK_TOKEN
+
+    def get_routes():
+        return get_best_routes(
+            chain_state=chain_state,
+            token_network_address=token_network_state.address,
+            one_to_n_address=one_to_n_address,
+            from_address=our_address,
+            to_address=address4,
+            amount=PaymentAmount(50),
+            previous_address=None,
+            pfs_config=pfs_config,
+            privkey=PRIVKEY,
+            iou_ledger=iou_ledger,
+        )
+
+    with patch("raiden.routing.get_best_routes_pfs", side_effect=pfs_request) as request:
+        # The secondary PFS is not asked when the primary one is fast
+        assert get_routes() == (None, [pfs_route], DEFAULT_FEEDBACK_TOKEN)
+        assert request.call_count == 1
+
+        # The feedback is only sent to the primary PFS
+        delays["abc"] = 1
+        assert get_routes() == (None, [pfs_route], None)
+        assert request.call_count == 3
+        iou_ledger.invalidate.assert_called_once_with(
+            pfs_config, token_network_state.address, our_address
+        )
+
+        # The internal routes are used when no PFS answered within the budget
+        delays["def"] = 1
+        error_msg, routes, feedback_token = get_routes()
+        assert error_msg is None and feedback_token is None
+        assert routes and routes != [pfs_route]
+        assert iou_ledger.invalidate.call_count == 3
+
+        # Or when all of them failed
+        delays["abc"] = delays["def"] = None
+        start = time.monotonic()
+        assert get_routes()[1] == routes
+        assert time.monotonic() - start < 0.05
+
+        # A PFS which raises is like one which failed, the other one is waited for
+        delays["abc"] = -1
+        delays["def"] = 0.03
+        assert get_routes() == (None, [pfs_route], None)
+        delays["abc"] = 0.03
+        delays["def"] = -1
+        assert get_routes() == (None, [pfs_route], DEFAULT_FEEDBACK_TOKEN)
+
+
 @pytest.fixture
 def query_paths_args(
     chain_id, token_network_state, one_to_n_address, our_address
@@ -838,7 +1047,9 @@ def test_post_pfs_feedback(query_paths_args):
     token_network_address = factories.make_token_network_address()
     route = [factories.make_address(), factories.make_address()]
 
-    with patch.object(requests, "post", return_value=mocked_json_response()) as feedback:
+    with patch.object(
+        pathfinding.session, "post", return_value=mocked_json_response()
+    ) as feedback:
         post_pfs_feedback(
             routing_mode=RoutingMode.PFS,
             pfs_config=query_paths_args["pfs_config"],
@@ -856,7 +1067,9 @@ def test_post_pfs_feedback(query_paths_args):
         assert payload["success"] is True
         assert payload["path"] == [to_checksum_address(addr) for addr in route]
 
-    with patch.object(requests, "post", return_value=mocked_json_response()) as feedback:
+    with patch.object(
+        pathfinding.session, "post", return_value=mocked_json_response()
+    ) as feedback:
         post_pfs_feedback(
             routing_mode=RoutingMode.PFS,
             pfs_config=query_paths_args["pfs_config"],
@@ -874,7 +1087,9 @@ def test_post_pfs_feedback(query_paths_args):
         assert payload["success"] is False
         assert payload["path"] == [to_checksum_address(addr) for addr in route]
 
-    with patch.object(requests, "post", return_value=mocked_json_response()) as feedback:
+    with patch.object(
+        pathfinding.session, "post", return_value=mocked_json_response()
+    ) as feedback:
         post_pfs_feedback(
             routing_mode=RoutingMode.PRIVATE,
             pfs_config=query_paths_args["pfs_config"],
@@ -938,32 +1153,86 @@ def test_no_iou_when_pfs_price_0(query_paths_args):
         )
 
 
-def test_two_parallel_queries(query_paths_args):
-    """ Test that only one IOU is being processed at a time. """
+def test_two_parallel_queries(query_paths_args, valid_response_json):
+    """ Test that queries sharing an IOU ledger are not serialized. """
+    payloads = []
+    both_in_flight = Event()
 
-    # We mock one query to last at least 0.2s
-    def mocked_json_response_with_sleep(**kwargs):  # pylint: disable=unused-argument
-        gevent.sleep(0.2)
-        return mocked_json_response()
+    def post_paths(url, json, **kwargs):  # pylint: disable=unused-argument
+        payloads.append(json)
+        if len(payloads) == 2:
+            both_in_flight.set()
+        # The first request is only answered once the second one was sent
+        both_in_flight.wait(timeout=5)
+        return mocked_json_response(response_data=valid_response_json)
+
+    query_paths_args["iou_ledger"] = IOULedger()
 
-    # Now we start two function calls - query_path - in parallel
     with patch("raiden.network.pathfinding.get_pfs_info") as mocked_pfs_info:
         mocked_pfs_info.return_value = PFS_CONFIG.info
 
-        with patch.object(pathfinding, "create_current_iou"):
+        with patch.object(pathfinding, "get_last_iou", return_value=None) as get_iou:
+            with patch.object(pathfinding.session, "post", side_effect=post_paths):
+                query_1 = gevent.spawn(query_paths, **query_paths_args)
+                query_2 = gevent.spawn(query_paths, **query_paths_args)
+                gevent.joinall({query_1, query_2}, raise_error=True)
+
+        assert get_iou.call_count == 1
+
+    # The IOU is reserved locally, so the second request was sent while the
+    # first one was in flight
+    assert both_in_flight.is_set()
+    price = PFS_CONFIG.info.price
+    assert [payload["iou"]["amount"] for payload in payloads] == [price, 2 * price]
+
+
+def test_queries_share_the_default_iou_ledger(query_paths_args, valid_response_json):
+    """ Queries without a ledger do not reuse the amount of a concurrent query. """
+    # Starts from a key unknown to the default ledger
+    query_paths_args["our_address"] = factories.make_address()
 
+    with patch("raiden.network.pathfinding.get_pfs_info") as mocked_pfs_info:
+        mocked_pfs_info.return_value = PFS_CONFIG.info
+
+        with patch.object(pathfinding, "get_last_iou", return_value=None) as get_iou:
             with patch.object(
-                pathfinding, "post_pfs_paths", side_effect=mocked_json_response_with_sleep
-            ):
+                pathfinding.session,
+                "post",
+                return_value=mocked_json_response(response_data=valid_response_json),
+            ) as post_paths:
+                query_paths(**query_paths_args)
+                query_paths(**query_paths_args)
 
-                query_1 = gevent.spawn(query_paths, **query_paths_args)
-                query_2 = gevent.spawn(query_paths, **query_paths_args)
+        assert get_iou.call_count == 1
 
-                before = time.monotonic()
-                gevent.joinall({query_1, query_2}, raise_error=True)
-                duration = time.monotonic() - before
+    price = PFS_CONFIG.info.price
+    amounts = [call[1]["json"]["iou"]["amount"] for call in post_paths.call_args_list]
+    assert amounts == [price, 2 * price]
+
+
+def test_iou_ledger_synchronizes_after_rejection(query_paths_args, valid_response_json):
+    """ The last IOU is only fetched again from the PFS after it rejected one. """
+    iou_ledger = IOULedger()
+    query_paths_args["iou_ledger"] = iou_ledger
+
+    assert_failed_pfs_request(
+        query_paths_args, [valid_response_json], [200], expected_requests=1, expected_success=True
+    )
+    assert_failed_pfs_request(
+        query_paths_args,
+        [valid_response_json],
+        [200],
+        expected_requests=1,
+        expected_get_iou_requests=0,
+        expected_success=True,
+    )
 
-                # We expect the calls to happen sequentially, so one greenlet must wait for
-                # the other. If semaphore in raiden.network.pathfinding is bound to 2,
-                # the test fails
-                assert duration >= 0.4
+    bad_iou_response = dict(error_code=PFSError.BAD_IOU.value)
+    assert_failed_pfs_request(
+        query_paths_args,
+        [bad_iou_response, valid_response_json],
+        [400, 200],
+        expected_requests=2,
+        expected_get_iou_requests=1,
+        expected_success=True,
+    )
@@ -6,6 +6,7 @@
 from eth_utils import to_canonical_address
 
 from raiden.exceptions import ServiceRequestFailed
+from raiden.network import pathfinding
 from raiden.network.pathfinding import PFSInfo, get_pfs_info
 
 # We first test the correct handling of the pfs info endpoint. The info endpoint provides
@@ -38,7 +39,7 @@ def test_get_pfs_info_success():
     response = Mock()
     response.configure_mock(status_code=200, content=json.dumps(info_data))
 
-    with patch.object(requests, "get", return_value=response):
+    with patch.object(pathfinding.session, "get", return_value=response):
         pfs_info = get_pfs_info("url")
 
         req_registry_address = to_canonical_address(pfs_test_default_registry_address)
@@ -77,14 +78,14 @@ def test_get_pfs_info_error():
     response = Mock()
     response.configure_mock(status_code=200, content=str(incorrect_json_info_data))
 
-    with patch.object(requests, "get", return_value=response):
+    with patch.object(pathfinding.session, "get", return_value=response):
         with pytest.raises(ServiceRequestFailed) as error:
             get_pfs_info("url")
 
         assert "Selected Pathfinding Service returned unexpected reply" == str(error.value)
 
     # test RequestException
-    with patch.object(requests, "get", side_effect=requests.RequestException()):
+    with patch.object(pathfinding.session, "get", side_effect=requests.RequestException()):
         with pytest.raises(ServiceRequestFailed) as error:
             get_pfs_info("url")
 
@@ -103,13 +104,15 @@ def test_get_pfs_info_error():
     }
 
     response.configure_mock(status_code=200, content=json.dumps(incorrect_info_data))
-    with patch.object(requests, "get", return_value=response):
+    with patch.object(pathfinding.session, "get", return_value=response):
         with pytest.raises(ServiceRequestFailed) as error:
             get_pfs_info("url")
 
         assert "Selected Pathfinding Service returned unexpected reply" == str(error.value)
 
-    with patch.object(requests, "get", side_effect=requests.exceptions.RequestException):
+    with patch.object(
+        pathfinding.session, "get", side_effect=requests.exceptions.RequestException
+    ):
         with pytest.raises(ServiceRequestFailed) as error:
             get_pfs_info("url")
 
@@ -1,5 +1,28 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import gevent
+import pytest
+from eth_utils import keccak, to_checksum_address
+from hexbytes import HexBytes
+from web3.gas_strategies.time_based import construct_time_based_gas_price_strategy
+
 from raiden.constants import EthClient
-from raiden.network.rpc.client import ClientErrorInspectResult, inspect_client_error
+from raiden.exceptions import RaidenUnrecoverableError
+from raiden.network.rpc.client import (
+    ClientErrorInspectResult,
+    EthTransfer,
+    JSONRPCClient,
+    NonceManager,
+    inspect_client_error,
+)
+from raiden.network.rpc.middleware import (
+    GAS_PRICE_ORACLE_BLOCKS_PER_UPDATE,
+    GasPriceOracle,
+    make_fast_gas_price_strategy,
+)
+from raiden.tests.utils import factories
+from raiden.utils.typing import Nonce
 
 
 def test_inspect_client_error():
@@ -12,3 +35,211 @@ def test_inspect_client_error():
 
     result = inspect_client_error(exception, EthClient.PARITY)
     assert result == ClientErrorInspectResult.ALWAYS_FAIL
+
+
+def test_nonce_manager():
+    nonces = NonceManager(Nonce(5))
+    first, second, third = nonces.reserve(), nonces.reserve(), nonces.reserve()
+    assert (first, second, third) == (5, 6, 7)
+
+    # The last nonce is handed out again
+    nonces.release(third)
+    assert nonces.gaps == []
+    assert nonces.reserve() == 7
+
+    # A gap is filled first
+    nonces.release(first)
+    assert nonces.gaps == [5]
+    assert nonces.reserve() == 5
+    assert nonces.reserve() == 8
+
+    # Once the later nonces are released too, the gap is gone
+    nonces.release(second)
+    nonces.release(Nonce(8))
+    assert nonces.gaps == [6]
+    nonces.release(Nonce(7))
+    assert nonces.gaps == []
+    assert nonces.reserve() == 6
+
+
+def test_nonce_gap_is_filled_without_further_transactions():
+    """ A nonce released while a later transaction was sent is filled right
+    away, the later transaction must not wait for another one.
+    """
+    client = object.__new__(JSONRPCClient)
+    client.address = factories.make_address()
+    client.privkey = factories.make_privatekey_bin()
+    client.eth_node = EthClient.GETH
+    client._nonces = NonceManager(Nonce(5))  # pylint: disable=protected-access
+    client.web3 = Mock()
+    client.web3.eth.generateGasPrice.return_value = 1
+
+    sent = list()
+    failed = list()
+
+    def sign_transaction(transaction_data, privkey):  # pylint: disable=unused-argument
+        if transaction_data["nonce"] == 5 and not failed:
+            # The first transaction is sent after the second one
+            gevent.sleep(0.01)
+        return SimpleNamespace(rawTransaction=transaction_data)
+
+    def send_raw_transaction(transaction_data):
+        if transaction_data["nonce"] == 5 and not failed:
+            failed.append(transaction_data)
+            raise ValueError("unexpected error")
+        sent.append(transaction_data)
+        return bytes(32)
+
+    client.web3.eth.account.sign_transaction.side_effect = sign_transaction
+    client.web3.eth.sendRawTransaction.side_effect = send_raw_transaction
+
+    def transfer():
+        return client.transact(
+            EthTransfer(to_address=factories.make_address(), value=1, gas_price=1)
+        )
+
+    failing = gevent.spawn(transfer)
+    gevent.sleep(0)
+    assert transfer().nonce == 6
+    with pytest.raises(RaidenUnrecoverableError):
+        failing.get()
+
+    # The gap was filled with a zero value transfer to ourselves
+    assert [transaction["nonce"] for transaction in sent] == [6, 5]
+    assert sent[1]["to"] == to_checksum_address(client.address)
+    assert sent[1]["value"] == 0
+    assert client._nonces.gaps == []  # pylint: disable=protected-access
+    assert client._nonces.reserve() == 7  # pylint: disable=protected-access
+
+
+class BlocksWeb3:
+    """ Serves the blocks of a fake chain and counts the fetched blocks. """
+
+    def __init__(self):
+        self.blocks = dict()
+        self.latest = None
+        self.fetched = list()
+        self.eth = self
+
+    def mine(self, gas_prices, parent=None):
+        parent = parent or self.latest
+        number = parent["number"] + 1 if parent else 0
+        block = {
+            "hash": HexBytes(keccak(f"{number}{gas_prices}{id(parent)}".encode())),
+            "parentHash": parent["hash"] if parent else HexBytes(bytes(32)),
+            "number": number,
+            "timestamp": 15 * number,
+            "miner": to_checksum_address(factories.make_address()),
+            "transactions": [{"gasPrice": gas_price} for gas_price in gas_prices],
+        }
+        self.blocks[block["hash"]] = block
+        self.latest = block
+        return block
+
+    def getBlock(
+        self, block_identifier, full_transactions=False
+    ):  # pylint: disable=unused-argument
+        if block_identifier == "latest":
+            return self.latest
+        if isinstance(block_identifier, int):
+            block = self.latest
+            while block["number"] != block_identifier:
+                block = self.blocks[block["parentHash"]]
+            return block
+        self.fetched.append(block_identifier)
+        return self.blocks[block_identifier]
+
+
+def test_gas_price_oracle():
+    web3 = BlocksWeb3()
+    oracle = GasPriceOracle(max_wait_seconds=15, sample_size=3, probability=98)
+    time_based_strategy = construct_time_based_gas_price_strategy(
+        max_wait_seconds=15, sample_size=3, probability=98
+    )
+
+    web3.mine([])
+    assert oracle(web3, {}) is None, "Without transactions there is no price"
+    genesis = web3.latest
+    web3.fetched.clear()
+
+    for _ in range(4):
+        web3.mine([10, 20])
+    assert oracle(web3, {}) == 10
+    assert len(web3.fetched) == 4, "Only the new blocks are fetched"
+
+    web3.fetched.clear()
+    assert oracle(web3, {}) == 10
+    assert not web3.fetched, "The price is cached for the latest block"
+
+    # The alarm task updates the oracle, no block is queried for a price
+    oracle.on_new_block(web3, web3.mine([30]))
+    assert web3.fetched == [web3.latest["hash"]]
+    price = oracle(web3, {})
+    assert price == time_based_strategy(web3, {}), "The price is the one of web3's strategy"
+    web3.fetched.clear()
+    web3.mine([100])
+    assert oracle(web3, {}) == price
+    assert not web3.fetched
+
+    # The statistics follow the parent hashes and drop the reorged blocks
+    fork = web3.blocks[web3.latest["parentHash"]]
+    reorged = web3.mine([50, 60], parent=fork)
+    oracle.on_new_block(web3, reorged)
+    assert web3.fetched == [reorged["hash"]]
+    assert oracle.blocks[-2].block_hash == fork["hash"]
+    assert oracle.blocks[-1].block_hash == reorged["hash"]
+
+    # Without a common block in the sample, the statistics are rebuilt
+    web3.fetched.clear()
+    oracle.on_new_block(web3, web3.mine([70], parent=genesis))
+    assert len(web3.fetched) == 2
+    assert len(oracle.blocks) == 2
+    assert oracle(web3, {}) == 70
+
+
+def test_gas_price_oracle_warms_up_incrementally():
+    web3 = BlocksWeb3()
+    sample_size = 2 * GAS_PRICE_ORACLE_BLOCKS_PER_UPDATE
+    oracle = GasPriceOracle(max_wait_seconds=15, sample_size=sample_size, probability=98)
+    time_based_strategy = construct_time_based_gas_price_strategy(
+        max_wait_seconds=15, sample_size=sample_size, probability=98
+    )
+    for number in range(3 * GAS_PRICE_ORACLE_BLOCKS_PER_UPDATE):
+        web3.mine([number + 1])
+
+    oracle.on_new_block(web3, web3.latest)
+    assert len(web3.fetched) == GAS_PRICE_ORACLE_BLOCKS_PER_UPDATE
+    assert len(oracle.blocks) == GAS_PRICE_ORACLE_BLOCKS_PER_UPDATE
+    assert oracle(web3, {}) is not None, "The partial sample gives a price"
+
+    # Every update fetches the new block and completes the sample a bit more
+    web3.fetched.clear()
+    oracle.on_new_block(web3, web3.mine([1]))
+    assert len(web3.fetched) == GAS_PRICE_ORACLE_BLOCKS_PER_UPDATE
+    assert len(oracle.blocks) == 2 * GAS_PRICE_ORACLE_BLOCKS_PER_UPDATE
+
+    web3.fetched.clear()
+    oracle.on_new_block(web3, web3.mine([1]))
+    assert len(web3.fetched) == 1
+    assert len(oracle.blocks) == sample_size + 1
+    assert oracle(web3, {}) == time_based_strategy(web3, {})
+
+
+def test_gas_price_oracles_are_per_client():
+    first_web3 = BlocksWeb3()
+    second_web3 = BlocksWeb3()
+    first_oracle = make_fast_gas_price_strategy()
+    second_oracle = make_fast_gas_price_strategy()
+    assert first_oracle is not second_oracle
+
+    for _ in range(3):
+        first_web3.mine([10])
+        second_web3.mine([20])
+    first_oracle.on_new_block(first_web3, first_web3.latest)
+
+    assert first_oracle(first_web3, {}) == 10
+    assert not second_oracle.updated_by_alarm
+    assert second_oracle(second_web3, {}) == 20
+
+    with pytest.raises(AssertionError):
+        first_oracle(second_web3, {})
@@ -1,7 +1,7 @@
 import json
 import os
 import random
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError, dataclass, replace
 from datetime import datetime
 
 import pytest
@@ -14,10 +14,14 @@
 from raiden.messages.synchronization import Delivered, Processed
 from raiden.messages.transfers import RevealSecret, SecretRequest
 from raiden.messages.withdraw import WithdrawConfirmation, WithdrawExpired, WithdrawRequest
-from raiden.storage.serialization import JSONSerializer
+from raiden.storage.serialization import JSONSerializer, compiled
+from raiden.storage.serialization.cache import SchemaCache
 from raiden.storage.serialization.serializer import MessageSerializer
 from raiden.tests.utils import factories
 from raiden.transfer import state, state_change
+from raiden.transfer.identifiers import QueueIdentifier
+from raiden.transfer.mediated_transfer.state_change import ActionInitMediator
+from raiden.utils.copy import deepcopy
 from raiden.utils.signer import LocalSigner
 
 # Required for test_message_identical. It would be better to have a set of
@@ -316,3 +320,73 @@ def test_hashing():
     """All messages must be hashable for de-duplication to work."""
     for message in messages:
         assert hash(message), "hashing failed"
+
+
+def test_compiled_serializer_matches_schema():
+    """ The compiled fast path must produce exactly the same data as the
+    marshmallow schemas, and restore equal objects.
+    """
+    pair = factories.make_transfers_pair(number_of_channels=3)
+    init_mediator = factories.mediator_make_init_action(
+        pair.channels, pair.transfers_pair[0].payer_transfer
+    )
+    assert isinstance(init_mediator, ActionInitMediator)
+    # Routes without a forward channel and the chain state of the factories,
+    # which uses a too short registry address, can not be deserialized at all
+    init_mediator = replace(
+        init_mediator,
+        route_states=[factories.make_route_from_channel(channel) for channel in pair.channels],
+    )
+
+    objects = list(messages) + [init_mediator, *pair.transfers_pair]
+    for obj in objects:
+        schema = SchemaCache.get_or_create_schema(obj.__class__)
+        expected = schema.dump(obj)
+
+        data = compiled.serialize(obj)
+        assert json.dumps(data) == json.dumps(expected)
+
+        restored = compiled.deserialize(obj.__class__, json.loads(json.dumps(data)))
+        assert restored == obj
+
+
+def test_compiled_serializer_falls_back_to_schema():
+    """ Data the fast path can not handle must still be deserialized by the
+    schema, e.g. missing fields with default values.
+    """
+    channel_state = factories.create(factories.NettingChannelStateProperties())
+    route = factories.make_route_from_channel(channel_state)
+    data = json.loads(JSONSerializer.serialize(route))
+    del data["estimated_fee"]
+
+    with pytest.raises(compiled.FallbackToSchema):
+        compiled.deserialize(route.__class__, data)
+
+    assert JSONSerializer.deserialize(json.dumps(data)) == route
+
+
+def test_slotted_states_roundtrip():
+    """ The slotted state classes must not have a `__dict__` and must survive
+    the JSON serializer and pickle, which is used to copy the state.
+    """
+    lock = factories.make_lock()
+    objects = [
+        factories.UNIT_CANONICAL_ID,
+        QueueIdentifier(factories.make_address(), factories.UNIT_CANONICAL_ID),
+        lock,
+        state.UnlockPartialProofState(lock, factories.make_secret()),
+        factories.create(factories.BalanceProofProperties()),
+        factories.create(factories.BalanceProofSignedStateProperties()),
+        factories.create(factories.LockedTransferSignedStateProperties()),
+        state.RouteState(route=[factories.make_address()], forward_channel_id=1),
+        state.HopState(factories.make_address(), 1),
+        state.TransactionExecutionStatus(started_block_number=1),
+    ]
+
+    for obj in objects:
+        assert not hasattr(obj, "__dict__"), type(obj).__name__
+        assert JSONSerializer.deserialize(JSONSerializer.serialize(obj)) == obj
+        assert deepcopy(obj) == obj
+
+    with pytest.raises(FrozenInstanceError):
+        deepcopy(factories.UNIT_CANONICAL_ID).channel_identifier = 1
@@ -0,0 +1,159 @@
+from unittest.mock import patch
+
+import gevent
+
+from raiden.constants import BLOCK_ID_LATEST, RoutingMode
+from raiden.services import MonitoringRequestPublisher, PFSUpdatePublisher
+from raiden.settings import RaidenConfig, ServiceConfig
+from raiden.tests.utils import factories
+from raiden.tests.utils.mocks import MockRaidenService
+
+
+def test_pfs_update_publisher_coalesces_and_rate_limits_updates():
+    raiden = MockRaidenService()
+    raiden.routing_mode = RoutingMode.PFS
+    publisher = PFSUpdatePublisher(raiden=raiden, window=0.05, min_interval=0.3)
+    canonical_identifier = factories.make_canonical_identifier()
+
+    with patch("raiden.services.send_pfs_update", return_value=True) as send_pfs_update:
+        for _ in range(10):
+            publisher.publish(canonical_identifier)
+        publisher.publish(canonical_identifier, update_fee_schedule=True)
+
+        gevent.sleep(0.1)
+        assert send_pfs_update.call_count == 1
+        assert send_pfs_update.call_args[1]["update_fee_schedule"] is True
+
+        # The channel was just updated, the next update is delayed by the rate
+        # limit and not by the window
+        publisher.publish(canonical_identifier)
+        gevent.sleep(0.1)
+        assert send_pfs_update.call_count == 1
+
+        gevent.sleep(0.3)
+        assert send_pfs_update.call_count == 2
+        assert send_pfs_update.call_args[1]["update_fee_schedule"] is False
+
+    assert publisher.counters == {
+        "requested": 12,
+        "suppressed": 10,
+        "sent_capacity": 2,
+        "sent_fee": 1,
+    }
+
+
+def test_pfs_update_publisher_flush():
+    raiden = MockRaidenService()
+    raiden.routing_mode = RoutingMode.PFS
+    publisher = PFSUpdatePublisher(raiden=raiden, window=60, min_interval=60)
+    canonical_identifiers = [factories.make_canonical_identifier() for _ in range(3)]
+
+    with patch("raiden.services.send_pfs_update", return_value=True) as send_pfs_update:
+        for canonical_identifier in canonical_identifiers:
+            publisher.publish(canonical_identifier)
+        assert send_pfs_update.call_count == 0
+
+        publisher.flush()
+        assert send_pfs_update.call_count == 3
+
+
+def test_pfs_update_publisher_private_routing():
+    raiden = MockRaidenService()
+    publisher = PFSUpdatePublisher(raiden=raiden, window=0, min_interval=0)
+
+    with patch("raiden.services.send_pfs_update", return_value=True) as send_pfs_update:
+        publisher.publish(factories.make_canonical_identifier())
+        assert send_pfs_update.call_count == 0
+
+
+def test_user_deposit_balance_is_queried_once_per_block():
+    raiden = MockRaidenService()
+    raiden.user_deposit.effective_balance.return_value = 10
+    cache = raiden.user_deposit_balance
+
+    # Before the first block the balance is queried on demand
+    assert cache.effective_balance() == 10
+    assert cache.effective_balance() == 10
+    raiden.user_deposit.effective_balance.assert_called_once_with(raiden.address, BLOCK_ID_LATEST)
+
+    raiden.user_deposit.effective_balance.return_value = 5
+    block_hash = factories.make_block_hash()
+    cache.on_new_block({"number": 1, "hash": block_hash})
+    cache.on_new_block({"number": 1, "hash": block_hash})
+    assert raiden.user_deposit.effective_balance.call_count == 2
+    raiden.user_deposit.effective_balance.assert_called_with(raiden.address, block_hash)
+
+    assert cache.effective_balance() == 5
+    assert raiden.user_deposit.effective_balance.call_count == 2
+
+
+def test_secret_registration_cache():
+    raiden = MockRaidenService()
+    registry = raiden.default_secret_registry
+    cache = raiden.secret_registrations
+    secrethash = factories.make_secret_hash()
+
+    def lookup(**kwargs):  # pylint: disable=unused-argument
+        gevent.sleep(0.01)
+        return False
+
+    registry.is_secret_registered.side_effect = lookup
+
+    # Before the first block nothing is cached
+    assert not cache.is_secret_registered(secrethash)
+    assert not cache.is_secret_registered(secrethash)
+    assert registry.is_secret_registered.call_count == 2
+    registry.is_secret_registered.assert_called_with(
+        secrethash=secrethash, block_identifier=BLOCK_ID_LATEST
+    )
+
+    # Concurrent lookups within a block share the call
+    cache.on_new_block({"number": 1})
+    lookups = set(gevent.spawn(cache.is_secret_registered, secrethash) for _ in range(5))
+    gevent.joinall(lookups, raise_error=True)
+    assert not any(lookup.value for lookup in lookups)
+    assert not cache.is_secret_registered(secrethash)
+    assert registry.is_secret_registered.call_count == 3
+
+    cache.on_new_block({"number": 2})
+    registry.is_secret_registered.side_effect = None
+    registry.is_secret_registered.return_value = True
+    assert cache.is_secret_registered(secrethash)
+    assert registry.is_secret_registered.call_count == 4
+
+    # The registrations are never forgotten
+    cache.on_new_block({"number": 3})
+    assert cache.is_secret_registered(secrethash)
+    other_secrethash = factories.make_secret_hash()
+    cache.on_secret_registered(other_secrethash)
+    assert cache.is_secret_registered(other_secrethash)
+    assert registry.is_secret_registered.call_count == 4
+
+
+def test_monitoring_request_publisher_coalesces_balance_proofs():
+    raiden = MockRaidenService()
+    raiden.config = RaidenConfig(
+        chain_id=raiden.rpc_client.chain_id,
+        environment_type=raiden.config.environment_type,
+        services=ServiceConfig(monitoring_enabled=True),
+    )
+    publisher = MonitoringRequestPublisher(raiden=raiden)
+
+    # All the balance proofs are for the same channel
+    balance_proofs = [
+        factories.create(factories.BalanceProofSignedStateProperties(nonce=nonce))
+        for nonce in range(1, 4)
+    ]
+
+    with patch("raiden.services.update_monitoring_service_from_balance_proof") as update:
+        for balance_proof in balance_proofs:
+            publisher.publish(chain_state=None, balance_proof=balance_proof)
+        assert update.call_count == 0
+
+        gevent.sleep(0)
+        update.assert_called_once_with(
+            raiden=raiden,
+            chain_state=None,
+            new_balance_proof=balance_proofs[-1],
+            non_closing_participant=raiden.address,
+        )
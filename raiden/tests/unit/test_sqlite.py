@@ -29,6 +29,7 @@
     SendRefundTransfer,
     SendUnlock,
 )
+from raiden.transfer.mediated_transfer.state import TargetTransferState
 from raiden.transfer.mediated_transfer.state_change import (
     ActionInitMediator,
     ActionInitTarget,
@@ -36,8 +37,10 @@
     ReceiveLockExpired,
     ReceiveTransferRefund,
 )
+from raiden.transfer.mediated_transfer.tasks import TargetTask
 from raiden.transfer.state import BalanceProofUnsignedState, HopState, RouteState
 from raiden.transfer.state_change import Block, ReceiveUnlock
+from raiden.utils.copy import deepcopy
 from raiden.utils.typing import (
     AdditionalHash,
     BlockExpiration,
@@ -563,3 +566,39 @@ def test_storage_close():
     storage.close()
     with pytest.raises(RuntimeError):  # attempt to close an already closed database
         storage.close()
+
+
+def test_payment_task_archive():
+    storage = SerializedSQLiteStorage(":memory:", JSONSerializer())
+    state_change_ids = storage.write_state_changes(
+        [Block(BlockNumber(1), BlockGasLimit(1), factories.make_block_hash()) for _ in range(2)]
+    )
+
+    transfer = factories.create(factories.LockedTransferSignedStateProperties())
+    secrethash = transfer.lock.secrethash
+    task = TargetTask(
+        canonical_identifier=transfer.balance_proof.canonical_identifier,
+        target_state=TargetTransferState(
+            from_hop=HopState(factories.make_address(), factories.make_channel_identifier()),
+            transfer=transfer,
+        ),
+    )
+    other_task = deepcopy(task)
+    other_task.target_state.state = TargetTransferState.EXPIRED
+
+    assert storage.get_payment_tasks(secrethash) == []
+    storage.write_payment_tasks(
+        [
+            (state_change_ids[0], secrethash, task),
+            (state_change_ids[0], factories.make_secret_hash(), task),
+            (state_change_ids[1], secrethash, other_task),
+        ]
+    )
+
+    records = storage.get_payment_tasks(secrethash)
+    assert [record.data for record in records] == [task, other_task]
+    assert [record.state_change_identifier for record in records] == state_change_ids
+    assert all(isinstance(record.log_time, datetime) for record in records)
+    assert storage.count_payment_tasks() == 3
+
+    storage.close()
@@ -0,0 +1,133 @@
+import gevent
+import pytest
+from gevent.event import Event
+
+from raiden.tasks import StateChangeDispatcher
+from raiden.transfer.architecture import StateChange
+
+
+class RecordingDispatch:
+    """ Records the batches and blocks the first dispatch until released. """
+
+    def __init__(self):
+        self.batches = list()
+        self.release = Event()
+        self.fail = False
+
+    def __call__(self, state_changes_batches):
+        self.batches.append(state_changes_batches)
+        self.release.wait()
+        if self.fail:
+            raise ValueError("dispatch failed")
+        return [[f"greenlet-{id(batch)}"] for batch in state_changes_batches]
+
+
+def test_state_change_dispatcher_batches_concurrent_callers():
+    dispatch = RecordingDispatch()
+    dispatcher = StateChangeDispatcher(dispatch, latency_budget=1)
+
+    # Not started, the state changes are dispatched by the caller
+    dispatch.release.set()
+    state_changes = [StateChange()]
+    assert dispatcher.dispatch(state_changes) == [f"greenlet-{id(state_changes)}"]
+    assert dispatch.batches == [[state_changes]]
+    dispatch.batches.clear()
+    dispatch.release.clear()
+
+    dispatcher.start()
+
+    callers = [[StateChange()], [StateChange(), StateChange()], [StateChange()]]
+    first = gevent.spawn(dispatcher.dispatch, callers[0])
+    gevent.sleep(0)
+    # The other callers queue while the first batch is dispatched
+    others = [gevent.spawn(dispatcher.dispatch, caller) for caller in callers[1:]]
+    gevent.sleep(0)
+    dispatch.release.set()
+
+    gevent.joinall(set([first, *others]), raise_error=True)
+    assert dispatch.batches == [[callers[0]], callers[1:]]
+    for greenlet, caller in zip([first, *others], callers):
+        assert greenlet.value == [f"greenlet-{id(caller)}"]
+
+    dispatcher.stop()
+    assert not dispatcher.greenlet
+
+
+def test_state_change_dispatcher_latency_budget():
+    dispatch = RecordingDispatch()
+    dispatcher = StateChangeDispatcher(dispatch, latency_budget=2)
+    dispatcher.state_change_duration = 1
+    dispatcher.start()
+
+    blocking = gevent.spawn(dispatcher.dispatch, [StateChange()])
+    gevent.sleep(0)
+
+    # About two state changes fit in the budget, a caller is never split
+    callers = [[StateChange()], [StateChange(), StateChange()], [StateChange()]]
+    others = [gevent.spawn(dispatcher.dispatch, caller) for caller in callers]
+    gevent.sleep(0)
+    dispatch.release.set()
+
+    gevent.joinall(set([blocking, *others]), raise_error=True)
+    assert dispatch.batches[1] == [callers[0]]
+    assert [caller for batch in dispatch.batches[1:] for caller in batch] == callers
+
+    # The estimate follows the measured duration of the dispatches
+    assert dispatcher.state_change_duration < 1
+
+    dispatcher.stop()
+
+
+def test_state_change_dispatcher_reentrant():
+    dispatcher = None
+    nested = [StateChange()]
+
+    def dispatch(state_changes_batches):
+        if state_changes_batches != [nested]:
+            # The dispatcher's own state changes don't wait for a batch
+            dispatcher.dispatch(nested)
+        return [list() for _ in state_changes_batches]
+
+    dispatcher = StateChangeDispatcher(dispatch, latency_budget=1)
+    dispatcher.start()
+    greenlet = gevent.spawn(dispatcher.dispatch, [StateChange()])
+    assert greenlet.get(timeout=1) == []
+    dispatcher.stop()
+
+
+def test_state_change_dispatcher_no_state_changes():
+    dispatch = RecordingDispatch()
+    dispatch.release.set()
+    dispatcher = StateChangeDispatcher(dispatch, latency_budget=1)
+    dispatcher.start()
+
+    # Nothing is dispatched and the dispatcher keeps running
+    greenlet = gevent.spawn(dispatcher.dispatch, [])
+    assert greenlet.get(timeout=1) == []
+    assert dispatch.batches == []
+    assert not dispatcher.greenlet.dead
+
+    state_changes = [StateChange()]
+    assert dispatcher.dispatch(state_changes) == [f"greenlet-{id(state_changes)}"]
+    dispatcher.stop()
+
+
+def test_state_change_dispatcher_error():
+    dispatch = RecordingDispatch()
+    dispatch.fail = True
+    dispatcher = StateChangeDispatcher(dispatch, latency_budget=1)
+    dispatcher.start()
+
+    first = gevent.spawn(dispatcher.dispatch, [StateChange()])
+    gevent.sleep(0)
+    queued = gevent.spawn(dispatcher.dispatch, [StateChange()])
+    gevent.sleep(0)
+    dispatch.release.set()
+
+    # The error is raised to the callers and by the dispatcher itself
+    with pytest.raises(ValueError):
+        first.get(timeout=1)
+    with pytest.raises(ValueError):
+        queued.get(timeout=1)
+    with pytest.raises(ValueError):
+        dispatcher.greenlet.get(timeout=1)
@@ -5,8 +5,13 @@
 from eth_keys.exceptions import BadSignature, ValidationError
 from eth_utils import decode_hex, keccak, to_canonical_address
 
+from raiden.constants import DEFAULT_HTTP_RETRIES
 from raiden.exceptions import InvalidSignature
-from raiden.network.utils import get_average_http_response_time
+from raiden.network.utils import (
+    HTTP_REQUEST_DURATION,
+    get_average_http_response_time,
+    make_http_session,
+)
 from raiden.utils.keys import privatekey_to_publickey
 from raiden.utils.signer import LocalSigner, Signer, recover
 
@@ -88,3 +93,20 @@ def test_get_http_rtt_ignore_failing(requests_responses):
     # Internal server error
     requests_responses.add(responses.GET, "http://url3", status=500)
     assert get_average_http_response_time(url="http://url3", method="get") is None
+
+
+def test_http_session(requests_responses):
+    """ The sessions reuse the adapter with the connection pools and record the latencies. """
+    session = make_http_session("test", pool_maxsize=4)
+    adapter = session.get_adapter("https://url")
+    assert adapter is session.get_adapter("http://url")
+    assert adapter.max_retries.total == DEFAULT_HTTP_RETRIES
+    assert adapter.max_retries.read == 0
+
+    requests_responses.add(responses.GET, "http://url/api/v1/0x01/info", status=200)
+    requests_responses.add(responses.POST, "http://url/api/v1/0x02/info/", status=500)
+    session.get("http://url/api/v1/0x01/info")
+    session.post("http://url/api/v1/0x02/info/")
+
+    histogram = HTTP_REQUEST_DURATION.labels("test", "info")
+    assert sum(histogram.counts) == 2
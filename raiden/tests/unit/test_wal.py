@@ -21,12 +21,13 @@
     make_block_hash,
     make_canonical_identifier,
     make_locksroot,
+    make_message_identifier,
     make_token_network_registry_address,
     make_transaction_hash,
     make_ulid,
 )
 from raiden.transfer.architecture import State, StateChange, StateManager, TransitionResult
-from raiden.transfer.events import EventPaymentSentFailed
+from raiden.transfer.events import EventPaymentSentFailed, SendProcessed
 from raiden.transfer.state_change import Block, ContractReceiveChannelBatchUnlock
 from raiden.utils.typing import BlockGasLimit, BlockNumber, Callable, List, TokenAmount
 
@@ -167,6 +168,47 @@ def test_write_read_events():
     assert isinstance(latest_event.wrapped_event, EventPaymentSentFailed)
 
 
+def test_dispatch_listeners_and_events_after():
+    def state_transition_payment_failed(state, state_change):  # pylint: disable=unused-argument
+        event = EventPaymentSentFailed(
+            make_token_network_registry_address(), make_address(), 1, make_address(), "whatever"
+        )
+        processed = SendProcessed(
+            recipient=make_address(),
+            message_identifier=make_message_identifier(),
+            canonical_identifier=make_canonical_identifier(),
+        )
+        return TransitionResult(Empty(), [event, processed])
+
+    wal = new_wal(state_transition_payment_failed)
+    dispatched = list()
+    wal.dispatch_listeners.append(
+        lambda state, state_changes, events: dispatched.append((state, state_changes, events))
+    )
+
+    state_changes = [StateChange(), StateChange()]
+    state, events = wal.log_and_dispatch(state_changes)
+
+    ((listener_state, listener_state_changes, saved_events),) = dispatched
+    assert listener_state is state
+    assert listener_state_changes == state_changes
+    first_events, second_events = events
+    assert len(first_events) == len(second_events) == 2
+    assert [event for _, event in saved_events] == first_events + second_events
+    event_ids = [event_id for event_id, _ in saved_events]
+    assert event_ids == sorted(event_ids)
+
+    payments_after_first = wal.storage.get_events_with_timestamps_after(
+        event_identifier=event_ids[0],
+        filters=[("_type", "raiden.transfer.events.EventPaymentSentFailed")],
+    )
+    assert [event_id for event_id, _ in payments_after_first] == [event_ids[2]]
+    assert isinstance(payments_after_first[0][1].wrapped_event, EventPaymentSentFailed)
+    assert (
+        wal.storage.get_events_with_timestamps_after(event_ids[0], limit=1)[0][0] == event_ids[1]
+    )
+
+
 def test_restore_without_snapshot():
     wal = new_wal(state_transition_noop)
 
@@ -23,7 +23,11 @@
     calculate_imbalance_fees,
     linspace,
 )
-from raiden.transfer.mediated_transfer.mediator import get_amount_without_fees
+from raiden.transfer.mediated_transfer.mediator import (
+    find_intersection,
+    find_intersection_linear,
+    get_amount_without_fees,
+)
 from raiden.transfer.state import NettingChannelState
 from raiden.utils.mediation_fees import ppm_fee_per_channel
 from raiden.utils.typing import (
@@ -488,6 +492,46 @@ def test_fee_add_remove_invariant(flat_fee, prop_fee, imbalance_fee, amount, bal
     assert amount - 1 <= amount_without_fees <= amount + 1
 
 
+@given(
+    integers(min_value=0, max_value=100),
+    integers(min_value=0, max_value=10_000),
+    integers(min_value=0, max_value=50_000),
+    integers(min_value=1, max_value=1_000),
+    integers(min_value=1, max_value=1_000),
+    integers(min_value=1, max_value=1_000),
+)
+@settings(suppress_health_check=[HealthCheck.filter_too_much])
+def test_find_intersection_binary_search(
+    flat_fee, prop_fee, imbalance_fee, amount, balance1, balance2
+):
+    """ The binary search must find the same intersection as the linear scan """
+    assume(amount <= balance1)  # The fees for the incoming channel must be defined
+    fee_schedule = FeeScheduleState(
+        cap_fees=True,
+        flat=FeeAmount(flat_fee),
+        proportional=ppm_fee_per_channel(ProportionalFeeAmount(prop_fee)),
+        imbalance_penalty=calculate_imbalance_fees(
+            TokenAmount(1_000), ProportionalFeeAmount(imbalance_fee)
+        ),
+    )
+    fee_func = FeeScheduleState.mediation_fee_func(
+        schedule_in=fee_schedule,
+        schedule_out=fee_schedule,
+        balance_in=Balance(1_000 - balance1),
+        balance_out=Balance(balance2),
+        receivable=TokenAmount(balance1),
+        amount_with_fees=PaymentWithFeeAmount(amount),
+        cap_fees=True,
+    )
+    min_slope, max_slope = fee_func.slope_bounds
+    assert all(min_slope <= slope <= max_slope for slope in fee_func.slopes)
+
+    def line(i):
+        return amount - fee_func.x_list[i]
+
+    assert find_intersection(fee_func, line) == find_intersection_linear(fee_func, line)
+
+
 def running_sum(a):
     total = 0
     for item in a:
@@ -0,0 +1,71 @@
+import gevent
+import pytest
+from gevent.event import Event
+
+from raiden.utils.gevent import GREENLETS, spawn_named
+from raiden.utils.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def test_metrics_exposition():
+    registry = MetricsRegistry()
+    counter = Counter(
+        "test_messages_total", "Messages by type", labelnames=("type",), registry=registry
+    )
+    gauge = Gauge("test_queue", "Queue length", registry=registry)
+    histogram = Histogram("test_seconds", "Durations", buckets=(0.1, 1), registry=registry)
+
+    counter.labels("Processed").inc()
+    counter.labels("Processed").inc(2)
+    counter.labels('Secret"Request').inc()
+    gauge.set(3)
+    histogram.observe(0.1)
+    histogram.observe(0.5)
+    histogram.observe(2)
+
+    assert registry.expose().splitlines() == [
+        "# HELP test_messages_total Messages by type",
+        "# TYPE test_messages_total counter",
+        'test_messages_total{type="Processed"} 3',
+        'test_messages_total{type="Secret\\"Request"} 1',
+        "# HELP test_queue Queue length",
+        "# TYPE test_queue gauge",
+        "test_queue 3",
+        "# HELP test_seconds Durations",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1"} 2',
+        'test_seconds_bucket{le="+Inf"} 3',
+        "test_seconds_sum 2.6",
+        "test_seconds_count 3",
+    ]
+
+    gauge.set_function(lambda: 5)
+    assert "test_queue 5" in registry.expose()
+
+
+def test_metrics_validation():
+    registry = MetricsRegistry()
+    counter = Counter("test_total", "Test", labelnames=("type",), registry=registry)
+
+    with pytest.raises(ValueError):
+        Counter("test_total", "Duplicate", registry=registry)
+
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+    with pytest.raises(ValueError):
+        counter.labels("a").inc(-1)
+
+
+def test_running_greenlets_gauge():
+    running = GREENLETS.value
+    finish = Event()
+
+    greenlet = spawn_named("test_running_greenlets_gauge", finish.wait)
+    killed = spawn_named("test_running_greenlets_gauge", finish.wait)
+    assert GREENLETS.value == running + 2
+
+    killed.kill()
+    finish.set()
+    gevent.joinall({greenlet}, raise_error=True)
+    assert GREENLETS.value == running
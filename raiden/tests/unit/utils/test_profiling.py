@@ -0,0 +1,80 @@
+import sys
+import time
+
+import gevent
+
+from raiden.utils.profiling.greenlets import HubBlockingMonitor
+from raiden.utils.profiling.sampler import SamplingProfiler, StackCollector
+
+
+def busy_loop(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def test_stack_collector_is_greenlet_aware():
+    collector = StackCollector()
+
+    def sample():
+        collector.collect(sys._getframe(), time.time())  # pylint: disable=protected-access
+
+    for _ in range(2):
+        greenlet = gevent.spawn(sample)
+        greenlet.name = "sampled;greenlet"
+        greenlet.get()
+
+    stack, count = collector.flamegraph().rsplit(" ", 1)
+    assert count == "2"
+    assert stack.startswith("greenlet:sampled,greenlet;")
+    assert stack.endswith(f"sample({__name__})")
+
+
+def test_sampling_profiler():
+    profiler = SamplingProfiler()
+    assert profiler.flamegraph() == ""
+
+    profiler.start(interval=0.001, duration=60)
+    assert profiler.is_running
+    busy_loop(0.2)
+    profiler.stop()
+    assert not profiler.is_running
+
+    flamegraph = profiler.flamegraph()
+    assert f"busy_loop({__name__})" in flamegraph
+
+    # The samples are kept after the profiler stopped
+    busy_loop(0.1)
+    assert profiler.flamegraph() == flamegraph
+
+    # The profiler stops itself after the duration elapsed
+    profiler.start(interval=0.001, duration=0.01)
+    gevent.sleep(0.05)
+    assert not profiler.is_running
+
+
+def test_hub_blocking_monitor():
+    monitor = HubBlockingMonitor(max_reports=1)
+    monitor.start(threshold=0.05)
+
+    def blocking():
+        busy_loop(0.2)
+
+    def more_blocking():
+        busy_loop(0.3)
+
+    try:
+        for function in (blocking, more_blocking, blocking):
+            greenlet = gevent.spawn(function)
+            greenlet.name = function.__name__
+            greenlet.get()
+            gevent.sleep(0)
+    finally:
+        monitor.stop()
+
+    # Only the worst offender is kept, with the stack sampled while blocking
+    (report,) = monitor.report()
+    assert report["greenlet"] == "more_blocking"
+    assert report["count"] == 1
+    assert report["max_duration"] >= 0.3
+    assert "busy_loop" in report["stack"]
@@ -4,6 +4,8 @@
 from unittest.mock import Mock, PropertyMock
 
 from raiden.constants import Environment, RoutingMode
+from raiden.network.pathfinding import IOULedger
+from raiden.services import SecretRegistrationCache, UserDepositBalanceCache
 from raiden.settings import RaidenConfig
 from raiden.storage.serialization import JSONSerializer
 from raiden.storage.sqlite import SerializedSQLiteStorage
@@ -187,6 +189,9 @@ def __init__(self, message_handler=None, state_transition=None, private_key=None
         )
 
         self.user_deposit = Mock()
+        self.user_deposit_balance = UserDepositBalanceCache(raiden=self)  # type: ignore
+        self.default_secret_registry = Mock()
+        self.secret_registrations = SecretRegistrationCache(raiden=self)  # type: ignore
         self.default_registry = Mock()
         self.default_registry.address = factories.make_address()
         self.default_one_to_n_address = factories.make_address()
@@ -194,6 +199,8 @@ def __init__(self, message_handler=None, state_transition=None, private_key=None
 
         self.targets_to_identifiers_to_statuses: Dict[Address, dict] = defaultdict(dict)
         self.route_to_feedback_token: dict = {}
+        self.iou_ledger = IOULedger()
+        self.route_cache = None
 
         if state_transition is None:
             state_transition = node.state_transition
@@ -224,6 +231,9 @@ def handle_and_track_state_changes(self, state_changes):
     def handle_state_changes(self, state_changes):
         pass
 
+    def add_pending_greenlet(self, greenlet):
+        pass
+
     def sign(self, message):
         message.sign(self.signer)
 
@@ -8,7 +8,9 @@
 from raiden.constants import EMPTY_BALANCE_HASH, UINT64_MAX, UINT256_MAX
 from raiden.transfer.identifiers import CanonicalIdentifier, QueueIdentifier
 from raiden.transfer.utils import hash_balance_data
+from raiden.utils import metrics
 from raiden.utils.copy import deepcopy
+from raiden.utils.datastructures import add_slots
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.typing import (
     AdditionalHash,
@@ -46,6 +48,14 @@
 
 log = structlog.get_logger(__name__)
 
+DISPATCH_DURATION = metrics.Histogram(
+    "raiden_state_change_dispatch_seconds",
+    "Time to apply a batch of state changes, including the copy of the state",
+)
+STATE_CHANGES_DISPATCHED = metrics.Counter(
+    "raiden_state_changes_total", "Number of dispatched state changes", labelnames=("type",)
+)
+
 # Quick overview
 # --------------
 #
@@ -83,9 +93,12 @@ class State:
     - Each iteration must operate on fresh copy of the state, treating the old
           objects as immutable.
     - This class is used as a marker for states.
+    - Subclasses which are instantiated in large numbers should use
+      `add_slots`, the empty `__slots__` here allow them to drop the
+      `__dict__`.
     """
 
-    pass
+    __slots__ = ()
 
 
 @dataclass
@@ -259,6 +272,10 @@ def dispatch(self, state_changes: List[StateChange]) -> Tuple[ST, List[List[Even
         if not state_changes:
             raise ValueError("dispatch called with an empty state_changes list")
 
+        with DISPATCH_DURATION.time():
+            return self._dispatch(state_changes)
+
+    def _dispatch(self, state_changes: List[StateChange]) -> Tuple[ST, List[List[Event]]]:
         # The state objects must be treated as immutable, so make a copy of the
         # current state and pass the copy to the state machine to be modified.
         before_copy = time.time()
@@ -268,6 +285,7 @@ def dispatch(self, state_changes: List[StateChange]) -> Tuple[ST, List[List[Even
         # Update the current state by applying the state changes
         events: List[List[Event]] = list()
         for state_change in state_changes:
+            STATE_CHANGES_DISPATCHED.labels(type(state_change).__name__).inc()
             iteration = self.state_transition(next_state, state_change)
 
             typecheck(iteration, TransitionResult)
@@ -295,6 +313,7 @@ def __ne__(self, other: Any) -> bool:
         return not self.__eq__(other)
 
 
+@add_slots
 @dataclass
 class BalanceProofUnsignedState(State):
     """ Balance proof from the local node without the signature. """
@@ -348,6 +367,11 @@ def channel_identifier(self) -> ChannelID:
         return self.canonical_identifier.channel_identifier
 
 
+class _MessageBalanceHash(bytes):
+    """ Marks the balance hash passed by `BalanceProofSignedState.from_message`. """
+
+
+@add_slots
 @dataclass
 class BalanceProofSignedState(State):
     """ Proof of a channel balance that can be used on-chain to resolve
@@ -396,11 +420,23 @@ def __post_init__(self) -> None:
 
         self.canonical_identifier.validate()
 
-        self.balance_hash = hash_balance_data(
-            transferred_amount=self.transferred_amount,
-            locked_amount=self.locked_amount,
-            locksroot=self.locksroot,
-        )
+        # Only `from_message` passes a hash, which was computed to verify the
+        # signature of the message. Any other value is replaced.
+        if isinstance(self.balance_hash, _MessageBalanceHash):
+            self.balance_hash = BalanceHash(bytes(self.balance_hash))
+        else:
+            self.balance_hash = hash_balance_data(
+                transferred_amount=self.transferred_amount,
+                locked_amount=self.locked_amount,
+                locksroot=self.locksroot,
+            )
+
+    @classmethod
+    def from_message(cls, balance_hash: BalanceHash, **kwargs: Any) -> "BalanceProofSignedState":
+        """ Balance proof of a received message, `balance_hash` is the hash which
+        was computed from the balance data of the message to verify its signature.
+        """
+        return cls(balance_hash=BalanceHash(_MessageBalanceHash(balance_hash)), **kwargs)
 
     @property
     def chain_id(self) -> ChainID:
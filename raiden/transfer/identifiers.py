@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 
 from raiden.constants import EMPTY_ADDRESS, UINT256_MAX
+from raiden.utils.datastructures import add_slots
 from raiden.utils.formatting import to_checksum_address
 from raiden.utils.typing import (
     Address,
@@ -14,6 +15,7 @@
 )
 
 
+@add_slots
 @dataclass(frozen=True, order=True)
 class CanonicalIdentifier:
     chain_identifier: ChainID
@@ -38,6 +40,7 @@ def __str__(self) -> str:
         )
 
 
+@add_slots
 @dataclass(frozen=True)
 class QueueIdentifier:
     recipient: Address
@@ -22,17 +22,39 @@ class Interpolate:  # pylint: disable=too-few-public-methods
     """ Linear interpolation of a function with given points
 
     Based on https://stackoverflow.com/a/7345691/114926
+
+    `slope_bounds` bound the slopes of the function when they are known in
+    advance, otherwise they are computed from the points when needed.
     """
 
     def __init__(
-        self, x_list: Sequence[Union[Fraction, int]], y_list: Sequence[Union[Fraction, int]]
+        self,
+        x_list: Sequence[Union[Fraction, int]],
+        y_list: Sequence[Union[Fraction, int]],
+        slope_bounds: Optional[Tuple[Fraction, Fraction]] = None,
     ) -> None:
         if any(y - x <= 0 for x, y in zip(x_list, x_list[1:])):
             raise ValueError("x_list must be in strictly ascending order!")
         self.x_list: List[Fraction] = [Fraction(x) for x in x_list]
         self.y_list: List[Fraction] = [Fraction(y) for y in y_list]
-        intervals = zip(self.x_list, self.x_list[1:], y_list, y_list[1:])
-        self.slopes: List[Fraction] = [(y2 - y1) / (x2 - x1) for x1, x2, y1, y2 in intervals]
+        self._slopes: Optional[List[Fraction]] = None
+        self._slope_bounds = slope_bounds
+
+    @property
+    def slopes(self) -> List[Fraction]:
+        # Computed lazily, the intersection search used for mediation only
+        # needs the points.
+        if self._slopes is None:
+            intervals = zip(self.x_list, self.x_list[1:], self.y_list, self.y_list[1:])
+            self._slopes = [(y2 - y1) / (x2 - x1) for x1, x2, y1, y2 in intervals]
+        return self._slopes
+
+    @property
+    def slope_bounds(self) -> Tuple[Fraction, Fraction]:
+        """ Lower and upper bound of the slopes, the function must have two points. """
+        if self._slope_bounds is None:
+            self._slope_bounds = (min(self.slopes), max(self.slopes))
+        return self._slope_bounds
 
     def __call__(self, x: Union[Fraction, int]) -> Fraction:
         if not self.x_list[0] <= x <= self.x_list[-1]:
@@ -149,24 +171,38 @@ def _mediation_fee_func(
     )
 
     # Sum up fees where either `amount_with_fees` or `amount_without_fees` is
-    # fixed and the other one is represented by `x`.
+    # fixed and the other one is represented by `x`. The fee of the fixed
+    # amount is the same for every `x`.
+    #
+    # The slopes of the sum are the proportional fee plus or minus the slopes
+    # of the penalty function of the channel whose amount is `x`. The bounds
+    # of these are cached by the penalty function of its fee schedule.
     try:
-        y_list = [
-            schedule_in.fee(
-                balance_in, x if amount_with_fees is None else Fraction(amount_with_fees)
-            )
-            + schedule_out.fee(
-                balance_out, -x if amount_without_fees is None else -Fraction(amount_without_fees)
-            )
-            for x in x_list
-        ]
+        if amount_with_fees is None:
+            assert amount_without_fees is not None, "amount_without_fees must be set"
+            fixed_fee = schedule_out.fee(balance_out, -Fraction(amount_without_fees))
+            y_list = [schedule_in.fee(balance_in, x) + fixed_fee for x in x_list]
+            proportional = Fraction(schedule_in.proportional, int(1e6))
+            min_penalty_slope, max_penalty_slope = schedule_in._penalty_func.slope_bounds
+            min_slope = proportional + min_penalty_slope
+            max_slope = proportional + max_penalty_slope
+        else:
+            fixed_fee = schedule_in.fee(balance_in, Fraction(amount_with_fees))
+            y_list = [fixed_fee + schedule_out.fee(balance_out, -x) for x in x_list]
+            proportional = Fraction(schedule_out.proportional, int(1e6))
+            min_penalty_slope, max_penalty_slope = schedule_out._penalty_func.slope_bounds
+            min_slope = proportional - max_penalty_slope
+            max_slope = proportional - min_penalty_slope
     except ValueError:
         raise UndefinedMediationFee()
 
     if cap_fees:
         x_list, y_list = _cap_fees(x_list, y_list)
+        # Capping only adds segments with a slope of zero
+        min_slope = min(min_slope, Fraction(0))
+        max_slope = max(max_slope, Fraction(0))
 
-    return Interpolate(x_list, y_list)
+    return Interpolate(x_list, y_list, slope_bounds=(min_slope, max_slope))
 
 
 T = TypeVar("T", bound="FeeScheduleState")
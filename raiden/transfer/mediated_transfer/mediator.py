@@ -207,6 +207,34 @@ def find_intersection(fee_func: Interpolate, line: Callable[[int], Fraction]) ->
     Returns `None` if there is no intersection within `fee_func`s domain, which
     indicates a lack of capacity.
     """
+    compare = operator.lt if fee_func.y_list[0] < line(0) else operator.gt
+    last = len(fee_func.x_list) - 1
+    if last > 0 and compare(fee_func.y_list[0], line(0)):
+        # The difference between both functions is monotonic if the slope of
+        # `line` is outside of the bounds of fee_func's slopes, so the first
+        # point past the intersection can be searched for.
+        line_slope = (line(last) - line(0)) / (fee_func.x_list[last] - fee_func.x_list[0])
+        min_slope, max_slope = fee_func.slope_bounds
+        if line_slope <= min_slope or line_slope >= max_slope:
+            low, high = 1, last + 1
+            while low < high:
+                middle = (low + high) // 2
+                if compare(fee_func.y_list[middle], line(middle)):
+                    low = middle + 1
+                else:
+                    high = middle
+            if low == len(fee_func.x_list):
+                # Not enough capacity to send
+                return None
+            return _interpolate_intersection(fee_func, line, low)
+
+    return find_intersection_linear(fee_func, line)
+
+
+def find_intersection_linear(
+    fee_func: Interpolate, line: Callable[[int], Fraction]
+) -> Optional[float]:
+    """ Same as `find_intersection`, scanning the points of `fee_func` in order. """
     i = 0
     y = fee_func.y_list[i]
     compare = operator.lt if y < line(i) else operator.gt
@@ -217,7 +245,13 @@ def find_intersection(fee_func: Interpolate, line: Callable[[int], Fraction]) ->
             return None
         y = fee_func.y_list[i]
 
-    # We found the linear section where the solution is. Now interpolate!
+    return _interpolate_intersection(fee_func, line, i)
+
+
+def _interpolate_intersection(
+    fee_func: Interpolate, line: Callable[[int], Fraction], i: int
+) -> float:
+    """ Intersection within the linear section between the points `i - 1` and `i` """
     x1 = fee_func.x_list[i - 1]
     x2 = fee_func.x_list[i]
     yf1 = fee_func.y_list[i - 1]
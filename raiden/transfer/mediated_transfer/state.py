@@ -10,6 +10,7 @@
     HopState,
     RouteState,
 )
+from raiden.utils.datastructures import add_slots
 from raiden.utils.secrethash import sha256_secrethash
 from raiden.utils.typing import (
     TYPE_CHECKING,
@@ -38,6 +39,7 @@
     from raiden.transfer.mediated_transfer.events import SendSecretReveal  # noqa
 
 
+@add_slots
 @dataclass
 class LockedTransferState(State):
 
@@ -73,6 +75,7 @@ def __post_init__(self) -> None:
             raise ValueError("balance_proof must not be empty")
 
 
+@add_slots
 @dataclass
 class LockedTransferSignedState(LockedTransferState):
     """ State for a received transfer which contains a hash time lock and a
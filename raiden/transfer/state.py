@@ -25,6 +25,7 @@
 )
 from raiden.transfer.identifiers import CanonicalIdentifier, QueueIdentifier
 from raiden.transfer.mediated_transfer.mediation_fee import FeeScheduleState
+from raiden.utils.datastructures import add_slots
 from raiden.utils.formatting import lpex, to_checksum_address
 from raiden.utils.typing import (
     Address,
@@ -147,6 +148,7 @@ def __eq__(self, other: Any) -> bool:
         )
 
 
+@add_slots
 @dataclass
 class HopState(State):
     """ Information about the next hop. """
@@ -158,6 +160,7 @@ def __post_init__(self) -> None:
         typecheck(self.node_address, T_Address)
 
 
+@add_slots
 @dataclass
 class RouteState(State):
     """ A possible route for a payment to a given target. """
@@ -180,6 +183,7 @@ def __repr__(self) -> str:
         )
 
 
+@add_slots
 @dataclass
 class HashTimeLockState(State):
     """ Represents a hash time lock. """
@@ -200,6 +204,7 @@ def __post_init__(self) -> None:
         self.encoded = EncodedData(lock.as_bytes)
 
 
+@add_slots
 @dataclass
 class UnlockPartialProofState(State):
     """ Stores the lock along with its unlocking secret. """
@@ -221,6 +226,7 @@ def __post_init__(self) -> None:
         self.encoded = self.lock.encoded
 
 
+@add_slots
 @dataclass
 class TransactionExecutionStatus(State):
     """ Represents the status of a transaction. """
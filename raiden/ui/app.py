@@ -208,11 +208,15 @@ def run_app(
     web_ui: bool,
     datadir: Optional[str],
     matrix_server: str,
+    matrix_signature_recovery_processes: int,
     network_id: ChainID,
     environment_type: Environment,
     unrecoverable_error_should_crash: bool,
     pathfinding_service_address: str,
     pathfinding_max_paths: int,
+    pathfinding_route_cache_ttl: float,
+    pathfinding_latency_budget: Optional[float],
+    pathfinding_secondary_service_address: Optional[str],
     enable_monitoring: bool,
     resolver_endpoint: str,
     default_reveal_timeout: BlockTimeout,
@@ -273,8 +277,12 @@ def run_app(
 
     config.services.monitoring_enabled = enable_monitoring
     config.services.pathfinding_max_paths = pathfinding_max_paths
+    config.services.pathfinding_route_cache_ttl = pathfinding_route_cache_ttl
+    config.services.pathfinding_latency_budget = pathfinding_latency_budget
+    config.services.pathfinding_secondary_service_address = pathfinding_secondary_service_address
 
     config.transport.server = matrix_server
+    config.transport.signature_recovery_processes = matrix_signature_recovery_processes
 
     config.rest_api = RestApiConfig(
         rest_api_enabled=rpc,
@@ -46,6 +46,7 @@
     DEFAULT_PATHFINDING_IOU_TIMEOUT,
     DEFAULT_PATHFINDING_MAX_FEE,
     DEFAULT_PATHFINDING_MAX_PATHS,
+    DEFAULT_PATHFINDING_ROUTE_CACHE_TTL,
     DEFAULT_REVEAL_TIMEOUT,
     DEFAULT_SETTLE_TIMEOUT,
 )
@@ -65,9 +66,10 @@
 )
 from raiden.utils.debugging import IDLE, enable_gevent_monitoring_signal
 from raiden.utils.formatting import to_checksum_address
-from raiden.utils.profiling.greenlets import SwitchMonitoring
+from raiden.utils.profiling.greenlets import HUB_BLOCKING_MONITOR, SwitchMonitoring
 from raiden.utils.profiling.memory import MemoryLogger
 from raiden.utils.profiling.sampler import FlameGraphCollector, TraceSampler
+from raiden.utils.signer import serve_recoveries
 from raiden.utils.system import get_system_spec
 from raiden.utils.typing import MYPY_ANNOTATION
 from raiden_contracts.constants import ID_TO_CHAINNAME
@@ -319,6 +321,38 @@ def options(func: Callable) -> Callable:
                 type=int,
                 show_default=True,
             ),
+            option(
+                "--pathfinding-route-cache-ttl",
+                help=(
+                    "Number of seconds for which the routes found by the path finding "
+                    "service are reused for payments of the same amount to the same target, "
+                    "0 disables the cache."
+                ),
+                default=DEFAULT_PATHFINDING_ROUTE_CACHE_TTL,
+                type=click.FloatRange(min=0),
+                show_default=True,
+            ),
+            option(
+                "--pathfinding-latency-budget",
+                help=(
+                    "Enable hedged routing. A secondary path finding service is asked when "
+                    "the first one is slow, and the routes found by the node are used when "
+                    "no path finding service answered within this many seconds."
+                ),
+                default=None,
+                type=click.FloatRange(min=0),
+            ),
+            option(
+                "--pathfinding-secondary-service-address",
+                help=(
+                    f"URL of the path finding service which is asked in addition to the "
+                    f"first one with hedged routing. Can also be given the "
+                    f"'{MATRIX_AUTO_SELECT_SERVER}' value so that raiden chooses another PFS "
+                    f"randomly from the service registry contract."
+                ),
+                default=None,
+                type=str,
+            ),
             option(
                 "--enable-monitoring",
                 help="Enable broadcasting of balance proofs to the monitoring services.",
@@ -340,6 +374,16 @@ def options(func: Callable) -> Callable:
                 type=MatrixServerType([MATRIX_AUTO_SELECT_SERVER, "<url>"]),
                 show_default=True,
             ),
+            option(
+                "--matrix-signature-recovery-processes",
+                help=(
+                    "Number of worker processes recovering the signers of received "
+                    "messages. With 0 they are recovered in the node's process."
+                ),
+                default=0,
+                type=click.IntRange(min=0),
+                show_default=True,
+            ),
         ),
         option_group(
             "Logging Options",
@@ -443,6 +487,15 @@ def options(func: Callable) -> Callable:
                 type=float,
                 default=0,
             ),
+            option(
+                "--hub-blocking-threshold",
+                help=(
+                    "Report greenlets which run for longer than X sec without "
+                    "yielding to the hub (fractions accepted). [default: disabled]"
+                ),
+                type=float,
+                default=0,
+            ),
         ),
         option_group(
             "Hash Resolver Options",
@@ -556,6 +609,10 @@ def run(ctx: Context, **kwargs: Any) -> None:
         memory_logger = MemoryLogger(log_memory_usage_interval)
         memory_logger.start()
 
+    hub_blocking_threshold = kwargs.pop("hub_blocking_threshold", 0)
+    if hub_blocking_threshold > 0:  # pragma: no cover
+        HUB_BLOCKING_MONITOR.start(hub_blocking_threshold)
+
     if ctx.invoked_subcommand is not None:
         # Pass parsed args on to subcommands.
         ctx.obj = kwargs
@@ -690,6 +747,8 @@ def run(ctx: Context, **kwargs: Any) -> None:
         # switch_monitor and profiler could use the tracing api, for the
         # teardown code to work correctly the teardown has to be done in the
         # reverse order of the initialization.
+        if HUB_BLOCKING_MONITOR.is_running:
+            HUB_BLOCKING_MONITOR.stop()
         if switch_monitor is not None:
             switch_monitor.stop()
         if memory_logger is not None:
@@ -714,6 +773,14 @@ def version(short: bool) -> None:
         print(json.dumps(get_system_spec(), indent=2))
 
 
+@run.command(name="signature-recovery-worker", hidden=True)
+def signature_recovery_worker() -> None:
+    """ Loop of the worker processes of the `SignatureRecoveryPool` in the
+    PyInstaller bundle, where `python -m raiden.utils.signer` is not available.
+    """
+    serve_recoveries(sys.stdin.buffer, sys.stdout.buffer)
+
+
 @run.command()
 @option(
     "--report-path",
@@ -6,7 +6,12 @@
 
 from raiden.constants import BLOCK_ID_LATEST, Environment, RoutingMode
 from raiden.exceptions import RaidenError
-from raiden.network.pathfinding import PFSConfig, check_pfs_for_production, configure_pfs_or_exit
+from raiden.network.pathfinding import (
+    PFSConfig,
+    check_pfs_for_production,
+    configure_pfs_or_exit,
+    configure_secondary_pfs,
+)
 from raiden.network.proxies.monitoring_service import MonitoringService
 from raiden.network.proxies.one_to_n import OneToN
 from raiden.network.proxies.proxy_manager import ProxyManager
@@ -348,7 +353,29 @@ def services_bundle_from_contracts_deployment(
             maximum_fee=config.services.pathfinding_max_fee,
             iou_timeout=config.services.pathfinding_iou_timeout,
             max_paths=config.services.pathfinding_max_paths,
+            latency_budget=config.services.pathfinding_latency_budget,
+            hedging_delay=config.services.pathfinding_hedging_delay,
         )
+
+        secondary_pfs_url = config.services.pathfinding_secondary_service_address
+        if config.services.pathfinding_latency_budget is not None and secondary_pfs_url:
+            secondary_pfs_info = configure_secondary_pfs(
+                pfs_url=secondary_pfs_url,
+                primary_info=pfs_info,
+                service_registry=proxies["service_registry"],
+                node_network_id=node_network_id,
+                token_network_registry_address=TokenNetworkRegistryAddress(
+                    token_network_registry_address
+                ),
+                pathfinding_max_fee=config.services.pathfinding_max_fee,
+            )
+            if secondary_pfs_info is not None:
+                config.pfs_config.secondary = PFSConfig(
+                    info=secondary_pfs_info,
+                    maximum_fee=config.services.pathfinding_max_fee,
+                    iou_timeout=config.services.pathfinding_iou_timeout,
+                    max_paths=config.services.pathfinding_max_paths,
+                )
     else:
         config.pfs_config = None
 
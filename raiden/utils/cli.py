@@ -14,10 +14,12 @@
 from click._compat import term_len
 from click.formatting import iter_rows, measure_table, wrap_text
 from toml import TomlDecodeError, load
-from web3.gas_strategies.time_based import fast_gas_price_strategy
 
 from raiden.exceptions import ConfigurationError, InvalidChecksummedAddress
-from raiden.network.rpc.middleware import faster_gas_price_strategy
+from raiden.network.rpc.middleware import (
+    make_fast_gas_price_strategy,
+    make_faster_gas_price_strategy,
+)
 from raiden.utils.formatting import address_checksum_and_decode
 from raiden_contracts.constants import CHAINNAME_TO_ID
 
@@ -303,9 +305,9 @@ def fixed_gas_price_strategy(_web3, _transaction_params):
         else:
             gas_price_string = super().convert(value, param, ctx)
             if gas_price_string == "fast":
-                return faster_gas_price_strategy
+                return make_faster_gas_price_strategy()
             else:
-                return fast_gas_price_strategy
+                return make_fast_gas_price_strategy()
 
 
 class MatrixServerType(click.Choice):
@@ -1,6 +1,10 @@
 import collections
+import copyreg
+from dataclasses import FrozenInstanceError, fields, is_dataclass
 from itertools import zip_longest
-from typing import Iterable, Tuple
+from typing import Any, Dict, Iterable, Tuple, Type, TypeVar
+
+T = TypeVar("T")
 
 
 def merge_dict(to_update: dict, other_dict: dict) -> None:
@@ -25,3 +29,119 @@ def split_in_pairs(arg: Iterable) -> Iterable[Tuple]:
     # from the iterator each time and produces the desired result.
     iterator = iter(arg)
     return zip_longest(iterator, iterator)
+
+
+def _frozen_setattr(self: Any, name: str, value: Any) -> None:
+    raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+
+def _frozen_delattr(self: Any, name: str) -> None:
+    raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+
+def _getstate_as_dict(self: Any) -> Dict[str, Any]:
+    state = dict(getattr(self, "__dict__", {}))
+    for name in copyreg._slotnames(type(self)):  # type: ignore # pylint: disable=protected-access
+        if hasattr(self, name):
+            state[name] = getattr(self, name)
+    return state
+
+
+def _setstate_from_dict(self: Any, state: Dict[str, Any]) -> None:
+    for name, value in state.items():
+        object.__setattr__(self, name, value)
+
+
+def _add_pickle_methods(cls: type, field_names: Tuple[str, ...], frozen: bool) -> None:
+    """ Generate `__getstate__` and `__setstate__` for the slotted `cls`.
+
+    The state is a tuple with the values of the fields, which is smaller and
+    faster to pickle than the default state of slotted objects, a dictionary
+    built from `__slotnames__`. Subclasses without the generated methods,
+    e.g. with a `__dict__`, fall back to a dictionary.
+    """
+    values = "".join(f"self.{name}, " for name in field_names)
+
+    if not field_names:
+        set_values = "pass"
+    elif frozen:
+        set_values = "; ".join(
+            f"_setattr(self, {name!r}, state[{position}])"
+            for position, name in enumerate(field_names)
+        )
+    else:
+        set_values = f"{values}= state"
+
+    source = (
+        f"def __getstate__(self):\n"
+        f"    if self.__class__ is not _cls:\n"
+        f"        return _getstate_as_dict(self)\n"
+        f"    return ({values})\n"
+        f"def __setstate__(self, state):\n"
+        f"    if state.__class__ is dict:\n"
+        f"        return _setstate_from_dict(self, state)\n"
+        f"    {set_values}\n"
+    )
+    namespace: Dict[str, Any] = {
+        "_cls": cls,
+        "_setattr": object.__setattr__,
+        "_getstate_as_dict": _getstate_as_dict,
+        "_setstate_from_dict": _setstate_from_dict,
+    }
+    exec(source, namespace)  # pylint: disable=exec-used
+
+    for name in ("__getstate__", "__setstate__"):
+        function = namespace[name]
+        function.__qualname__ = f"{cls.__qualname__}.{name}"
+        setattr(cls, name, function)
+
+
+def add_slots(cls: Type[T]) -> Type[T]:
+    """ Recreate the dataclass `cls` with `__slots__` for its fields.
+
+    Slotted instances have no `__dict__`, which makes them smaller and faster
+    to pickle. The bases of `cls` must be slotted as well, otherwise the
+    instances still get a `__dict__`. Must be the outermost decorator:
+
+        @add_slots
+        @dataclass
+        class HopState(State):
+            ...
+    """
+    assert is_dataclass(cls), "add_slots must be applied on top of @dataclass"
+    assert "__slots__" not in cls.__dict__, f"{cls.__name__} already has __slots__"
+
+    inherited_slots = {
+        name for base in cls.__mro__[1:] for name in base.__dict__.get("__slots__", ())
+    }
+    field_names = tuple(field.name for field in fields(cls))
+    frozen = cls.__dataclass_params__.frozen  # type: ignore
+
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = tuple(name for name in field_names if name not in inherited_slots)
+    # The defaults are kept by the generated `__init__`, as class attributes
+    # they would conflict with the slots
+    for name in field_names:
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+
+    if frozen:
+        # The `__setattr__` generated for frozen dataclasses refers to the
+        # original class
+        cls_dict["__setattr__"] = _frozen_setattr
+        cls_dict["__delattr__"] = _frozen_delattr
+
+    metaclass: type = type(cls)
+    slotted_cls = metaclass(cls.__name__, cls.__bases__, cls_dict)
+    slotted_cls.__qualname__ = cls.__qualname__
+    _add_pickle_methods(slotted_cls, field_names, frozen)
+
+    # Methods using `super()` have a reference to the original class
+    for member in cls_dict.values():
+        function = getattr(member, "fget", member)
+        for cell in getattr(function, "__closure__", None) or ():
+            if cell.cell_contents is cls:
+                cell.cell_contents = slotted_cls
+
+    return slotted_cls
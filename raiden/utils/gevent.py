@@ -2,6 +2,10 @@
 
 from gevent import Greenlet
 
+from raiden.utils import metrics
+
+GREENLETS = metrics.Gauge("raiden_greenlets", "Number of running greenlets spawned by the node")
+
 
 def spawn_named(name: str, task: Callable, *args: Any, **kwargs: Any) -> Greenlet:
     """ Helper function to spawn a greenlet with a name. """
@@ -9,6 +13,11 @@ def spawn_named(name: str, task: Callable, *args: Any, **kwargs: Any) -> Greenle
     greenlet = Greenlet(task, *args, **kwargs)
     greenlet.name = name
 
+    # Counted as they start and finish, scanning the heap for the running
+    # greenlets would block the node on every scrape of the metrics
+    GREENLETS.inc()
+    greenlet.rawlink(lambda _: GREENLETS.dec())
+
     greenlet.start()
 
     return greenlet
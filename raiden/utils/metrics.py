@@ -0,0 +1,211 @@
+""" Minimal metrics registry rendered in the Prometheus text exposition format.
+
+Metrics are defined at module level next to the code they instrument and are
+registered in the global `REGISTRY`, which is exposed by the REST API at
+`/api/v1/metrics`. Only the subset of the Prometheus data model needed by
+Raiden is implemented: counters, gauges and histograms with optional labels.
+
+See https://prometheus.io/docs/instrumenting/exposition_formats/
+"""
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from raiden.utils.typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 5, 10, 50, 100, 500, 1_000, 5_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+M = TypeVar("M", bound="Metric")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\""))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, "Metric"] = dict()
+
+    def register(self, metric: "Metric") -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional["Metric"]:
+        return self._metrics.get(name)
+
+    def expose(self) -> str:
+        """ Render all registered metrics in the text exposition format. """
+        lines: List[str] = list()
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.metric_type}")
+            for sample_name, labels, value in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Metric:
+    """ Base class of the metric types.
+
+    A metric without `labelnames` is used directly, otherwise `labels` returns
+    the child for the given label values.
+    """
+
+    metric_type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[MetricsRegistry] = REGISTRY,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # The children have the type of their parent
+        self._children: Dict[LabelValues, Any] = dict()
+
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self: M, *labelvalues: str) -> M:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects the labels {self.labelnames}")
+
+        child = self._children.get(labelvalues)
+        if child is None:
+            child = self._make_child()
+            self._children[labelvalues] = child
+        return child
+
+    def _make_child(self: M) -> M:
+        return type(self)(self.name, self.documentation, registry=None)
+
+    def _own_samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[Sample]:
+        if not self.labelnames:
+            yield from self._own_samples()
+            return
+
+        for labelvalues, child in sorted(self._children.items()):
+            labels = dict(zip(self.labelnames, labelvalues))
+            for sample_name, sample_labels, value in child._own_samples():
+                yield sample_name, {**labels, **sample_labels}, value
+
+
+class Counter(Metric):
+    """ Monotonically increasing value, by convention the name ends in `_total` """
+
+    metric_type = "counter"
+    value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        self.value += amount
+
+    def _own_samples(self) -> Iterable[Sample]:
+        yield self.name, {}, self.value
+
+
+class Gauge(Metric):
+    metric_type = "gauge"
+    value = 0.0
+    _function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """ Compute the value with `function` when the metrics are collected. """
+        self._function = function
+
+    def _own_samples(self) -> Iterable[Sample]:
+        value = self._function() if self._function is not None else self.value
+        yield self.name, {}, value
+
+
+class Histogram(Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[MetricsRegistry] = REGISTRY,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+
+    def _make_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets[:-1], registry=None)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self) -> Generator[None, None, None]:
+        """ Observe the duration of the `with` block in seconds. """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start)
+
+    def _own_samples(self) -> Iterable[Sample]:
+        cumulative = 0
+        for upper_bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f"{self.name}_bucket", {"le": _format_value(upper_bound)}, cumulative
+        yield f"{self.name}_sum", {}, self.sum
+        yield f"{self.name}_count", {}, cumulative
@@ -5,3 +5,6 @@
 MINUTE = 60 * SECOND
 ONESECOND_TIMEDELTA = timedelta(days=0, seconds=1)
 INTERVAL_SECONDS = 1.0
+PROFILER_INTERVAL_SECONDS = 0.01
+PROFILER_DURATION_SECONDS = MINUTE
+PROFILER_MAX_DURATION_SECONDS = 10 * MINUTE
@@ -1,15 +1,33 @@
 import json
 import sys
+import time
+import traceback
+from dataclasses import asdict, dataclass
 from datetime import datetime
-from typing import Any
+from typing import Any, Dict, List, Optional, Tuple
 
+import gevent
 import greenlet
 import structlog
+from gevent.hub import Hub
+from gevent.monkey import get_original
 
-from raiden.utils.profiling.sampler import collect_frames
+from raiden.utils.metrics import Histogram
+from raiden.utils.profiling.sampler import collect_frames, greenlet_name
+
+# The watcher must run on a native thread, otherwise it would be blocked by the
+# same greenlets it is supposed to detect.
+start_new_thread, get_thread_ident = get_original("_thread", ["start_new_thread", "get_ident"])
+native_sleep = get_original("time", "sleep")
 
 log = structlog.get_logger(__name__)
 
+HUB_BLOCKING_DURATION = Histogram(
+    "raiden_hub_blocking_seconds",
+    "Time a greenlet ran without yielding, for runs longer than the threshold",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
 
 def install_switch_log():
     # Do not overwrite the previous installed tracing function, this could be
@@ -62,3 +80,144 @@ def stop(self) -> None:
         # to be installed after the `install_switch_log` is called, and this would
         # overwrite it.
         greenlet.settrace(self.previous_callback)
+
+
+@dataclass
+class HubBlockingReport:
+    greenlet: str
+    stack: str
+    count: int = 0
+    total_duration: float = 0.0
+    max_duration: float = 0.0
+
+
+class HubBlockingMonitor:
+    """ Detects greenlets which run for longer than `threshold` seconds
+    without yielding to the hub.
+
+    The time between two switches is measured by a greenlet trace function.
+    Because at the switch the offender is not running anymore, a native
+    thread samples the stack of the main thread while it is still blocked,
+    the stack at the switch is used if the sample is missing.
+
+    The offenders are aggregated by greenlet name and stack, only the
+    `max_reports` worst ones are kept.
+    """
+
+    def __init__(self, max_reports: int = 50) -> None:
+        self.max_reports = max_reports
+        self.threshold = 0.0
+        self.reports: Dict[Tuple[str, str], HubBlockingReport] = dict()
+
+        self._running = False
+        self._previous_callback: Optional[Any] = None
+        self._main_thread_ident = 0
+        self._active: Optional[greenlet.greenlet] = None
+        self._switch_time = 0.0
+        self._switch_count = 0
+        self._sampled_stack: Optional[Tuple[int, str]] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def start(self, threshold: float) -> None:
+        assert not self._running, "HubBlockingMonitor is already running"
+        assert threshold > 0, "threshold must be positive"
+
+        self.threshold = threshold
+        self._main_thread_ident = get_thread_ident()
+        self._active = greenlet.getcurrent()
+        self._switch_time = time.monotonic()
+        self._running = True
+
+        # Chain to the previous tracing function, see `install_switch_log`
+        self._previous_callback = greenlet.gettrace()
+        greenlet.settrace(self._trace)
+        start_new_thread(self._watch, ())
+
+    def stop(self) -> None:
+        # This is a best effort only, see `SwitchMonitoring.stop`
+        self._running = False
+        greenlet.settrace(self._previous_callback)
+
+    def report(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """ The offenders, the one which blocked the longest first. """
+        reports = sorted(self.reports.values(), key=lambda r: r.max_duration, reverse=True)
+        return [asdict(report) for report in reports[:limit]]
+
+    def _watch(self) -> None:
+        while self._running:
+            native_sleep(self.threshold / 2)
+
+            switch_count = self._switch_count
+            is_blocking = (
+                self._sampled_stack is None
+                and not isinstance(self._active, Hub)
+                and time.monotonic() - self._switch_time >= self.threshold
+            )
+            if is_blocking:
+                frame = sys._current_frames().get(  # pylint: disable=protected-access
+                    self._main_thread_ident
+                )
+                if frame is not None:
+                    self._sampled_stack = (switch_count, "".join(traceback.format_stack(frame)))
+
+    def _trace(self, event: str, args: Any) -> None:
+        if event in ("switch", "throw"):
+            origin, target = args
+
+            now = time.monotonic()
+            duration = now - self._switch_time
+            if duration >= self.threshold and not isinstance(origin, Hub):
+                self._record(origin, duration)
+
+            self._active = target
+            self._switch_time = now
+            self._switch_count += 1
+            self._sampled_stack = None
+
+        if self._previous_callback is not None:
+            return self._previous_callback(event, args)
+
+        return None
+
+    def _record(self, origin: greenlet.greenlet, duration: float) -> None:
+        sampled_stack = self._sampled_stack
+        if sampled_stack is not None and sampled_stack[0] == self._switch_count:
+            stack = sampled_stack[1]
+        else:
+            # Skip this method and the trace function
+            frame = sys._getframe(2)  # pylint: disable=protected-access
+            stack = "".join(traceback.format_stack(frame))
+
+        name = greenlet_name(origin)
+        HUB_BLOCKING_DURATION.observe(duration)
+
+        # Logging may switch greenlets, which must not be done from within the
+        # trace function, so it is deferred to the hub
+        gevent.get_hub().loop.run_callback(
+            lambda: log.warning(
+                "Greenlet blocked the hub", greenlet=name, duration=duration, stack=stack
+            )
+        )
+
+        key = (name, stack)
+        report = self.reports.get(key)
+
+        if report is None:
+            if len(self.reports) >= self.max_reports:
+                least_key = min(self.reports, key=lambda k: self.reports[k].max_duration)
+                if self.reports[least_key].max_duration >= duration:
+                    return
+                del self.reports[least_key]
+
+            report = HubBlockingReport(greenlet=name, stack=stack)
+            self.reports[key] = report
+
+        report.count += 1
+        report.total_duration += duration
+        report.max_duration = max(report.max_duration, duration)
+
+
+HUB_BLOCKING_MONITOR = HubBlockingMonitor()
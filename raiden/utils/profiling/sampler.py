@@ -7,11 +7,12 @@
 from types import FrameType
 from typing import IO, Any, Dict, List, NewType, Optional
 
+import gevent
 import greenlet
 import objgraph
 import psutil
 
-from .constants import INTERVAL_SECONDS, MEGA
+from .constants import INTERVAL_SECONDS, MEGA, PROFILER_DURATION_SECONDS, PROFILER_INTERVAL_SECONDS
 from .timer import TIMER, TIMER_SIGNAL, Timer
 
 # Improvements:
@@ -40,6 +41,15 @@ def collect_frames(frame: FrameType) -> List[str]:
     return callstack
 
 
+def greenlet_name(current: greenlet.greenlet) -> str:
+    # gevent's Greenlet and Hub have names, raw greenlets fall back to the type
+    return str(getattr(current, "name", None) or type(current).__name__)
+
+
+def greenlet_format(current: greenlet.greenlet) -> str:
+    return "greenlet:{}".format(greenlet_name(current).replace(";", ","))
+
+
 def flamegraph_format(stack_count: FlameGraph) -> str:
     return "\n".join("%s %d" % (key, value) for key, value in sorted(stack_count.items()))
 
@@ -111,6 +121,35 @@ def stop(self) -> None:
         del self.last_timestamp
 
 
+class StackCollector:
+    """ Aggregates the sampled stacks in memory.
+
+    Every stack is rooted at the greenlet which was running when the sample
+    was taken, so the time spent by each greenlet can be told apart. Samples
+    are counted instead of weighted by wall time, because the signal based
+    sampler fires at regular intervals of CPU time.
+    """
+
+    def __init__(self) -> None:
+        self.stack_count: FlameGraph = collections.defaultdict(int)
+
+    def collect(self, frame: FrameType, _timestamp: float) -> None:
+        callstack = collect_frames(frame)
+        callstack.insert(0, greenlet_format(greenlet.getcurrent()))
+
+        formatted_stack = FlameStack(";".join(callstack))
+        self.stack_count[formatted_stack] += 1
+
+    def flamegraph(self) -> str:
+        # Copying the dictionary is done in C, so a signal cannot add a stack
+        # while it is being formatted
+        return flamegraph_format(dict(self.stack_count))
+
+    def stop(self) -> None:
+        # The samples are kept in memory until they are fetched
+        pass
+
+
 class MemoryCollector:
     def __init__(self, memory_stream: IO) -> None:
         self.memory_stream = memory_stream
@@ -230,17 +269,60 @@ def __init__(
     def _timer_callback(
         self, signum: int, frame: FrameType  # pylint: disable=unused-argument
     ) -> None:
-        # Sample can be called one last time after sample_stop
-        if self.collector is not None:
-            self.collector.collect(frame, time.time())
+        self.collector.collect(frame, time.time())
 
     def stop(self) -> None:
-        timer = self.timer
-        collector = self.collector
+        # The timer must be stoped before the collector, otherwise a last
+        # sample can be taken after the collector was stopped
+        self.timer.stop()
+        self.collector.stop()
 
         del self.timer
         del self.collector
 
-        # The timer must be stoped before sampler
-        timer.stop()
-        collector.stop()
+
+class SamplingProfiler:
+    """ Sampling profiler which can be started and stopped on a running node.
+
+    Only the main thread is sampled, which is where all the greenlets are
+    executed. The profiler stops itself after `duration` seconds, so that a
+    forgotten session does not keep the overhead of the sampling forever. The
+    stacks of the last session are kept until a new one is started.
+    """
+
+    def __init__(self) -> None:
+        self.collector: Optional[StackCollector] = None
+        self._sampler: Optional[SignalSampler] = None
+        self._stop_timer: Optional[gevent.Greenlet] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._sampler is not None
+
+    def start(
+        self,
+        interval: float = PROFILER_INTERVAL_SECONDS,
+        duration: float = PROFILER_DURATION_SECONDS,
+    ) -> None:
+        assert not self.is_running, "Profiler is already running"
+
+        self.collector = StackCollector()
+        self._sampler = SignalSampler(self.collector, interval=interval)
+        self._stop_timer = gevent.spawn_later(duration, self.stop)
+        self._stop_timer.name = "SamplingProfiler.stop"
+
+    def stop(self) -> None:
+        sampler, self._sampler = self._sampler, None
+        stop_timer, self._stop_timer = self._stop_timer, None
+
+        if sampler is not None:
+            sampler.stop()
+
+        if stop_timer is not None and stop_timer is not gevent.getcurrent():
+            stop_timer.kill(block=False)
+
+    def flamegraph(self) -> str:
+        """ Sampled stacks in the collapsed format used by flamegraph.pl """
+        if self.collector is None:
+            return ""
+        return self.collector.flamegraph()
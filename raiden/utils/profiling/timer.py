@@ -25,18 +25,23 @@ def __init__(
 
         assert callable(callback), "callback must be callable"
 
+        self._callback = callback
+        self._timer = timer
+        self._timer_signal = timer_signal
+
         signal.signal(timer_signal, self.callback)
         signal.setitimer(timer, interval, interval)
 
-        self._callback = callback
-
     def callback(self, signum: int, stack: FrameType) -> None:
         self._callback(signum, stack)
 
     def stop(self) -> None:
-        del self._callback
+        # Disarm the timer before removing the handler, otherwise a pending
+        # signal would be delivered to a half torn down object
+        signal.setitimer(self._timer, 0)
+        signal.signal(self._timer_signal, signal.SIG_IGN)
 
-        signal.signal(TIMER_SIGNAL, signal.SIG_IGN)
+        del self._callback
 
     def __bool__(self) -> bool:
         # we're always truthy
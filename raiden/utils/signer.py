@@ -1,5 +1,7 @@
+import sys
 from abc import ABC, abstractmethod
-from typing import Callable
+from binascii import hexlify, unhexlify
+from typing import BinaryIO, Callable, List, Optional
 
 from eth_keys import keys
 from eth_keys.exceptions import BadSignature, ValidationError
@@ -40,6 +42,39 @@ def recover(
     return public_key.to_canonical_address()
 
 
+def recover_or_none(data: bytes, signature: Signature) -> Optional[Address]:
+    """ Same as `recover` but returns None for invalid signatures """
+    if not signature:
+        return None
+    try:
+        return recover(data=data, signature=signature)
+    except InvalidSignature:
+        return None
+
+
+def serve_recoveries(requests: BinaryIO, replies: BinaryIO) -> None:
+    """ Recovers the signers of the batches read from `requests`.
+
+    This is the loop of the worker processes of a `SignatureRecoveryPool`. A
+    batch has one line per message with the hex encoded data and signature
+    separated by a space, and ends with an empty line. The reply has one line
+    per message with the hex encoded signer, or `-` for an invalid signature.
+    """
+    batch: List[bytes] = list()
+    for line in requests:
+        line = line.strip()
+        if line:
+            batch.append(line)
+            continue
+
+        for request in batch:
+            data, _, signature = request.partition(b" ")
+            sender = recover_or_none(unhexlify(data), Signature(unhexlify(signature)))
+            replies.write((hexlify(sender) if sender else b"-") + b"\n")
+        replies.flush()
+        batch.clear()
+
+
 class Signer(ABC):
     """ ABC for Signer interface """
 
@@ -89,3 +124,7 @@ def sign(self, data: bytes, v: int = 27) -> Signature:
         sig_bytes = signature.to_bytes()
         # adjust last byte to v
         return sig_bytes[:-1] + bytes([sig_bytes[-1] + v])
+
+
+if __name__ == "__main__":
+    serve_recoveries(sys.stdin.buffer, sys.stdout.buffer)